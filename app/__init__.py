@@ -46,6 +46,18 @@ def create_app(config_name='default'):
     # Configurar bloqueo de peticiones sospechosas
     app = block_suspicious_requests(app)
     
+    # Configurar recursos estáticos con huella y precomprimidos
+    from app.utils.assets import configure_assets
+    app = configure_assets(app)
+    
+    # Configurar compresión de respuestas dinámicas
+    from app.utils.compression import configure_compression
+    app = configure_compression(app)
+    
+    # Configurar el almacenamiento de las sesiones (cookie o en el servidor)
+    from app.utils.sessions import configure_sessions
+    app = configure_sessions(app)
+    
     # Configurar Flask-Security
     from app.models.user import User, Role
     user_datastore = SQLAlchemyUserDatastore(db, User, Role)  # Usar el modelo Role
@@ -58,7 +70,8 @@ def create_app(config_name='default'):
     app.config['SECURITY_CONFIRMABLE'] = True
     app.config['SECURITY_RECOVERABLE'] = True
     app.config['SECURITY_CHANGEABLE'] = True
-    app.config['SECURITY_TRACKABLE'] = True
+    # Los inicios de sesión se registran agrupados (app/services/login_tracking_service.py)
+    app.config['SECURITY_TRACKABLE'] = False
     app.config['SECURITY_SEND_REGISTER_EMAIL'] = True
     app.config['SECURITY_EMAIL_SUBJECT_REGISTER'] = 'Bienvenido a Eureka'
     app.config['SECURITY_EMAIL_SUBJECT_PASSWORD_RESET'] = 'Restablece tu contraseña en Eureka'
@@ -73,6 +86,54 @@ def create_app(config_name='default'):
     app.config['SECURITY_MSG_DISABLED_ACCOUNT'] = ('Esta cuenta está desactivada.', 'error')
     app.config['SECURITY_MSG_LOGIN'] = ('Inicia sesión para acceder a esta página.', 'info')
     
+    # Configurar notificaciones de cambios
+    from app.utils.events import configure_events
+    app = configure_events(app)
+    
+    # Configurar la cola de tareas en segundo plano
+    from app.services.job_service import configure_jobs
+    app = configure_jobs(app)
+    
+    # Configurar la resolución cacheada de roles y permisos
+    from app.services.permission_service import configure_permissions
+    app = configure_permissions(app)
+    
+    # Configurar la comprobación de disponibilidad de nombres de usuario y correos
+    from app.services.availability_service import configure_availability
+    app = configure_availability(app)
+    
+    # Configurar el registro agrupado de inicios de sesión
+    from app.services.login_tracking_service import configure_login_tracking
+    app = configure_login_tracking(app)
+    
+    # Configurar el autoguardado agrupado de entradas
+    from app.services.autosave_service import configure_autosave
+    app = configure_autosave(app)
+    
+    # Configurar el autocompletado de etiquetas y colecciones
+    from app.services.autocomplete_service import configure_autocomplete
+    app = configure_autocomplete(app)
+    
+    # Configurar las entradas relacionadas por etiquetas
+    from app.services.related_service import configure_related
+    app = configure_related(app)
+    
+    # Configurar la detección de entradas casi duplicadas
+    from app.services.dedup_service import configure_dedup
+    app = configure_dedup(app)
+    
+    # Configurar la búsqueda semántica local
+    from app.services.search_service import configure_search
+    app = configure_search(app)
+    
+    # Configurar el almacén de imágenes de portada y sus miniaturas
+    from app.services.image_service import configure_images
+    app = configure_images(app)
+    
+    # Configurar los resúmenes diarios de actividad (estadísticas)
+    from app.services.stats_service import configure_stats
+    app = configure_stats(app)
+    
     # Register blueprints
     from app.views.main import main as main_blueprint
     app.register_blueprint(main_blueprint)
@@ -80,4 +141,7 @@ def create_app(config_name='default'):
     from app.views.auth import auth as auth_blueprint
     app.register_blueprint(auth_blueprint)
     
+    from app.views.api import api as api_blueprint
+    app.register_blueprint(api_blueprint)
+    
     return app 
\ No newline at end of file
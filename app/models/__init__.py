@@ -9,5 +9,9 @@ from app.models.user import User
 from app.models.collection import Collection
 from app.models.entry import Entry
 from app.models.tag import Tag, EntryTag
+from app.models.entry_signature import EntrySignature, EntryLshBucket
+from app.models.activity import DailyActivity, DailyTagActivity, EntryActivity
+from app.models.job import Job
 
-__all__ = ['User', 'Collection', 'Entry', 'Tag', 'EntryTag'] 
\ No newline at end of file
+__all__ = ['User', 'Collection', 'Entry', 'Tag', 'EntryTag', 'EntrySignature', 'EntryLshBucket',
+           'DailyActivity', 'DailyTagActivity', 'EntryActivity', 'Job'] 
\ No newline at end of file
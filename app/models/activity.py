@@ -0,0 +1,82 @@
+"""
+Modelos de los resúmenes diarios de actividad para la aplicación Eureka.
+"""
+
+from sqlalchemy import ForeignKey, Index
+
+from app import db
+
+class DailyActivity(db.Model):
+    """
+    Actividad de escritura de un usuario en un día (UTC).
+    
+    Se actualiza de forma incremental al confirmar cada transacción que crea,
+    publica, edita o borra entradas, de modo que las estadísticas no tienen que
+    recorrer las entradas del usuario.
+    """
+    __tablename__ = 'daily_activity'
+    
+    user_id = db.Column(db.Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    
+    entries_created = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    entries_published = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    entries_deleted = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Palabras añadidas ese día (al crear entradas o al alargarlas)
+    words_written = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    def __repr__(self):
+        """
+        Representación en string del modelo.
+        """
+        return f'<DailyActivity {self.user_id} {self.day}>'
+
+
+class DailyTagActivity(db.Model):
+    """
+    Veces que un usuario asignó una etiqueta a sus entradas en un día (UTC).
+    """
+    __tablename__ = 'daily_tag_activity'
+    
+    user_id = db.Column(db.Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day = db.Column(db.Date, primary_key=True)
+    tag_id = db.Column(db.Integer, ForeignKey('tags.id', ondelete='CASCADE'), primary_key=True)
+    
+    uses = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    
+    def __repr__(self):
+        """
+        Representación en string del modelo.
+        """
+        return f'<DailyTagActivity {self.user_id} {self.day} (Tag: {self.tag_id})>'
+
+
+class EntryActivity(db.Model):
+    """
+    Estado de una entrada ya contabilizado en los resúmenes diarios.
+    
+    Al cambiar la entrada, la diferencia con este estado es lo que se suma a los
+    resúmenes (palabras nuevas, publicación, borrado, etiquetas asignadas).
+    """
+    __tablename__ = 'entry_activity'
+    
+    entry_id = db.Column(db.Integer, ForeignKey('entries.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    
+    words = db.Column(db.Integer, nullable=False)
+    # Si ya se contó su publicación o su borrado (solo se cuentan una vez)
+    published = db.Column(db.Boolean, nullable=False)
+    deleted = db.Column(db.Boolean, nullable=False)
+    # Fecha de alta de la última asignación de etiqueta contabilizada
+    tags_at = db.Column(db.DateTime, nullable=True)
+    
+    # Índice para reconstruir los resúmenes de un usuario (`flask stats backfill`)
+    __table_args__ = (
+        Index('idx_entry_activity_user', 'user_id'),
+    )
+    
+    def __repr__(self):
+        """
+        Representación en string del modelo.
+        """
+        return f'<EntryActivity {self.entry_id}>'
@@ -3,7 +3,7 @@ Modelo de colección para la aplicación Eureka.
 """
 
 from datetime import datetime
-from sqlalchemy import Index, ForeignKey
+from sqlalchemy import Index, ForeignKey, func
 
 from app import db
 
@@ -38,6 +38,11 @@ class Collection(db.Model):
         Index('idx_collection_user_name', 'user_id', 'name'),
         # Índice para búsquedas por fecha de creación
         Index('idx_collection_created', 'created_at'),
+        # Índice para la sincronización incremental por usuario (updated_at, id)
+        Index('idx_collection_user_updated', 'user_id', 'updated_at', 'id'),
+        # Índice para el autocompletado por prefijo sin distinguir mayúsculas (solo PostgreSQL)
+        Index('idx_collection_user_name_prefix', 'user_id', func.lower(name).label('name_lower'),
+              postgresql_ops={'name_lower': 'text_pattern_ops'}).ddl_if(dialect='postgresql'),
     )
     
     def soft_delete(self):
@@ -54,6 +54,9 @@ class Entry(db.Model):
     is_deleted = db.Column(db.Boolean, default=False, nullable=False)
     deleted_at = db.Column(db.DateTime, nullable=True)
     
+    # Versión para el control de concurrencia optimista: se incrementa en cada escritura
+    version = db.Column(db.Integer, default=1, server_default='1', nullable=False)
+    
     # Índices
     __table_args__ = (
         # Índice para búsquedas por usuario
@@ -66,8 +69,13 @@ class Entry(db.Model):
         Index('idx_entry_created', 'created_at'),
         # Índice para búsqueda de texto en título
         Index('idx_entry_title', 'title'),
+        # Índice para la sincronización incremental por usuario (updated_at, id)
+        Index('idx_entry_user_updated', 'user_id', 'updated_at', 'id'),
     )
     
+    # El ORM añade `version` a la condición de cada UPDATE y lo incrementa
+    __mapper_args__ = {'version_id_col': version}
+    
     def soft_delete(self):
         """
         Realiza un borrado lógico de la entrada.
@@ -95,6 +103,8 @@ class Entry(db.Model):
         """
         if tag not in self.tags:
             self.tags.append(tag)
+            # Cambiar las etiquetas modifica la entrada (la sincronización depende de ello)
+            self.updated_at = datetime.utcnow()
     
     def remove_tag(self, tag):
         """
@@ -102,6 +112,7 @@ class Entry(db.Model):
         """
         if tag in self.tags:
             self.tags.remove(tag)
+            self.updated_at = datetime.utcnow()
     
     def __repr__(self):
         """
@@ -0,0 +1,55 @@
+"""
+Modelos de firmas MinHash y cubetas LSH de las entradas para la aplicación Eureka.
+"""
+
+from datetime import datetime
+from sqlalchemy import Index, ForeignKey
+
+from app import db
+
+class EntrySignature(db.Model):
+    """
+    Firma MinHash del contenido de una entrada, usada para detectar casi duplicados.
+    """
+    __tablename__ = 'entry_signatures'
+    
+    entry_id = db.Column(db.Integer, ForeignKey('entries.id', ondelete='CASCADE'), primary_key=True)
+    user_id = db.Column(db.Integer, ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
+    
+    # Huella del contenido normalizado: si no cambia, no hace falta recalcular la firma
+    content_hash = db.Column(db.BigInteger, nullable=False)
+    # Valores mínimos de cada permutación (uint32 en little-endian)
+    signature = db.Column(db.LargeBinary, nullable=False)
+    
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        """
+        Representación en string del modelo.
+        """
+        return f'<EntrySignature {self.entry_id}>'
+
+
+class EntryLshBucket(db.Model):
+    """
+    Cubeta LSH de una banda de la firma de una entrada.
+    
+    Dos entradas son candidatas a duplicado si coinciden en la cubeta de alguna banda.
+    """
+    __tablename__ = 'entry_lsh_buckets'
+    
+    user_id = db.Column(db.Integer, ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    band = db.Column(db.SmallInteger, primary_key=True)
+    bucket = db.Column(db.BigInteger, primary_key=True)
+    entry_id = db.Column(db.Integer, ForeignKey('entries.id', ondelete='CASCADE'), primary_key=True)
+    
+    __table_args__ = (
+        # Índice para sustituir las cubetas de una entrada al cambiar su contenido
+        Index('idx_lsh_bucket_entry', 'entry_id'),
+    )
+    
+    def __repr__(self):
+        """
+        Representación en string del modelo.
+        """
+        return f'<EntryLshBucket {self.entry_id} (Band: {self.band})>'
@@ -0,0 +1,67 @@
+"""
+Modelo de tarea en segundo plano para la aplicación Eureka.
+"""
+
+from datetime import datetime
+from sqlalchemy import Index, String, text
+import enum
+
+from app import db
+
+class JobStatus(enum.Enum):
+    """
+    Enumeración para los posibles estados de una tarea.
+    Solo se usa para validación en Python, no crea tipo ENUM en la base de datos.
+    """
+    PENDIENTE = 'pendiente'
+    EN_CURSO = 'en_curso'
+    COMPLETADA = 'completada'
+    FALLIDA = 'fallida'
+
+class Job(db.Model):
+    """
+    Tarea en segundo plano a la espera de un worker (`flask jobs work`).
+    
+    Las tareas se guardan en la misma base de datos que los datos que las
+    originan: encolar una tarea dentro de una transacción hace que solo exista si
+    la transacción se confirma.
+    """
+    __tablename__ = 'jobs'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    queue = db.Column(db.String(50), default='default', nullable=False)
+    # Nombre de la tarea registrada que la ejecuta (ver `app.services.job_service.task`)
+    name = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    
+    # Las tareas de mayor prioridad se ejecutan antes
+    priority = db.Column(db.SmallInteger, default=0, server_default='0', nullable=False)
+    status = db.Column(String(20), default=JobStatus.PENDIENTE.value, nullable=False)
+    
+    # No se ejecuta antes de esta fecha (tareas programadas y reintentos)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    attempts = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    max_attempts = db.Column(db.Integer, default=5, server_default='5', nullable=False)
+    last_error = db.Column(db.Text, nullable=True)
+    
+    # Worker que la está ejecutando y desde cuándo
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    
+    # Índices
+    __table_args__ = (
+        # Índice parcial para tomar las siguientes tareas pendientes de una cola
+        Index('idx_job_pending', queue, priority.desc(), run_at, id,
+              postgresql_where=text("status = 'pendiente'"), sqlite_where=text("status = 'pendiente'")),
+        # Índice para recuperar las tareas de workers caídos y limpiar las terminadas
+        Index('idx_job_status', 'status', 'locked_at'),
+    )
+    
+    def __repr__(self):
+        """
+        Representación en string del modelo.
+        """
+        return f'<Job {self.id} {self.name} ({self.status})>'
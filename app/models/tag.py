@@ -3,7 +3,7 @@ Modelos de etiqueta y relación entre etiquetas y entradas para la aplicación E
 """
 
 from datetime import datetime
-from sqlalchemy import Index, ForeignKey, UniqueConstraint
+from sqlalchemy import Index, ForeignKey, UniqueConstraint, func
 
 from app import db
 
@@ -36,6 +36,11 @@ class Tag(db.Model):
         Index('idx_tag_name', 'name'),
         # Índice para búsquedas por usuario
         Index('idx_tag_user', 'user_id'),
+        # Índice para la sincronización incremental por usuario (updated_at, id)
+        Index('idx_tag_user_updated', 'user_id', 'updated_at', 'id'),
+        # Índice para el autocompletado por prefijo sin distinguir mayúsculas (solo PostgreSQL)
+        Index('idx_tag_user_name_prefix', 'user_id', func.lower(name).label('name_lower'),
+              postgresql_ops={'name_lower': 'text_pattern_ops'}).ddl_if(dialect='postgresql'),
     )
     
     def __repr__(self):
@@ -6,6 +6,7 @@ from datetime import datetime
 import uuid
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy import Index
+from flask import current_app
 from flask_login import UserMixin
 
 from app import db, bcrypt
@@ -30,6 +31,8 @@ class User(UserMixin, db.Model):
     # Campos de auditoría
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     last_login = db.Column(db.DateTime, nullable=True)
+    # Se escriben agrupados (ver app/services/login_tracking_service.py)
+    login_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
     
     # Preferencias
     theme_preference = db.Column(db.String(10), default='claro', nullable=False)
@@ -59,8 +62,18 @@ class User(UserMixin, db.Model):
     def get_id(self):
         """
         Método requerido por Flask-Login.
+        
+        Flask-Security recarga la identidad de la sesión por `fs_uniquifier`,
+        por lo que ese es el identificador que debe guardarse en la cookie.
         """
-        return str(self.id)
+        return str(self.fs_uniquifier)
+    
+    @property
+    def active(self):
+        """
+        Atributo requerido por Flask-Security para validar la identidad cargada.
+        """
+        return self.is_active
     
     @property
     def is_authenticated(self):
@@ -96,6 +109,20 @@ class User(UserMixin, db.Model):
         """
         return bcrypt.check_password_hash(self._password_hash, password)
     
+    def has_role(self, role):
+        """
+        Indica si el usuario tiene un rol (nombre o instancia de `Role`).
+        
+        Se resuelve con la caché de roles del worker (ver `app.services.permission_service`).
+        """
+        return current_app.extensions['permissions'].has_role(self.id, role)
+    
+    def has_permission(self, permission):
+        """
+        Indica si alguno de los roles del usuario concede un permiso.
+        """
+        return current_app.extensions['permissions'].has_permission(self.id, permission)
+    
     def soft_delete(self):
         """
         Realiza un borrado lógico del usuario.
@@ -120,12 +147,27 @@ class Role(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(80), unique=True)
     description = db.Column(db.String(255))
+    # Permisos que concede el rol, separados por comas (p. ej. "entries-read,admin-write")
+    permissions = db.Column(db.Text, nullable=True)
+    
+    @staticmethod
+    def parse_permissions(permissions):
+        """Conjunto de permisos de un valor de la columna `permissions`."""
+        return {permission.strip() for permission in (permissions or '').split(',') if permission.strip()}
+    
+    def get_permissions(self):
+        """
+        Permisos que concede el rol (requerido por Flask-Security).
+        """
+        return self.parse_permissions(self.permissions)
     
     def __repr__(self):
         return f'<Role {self.name}>'
 
-# Tabla de asociación entre usuarios y roles
+# Tabla de asociación entre usuarios y roles: la clave primaria (user_id, role_id)
+# resuelve los roles de un usuario y el índice de role_id, los usuarios de un rol
 roles_users = db.Table('roles_users',
-    db.Column('user_id', db.Integer(), db.ForeignKey('users.id')),
-    db.Column('role_id', db.Integer(), db.ForeignKey('roles.id'))
+    db.Column('user_id', db.Integer(), db.ForeignKey('users.id'), primary_key=True),
+    db.Column('role_id', db.Integer(), db.ForeignKey('roles.id'), primary_key=True),
+    Index('idx_roles_users_role', 'role_id')
 ) 
\ No newline at end of file
@@ -0,0 +1,179 @@
+"""
+Autocompletado por prefijo de nombres de etiquetas y colecciones.
+
+Cada pulsación en un campo de etiquetas es una petición, así que los nombres de
+cada usuario se guardan en memoria ordenados por su versión en minúsculas y un
+prefijo se resuelve con una búsqueda binaria (`bisect`), sin tocar la base de datos.
+La caché de un usuario se descarta cuando se publican cambios en sus etiquetas o
+colecciones (ver `app.utils.events`) y, por si se pierde algún aviso, caduca tras
+`AUTOCOMPLETE_CACHE_TTL` segundos.
+
+Las listas de los usuarios con más de `AUTOCOMPLETE_MAX_NAMES` nombres no se
+cachean (solo se recuerda, con la misma caducidad, que son demasiados): se consulta la base de datos con `lower(name) LIKE 'prefijo%'`, que en
+PostgreSQL resuelve el índice `(user_id, lower(name) text_pattern_ops)` de cada tabla.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict, defaultdict
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Collection, Tag
+
+# Modelo y filtros adicionales de cada tipo de nombre autocompletable
+AUTOCOMPLETE_SOURCES = {
+    'tags': (Tag, ()),
+    'collections': (Collection, (Collection.is_deleted.is_(False),)),
+}
+
+class AutocompleteService:
+    """
+    Búsqueda por prefijo con una caché LRU de nombres ordenados por usuario y tipo.
+    """
+    
+    def __init__(self, max_users=1000, ttl=300, max_names=5000):
+        """
+        Args:
+            max_users (int): Listas de nombres (usuario y tipo) que se mantienen en memoria.
+            ttl (float): Segundos tras los que se recarga una lista aunque no haya avisos.
+            max_names (int): Nombres a partir de los cuales no se cachea la lista de un usuario.
+        """
+        self.max_users = max_users
+        self.ttl = ttl
+        self.max_names = max_names
+        self._cache = OrderedDict()
+        # Invalidaciones de cada (user_id, tipo): una carga que empezó antes no se guarda
+        self._generations = defaultdict(int)
+        self._lock = threading.Lock()
+    
+    def complete(self, user_id, kind, prefix, limit=10):
+        """
+        Obtiene los nombres de un usuario que empiezan por un prefijo.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            kind (str): 'tags' o 'collections'.
+            prefix (str): Texto escrito (no distingue mayúsculas).
+            limit (int): Máximo de resultados.
+        
+        Returns:
+            list: Diccionarios con `id` y `name`, por orden alfabético.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        
+        names = self._names(user_id, kind)
+        if names is None:
+            return self.search_database(user_id, kind, prefix, limit=limit)
+        
+        keys, items = names
+        start = bisect_left(keys, prefix)
+        results = []
+        for index in range(start, len(keys)):
+            if len(results) >= limit or not keys[index].startswith(prefix):
+                break
+            results.append(items[index])
+        return results
+    
+    def invalidate(self, user_id, kind=None):
+        """Descarta la caché de un usuario (de un tipo o de todos)."""
+        kinds = [kind] if kind else list(AUTOCOMPLETE_SOURCES)
+        with self._lock:
+            for name in kinds:
+                self._cache.pop((user_id, name), None)
+                self._generations[(user_id, name)] += 1
+    
+    def on_changes(self, user_id, changes):
+        """Oyente de `app.utils.events`: invalida los tipos con cambios."""
+        for kind in AUTOCOMPLETE_SOURCES:
+            if kind in changes:
+                self.invalidate(user_id, kind)
+    
+    def search_database(self, user_id, kind, prefix, limit=10):
+        """
+        Búsqueda por prefijo directamente en la base de datos.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            kind (str): 'tags' o 'collections'.
+            prefix (str): Texto escrito (no distingue mayúsculas).
+            limit (int): Máximo de resultados.
+        
+        Returns:
+            list: Diccionarios con `id` y `name`, por orden alfabético.
+        """
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return []
+        
+        model, filters = AUTOCOMPLETE_SOURCES[kind]
+        pattern = prefix.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        rows = db.session.execute(
+            select(model.id, model.name)
+            .where(model.user_id == user_id, func.lower(model.name).like(pattern, escape='\\'), *filters)
+            .order_by(func.lower(model.name), model.id)
+            .limit(limit)
+        )
+        return [{'id': row.id, 'name': row.name} for row in rows]
+    
+    def _names(self, user_id, kind):
+        """
+        Lista ordenada de nombres en minúsculas y sus elementos, desde la caché o la base de datos.
+        
+        Returns:
+            tuple: (nombres en minúsculas, elementos), o None si el usuario tiene demasiados nombres.
+        """
+        key = (user_id, kind)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and now - cached[0] < self.ttl:
+                self._cache.move_to_end(key)
+                # Sin lista (demasiados nombres) se recuerda igualmente, para no cargarla en cada pulsación
+                return None if cached[1] is None else (cached[1], cached[2])
+            generation = self._generations.get(key, 0)
+        
+        model, filters = AUTOCOMPLETE_SOURCES[kind]
+        rows = db.session.execute(
+            select(model.id, model.name).where(model.user_id == user_id, *filters).limit(self.max_names + 1)
+        ).all()
+        if len(rows) > self.max_names:
+            keys = items = None
+        else:
+            entries = sorted((row.name.lower(), row.id, row.name) for row in rows)
+            keys = [lower for lower, _, _ in entries]
+            items = [{'id': row_id, 'name': name} for _, row_id, name in entries]
+        
+        with self._lock:
+            if self._generations.get(key, 0) == generation:
+                self._cache[key] = (now, keys, items)
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.max_users:
+                    self._cache.popitem(last=False)
+        return None if keys is None else (keys, items)
+
+def configure_autocomplete(app):
+    """
+    Configura el autocompletado y su invalidación con las notificaciones de cambios.
+    
+    Debe llamarse después de `configure_events`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('AUTOCOMPLETE_CACHE_USERS', 1000)
+    app.config.setdefault('AUTOCOMPLETE_CACHE_TTL', 300)
+    app.config.setdefault('AUTOCOMPLETE_MAX_NAMES', 5000)
+    
+    service = AutocompleteService(
+        max_users=app.config['AUTOCOMPLETE_CACHE_USERS'],
+        ttl=app.config['AUTOCOMPLETE_CACHE_TTL'],
+        max_names=app.config['AUTOCOMPLETE_MAX_NAMES']
+    )
+    app.extensions['events'].add_listener(service.on_changes)
+    app.extensions['autocomplete'] = service
+    return app
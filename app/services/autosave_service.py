@@ -0,0 +1,266 @@
+"""
+Autoguardado de entradas con agrupación de escrituras.
+
+El editor envía un PATCH con los campos modificados cada pocos segundos. En lugar
+de escribir cada uno, los cambios de una misma entrada se acumulan en memoria y se
+escriben juntos cuando pasan `AUTOSAVE_DEBOUNCE` segundos sin cambios nuevos (o
+`AUTOSAVE_MAX_DELAY` segundos desde el primero, si no dejan de llegar). Cada
+escritura es un compare-and-swap sobre `Entry.version`, así que los cambios de otro
+dispositivo nunca se pisan: se detectan y se devuelven como conflicto.
+
+El búfer vive en el proceso: con varios workers, el balanceador debe mantener las
+peticiones de un mismo editor en el mismo worker (o usar `AUTOSAVE_DEBOUNCE = 0`).
+Si no lo hace, no se pierden cambios, pero pueden aparecer conflictos falsos.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+from app.services.entry_service import EntryService, VersionConflictError
+
+logger = logging.getLogger(__name__)
+
+# Segundos durante los que se recuerdan las versiones escritas y los conflictos
+RESULT_TTL = 300
+
+class _PendingSave:
+    """Cambios acumulados de una entrada a la espera de escribirse."""
+    
+    __slots__ = ('user_id', 'entry_id', 'editor', 'version', 'values', 'first_at', 'last_at')
+    
+    def __init__(self, user_id, entry_id, editor, version, values, now):
+        self.user_id = user_id
+        self.entry_id = entry_id
+        self.editor = editor
+        self.version = version
+        self.values = values
+        self.first_at = now
+        self.last_at = now
+    
+    def same_chain(self, user_id, editor, version):
+        """Indica si un guardado continúa esta misma serie de cambios."""
+        return self.user_id == user_id and self.editor == editor and self.version == version
+
+class AutosaveCoalescer:
+    """
+    Agrupa los autoguardados de cada entrada y los escribe con compare-and-swap.
+    
+    El cliente envía siempre la versión recibida en la última respuesta. Mientras
+    sus cambios están pendientes se le devuelve la misma versión; cuando se
+    escriben, se recuerda la correspondencia entre la versión de partida y la
+    nueva, para que el siguiente guardado de ese editor continúe sin conflicto.
+    """
+    
+    def __init__(self, app, debounce=2.0, max_delay=10.0, entry_service=None):
+        """
+        Args:
+            app: Aplicación Flask (para escribir desde el hilo de fondo).
+            debounce (float): Segundos sin cambios antes de escribir; 0 escribe siempre al momento.
+            max_delay (float): Segundos máximos que un cambio puede esperar.
+            entry_service (EntryService): Servicio con el que se escriben las entradas.
+        """
+        self.app = app
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.entry_service = entry_service or EntryService()
+        self._pending = {}
+        self._written = {}
+        self._conflicts = {}
+        self._writing = set()
+        self._lock = threading.Lock()
+        self._written_cond = threading.Condition(self._lock)
+        self._thread = None
+    
+    def save(self, user_id, entry_id, version, data, editor=None, defer=True):
+        """
+        Guarda los cambios de una entrada, agrupándolos con los pendientes.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            entry_id (int): ID de la entrada.
+            version (int): Versión recibida por el cliente en la última respuesta.
+            data (dict): Campos modificados.
+            editor (str): Identificador de la sesión de edición (p. ej. del dispositivo).
+                Sin él no se pueden distinguir dos dispositivos y se escribe al momento.
+            defer (bool): Si es False, los cambios (y los pendientes) se escriben ya.
+        
+        Returns:
+            dict: `id`, `version` y `pending` (los cambios aún no están escritos),
+                o None si la entrada no existe.
+        
+        Raises:
+            ValueError: Si algún dato no es válido.
+            VersionConflictError: Si la entrada se modificó desde otra sesión.
+        """
+        if not isinstance(version, int) or isinstance(version, bool):
+            raise ValueError('La versión de la entrada debe ser un número entero.')
+        values = self.entry_service._clean_values(data, partial=True)
+        now = time.monotonic()
+        
+        with self._lock:
+            # Si otro guardado o el hilo de fondo está escribiendo esta entrada, se espera a que termine
+            while entry_id in self._writing:
+                self._written_cond.wait()
+            version = self._resolve_version(entry_id, editor, version)
+            unsaved = self._conflicts.pop((entry_id, editor, version), None)
+            pending = self._pending.get(entry_id)
+            
+            if unsaved is None and pending is not None and pending.same_chain(user_id, editor, version):
+                # Mismo editor: los cambios se combinan en el búfer sin sacarlo del diccionario
+                pending.values.update(values)
+                pending.last_at = now
+                if defer and self.debounce > 0 and now - pending.first_at < self.max_delay:
+                    return {'id': entry_id, 'version': version, 'pending': True}
+                values = pending.values
+                chained = True
+            else:
+                chained = False
+            
+            # El resto necesita la base de datos: mientras tanto los demás guardados de la entrada esperan
+            if pending is not None:
+                del self._pending[entry_id]
+            self._writing.add(entry_id)
+        
+        try:
+            return self._save_now(user_id, entry_id, editor, version, values, pending, chained, unsaved, defer, now)
+        finally:
+            with self._lock:
+                self._writing.discard(entry_id)
+                self._written_cond.notify_all()
+    
+    def _save_now(self, user_id, entry_id, editor, version, values, pending, chained, unsaved, defer, now):
+        """Parte de `save` que consulta o escribe la entrada, con la entrada marcada en `_writing`."""
+        if unsaved is not None:
+            if pending is not None:
+                self._write(pending)
+            # Un guardado anterior de este editor chocó con otro al escribirse
+            self._raise_conflict(user_id, entry_id, dict(unsaved[0], **values))
+        
+        if not chained:
+            if pending is not None:
+                # Otro editor tenía cambios pendientes: se escriben primero y ganan
+                self._write(pending)
+            current = self.entry_service.current_version(user_id, entry_id)
+            if current is None:
+                return None
+            if current != version:
+                self._raise_conflict(user_id, entry_id, values)
+            
+            if defer and editor and self.debounce > 0 and self.max_delay > 0:
+                with self._lock:
+                    self._pending[entry_id] = _PendingSave(user_id, entry_id, editor, version, values, now)
+                self._ensure_flushing()
+                return {'id': entry_id, 'version': version, 'pending': True}
+        
+        # Escritura inmediata: el cliente recibe la nueva versión en la respuesta
+        result = self.entry_service.update_entry(user_id, entry_id, version, values)
+        if result is None:
+            return None
+        return dict(result, pending=False)
+    
+    def flush(self, force=False):
+        """
+        Escribe los cambios pendientes que ya han esperado lo suficiente.
+        
+        Args:
+            force (bool): Escribir todos los pendientes, hayan esperado o no.
+        
+        Returns:
+            int: Número de entradas escritas (o en conflicto).
+        """
+        now = time.monotonic()
+        with self._lock:
+            due = [pending for pending in self._pending.values()
+                   if force or now - pending.last_at >= self.debounce or now - pending.first_at >= self.max_delay]
+            for pending in due:
+                del self._pending[pending.entry_id]
+                self._writing.add(pending.entry_id)
+            self._expire(now)
+        
+        for pending in due:
+            try:
+                self._write(pending)
+            finally:
+                with self._lock:
+                    self._writing.discard(pending.entry_id)
+                    self._written_cond.notify_all()
+        return len(due)
+    
+    def _write(self, pending):
+        """Escribe unos cambios pendientes y recuerda la nueva versión o el conflicto."""
+        try:
+            result = self.entry_service.update_entry(pending.user_id, pending.entry_id, pending.version,
+                                                     pending.values)
+        except VersionConflictError:
+            with self._lock:
+                self._conflicts[(pending.entry_id, pending.editor, pending.version)] = (pending.values,
+                                                                                        time.monotonic())
+            return
+        except Exception:
+            logger.exception('No se pudo escribir el autoguardado de la entrada %s', pending.entry_id)
+            return
+        
+        if result is not None:
+            with self._lock:
+                self._written[(pending.entry_id, pending.editor, pending.version)] = (result['version'],
+                                                                                      time.monotonic())
+    
+    def _resolve_version(self, entry_id, editor, version):
+        """Sigue las versiones ya escritas a partir de la que envía el cliente."""
+        while (entry_id, editor, version) in self._written:
+            version = self._written[(entry_id, editor, version)][0]
+        return version
+    
+    def _raise_conflict(self, user_id, entry_id, unsaved):
+        """Lanza el conflicto con el estado actual de la entrada."""
+        current = self.entry_service.get_entry(user_id, entry_id)
+        raise VersionConflictError(current, unsaved=unsaved)
+    
+    def _expire(self, now):
+        """Olvida las versiones escritas y los conflictos antiguos."""
+        for records in (self._written, self._conflicts):
+            for key in [key for key, (_, at) in records.items() if now - at > RESULT_TTL]:
+                del records[key]
+    
+    def _ensure_flushing(self):
+        """Arranca el hilo que escribe los cambios pendientes (también tras un fork)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self._flush_in_context, True)
+            self._thread = threading.Thread(target=self._flush_forever, name='eureka-autosave', daemon=True)
+            self._thread.start()
+    
+    def _flush_forever(self):
+        """Bucle del hilo de escritura."""
+        interval = max(min(self.debounce, self.max_delay) / 2, 0.1)
+        while True:
+            time.sleep(interval)
+            try:
+                self._flush_in_context()
+            except Exception:
+                logger.exception('Error al escribir los autoguardados pendientes')
+    
+    def _flush_in_context(self, force=False):
+        """Ejecuta `flush` dentro de un contexto de aplicación propio."""
+        with self.app.app_context():
+            self.flush(force=force)
+
+def configure_autosave(app):
+    """
+    Configura el autoguardado agrupado de entradas.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('AUTOSAVE_DEBOUNCE', 2.0)
+    app.config.setdefault('AUTOSAVE_MAX_DELAY', 10.0)
+    app.extensions['autosave'] = AutosaveCoalescer(
+        app,
+        debounce=app.config['AUTOSAVE_DEBOUNCE'],
+        max_delay=app.config['AUTOSAVE_MAX_DELAY']
+    )
+    return app
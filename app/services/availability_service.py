@@ -0,0 +1,150 @@
+"""
+Disponibilidad de nombres de usuario y correos con un filtro de Bloom.
+
+Comprobar "¿está libre este nombre?" mientras el usuario escribe el formulario de
+registro sería una consulta por pulsación. Cada worker mantiene un filtro de Bloom
+(`app.utils.bloom`) con todos los nombres de usuario y correos existentes: si el
+filtro dice que un valor no está, seguro que no existía al construirlo y se
+responde sin tocar la base de datos. Solo los positivos (los ocupados y ~1 % de
+falsos positivos) se confirman con una única consulta.
+
+El filtro se construye en la primera consulta, recibe los usuarios creados por
+este worker (`UserService.create_user`) y se reconstruye cada
+`AVAILABILITY_REFRESH` segundos para incorporar los creados en otros workers.
+Mientras tanto puede dar por libre un nombre recién ocupado en otro worker: es
+solo una indicación para el formulario, el registro lo resuelven las restricciones
+únicas de la tabla `users`.
+"""
+
+import threading
+import time
+
+from sqlalchemy import func, select
+
+from app import db
+from app.models.user import User
+from app.services.user_service import UserService
+from app.utils.bloom import BloomFilter
+
+# Elementos mínimos para los que se dimensiona el filtro
+MIN_CAPACITY = 10000
+
+# Margen de crecimiento: el filtro admite este múltiplo de los elementos actuales
+CAPACITY_HEADROOM = 2
+
+def _key(field, value):
+    """Clave de un valor en el filtro (los correos se guardan en minúsculas)."""
+    return f"{field}:{value.lower() if field == 'email' else value}"
+
+class AvailabilityService:
+    """
+    Comprueba si un nombre de usuario o un correo están libres.
+    """
+    
+    def __init__(self, error_rate=0.01, ttl=3600, user_service=None):
+        """
+        Args:
+            error_rate (float): Probabilidad de falso positivo del filtro.
+            ttl (float): Segundos tras los que se reconstruye el filtro.
+            user_service (UserService): Servicio con el que se confirman los positivos.
+        """
+        self.error_rate = error_rate
+        self.ttl = ttl
+        self.user_service = user_service or UserService()
+        self._filter = None
+        self._built_at = 0.0
+        self._building = False
+        # Usuarios creados mientras se construye un filtro nuevo
+        self._added = []
+        self._lock = threading.Lock()
+    
+    def taken(self, username=None, email=None):
+        """
+        Campos ocupados entre los indicados.
+        
+        Args:
+            username (str): Nombre de usuario.
+            email (str): Correo electrónico.
+        
+        Returns:
+            set: 'username' y/o 'email', los que ya usa otra cuenta.
+        """
+        values = {field: value for field, value in (('username', username), ('email', email)) if value}
+        bloom = self._bloom()
+        maybe = {field: value for field, value in values.items() if _key(field, value) in bloom}
+        if not maybe:
+            return set()
+        return self.user_service.get_taken_fields(maybe.get('username'), maybe.get('email'))
+    
+    def add(self, username, email):
+        """Añade al filtro un usuario recién creado."""
+        keys = (_key('username', username), _key('email', email))
+        with self._lock:
+            if self._filter is not None:
+                self._filter.update(keys)
+            if self._building:
+                self._added.extend(keys)
+    
+    def invalidate(self):
+        """Descarta el filtro: se reconstruye en la siguiente consulta."""
+        with self._lock:
+            self._filter = None
+    
+    def build(self):
+        """
+        Construye un filtro con todos los nombres de usuario y correos.
+        
+        Incluye las cuentas borradas lógicamente: sus valores siguen ocupando las
+        restricciones únicas.
+        
+        Returns:
+            BloomFilter: Filtro nuevo.
+        """
+        total = db.session.scalar(select(func.count(User.id))) or 0
+        bloom = BloomFilter(max(MIN_CAPACITY, 2 * total * CAPACITY_HEADROOM), self.error_rate)
+        rows = db.session.execute(select(User.username, User.email).execution_options(yield_per=5000))
+        for username, email in rows:
+            bloom.update((_key('username', username), _key('email', email)))
+        return bloom
+    
+    def _bloom(self):
+        """Filtro actual, construyéndolo si no existe, ha caducado o está lleno."""
+        now = time.monotonic()
+        with self._lock:
+            bloom = self._filter
+            stale = bloom is None or now - self._built_at > self.ttl or len(bloom) > bloom.capacity
+            # Mientras otro hilo lo reconstruye se sigue usando el anterior
+            if not stale or (self._building and bloom is not None):
+                return bloom
+            self._building = True
+            self._added = []
+        
+        try:
+            bloom = self.build()
+        except Exception:
+            with self._lock:
+                self._building = False
+            raise
+        
+        with self._lock:
+            bloom.update(self._added)
+            self._filter = bloom
+            self._built_at = now
+            self._building = False
+            self._added = []
+        return bloom
+
+def configure_availability(app):
+    """
+    Configura la comprobación de disponibilidad de nombres de usuario y correos.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('AVAILABILITY_ERROR_RATE', 0.01)
+    app.config.setdefault('AVAILABILITY_REFRESH', 3600)
+    app.extensions['availability'] = AvailabilityService(
+        error_rate=app.config['AVAILABILITY_ERROR_RATE'],
+        ttl=app.config['AVAILABILITY_REFRESH']
+    )
+    return app
@@ -0,0 +1,70 @@
+from sqlalchemy import select
+
+from app import db
+from app.models import Collection
+
+# Campos de una colección que expone la API y la columna de la que se cargan
+COLLECTION_COLUMNS = {
+    'id': Collection.id,
+    'name': Collection.name,
+    'description': Collection.description,
+    'image_path': Collection.image_path,
+    'created_at': Collection.created_at,
+    'updated_at': Collection.updated_at,
+}
+
+COLLECTION_FIELDS = tuple(COLLECTION_COLUMNS)
+
+class CollectionService:
+    """
+    Servicio para consultar las colecciones de un usuario.
+    """
+    
+    def list_collections(self, user_id, fields=COLLECTION_FIELDS):
+        """
+        Obtiene las colecciones activas de un usuario ordenadas por nombre.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            fields (tuple): Campos a devolver (ver `COLLECTION_FIELDS`).
+        
+        Returns:
+            list: Colecciones como diccionarios con los campos solicitados.
+        """
+        columns = [COLLECTION_COLUMNS[name].label(name) for name in fields]
+        rows = db.session.execute(
+            select(*columns)
+            .where(Collection.user_id == user_id, Collection.is_deleted.is_(False))
+            .order_by(Collection.name, Collection.id)
+        )
+        return [dict(row._mapping) for row in rows]
+    
+    def set_image(self, user_id, collection_id, image_path):
+        """
+        Asigna (o quita) la imagen de portada de una colección.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            collection_id (int): ID de la colección.
+            image_path (str): Nombre de la imagen guardada, o None para quitarla.
+        
+        Returns:
+            dict: `id`, `image_path` y `updated_at`, o None si la colección no existe.
+        """
+        collection = db.session.scalar(
+            select(Collection).where(Collection.id == collection_id, Collection.user_id == user_id,
+                                     Collection.is_deleted.is_(False))
+        )
+        if collection is None:
+            return None
+        
+        collection.image_path = image_path
+        db.session.commit()
+        return {'id': collection.id, 'image_path': collection.image_path, 'updated_at': collection.updated_at}
+    
+    def exists(self, user_id, collection_id):
+        """Indica si una colección activa pertenece al usuario."""
+        return db.session.scalar(
+            select(Collection.id).where(Collection.id == collection_id, Collection.user_id == user_id,
+                                        Collection.is_deleted.is_(False))
+        ) is not None
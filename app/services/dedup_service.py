@@ -0,0 +1,222 @@
+"""
+Detección de entradas casi duplicadas con MinHash y LSH.
+
+Al confirmar una transacción que crea o modifica entradas se recalcula la firma
+MinHash de las que han cambiado de contenido y se guardan sus cubetas LSH (ver
+`app.utils.minhash`), en la misma transacción. Buscar los posibles duplicados de
+una entrada solo lee las entradas que comparten alguna cubeta con ella (una
+consulta por índice), no todas las del usuario.
+
+`flask dedup backfill` calcula las firmas de las entradas existentes repartiendo
+el cálculo entre varios procesos.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, insert, select, tuple_
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Entry, EntryLshBucket, EntrySignature
+from app.utils.events import SESSION_KEY
+from app.utils.minhash import compute_signature, compute_signatures, normalize, content_hash, \
+    signature_from_bytes, similarity
+
+# Similitud estimada a partir de la cual se considera posible duplicado
+DUPLICATE_THRESHOLD = 0.7
+
+class DedupService:
+    """
+    Servicio de firmas MinHash y búsqueda de posibles duplicados.
+    """
+    
+    def index_entries(self, session, entry_ids):
+        """
+        Actualiza las firmas de unas entradas cuyo contenido puede haber cambiado.
+        
+        Solo se recalculan las entradas cuyo contenido normalizado ha cambiado; las
+        borradas (o vacías) pierden su firma y sus cubetas.
+        
+        Args:
+            session: Sesión en cuya transacción se escriben las firmas.
+            entry_ids (iterable): Entradas creadas, modificadas o borradas.
+        """
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return
+        
+        rows = session.execute(
+            select(Entry.id, Entry.user_id, Entry.content, Entry.is_deleted, EntrySignature.content_hash)
+            .outerjoin(EntrySignature, EntrySignature.entry_id == Entry.id)
+            .where(Entry.id.in_(entry_ids))
+        ).all()
+        
+        results = []
+        for entry_id, user_id, content, is_deleted, stored_hash in rows:
+            if is_deleted:
+                results.append((entry_id, user_id, None))
+                continue
+            normalized = normalize(content)
+            if stored_hash is not None and normalized and content_hash(normalized) == stored_hash:
+                continue
+            results.append((entry_id, user_id, compute_signature(content)))
+        
+        self.store_signatures(session, results)
+    
+    def store_signatures(self, session, results):
+        """
+        Sustituye las firmas y cubetas de unas entradas.
+        
+        Args:
+            session: Sesión en cuya transacción se escriben.
+            results (list): Tuplas (entry_id, user_id, resultado de `compute_signature`);
+                con resultado None solo se borran las firmas anteriores.
+        """
+        if not results:
+            return
+        
+        entry_ids = [entry_id for entry_id, _, _ in results]
+        session.execute(delete(EntryLshBucket).where(EntryLshBucket.entry_id.in_(entry_ids)))
+        session.execute(delete(EntrySignature).where(EntrySignature.entry_id.in_(entry_ids)))
+        
+        signatures, buckets = [], []
+        for entry_id, user_id, result in results:
+            if result is None:
+                continue
+            hash_value, signature, entry_buckets = result
+            signatures.append({'entry_id': entry_id, 'user_id': user_id, 'content_hash': hash_value,
+                               'signature': signature})
+            buckets.extend({'user_id': user_id, 'band': band, 'bucket': bucket, 'entry_id': entry_id}
+                           for band, bucket in set(entry_buckets))
+        if signatures:
+            session.execute(insert(EntrySignature), signatures)
+            session.execute(insert(EntryLshBucket), buckets)
+    
+    def possible_duplicates(self, user_id, entry_id, threshold=DUPLICATE_THRESHOLD, limit=10):
+        """
+        Entradas del usuario cuyo contenido es casi igual al de una entrada.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            entry_id (int): ID de la entrada.
+            threshold (float): Similitud estimada mínima (0 a 1).
+            limit (int): Máximo de resultados.
+        
+        Returns:
+            list: Diccionarios con `id`, `title` y `similarity`, de mayor a menor
+                similitud, o None si la entrada no existe o aún no tiene firma.
+        """
+        signature = db.session.scalar(
+            select(EntrySignature.signature)
+            .join(Entry, Entry.id == EntrySignature.entry_id)
+            .where(EntrySignature.entry_id == entry_id, Entry.user_id == user_id, Entry.is_deleted.is_(False))
+        )
+        if signature is None:
+            return None
+        
+        keys = db.session.execute(
+            select(EntryLshBucket.band, EntryLshBucket.bucket).where(EntryLshBucket.entry_id == entry_id)
+        ).all()
+        # Candidatas: entradas que comparten alguna cubeta (índice user_id, band, bucket)
+        candidates = select(EntryLshBucket.entry_id).where(
+            EntryLshBucket.user_id == user_id,
+            tuple_(EntryLshBucket.band, EntryLshBucket.bucket).in_(keys),
+            EntryLshBucket.entry_id != entry_id
+        ).distinct()
+        rows = db.session.execute(
+            select(Entry.id, Entry.title, EntrySignature.signature)
+            .join(EntrySignature, EntrySignature.entry_id == Entry.id)
+            .where(Entry.id.in_(candidates), Entry.is_deleted.is_(False))
+        ).all()
+        
+        source = signature_from_bytes(signature)
+        duplicates = []
+        for row in rows:
+            score = similarity(source, signature_from_bytes(row.signature))
+            if score >= threshold:
+                duplicates.append({'id': row.id, 'title': row.title, 'similarity': round(score, 4)})
+        duplicates.sort(key=lambda item: (-item['similarity'], item['id']))
+        return duplicates[:limit]
+    
+    def backfill(self, batch_size=1000, workers=None, recompute=False):
+        """
+        Calcula las firmas de las entradas existentes en un pool de procesos.
+        
+        Las entradas se leen por bloques de ID (paginación por clave) y cada bloque se
+        reparte entre los procesos; las firmas se escriben y confirman por bloque.
+        
+        Args:
+            batch_size (int): Entradas leídas y confirmadas por bloque.
+            workers (int): Procesos de cálculo (por defecto, uno por CPU).
+            recompute (bool): Recalcular también las entradas que ya tienen firma.
+        
+        Returns:
+            int: Entradas procesadas.
+        """
+        workers = workers or os.cpu_count() or 1
+        chunk_size = max(1, batch_size // (workers * 4))
+        processed, last_id = 0, 0
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            while True:
+                stmt = select(Entry.id, Entry.user_id, Entry.content) \
+                    .where(Entry.id > last_id, Entry.is_deleted.is_(False)) \
+                    .order_by(Entry.id) \
+                    .limit(batch_size)
+                if not recompute:
+                    stmt = stmt.where(~select(EntrySignature.entry_id)
+                                      .where(EntrySignature.entry_id == Entry.id).exists())
+                items = [tuple(row) for row in db.session.execute(stmt)]
+                if not items:
+                    break
+                
+                chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+                results = [result for chunk in executor.map(compute_signatures, chunks) for result in chunk]
+                self.store_signatures(db.session, results)
+                db.session.commit()
+                
+                processed += len(items)
+                last_id = items[-1][0]
+        return processed
+
+@event.listens_for(Session, 'before_commit')
+def _index_changed_entries(session):
+    """Actualiza las firmas de las entradas modificadas en la transacción que se confirma."""
+    if not has_app_context() or not current_app.config.get('DEDUP_ENABLED'):
+        return
+    
+    # Vuelca los cambios pendientes para que queden registrados (ver `app.utils.events`)
+    session.flush()
+    pending = session.info.get(SESSION_KEY)
+    if not pending:
+        return
+    
+    entry_ids = {entry_id for changes in pending.values() for entry_id in changes.get('entries', ())}
+    DedupService().index_entries(session, entry_ids)
+
+def configure_dedup(app):
+    """
+    Configura la detección de duplicados y el comando `flask dedup backfill`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('DEDUP_ENABLED', True)
+    
+    @app.cli.group()
+    def dedup():
+        """Detección de entradas casi duplicadas."""
+    
+    @dedup.command('backfill')
+    @click.option('--batch-size', default=1000, show_default=True, help='Entradas por bloque.')
+    @click.option('--workers', type=int, default=None, help='Procesos de cálculo (uno por CPU por defecto).')
+    @click.option('--all', 'recompute', is_flag=True, help='Recalcular también las que ya tienen firma.')
+    def backfill_command(batch_size, workers, recompute):
+        """Calcula las firmas MinHash de las entradas existentes."""
+        processed = DedupService().backfill(batch_size=batch_size, workers=workers, recompute=recompute)
+        click.echo(f'{processed} entradas procesadas')
+    
+    return app
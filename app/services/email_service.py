@@ -1,23 +1,31 @@
 from flask import current_app, render_template, url_for
 from flask_mail import Message
-from threading import Thread
 from app import mail
+from app.services.job_service import task
 
-def _send_async_email(app, msg):
+# Los correos de la cuenta (confirmación, contraseña) pasan antes que otras tareas
+EMAIL_PRIORITY = 10
+
+@task('email.send')
+def _send_queued_email(subject, recipients, html, sender):
     """
-    Envía un correo electrónico de forma asíncrona.
+    Envía un correo encolado por `send_email` (desde un worker de la cola de tareas).
     
     Args:
-        app: Instancia de la aplicación Flask.
-        msg: Mensaje a enviar.
+        subject (str): Asunto del correo.
+        recipients (list): Destinatarios.
+        html (str): Cuerpo ya renderizado.
+        sender (str): Remitente.
     """
-    with app.app_context():
-        mail.send(msg)
+    mail.send(Message(subject=subject, recipients=recipients, html=html, sender=sender))
 
 def send_email(to, subject, template, **kwargs):
     """
     Configura y envía un correo electrónico.
     
+    Fuera de las pruebas el envío se encola en la sesión actual (ver
+    `JobQueue.enqueue`): solo se envía si quien llama confirma su transacción.
+    
     Args:
         to (str): Destinatario del correo.
         subject (str): Asunto del correo.
@@ -25,24 +33,27 @@ def send_email(to, subject, template, **kwargs):
         **kwargs: Variables para la plantilla.
     """
     app = current_app._get_current_object()
-    msg = Message(
-        subject=f"Eureka - {subject}",
-        recipients=[to],
-        html=render_template(template, **kwargs),
-        sender=app.config['MAIL_DEFAULT_SENDER']
-    )
+    message = {
+        'subject': f"Eureka - {subject}",
+        'recipients': [to],
+        'html': render_template(template, **kwargs),
+        'sender': app.config['MAIL_DEFAULT_SENDER']
+    }
     
-    # Enviar el correo de forma asíncrona para no bloquear la aplicación
+    # Encolar el envío para no bloquear la petición: lo hace un worker (`flask jobs work`),
+    # que lo reintenta si el servidor de correo falla
     if not app.testing:
-        Thread(target=_send_async_email, args=(app, msg)).start()
+        app.extensions['jobs'].enqueue('email.send', message, queue='email', priority=EMAIL_PRIORITY)
     else:
         # En modo de prueba, enviar de forma síncrona
-        mail.send(msg)
+        mail.send(Message(**message))
 
 def send_confirmation_email(user):
     """
     Envía un correo de confirmación para verificar la cuenta.
     
+    El correo se encola en la sesión actual: quien llama debe confirmarla.
+    
     Args:
         user (User): Usuario al que se le enviará el correo.
     """
@@ -65,6 +76,8 @@ def send_password_reset_email(user):
     """
     Envía un correo con instrucciones para restablecer la contraseña.
     
+    El correo se encola en la sesión actual: quien llama debe confirmarla.
+    
     Args:
         user (User): Usuario al que se le enviará el correo.
     """
@@ -0,0 +1,631 @@
+import base64
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import and_, bindparam, delete, insert, or_, select, tuple_, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm.exc import StaleDataError
+
+from app import db
+from app.models import Collection, Entry, Tag, EntryTag
+from app.models.entry import EntryStatus
+from app.utils.events import record_changes
+
+# Campos de una entrada que expone la API y la columna de la que se cargan
+ENTRY_COLUMNS = {
+    'id': Entry.id,
+    'title': Entry.title,
+    'content': Entry.content,
+    'status': Entry.status,
+    'collection_id': Entry.collection_id,
+    'created_at': Entry.created_at,
+    'updated_at': Entry.updated_at,
+    'version': Entry.version,
+}
+
+# `tags` no es una columna: se resuelve con una consulta adicional para toda la página
+ENTRY_FIELDS = tuple(ENTRY_COLUMNS) + ('tags',)
+
+# Campos que se pueden escribir al crear o actualizar una entrada
+WRITABLE_FIELDS = ('title', 'content', 'status', 'collection_id')
+
+# Operaciones admitidas en un lote y número máximo de operaciones por lote
+BATCH_OPERATIONS = ('create', 'update', 'delete', 'add_tags', 'remove_tags')
+BATCH_MAX_OPERATIONS = 500
+
+# Mensaje de los conflictos de versión
+CONFLICT_ERROR = 'La entrada ha sido modificada por otra sesión.'
+
+class VersionConflictError(Exception):
+    """
+    La entrada se modificó después de leer la versión con la que se intenta escribir.
+    
+    Attributes:
+        current (dict): Estado actual de la entrada.
+        unsaved (dict): Campos que no se han podido guardar.
+    """
+    
+    def __init__(self, current, unsaved=None):
+        super().__init__(CONFLICT_ERROR)
+        self.current = current
+        self.unsaved = unsaved or {}
+
+class EntryService:
+    """
+    Servicio para consultar y crear entradas cargando solo las columnas necesarias.
+    """
+    
+    def list_entries(self, user_id, fields=ENTRY_FIELDS, q=None, collection_id=None, tag_id=None,
+                     status=None, cursor=None, limit=50):
+        """
+        Obtiene una página de entradas de un usuario, de la más reciente a la más antigua.
+        
+        La paginación es por cursor (keyset) sobre (created_at, id): el coste de cada
+        página no depende de lo lejos que esté del principio, a diferencia de OFFSET.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            fields (tuple): Campos a devolver (ver `ENTRY_FIELDS`).
+            q (str): Texto a buscar en el título o el contenido.
+            collection_id (int): Filtrar por colección.
+            tag_id (int): Filtrar por etiqueta.
+            status (str): Filtrar por estado.
+            cursor (str): Cursor devuelto por la página anterior.
+            limit (int): Número máximo de entradas.
+        
+        Returns:
+            tuple: (lista de diccionarios, cursor de la página siguiente o None)
+        
+        Raises:
+            ValueError: Si el cursor no es válido.
+        """
+        stmt = self._select(user_id, fields)
+        
+        if q:
+            pattern = '%' + q.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            stmt = stmt.where(or_(Entry.title.ilike(pattern, escape='\\'),
+                                  Entry.content.ilike(pattern, escape='\\')))
+        if collection_id is not None:
+            stmt = stmt.where(Entry.collection_id == collection_id)
+        if tag_id is not None:
+            stmt = stmt.where(Entry.id.in_(select(EntryTag.entry_id).where(EntryTag.tag_id == tag_id)))
+        if status is not None:
+            stmt = stmt.where(Entry.status == status)
+        if cursor:
+            created_at, entry_id = self._decode_cursor(cursor)
+            stmt = stmt.where(or_(Entry.created_at < created_at,
+                                  and_(Entry.created_at == created_at, Entry.id < entry_id)))
+        
+        stmt = stmt.order_by(Entry.created_at.desc(), Entry.id.desc()).limit(limit + 1)
+        rows = db.session.execute(stmt).all()
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]._cursor_created_at, rows[-1]._cursor_id)
+        
+        return self._to_dicts(rows, fields), next_cursor
+    
+    def get_entry(self, user_id, entry_id, fields=ENTRY_FIELDS):
+        """
+        Obtiene una entrada de un usuario.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            entry_id (int): ID de la entrada.
+            fields (tuple): Campos a devolver.
+        
+        Returns:
+            dict: Entrada encontrada o None.
+        """
+        row = db.session.execute(self._select(user_id, fields).where(Entry.id == entry_id)).first()
+        if row is None:
+            return None
+        return self._to_dicts([row], fields)[0]
+    
+    def create_entry(self, user_id, title, content, status=None, collection_id=None, tag_names=()):
+        """
+        Crea una entrada, creando también las etiquetas que el usuario aún no tenga.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            title (str): Título de la entrada.
+            content (str): Contenido de la entrada.
+            status (str): Estado inicial (borrador por defecto).
+            collection_id (int): Colección a la que pertenece la entrada.
+            tag_names (iterable): Nombres de las etiquetas de la entrada.
+        
+        Returns:
+            Entry: Entrada creada.
+        
+        Raises:
+            ValueError: Si algún dato no es válido o la colección no es del usuario.
+        """
+        values = self._clean_values({'title': title, 'content': content, 'status': status,
+                                     'collection_id': collection_id})
+        if values['collection_id'] is not None and \
+                not self._owned_collection_ids(user_id, [values['collection_id']]):
+            raise ValueError('La colección no existe.')
+        
+        entry = Entry(user_id=user_id, **values)
+        entry.tags = self._get_or_create_tags(user_id, tag_names)
+        
+        db.session.add(entry)
+        db.session.commit()
+        
+        return entry
+    
+    def update_entry(self, user_id, entry_id, version, data):
+        """
+        Actualiza solo los campos indicados si la entrada sigue en la versión esperada.
+        
+        La comprobación y la escritura son una única sentencia
+        (`UPDATE ... WHERE version = :version`), de modo que dos escrituras
+        concurrentes desde la misma versión no pueden pisarse: la segunda falla.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            entry_id (int): ID de la entrada.
+            version (int): Versión de la entrada sobre la que se hicieron los cambios.
+            data (dict): Campos modificados.
+        
+        Returns:
+            dict: `id`, `version` y `updated_at` tras la escritura, o None si la
+                entrada no existe.
+        
+        Raises:
+            ValueError: Si algún dato no es válido o la colección no es del usuario.
+            VersionConflictError: Si la entrada está en otra versión.
+        """
+        values = self._clean_values(data, partial=True)
+        if values.get('collection_id') is not None and \
+                not self._owned_collection_ids(user_id, [values['collection_id']]):
+            raise ValueError('La colección no existe.')
+        
+        try:
+            row = db.session.execute(
+                update(Entry.__table__)
+                .where(Entry.id == entry_id, Entry.user_id == user_id, Entry.is_deleted.is_(False),
+                       Entry.version == version)
+                .values(version=Entry.version + 1, updated_at=datetime.utcnow(), **values)
+                .returning(Entry.version, Entry.updated_at)
+            ).first()
+            if row is None:
+                current = self.get_entry(user_id, entry_id)
+                if current is None:
+                    return None
+                raise VersionConflictError(current, unsaved=values)
+            
+            record_changes(db.session, user_id, 'entries', [entry_id])
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
+        
+        return {'id': entry_id, 'version': row.version, 'updated_at': row.updated_at}
+    
+    def current_version(self, user_id, entry_id):
+        """Versión actual de una entrada activa del usuario, o None si no existe."""
+        return db.session.scalar(
+            select(Entry.version).where(Entry.id == entry_id, Entry.user_id == user_id, Entry.is_deleted.is_(False))
+        )
+    
+    def apply_batch(self, user_id, operations):
+        """
+        Aplica un lote de operaciones sobre entradas en una única transacción.
+        
+        Cada operación es un diccionario con `op` (ver `BATCH_OPERATIONS`), `id` (salvo
+        en `create`), `data` (en `create` y `update`) y `tags` (nombres, en `create`,
+        `add_tags` y `remove_tags`). Un `update` con `version` solo se aplica si la
+        entrada sigue en esa versión (compare-and-swap); si no, su resultado es un
+        conflicto con la versión actual y el resto del lote se aplica. La propiedad de las entradas y colecciones se
+        comprueba con una consulta por tabla para todo el lote, y las escrituras se
+        agrupan en sentencias masivas: primero las altas, después las modificaciones,
+        las etiquetas y, por último, los borrados (lógicos).
+        
+        Las operaciones no válidas se omiten y se informa del error en su resultado;
+        el resto se aplica igualmente.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            operations (list): Operaciones a aplicar.
+        
+        Returns:
+            list: Un resultado por operación, en el mismo orden, con `index`, `op`,
+                `status` ('ok', 'error' o 'conflict') y `id` o `error` (y `version`
+                en los conflictos).
+        
+        Raises:
+            SQLAlchemyError: Si falla la escritura (la transacción se revierte).
+        """
+        results = [None] * len(operations)
+        parsed = []
+        for index, operation in enumerate(operations):
+            try:
+                parsed.append((index, *self._parse_operation(operation)))
+            except ValueError as e:
+                results[index] = self._batch_result(index, operation, error=str(e))
+        
+        # Propiedad de entradas y colecciones: una consulta por tabla para todo el lote
+        owned_entries = self._owned_entry_ids(user_id, {item[2] for item in parsed if item[2] is not None})
+        owned_collections = self._owned_collection_ids(
+            user_id, {item[3]['collection_id'] for item in parsed if item[3].get('collection_id') is not None}
+        )
+        
+        creates, updates, deletes, tag_changes = [], [], [], []
+        for index, op, entry_id, values, tag_names, version in parsed:
+            if op != 'create' and entry_id not in owned_entries:
+                results[index] = self._batch_result(index, operations[index], error='La entrada no existe.')
+            elif values.get('collection_id') is not None and values['collection_id'] not in owned_collections:
+                results[index] = self._batch_result(index, operations[index], error='La colección no existe.')
+            elif op == 'create':
+                creates.append((index, values, tag_names))
+            elif op == 'update':
+                updates.append((index, entry_id, values, version))
+            elif op == 'delete':
+                deletes.append((index, entry_id))
+            else:
+                tag_changes.append((index, op, entry_id, tag_names))
+        
+        now = datetime.utcnow()
+        try:
+            created_ids = self._bulk_create(user_id, creates, now)
+            for (index, _, tag_names), entry_id in zip(creates, created_ids):
+                results[index] = self._batch_result(index, operations[index], entry_id=entry_id)
+                if tag_names:
+                    tag_changes.append((index, 'add_tags', entry_id, tag_names))
+            
+            conflicts = self._bulk_update(user_id, updates, now)
+            for index, version in conflicts.items():
+                results[index] = self._batch_result(index, operations[index], error=CONFLICT_ERROR)
+                results[index].update(status='conflict', version=version)
+            updates = [update_ for update_ in updates if update_[0] not in conflicts]
+            self._bulk_tag_changes(user_id, tag_changes, set(created_ids), now)
+            
+            # Las sentencias masivas no pasan por los eventos del ORM
+            record_changes(db.session, user_id, 'entries', created_ids)
+            record_changes(db.session, user_id, 'entries', [entry_id for _, entry_id, _, _ in updates])
+            record_changes(db.session, user_id, 'entries', [entry_id for _, _, entry_id, _ in tag_changes])
+            
+            if deletes:
+                record_changes(db.session, user_id, 'entries', [entry_id for _, entry_id in deletes])
+                db.session.execute(
+                    update(Entry)
+                    .where(Entry.id.in_([entry_id for _, entry_id in deletes]), Entry.user_id == user_id)
+                    .values(is_deleted=True, deleted_at=now, updated_at=now, version=Entry.version + 1)
+                    .execution_options(synchronize_session=False)
+                )
+            
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            raise
+        
+        applied = [(index, entry_id) for index, entry_id, _, _ in updates] + deletes + \
+            [(index, entry_id) for index, _, entry_id, _ in tag_changes]
+        for index, entry_id in applied:
+            if results[index] is None:
+                results[index] = self._batch_result(index, operations[index], entry_id=entry_id)
+        return results
+    
+    def entry_to_dict(self, entry, fields=ENTRY_FIELDS):
+        """
+        Convierte una entrada ya cargada en un diccionario con los campos indicados.
+        
+        Args:
+            entry (Entry): Entrada a convertir.
+            fields (tuple): Campos a incluir.
+        
+        Returns:
+            dict: Representación de la entrada.
+        """
+        data = {name: getattr(entry, name) for name in fields if name in ENTRY_COLUMNS}
+        if 'tags' in fields:
+            data['tags'] = [{'id': tag.id, 'name': tag.name} for tag in sorted(entry.tags, key=lambda t: t.name)]
+        return data
+    
+    def tags_for_entries(self, entry_ids):
+        """
+        Obtiene las etiquetas de varias entradas con una sola consulta.
+        
+        Args:
+            entry_ids (list): IDs de las entradas.
+        
+        Returns:
+            dict: Lista de etiquetas ({'id', 'name'}) por ID de entrada.
+        """
+        tags = defaultdict(list)
+        if not entry_ids:
+            return tags
+        
+        rows = db.session.execute(
+            select(EntryTag.entry_id, Tag.id, Tag.name)
+            .join(Tag, Tag.id == EntryTag.tag_id)
+            .where(EntryTag.entry_id.in_(entry_ids))
+            .order_by(Tag.name)
+        )
+        for entry_id, tag_id, name in rows:
+            tags[entry_id].append({'id': tag_id, 'name': name})
+        return tags
+    
+    def _select(self, user_id, fields):
+        """Construye la consulta de las columnas solicitadas más las necesarias para paginar."""
+        columns = [ENTRY_COLUMNS[name].label(name) for name in fields if name in ENTRY_COLUMNS]
+        columns.append(Entry.id.label('_cursor_id'))
+        columns.append(Entry.created_at.label('_cursor_created_at'))
+        return select(*columns).where(Entry.user_id == user_id, Entry.is_deleted.is_(False))
+    
+    def _to_dicts(self, rows, fields):
+        """Convierte las filas en diccionarios y añade las etiquetas si se han solicitado."""
+        columns = [name for name in fields if name in ENTRY_COLUMNS]
+        items = [{name: getattr(row, name) for name in columns} for row in rows]
+        
+        if 'tags' in fields:
+            tags = self.tags_for_entries([row._cursor_id for row in rows])
+            for item, row in zip(items, rows):
+                item['tags'] = tags.get(row._cursor_id, [])
+        return items
+    
+    def _clean_values(self, data, partial=False):
+        """
+        Valida los campos escribibles de una entrada.
+        
+        Args:
+            data (dict): Campos recibidos.
+            partial (bool): Si es una actualización (solo se validan los campos presentes).
+        
+        Returns:
+            dict: Campos validados.
+        
+        Raises:
+            ValueError: Si algún campo no es válido.
+        """
+        unknown = [name for name in data if name not in WRITABLE_FIELDS]
+        if unknown:
+            raise ValueError(f"Campos no modificables: {', '.join(unknown)}")
+        
+        values = {}
+        if not partial or 'title' in data:
+            title = data.get('title')
+            if not isinstance(title, str) or not title.strip():
+                raise ValueError('El título es obligatorio.')
+            if len(title) > 200:
+                raise ValueError('El título no puede superar los 200 caracteres.')
+            values['title'] = title.strip()
+        if not partial or 'content' in data:
+            if not isinstance(data.get('content'), str):
+                raise ValueError('El contenido es obligatorio.')
+            values['content'] = data['content']
+        if not partial or 'status' in data:
+            status = data.get('status') or EntryStatus.BORRADOR.value
+            if status not in [e.value for e in EntryStatus]:
+                raise ValueError(f"Estado inválido. Debe ser uno de: {', '.join(e.value for e in EntryStatus)}")
+            values['status'] = status
+        if not partial or 'collection_id' in data:
+            collection_id = data.get('collection_id')
+            if collection_id is not None and (not isinstance(collection_id, int) or isinstance(collection_id, bool)):
+                raise ValueError('El ID de la colección debe ser un número entero.')
+            values['collection_id'] = collection_id
+        
+        if not values:
+            raise ValueError('No hay campos que actualizar.')
+        return values
+    
+    def _clean_tag_names(self, tag_names):
+        """Normaliza una lista de nombres de etiqueta, sin duplicados ni vacíos."""
+        if not isinstance(tag_names, (list, tuple)):
+            raise ValueError('Las etiquetas deben ser una lista de nombres.')
+        names = list(dict.fromkeys(name.strip() for name in tag_names if isinstance(name, str) and name.strip()))
+        if any(len(name) > 50 for name in names):
+            raise ValueError('El nombre de una etiqueta no puede superar los 50 caracteres.')
+        return names
+    
+    def _parse_operation(self, operation):
+        """
+        Valida una operación de un lote.
+        
+        Returns:
+            tuple: (op, ID de la entrada o None, campos validados, nombres de etiquetas, versión o None)
+        """
+        if not isinstance(operation, dict):
+            raise ValueError('Cada operación debe ser un objeto JSON.')
+        
+        op = operation.get('op')
+        if op not in BATCH_OPERATIONS:
+            raise ValueError(f"Operación desconocida. Debe ser una de: {', '.join(BATCH_OPERATIONS)}")
+        
+        entry_id = None
+        if op != 'create':
+            entry_id = operation.get('id')
+            if not isinstance(entry_id, int) or isinstance(entry_id, bool):
+                raise ValueError('El ID de la entrada debe ser un número entero.')
+        
+        values = {}
+        if op in ('create', 'update'):
+            data = operation.get('data')
+            if not isinstance(data, dict):
+                raise ValueError('Los datos de la entrada deben ser un objeto JSON.')
+            values = self._clean_values(data, partial=(op == 'update'))
+        
+        tag_names = []
+        if op in ('create', 'add_tags', 'remove_tags'):
+            tag_names = self._clean_tag_names(operation.get('tags') or [])
+            if op != 'create' and not tag_names:
+                raise ValueError('Indica al menos una etiqueta.')
+        
+        version = None
+        if op == 'update' and operation.get('version') is not None:
+            version = operation['version']
+            if not isinstance(version, int) or isinstance(version, bool):
+                raise ValueError('La versión de la entrada debe ser un número entero.')
+        
+        return op, entry_id, values, tag_names, version
+    
+    def _batch_result(self, index, operation, entry_id=None, error=None):
+        """Resultado de una operación de un lote."""
+        result = {'index': index, 'op': operation.get('op') if isinstance(operation, dict) else None}
+        if error is not None:
+            result.update(status='error', error=error)
+        else:
+            result.update(status='ok', id=entry_id)
+        return result
+    
+    def _owned_entry_ids(self, user_id, entry_ids):
+        """IDs de las entradas activas del usuario entre las indicadas."""
+        if not entry_ids:
+            return set()
+        return set(db.session.scalars(
+            select(Entry.id).where(Entry.id.in_(entry_ids), Entry.user_id == user_id, Entry.is_deleted.is_(False))
+        ))
+    
+    def _owned_collection_ids(self, user_id, collection_ids):
+        """IDs de las colecciones activas del usuario entre las indicadas."""
+        if not collection_ids:
+            return set()
+        return set(db.session.scalars(
+            select(Collection.id).where(Collection.id.in_(collection_ids), Collection.user_id == user_id,
+                                        Collection.is_deleted.is_(False))
+        ))
+    
+    def _bulk_create(self, user_id, creates, now):
+        """Inserta las entradas nuevas con una sentencia masiva y devuelve sus IDs en orden."""
+        if not creates:
+            return []
+        rows = [dict(values, user_id=user_id, created_at=now, updated_at=now, is_deleted=False)
+                for _, values, _ in creates]
+        return list(db.session.scalars(insert(Entry).returning(Entry.id, sort_by_parameter_order=True), rows))
+    
+    def _bulk_update(self, user_id, updates, now):
+        """
+        Actualiza las entradas con una sentencia por combinación de campos modificados.
+        
+        Las modificaciones con versión se comprueban antes contra las filas bloqueadas
+        (`SELECT ... FOR UPDATE`) y se escriben con compare-and-swap sobre `version`.
+        Si una entrada se modifica varias veces en el lote, cada modificación va en
+        una tanda posterior, de modo que se escriben en el orden del lote.
+        
+        Returns:
+            dict: Versión actual de cada modificación en conflicto, por índice.
+        """
+        # Versiones actuales, con las filas bloqueadas hasta el commit
+        versioned_ids = {entry_id for _, entry_id, _, version in updates if version is not None}
+        current = {}
+        if versioned_ids:
+            current = dict(db.session.execute(
+                select(Entry.id, Entry.version).where(Entry.id.in_(versioned_ids)).with_for_update()
+            ).all())
+        
+        conflicts = {}
+        groups = defaultdict(list)
+        # Modificaciones ya asignadas a cada entrada: la siguiente va en la tanda siguiente
+        waves = defaultdict(int)
+        for index, entry_id, values, version in updates:
+            params = dict({f'new_{k}': v for k, v in values.items()}, entry_id=entry_id)
+            if version is not None:
+                if current.get(entry_id) != version:
+                    conflicts[index] = current.get(entry_id)
+                    continue
+                params['expected_version'] = version
+            if entry_id in current:
+                # Toda modificación incrementa la versión, también las que no la indican
+                current[entry_id] += 1
+            groups[(waves[entry_id], tuple(sorted(values)), version is not None)].append(params)
+            waves[entry_id] += 1
+        
+        table = Entry.__table__
+        for (_, columns, versioned), params in sorted(groups.items(), key=lambda item: item[0][0]):
+            conditions = [table.c.id == bindparam('entry_id'), table.c.user_id == user_id]
+            if versioned:
+                conditions.append(table.c.version == bindparam('expected_version'))
+            result = db.session.execute(
+                update(table)
+                .where(*conditions)
+                .values(updated_at=now, version=table.c.version + 1,
+                        **{name: bindparam(f'new_{name}') for name in columns}),
+                params
+            )
+            if versioned and result.rowcount != len(params) and db.engine.dialect.supports_sane_multi_rowcount:
+                # Otra transacción cambió la fila pese al bloqueo: no se guarda nada del lote
+                raise StaleDataError('Una entrada del lote cambió de versión al escribirse.')
+        return conflicts
+    
+    def _bulk_tag_changes(self, user_id, tag_changes, created_ids, now):
+        """Aplica las altas y bajas de etiquetas del lote con sentencias masivas."""
+        if not tag_changes:
+            return
+        
+        names = {name for _, _, _, tag_names in tag_changes for name in tag_names}
+        tag_ids = dict(db.session.execute(
+            select(Tag.name, Tag.id).where(Tag.user_id == user_id, Tag.name.in_(names))
+        ).all())
+        
+        missing = sorted({name for _, op, _, tag_names in tag_changes if op == 'add_tags'
+                          for name in tag_names if name not in tag_ids})
+        if missing:
+            created = db.session.execute(
+                insert(Tag).returning(Tag.name, Tag.id, sort_by_parameter_order=True),
+                [{'name': name, 'user_id': user_id, 'created_at': now, 'updated_at': now} for name in missing]
+            )
+            created = created.all()
+            tag_ids.update(created)
+            record_changes(db.session, user_id, 'tags', [tag_id for _, tag_id in created])
+        
+        add_pairs, remove_pairs = set(), set()
+        for _, op, entry_id, tag_names in tag_changes:
+            pairs = {(entry_id, tag_ids[name]) for name in tag_names if name in tag_ids}
+            if op == 'add_tags':
+                add_pairs |= pairs
+                remove_pairs -= pairs
+            else:
+                remove_pairs |= pairs
+                add_pairs -= pairs
+        
+        if add_pairs:
+            existing = set(db.session.execute(
+                select(EntryTag.entry_id, EntryTag.tag_id)
+                .where(EntryTag.entry_id.in_({entry_id for entry_id, _ in add_pairs}))
+            ).all())
+            new_links = [{'entry_id': entry_id, 'tag_id': tag_id, 'created_at': now}
+                         for entry_id, tag_id in sorted(add_pairs - existing)]
+            if new_links:
+                db.session.execute(insert(EntryTag.__table__), new_links)
+        if remove_pairs:
+            db.session.execute(
+                delete(EntryTag.__table__)
+                .where(tuple_(EntryTag.entry_id, EntryTag.tag_id).in_(sorted(remove_pairs)))
+            )
+        
+        # Cambiar las etiquetas también modifica la entrada (las nuevas ya tienen updated_at)
+        touched = {entry_id for _, _, entry_id, _ in tag_changes} - created_ids
+        if touched:
+            db.session.execute(
+                update(Entry.__table__).where(Entry.id.in_(touched), Entry.user_id == user_id)
+                .values(updated_at=now, version=Entry.version + 1)
+            )
+    
+    def _get_or_create_tags(self, user_id, tag_names):
+        """Obtiene las etiquetas del usuario con esos nombres, creando las que falten."""
+        names = self._clean_tag_names(tag_names)
+        if not names:
+            return []
+        
+        existing = {tag.name: tag for tag in Tag.query.filter(Tag.user_id == user_id, Tag.name.in_(names))}
+        for name in names:
+            if name not in existing:
+                existing[name] = Tag(name=name, user_id=user_id)
+                db.session.add(existing[name])
+        return [existing[name] for name in names]
+    
+    def _encode_cursor(self, created_at, entry_id):
+        """Codifica la posición de la última entrada de una página."""
+        raw = f'{created_at.isoformat()}|{entry_id}'.encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+    
+    def _decode_cursor(self, cursor):
+        """Decodifica un cursor generado por `_encode_cursor`."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode('utf-8')
+            created_at, entry_id = raw.split('|')
+            return datetime.fromisoformat(created_at), int(entry_id)
+        except (ValueError, UnicodeDecodeError):
+            raise ValueError('Cursor de paginación no válido.')
@@ -0,0 +1,287 @@
+"""
+Imágenes de portada de las colecciones.
+
+Las imágenes se reciben como cuerpo de la petición y se copian a disco por bloques
+mientras se calcula su SHA-256, sin cargar el cuerpo entero en memoria. El nombre
+del fichero es ese hash (`<sha256>.<ext>`): dos subidas del mismo contenido
+comparten fichero, y como el contenido de una URL nunca cambia, las imágenes y
+sus miniaturas se sirven con caché de un año (`immutable`).
+
+Las miniaturas (`THUMBNAIL_SIZES`, en WebP) se generan en un pool de procesos al
+subir la imagen, sin esperar a que terminen; si se pide una que aún no existe, se
+genera en ese momento. El pool usa el método `spawn`: hacer fork de un servidor con
+hilos puede dejar bloqueos tomados en el proceso hijo.
+
+Solo se sirven a usuarios con alguna colección que use la imagen: conocer el hash
+no basta para descargarla.
+"""
+
+import hashlib
+import logging
+import multiprocessing
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import click
+from flask import abort, current_app, send_file
+from flask_security import current_user
+from PIL import Image
+from sqlalchemy import select
+
+from app import db
+from app.models import Collection
+from app.services.job_service import task
+from app.utils.assets import IMMUTABLE_CACHE_CONTROL
+from app.utils.images import THUMBNAIL_EXTENSION, THUMBNAIL_SIZES, identify, make_thumbnails
+
+logger = logging.getLogger(__name__)
+
+# Bytes leídos del cuerpo de la petición en cada bloque
+CHUNK_SIZE = 64 * 1024
+
+# Nombre de una imagen guardada: hash SHA-256 y extensión
+IMAGE_NAME = re.compile(r'^[0-9a-f]{64}\.(jpg|png|webp|gif)$')
+
+# Segundos máximos de espera por una miniatura generada bajo demanda
+THUMBNAIL_TIMEOUT = 30
+
+# Segundos tras los que reintentar una miniatura que aún se está generando
+THUMBNAIL_RETRY_AFTER = 5
+
+# Las imágenes son privadas (solo las ve quien las usa), pero su contenido nunca cambia
+PRIVATE_IMMUTABLE_CACHE_CONTROL = IMMUTABLE_CACHE_CONTROL.replace('public', 'private')
+
+class ImageTooLargeError(ValueError):
+    """La imagen supera el tamaño máximo admitido."""
+
+class ImageStore:
+    """
+    Almacén de imágenes direccionado por contenido, con miniaturas generadas en un pool de procesos.
+    
+    Estructura: `originals/ab/<sha256>.<ext>` y `thumbnails/<tamaño>/ab/<sha256>.webp`,
+    donde `ab` son los dos primeros caracteres del hash (evita directorios enormes).
+    """
+    
+    def __init__(self, root, max_bytes=10 * 1024 * 1024, workers=2):
+        """
+        Args:
+            root (str): Directorio raíz del almacén.
+            max_bytes (int): Tamaño máximo de una imagen subida.
+            workers (int): Procesos del pool de miniaturas.
+        """
+        self.root = root
+        self.max_bytes = max_bytes
+        self.workers = workers
+        self._executor = None
+        self._lock = threading.Lock()
+    
+    def save(self, stream, content_length=None):
+        """
+        Guarda una imagen leyéndola por bloques y encarga sus miniaturas.
+        
+        Args:
+            stream: Flujo binario con el contenido (p. ej. `request.stream`).
+            content_length (int): Tamaño anunciado, para rechazar antes de leer.
+        
+        Returns:
+            str: Nombre de la imagen (`<sha256>.<ext>`).
+        
+        Raises:
+            ImageTooLargeError: Si supera `max_bytes`.
+            ValueError: Si no es una imagen admitida.
+        """
+        if content_length is not None and content_length > self.max_bytes:
+            raise ImageTooLargeError('La imagen es demasiado grande.')
+        
+        os.makedirs(os.path.join(self.root, 'tmp'), exist_ok=True)
+        temporary = os.path.join(self.root, 'tmp', f'{uuid.uuid4().hex}.part')
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            with open(temporary, 'wb') as f:
+                for chunk in iter(lambda: stream.read(CHUNK_SIZE), b''):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise ImageTooLargeError('La imagen es demasiado grande.')
+                    digest.update(chunk)
+                    f.write(chunk)
+            if not size:
+                raise ValueError('La petición no contiene ninguna imagen.')
+            
+            name = f'{digest.hexdigest()}.{identify(temporary)}'
+            path = self.original_path(name)
+            if os.path.exists(path):
+                # Ya se subió este mismo contenido: se renueva su fecha para que `prune` no lo borre
+                os.remove(temporary)
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
+        
+        missing = self._missing_thumbnails(name)
+        if missing:
+            self._pool().submit(make_thumbnails, path, missing)
+        return name
+    
+    def thumbnail(self, name, size):
+        """
+        Ruta de una miniatura, generándola si aún no existe.
+        
+        Returns:
+            str: Ruta de la miniatura, o None si la imagen no existe o no puede decodificarse.
+        
+        Raises:
+            concurrent.futures.TimeoutError: Si la miniatura no se genera en `THUMBNAIL_TIMEOUT`
+                segundos (sigue generándose en el pool).
+        """
+        if not os.path.exists(self.original_path(name)):
+            return None
+        missing = self._missing_thumbnails(name)
+        if missing:
+            future = self._pool().submit(make_thumbnails, self.original_path(name), missing)
+            try:
+                future.result(THUMBNAIL_TIMEOUT)
+            except (OSError, ValueError, Image.DecompressionBombError):
+                logger.exception('No se pudieron generar las miniaturas de %s', name)
+                return None
+        return self.thumbnail_path(name, size)
+    
+    def original_path(self, name):
+        return os.path.join(self.root, 'originals', name[:2], name)
+    
+    def thumbnail_path(self, name, size):
+        stem = name.rsplit('.', 1)[0]
+        return os.path.join(self.root, 'thumbnails', str(size), stem[:2], f'{stem}.{THUMBNAIL_EXTENSION}')
+    
+    def prune(self, keep, min_age=3600):
+        """
+        Borra las imágenes (y sus miniaturas) que ninguna colección usa.
+        
+        Args:
+            keep (set): Nombres de las imágenes en uso.
+            min_age (float): Segundos de antigüedad mínima: una imagen recién subida
+                puede no estar asignada todavía a su colección.
+        
+        Returns:
+            int: Imágenes borradas.
+        """
+        removed = 0
+        now = time.time()
+        for directory, _, files in os.walk(os.path.join(self.root, 'originals')):
+            for name in files:
+                path = os.path.join(directory, name)
+                if name in keep or not IMAGE_NAME.match(name) or now - os.path.getmtime(path) < min_age:
+                    continue
+                for size in THUMBNAIL_SIZES:
+                    if os.path.exists(self.thumbnail_path(name, size)):
+                        os.remove(self.thumbnail_path(name, size))
+                os.remove(path)
+                removed += 1
+        return removed
+    
+    def shutdown(self):
+        """Detiene el pool de miniaturas (esperando a las pendientes)."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown()
+    
+    def _missing_thumbnails(self, name):
+        paths = {size: self.thumbnail_path(name, size) for size in THUMBNAIL_SIZES}
+        return {size: path for size, path in paths.items() if not os.path.exists(path)}
+    
+    def _pool(self):
+        """Pool de procesos de miniaturas, creado al usarse por primera vez."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers,
+                                                     mp_context=multiprocessing.get_context('spawn'))
+            return self._executor
+
+def _serve_image(name, size=None):
+    """Sirve una imagen original o una de sus miniaturas con caché de un año."""
+    if not current_user.is_authenticated:
+        abort(401)
+    if not IMAGE_NAME.match(name) or (size is not None and size not in THUMBNAIL_SIZES):
+        abort(404)
+    # Igual que si no existiera: no se revela qué imágenes ha subido otro usuario
+    owned = db.session.scalar(
+        select(Collection.id).where(Collection.user_id == current_user.id, Collection.image_path == name).limit(1)
+    )
+    if owned is None:
+        abort(404)
+    
+    store = current_app.extensions['images']
+    try:
+        path = store.original_path(name) if size is None else store.thumbnail(name, size)
+    except FutureTimeoutError:
+        abort(503, retry_after=THUMBNAIL_RETRY_AFTER)
+    if path is None or not os.path.exists(path):
+        abort(404)
+    
+    response = send_file(path, max_age=31536000, conditional=True, etag=False)
+    response.headers['Cache-Control'] = PRIVATE_IMMUTABLE_CACHE_CONTROL
+    return response
+
+def image_urls(name):
+    """
+    URLs de una imagen y de sus miniaturas.
+    
+    Args:
+        name (str): Nombre de la imagen (`Collection.image_path`).
+    
+    Returns:
+        dict: `original` y una URL por tamaño de miniatura, o None si no hay imagen.
+    """
+    if not name:
+        return None
+    urls = {'original': f'/images/{name}'}
+    urls.update({str(size): f'/images/{size}/{name}' for size in THUMBNAIL_SIZES})
+    return urls
+
+@task('images.prune')
+def _prune_images(min_age=3600):
+    """Borra las imágenes que ninguna colección usa (tarea y comando `flask images prune`)."""
+    keep = set(db.session.scalars(select(Collection.image_path).where(Collection.image_path.is_not(None))))
+    return current_app.extensions['images'].prune(keep, min_age=min_age)
+
+def configure_images(app):
+    """
+    Configura el almacén de imágenes, sus rutas y el comando `flask images prune`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('IMAGE_STORAGE_DIR', None)
+    app.config.setdefault('IMAGE_MAX_BYTES', 10 * 1024 * 1024)
+    app.config.setdefault('IMAGE_WORKERS', 2)
+    
+    app.extensions['images'] = ImageStore(
+        app.config['IMAGE_STORAGE_DIR'] or os.path.join(app.instance_path, 'images'),
+        max_bytes=app.config['IMAGE_MAX_BYTES'],
+        workers=app.config['IMAGE_WORKERS']
+    )
+    app.add_url_rule('/images/<name>', 'image', _serve_image)
+    app.add_url_rule('/images/<int:size>/<name>', 'image_thumbnail', _serve_image)
+    
+    @app.cli.group()
+    def images():
+        """Gestión de las imágenes subidas."""
+    
+    @images.command('prune')
+    @click.option('--min-age', default=3600, show_default=True, help='Antigüedad mínima (segundos).')
+    def prune_command(min_age):
+        """Borra las imágenes que ninguna colección usa."""
+        removed = _prune_images(min_age)
+        click.echo(f'{removed} imágenes borradas')
+    
+    return app
@@ -0,0 +1,470 @@
+"""
+Cola de tareas en segundo plano guardada en la base de datos.
+
+Las tareas son filas de `jobs`. Encolar una tarea es insertar una fila en la
+transacción de quien la encola, así que una tarea solo existe si esa transacción
+se confirma y no se pierde si el proceso termina justo después.
+
+Los workers (`flask jobs work`) toman lotes de tareas pendientes con
+`SELECT ... FOR UPDATE SKIP LOCKED`: varios workers pueden pedir tareas a la vez
+sin esperarse ni tomar la misma, porque cada uno se salta las filas que otro
+tiene bloqueadas. Al tomarlas se marcan como `en_curso` con el worker y la hora;
+mientras una tarea se ejecuta, el worker renueva esa hora desde otro hilo, y las
+de un worker caído vuelven a la cola pasado `JOB_LOCK_TIMEOUT`. Cada tarea
+se marca como completada en la misma transacción que sus escrituras, y las que
+fallan se reintentan con espera exponencial hasta `max_attempts` veces. Como un
+worker puede caer después de ejecutar una tarea y antes de confirmarla, las
+tareas con efectos fuera de la base de datos (correos) deben tolerar repetirse.
+
+Las funciones que ejecutan las tareas se registran con el decorador `task`.
+"""
+
+import json
+import logging
+import os
+import random
+import signal
+import socket
+import threading
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app
+from sqlalchemy import delete, func, select, update
+
+from app import db
+from app.models.job import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+# Funciones registradas para ejecutar cada tipo de tarea
+TASKS = {}
+
+# Errores de más de estos caracteres se recortan al guardarlos
+MAX_ERROR_LENGTH = 2000
+
+def task(name):
+    """
+    Registra la función que ejecuta las tareas de un tipo.
+    
+    La función recibe el `payload` de la tarea como argumentos con nombre y se
+    ejecuta en un contexto de aplicación; sus escrituras se confirman junto con la
+    tarea.
+    
+    Args:
+        name (str): Nombre del tipo de tarea (p. ej. 'email.send').
+    """
+    def decorator(func):
+        TASKS[name] = func
+        return func
+    return decorator
+
+class JobQueue:
+    """
+    Operaciones sobre la cola de tareas.
+    """
+    
+    def __init__(self, retry_delay=10, max_retry_delay=3600, lock_timeout=600):
+        """
+        Args:
+            retry_delay (float): Segundos de espera antes del primer reintento; se
+                duplica en cada reintento.
+            max_retry_delay (float): Espera máxima entre reintentos.
+            lock_timeout (float): Segundos tras los que una tarea en curso se da por
+                abandonada (worker caído) y vuelve a la cola.
+        """
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self.lock_timeout = lock_timeout
+    
+    def enqueue(self, name, payload=None, queue='default', priority=0, run_at=None, delay=None, max_attempts=5):
+        """
+        Añade una tarea a la sesión actual; se encola al confirmarla.
+        
+        Args:
+            name (str): Tipo de tarea registrado con `task`.
+            payload (dict): Argumentos de la tarea (serializables en JSON).
+            queue (str): Cola.
+            priority (int): Prioridad (las mayores se ejecutan antes).
+            run_at (datetime): No ejecutar antes de esta fecha (UTC).
+            delay (float): No ejecutar antes de estos segundos (alternativa a `run_at`).
+            max_attempts (int): Ejecuciones como máximo antes de darla por fallida.
+        
+        Returns:
+            Job: Tarea añadida a la sesión.
+        
+        Raises:
+            ValueError: Si el tipo de tarea no está registrado.
+        """
+        if name not in TASKS:
+            raise ValueError(f'Tarea desconocida: {name}')
+        if run_at is None:
+            run_at = datetime.utcnow() + timedelta(seconds=delay or 0)
+        
+        job = Job(name=name, payload=payload or {}, queue=queue, priority=priority, run_at=run_at,
+                  max_attempts=max_attempts)
+        db.session.add(job)
+        return job
+    
+    def dequeue(self, worker_id, queues=None, limit=10):
+        """
+        Toma las siguientes tareas pendientes y las marca como en curso.
+        
+        Las tareas se toman por prioridad y, a igual prioridad, por antigüedad. Las
+        filas bloqueadas por otro worker se saltan (`SKIP LOCKED`), y la condición
+        sobre el estado evita tomar dos veces la misma tarea en bases de datos sin
+        bloqueo de filas (SQLite serializa las escrituras).
+        
+        Args:
+            worker_id (str): Identificador del worker.
+            queues (list): Colas de las que tomar tareas (todas si no se indica).
+            limit (int): Tareas como máximo.
+        
+        Returns:
+            list: Filas con `id`, `name`, `payload`, `attempts` y `max_attempts`.
+        """
+        now = datetime.utcnow()
+        pending = JobStatus.PENDIENTE.value
+        candidates = select(Job.id) \
+            .where(Job.status == pending, Job.run_at <= now) \
+            .order_by(Job.priority.desc(), Job.run_at, Job.id) \
+            .limit(limit) \
+            .with_for_update(skip_locked=True)
+        if queues:
+            candidates = candidates.where(Job.queue.in_(queues))
+        
+        jobs = db.session.execute(
+            update(Job)
+            .where(Job.id.in_(candidates.scalar_subquery()), Job.status == pending)
+            .values(status=JobStatus.EN_CURSO.value, locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+            .returning(Job.id, Job.name, Job.payload, Job.attempts, Job.max_attempts, Job.priority, Job.run_at),
+            execution_options={'synchronize_session': False}
+        ).all()
+        db.session.commit()
+        return sorted(jobs, key=lambda job: (-job.priority, job.run_at, job.id))
+    
+    def complete(self, job_id, worker_id):
+        """Marca una tarea como completada (sin confirmar la transacción)."""
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == JobStatus.EN_CURSO.value)
+            .values(status=JobStatus.COMPLETADA.value, finished_at=datetime.utcnow(), locked_by=None,
+                    locked_at=None, last_error=None),
+            execution_options={'synchronize_session': False}
+        )
+    
+    def fail(self, job, worker_id, error):
+        """
+        Registra el fallo de una tarea: la reprograma o, si ha agotado sus intentos, la da por fallida.
+        
+        Args:
+            job: Fila devuelta por `dequeue`.
+            worker_id (str): Worker que la ejecutaba.
+            error (str): Descripción del error.
+        """
+        now = datetime.utcnow()
+        values = {'locked_by': None, 'locked_at': None, 'last_error': error[:MAX_ERROR_LENGTH]}
+        if job.attempts >= job.max_attempts:
+            values.update(status=JobStatus.FALLIDA.value, finished_at=now)
+        else:
+            values.update(status=JobStatus.PENDIENTE.value, run_at=now + timedelta(seconds=self.backoff(job.attempts)))
+        
+        db.session.execute(
+            update(Job)
+            .where(Job.id == job.id, Job.locked_by == worker_id, Job.status == JobStatus.EN_CURSO.value)
+            .values(**values),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+    
+    def heartbeat(self, job_id, worker_id):
+        """
+        Renueva la hora de bloqueo de una tarea en curso, para que `recover_stale` no la recupere.
+        
+        Returns:
+            bool: Si la tarea sigue en curso en ese worker.
+        """
+        renewed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.locked_by == worker_id, Job.status == JobStatus.EN_CURSO.value)
+            .values(locked_at=datetime.utcnow()),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        return bool(renewed)
+    
+    def release(self, job_ids, worker_id):
+        """Devuelve a la cola tareas tomadas que no se han llegado a ejecutar."""
+        if not job_ids:
+            return
+        db.session.execute(
+            update(Job)
+            .where(Job.id.in_(job_ids), Job.locked_by == worker_id, Job.status == JobStatus.EN_CURSO.value)
+            .values(status=JobStatus.PENDIENTE.value, locked_by=None, locked_at=None, attempts=Job.attempts - 1),
+            execution_options={'synchronize_session': False}
+        )
+        db.session.commit()
+    
+    def backoff(self, attempts):
+        """Segundos de espera antes del siguiente intento (exponencial, con variación aleatoria)."""
+        delay = min(self.max_retry_delay, self.retry_delay * 2 ** (attempts - 1))
+        # La variación evita que las tareas que fallaron a la vez se reintenten a la vez
+        return delay * random.uniform(0.75, 1.0)
+    
+    def recover_stale(self):
+        """
+        Devuelve a la cola las tareas de workers caídos (en curso desde hace más de `lock_timeout`).
+        
+        Las que ya han agotado sus intentos se dan por fallidas.
+        
+        Returns:
+            int: Tareas recuperadas.
+        """
+        now = datetime.utcnow()
+        stale = (Job.status == JobStatus.EN_CURSO.value,
+                 Job.locked_at < now - timedelta(seconds=self.lock_timeout))
+        db.session.execute(
+            update(Job)
+            .where(*stale, Job.attempts >= Job.max_attempts)
+            .values(status=JobStatus.FALLIDA.value, finished_at=now, locked_by=None, locked_at=None,
+                    last_error='El worker dejó de responder.'),
+            execution_options={'synchronize_session': False}
+        )
+        recovered = db.session.execute(
+            update(Job)
+            .where(*stale)
+            .values(status=JobStatus.PENDIENTE.value, locked_by=None, locked_at=None, run_at=now),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        return recovered
+    
+    def retry_failed(self, queue=None):
+        """
+        Vuelve a encolar las tareas fallidas, con sus intentos a cero.
+        
+        Returns:
+            int: Tareas encoladas de nuevo.
+        """
+        stmt = update(Job).where(Job.status == JobStatus.FALLIDA.value)
+        if queue:
+            stmt = stmt.where(Job.queue == queue)
+        retried = db.session.execute(
+            stmt.values(status=JobStatus.PENDIENTE.value, attempts=0, run_at=datetime.utcnow(), finished_at=None),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        return retried
+    
+    def purge(self, older_than=7, include_failed=False):
+        """
+        Borra las tareas terminadas hace más de `older_than` días.
+        
+        Args:
+            older_than (float): Días de antigüedad.
+            include_failed (bool): Borrar también las fallidas.
+        
+        Returns:
+            int: Tareas borradas.
+        """
+        statuses = [JobStatus.COMPLETADA.value] + ([JobStatus.FALLIDA.value] if include_failed else [])
+        removed = db.session.execute(
+            delete(Job).where(Job.status.in_(statuses),
+                              Job.finished_at < datetime.utcnow() - timedelta(days=older_than)),
+            execution_options={'synchronize_session': False}
+        ).rowcount
+        db.session.commit()
+        return removed
+    
+    def counts(self):
+        """
+        Número de tareas por cola y estado.
+        
+        Returns:
+            dict: `{cola: {estado: número}}`.
+        """
+        rows = db.session.execute(
+            select(Job.queue, Job.status, func.count()).group_by(Job.queue, Job.status)
+        ).all()
+        counts = {}
+        for queue, status, count in rows:
+            counts.setdefault(queue, {})[status] = count
+        return counts
+
+class Worker:
+    """
+    Proceso que ejecuta tareas de la cola hasta que se le pide parar.
+    
+    Se pueden lanzar tantos workers como se quiera, en una o varias máquinas.
+    SIGTERM y SIGINT terminan la tarea en curso, devuelven a la cola el resto del
+    lote y salen.
+    """
+    
+    def __init__(self, app, queues=None, batch_size=10, poll_interval=1.0, worker_id=None, heartbeat_interval=None):
+        """
+        Args:
+            app: Aplicación Flask.
+            queues (list): Colas atendidas (todas si no se indica).
+            batch_size (int): Tareas tomadas en cada consulta.
+            poll_interval (float): Segundos de espera cuando no hay tareas.
+            worker_id (str): Identificador (por defecto, `máquina:pid`).
+            heartbeat_interval (float): Segundos entre renovaciones del bloqueo de la
+                tarea en curso (por defecto, un tercio de `JOB_LOCK_TIMEOUT`).
+        """
+        self.app = app
+        self.queues = list(queues or [])
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.heartbeat_interval = heartbeat_interval
+        self._stop = threading.Event()
+    
+    def stop(self, *args):
+        """Pide al worker que termine después de la tarea en curso."""
+        self._stop.set()
+    
+    def run(self, burst=False):
+        """
+        Ejecuta tareas hasta recibir `stop` (o, con `burst`, hasta vaciar la cola).
+        
+        Returns:
+            int: Tareas ejecutadas (completadas o fallidas).
+        """
+        previous = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                previous[signum] = signal.signal(signum, self.stop)
+        
+        processed = 0
+        try:
+            with self.app.app_context():
+                queue = self.app.extensions['jobs']
+                next_recovery = 0
+                while not self._stop.is_set():
+                    if datetime.utcnow().timestamp() >= next_recovery:
+                        queue.recover_stale()
+                        next_recovery = datetime.utcnow().timestamp() + queue.lock_timeout / 4
+                    
+                    jobs = queue.dequeue(self.worker_id, self.queues, self.batch_size)
+                    if not jobs:
+                        if burst:
+                            break
+                        self._stop.wait(self.poll_interval)
+                        continue
+                    
+                    for index, job in enumerate(jobs):
+                        if self._stop.is_set():
+                            queue.release([pending.id for pending in jobs[index:]], self.worker_id)
+                            break
+                        self._execute(queue, job)
+                        processed += 1
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+        return processed
+    
+    def _execute(self, queue, job):
+        """Ejecuta una tarea y la marca como completada o fallida."""
+        func = TASKS.get(job.name)
+        finished = threading.Event()
+        heartbeat = threading.Thread(target=self._heartbeat, args=(queue, job.id, finished),
+                                     name='eureka-heartbeat', daemon=True)
+        heartbeat.start()
+        try:
+            if func is None:
+                raise LookupError(f'Tarea desconocida: {job.name}')
+            func(**job.payload)
+            queue.complete(job.id, self.worker_id)
+            db.session.commit()
+        except Exception as e:
+            db.session.rollback()
+            logger.exception('Error en la tarea %s (%s), intento %s', job.id, job.name, job.attempts)
+            queue.fail(job, self.worker_id, f'{type(e).__name__}: {e}')
+        finally:
+            finished.set()
+            heartbeat.join()
+    
+    def _heartbeat(self, queue, job_id, finished):
+        """Renueva el bloqueo de una tarea hasta que termina (en su propio hilo y sesión)."""
+        interval = self.heartbeat_interval or queue.lock_timeout / 3
+        while not finished.wait(interval):
+            try:
+                with self.app.app_context():
+                    queue.heartbeat(job_id, self.worker_id)
+            except Exception:
+                logger.exception('No se pudo renovar el bloqueo de la tarea %s', job_id)
+
+@task('jobs.purge')
+def _purge_jobs(older_than=7, include_failed=False):
+    """Tarea de limpieza de las tareas terminadas."""
+    current_app.extensions['jobs'].purge(older_than=older_than, include_failed=include_failed)
+
+def configure_jobs(app):
+    """
+    Configura la cola de tareas y los comandos `flask jobs`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('JOB_RETRY_DELAY', 10)
+    app.config.setdefault('JOB_MAX_RETRY_DELAY', 3600)
+    app.config.setdefault('JOB_LOCK_TIMEOUT', 600)
+    
+    app.extensions['jobs'] = JobQueue(
+        retry_delay=app.config['JOB_RETRY_DELAY'],
+        max_retry_delay=app.config['JOB_MAX_RETRY_DELAY'],
+        lock_timeout=app.config['JOB_LOCK_TIMEOUT']
+    )
+    
+    @app.cli.group()
+    def jobs():
+        """Cola de tareas en segundo plano."""
+    
+    @jobs.command('work')
+    @click.option('--queue', 'queues', multiple=True, help='Cola atendida (se puede repetir; todas por defecto).')
+    @click.option('--batch-size', default=10, show_default=True, help='Tareas tomadas por consulta.')
+    @click.option('--poll-interval', default=1.0, show_default=True, help='Segundos de espera sin tareas.')
+    @click.option('--burst', is_flag=True, help='Salir cuando no queden tareas.')
+    def work_command(queues, batch_size, poll_interval, burst):
+        """Ejecuta tareas de la cola."""
+        worker = Worker(app, queues=queues, batch_size=batch_size, poll_interval=poll_interval)
+        click.echo(f'Worker {worker.worker_id} atendiendo {", ".join(queues) or "todas las colas"}')
+        processed = worker.run(burst=burst)
+        click.echo(f'{processed} tareas ejecutadas')
+    
+    @jobs.command('enqueue')
+    @click.argument('name')
+    @click.option('--payload', default='{}', help='Argumentos de la tarea en JSON.')
+    @click.option('--queue', default='default', show_default=True, help='Cola.')
+    @click.option('--priority', default=0, show_default=True, help='Prioridad (mayor antes).')
+    @click.option('--delay', default=0.0, show_default=True, help='Segundos de espera antes de ejecutarla.')
+    def enqueue_command(name, payload, queue, priority, delay):
+        """Encola una tarea (por ejemplo, desde cron)."""
+        try:
+            job = app.extensions['jobs'].enqueue(name, json.loads(payload), queue=queue, priority=priority,
+                                                 delay=delay)
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        db.session.commit()
+        click.echo(f'Tarea {job.id} encolada')
+    
+    @jobs.command('status')
+    def status_command():
+        """Muestra el número de tareas por cola y estado."""
+        for queue, counts in sorted(app.extensions['jobs'].counts().items()):
+            click.echo(f'{queue}: ' + ', '.join(f'{status}={count}' for status, count in sorted(counts.items())))
+    
+    @jobs.command('retry')
+    @click.option('--queue', default=None, help='Solo las tareas de esta cola.')
+    def retry_command(queue):
+        """Vuelve a encolar las tareas fallidas."""
+        click.echo(f'{app.extensions["jobs"].retry_failed(queue)} tareas encoladas de nuevo')
+    
+    @jobs.command('purge')
+    @click.option('--days', default=7.0, show_default=True, help='Antigüedad mínima (días).')
+    @click.option('--failed', is_flag=True, help='Borrar también las fallidas.')
+    def purge_command(days, failed):
+        """Borra las tareas terminadas."""
+        click.echo(f'{app.extensions["jobs"].purge(older_than=days, include_failed=failed)} tareas borradas')
+    
+    return app
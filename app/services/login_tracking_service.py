@@ -0,0 +1,143 @@
+"""
+Registro agrupado de inicios de sesión (`last_login` y `login_count`).
+
+Escribir la fecha del último login en cada inicio de sesión es un UPDATE y un
+COMMIT por petición sobre la fila del usuario; con ráfagas de logins (p. ej. tras
+un despliegue, cuando todas las sesiones caducan a la vez) esas escrituras
+compiten por las mismas filas de `users`. En su lugar, cada worker acumula en
+memoria la última fecha y el número de logins de cada usuario y los escribe cada
+`LOGIN_TRACKING_INTERVAL` segundos con un único UPDATE por lotes (y al terminar el
+proceso). Con `LOGIN_TRACKING_INTERVAL = 0` se escribe al momento.
+
+Si el proceso muere sin poder escribir, se pierden como mucho los logins de ese
+intervalo: son datos informativos, no de seguridad.
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import bindparam, update
+
+from app import db
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+class LoginTracker:
+    """
+    Acumula los inicios de sesión de cada usuario y los escribe por lotes.
+    """
+    
+    def __init__(self, app, interval=5.0):
+        """
+        Args:
+            app: Aplicación Flask (para escribir desde el hilo de fondo).
+            interval (float): Segundos entre escrituras; 0 escribe en cada login.
+        """
+        self.app = app
+        self.interval = interval
+        # user_id -> (fecha del último login, logins sin escribir)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._thread = None
+    
+    def record(self, user_id, at=None):
+        """
+        Registra un inicio de sesión.
+        
+        Args:
+            user_id (int): ID del usuario.
+            at (datetime): Fecha del login (por defecto, ahora).
+        """
+        at = at or datetime.utcnow()
+        with self._lock:
+            last_at, count = self._pending.get(user_id, (at, 0))
+            self._pending[user_id] = (max(last_at, at), count + 1)
+        
+        if self.interval > 0:
+            self._ensure_flushing()
+        else:
+            self.flush()
+    
+    def pending(self, user_id):
+        """Fecha del último login y número de logins de un usuario aún sin escribir, o None."""
+        with self._lock:
+            return self._pending.get(user_id)
+    
+    def flush(self):
+        """
+        Escribe los inicios de sesión acumulados con un UPDATE por lotes.
+        
+        Las filas se actualizan en orden de ID, de modo que dos workers que
+        escriben a la vez bloquean las filas en el mismo orden y no se interbloquean.
+        Si la escritura falla, los logins vuelven al búfer para el siguiente intento.
+        
+        Returns:
+            int: Número de usuarios actualizados.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+        
+        users = User.__table__
+        stmt = (
+            update(users)
+            .where(users.c.id == bindparam('b_id'))
+            .values(last_login=bindparam('b_at'), login_count=users.c.login_count + bindparam('b_count'))
+        )
+        rows = [{'b_id': user_id, 'b_at': at, 'b_count': count}
+                for user_id, (at, count) in sorted(pending.items())]
+        try:
+            db.session.execute(stmt, rows)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            self._restore(pending)
+            raise
+        return len(rows)
+    
+    def _restore(self, pending):
+        """Devuelve al búfer unos logins que no se pudieron escribir."""
+        with self._lock:
+            for user_id, (at, count) in pending.items():
+                last_at, newer = self._pending.get(user_id, (at, 0))
+                self._pending[user_id] = (max(last_at, at), count + newer)
+    
+    def _ensure_flushing(self):
+        """Arranca el hilo que escribe los logins acumulados (también tras un fork)."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self._flush_in_context)
+            self._thread = threading.Thread(target=self._flush_forever, name='eureka-login-tracking', daemon=True)
+            self._thread.start()
+    
+    def _flush_forever(self):
+        """Bucle del hilo de escritura."""
+        while True:
+            time.sleep(self.interval or 1.0)
+            try:
+                self._flush_in_context()
+            except Exception:
+                logger.exception('Error al escribir los inicios de sesión acumulados')
+    
+    def _flush_in_context(self):
+        """Ejecuta `flush` dentro de un contexto de aplicación propio."""
+        with self.app.app_context():
+            self.flush()
+
+def configure_login_tracking(app):
+    """
+    Configura el registro agrupado de inicios de sesión.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('LOGIN_TRACKING_INTERVAL', 5.0)
+    app.extensions['login_tracker'] = LoginTracker(app, interval=app.config['LOGIN_TRACKING_INTERVAL'])
+    return app
@@ -0,0 +1,185 @@
+"""
+Roles y permisos de cada usuario, resueltos una vez y cacheados por worker.
+
+Flask-Security carga la identidad (Flask-Principal) en cada petición autenticada
+y, para añadir sus roles y permisos, recorre `current_user.roles`: una consulta a
+`roles_users` por petición, haya o no comprobaciones de roles. Este módulo
+sustituye ese paso por `PermissionResolver`, que carga los nombres de los roles y
+sus permisos con una única consulta (join de `roles_users` y `roles`) la primera
+vez y los sirve desde memoria en las siguientes, de modo que `roles_required`,
+`permissions_required`, `User.has_role` y `User.has_permission` no consultan la
+base de datos.
+
+La caché se invalida con las notificaciones de cambios (`app.utils.events`):
+al confirmar cambios en los roles de un usuario se descartan los suyos y, si
+cambia un rol (nombre, permisos o borrado), los de todos. Con `EVENTS_BROKER=postgres`
+el aviso llega a todos los workers; por si se pierde alguno, las entradas caducan
+tras `PERMISSIONS_CACHE_TTL` segundos.
+"""
+
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from flask_principal import RoleNeed, UserNeed, identity_loaded
+from flask_security import core as security_core
+from flask_security import current_user
+from flask_security.utils import FsPermNeed
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session, attributes
+
+from app import db
+from app.models.user import Role, User, roles_users
+from app.utils.events import record_changes
+
+# Roles y permisos de un usuario
+Grants = namedtuple('Grants', ['roles', 'permissions'])
+
+# Tipo de cambio que se publica al modificar roles (ver `app.utils.events`) y, en su
+# lista de usuarios, valor que indica que cambian los de todos
+ROLES_CHANGE = 'roles'
+ALL_USERS = 0
+
+class PermissionResolver:
+    """
+    Caché LRU de los roles y permisos de cada usuario.
+    """
+    
+    def __init__(self, max_users=10000, ttl=300):
+        """
+        Args:
+            max_users (int): Usuarios cuyos roles se mantienen en memoria.
+            ttl (float): Segundos tras los que se vuelven a leer aunque no haya avisos.
+        """
+        self.max_users = max_users
+        self.ttl = ttl
+        self._cache = OrderedDict()
+        # Se incrementa en cada invalidación: una carga que empezó antes no se guarda
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def resolve(self, user_id):
+        """
+        Roles y permisos de un usuario.
+        
+        Args:
+            user_id (int): ID del usuario.
+        
+        Returns:
+            Grants: Conjuntos (`frozenset`) de nombres de roles y de permisos.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(user_id)
+            if cached is not None and now - cached[1] <= self.ttl:
+                self._cache.move_to_end(user_id)
+                return cached[0]
+            generation = self._generation
+        
+        grants = self.load(user_id)
+        with self._lock:
+            if generation == self._generation:
+                self._cache[user_id] = (grants, now)
+                self._cache.move_to_end(user_id)
+                while len(self._cache) > self.max_users:
+                    self._cache.popitem(last=False)
+        return grants
+    
+    def load(self, user_id):
+        """Lee de la base de datos los roles de un usuario y sus permisos, con una única consulta."""
+        rows = db.session.execute(
+            select(Role.name, Role.permissions)
+            .join(roles_users, roles_users.c.role_id == Role.id)
+            .where(roles_users.c.user_id == user_id)
+        )
+        roles, permissions = set(), set()
+        for name, role_permissions in rows:
+            roles.add(name)
+            permissions.update(Role.parse_permissions(role_permissions))
+        return Grants(frozenset(roles), frozenset(permissions))
+    
+    def has_role(self, user_id, role):
+        """Indica si el usuario tiene un rol (nombre o instancia de `Role`)."""
+        return (role if isinstance(role, str) else role.name) in self.resolve(user_id).roles
+    
+    def has_permission(self, user_id, permission):
+        """Indica si alguno de los roles del usuario concede un permiso."""
+        return permission in self.resolve(user_id).permissions
+    
+    def invalidate(self, user_ids=None):
+        """Descarta los roles cacheados de unos usuarios (de todos si no se indican)."""
+        with self._lock:
+            if user_ids is None:
+                self._cache.clear()
+            else:
+                for user_id in user_ids:
+                    self._cache.pop(user_id, None)
+            self._generation += 1
+    
+    def on_changes(self, user_id, changes):
+        """Oyente de `app.utils.events`: invalida los usuarios con cambios en sus roles."""
+        if ROLES_CHANGE in changes:
+            user_ids = changes[ROLES_CHANGE]
+            # Sin detalle (carga de NOTIFY demasiado grande) o con ALL_USERS se invalida todo
+            self.invalidate(None if not user_ids or ALL_USERS in user_ids else user_ids)
+    
+    def on_identity_loaded(self, sender, identity):
+        """
+        Añade a la identidad de Flask-Principal los roles y permisos del usuario.
+        
+        Sustituye al manejador de Flask-Security, que recorre `current_user.roles`.
+        """
+        user = current_user
+        if hasattr(user, 'fs_uniquifier'):
+            identity.provides.add(UserNeed(user.fs_uniquifier))
+        if getattr(user, 'is_authenticated', False):
+            grants = self.resolve(user.id)
+            identity.provides.update(RoleNeed(name) for name in grants.roles)
+            identity.provides.update(FsPermNeed(permission) for permission in grants.permissions)
+        identity.user = user
+
+@event.listens_for(Session, 'after_flush')
+def _collect_role_changes(session, flush_context):
+    """Registra los usuarios cuyos roles cambian y los cambios en los propios roles."""
+    changed_users = set()
+    all_users = False
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(instance, User) and instance.id is not None:
+            if attributes.get_history(instance, 'roles').has_changes():
+                changed_users.add(instance.id)
+        elif isinstance(instance, Role) and instance not in session.new:
+            if instance in session.deleted or session.is_modified(instance):
+                all_users = True
+    
+    if all_users:
+        changed_users = {ALL_USERS}
+    if changed_users:
+        # Sin usuario propietario: no se envía a las conexiones SSE, solo a los oyentes
+        record_changes(session, None, ROLES_CHANGE, changed_users)
+
+def configure_permissions(app):
+    """
+    Configura la resolución cacheada de roles y permisos.
+    
+    Debe llamarse después de inicializar Flask-Security y de `configure_events`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('PERMISSIONS_CACHE_USERS', 10000)
+    app.config.setdefault('PERMISSIONS_CACHE_TTL', 300)
+    
+    resolver = PermissionResolver(
+        max_users=app.config['PERMISSIONS_CACHE_USERS'],
+        ttl=app.config['PERMISSIONS_CACHE_TTL']
+    )
+    app.extensions['events'].add_listener(resolver.on_changes)
+    
+    # El manejador de Flask-Security consultaría los roles en cada petición
+    default_handler = getattr(security_core, '_on_identity_loaded', None)
+    if default_handler is not None:
+        identity_loaded.disconnect(default_handler, sender=app)
+    identity_loaded.connect_via(app)(resolver.on_identity_loaded)
+    
+    app.extensions['permissions'] = resolver
+    return app
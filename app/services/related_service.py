@@ -0,0 +1,243 @@
+"""
+Entradas relacionadas a partir de las etiquetas que comparten.
+
+Las etiquetas de las entradas de un usuario se representan como una matriz
+dispersa entradas × etiquetas (SciPy CSR). Cada etiqueta pesa según su rareza
+(IDF: compartir una etiqueta poco usada dice más que compartir una que está en
+todas las entradas) y las filas se normalizan, de modo que la similitud entre
+entradas es el producto de sus filas (coseno). Las entradas relacionadas con un
+lote de entradas se obtienen con un único producto de matrices dispersas, sin
+una consulta con joins por entrada.
+
+La matriz de cada usuario se cachea en memoria. Cuando cambian entradas (ver
+`app.utils.events`) solo se vuelven a leer las etiquetas de esas entradas y se
+sustituyen sus filas.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+
+from app import db
+from app.models import Entry, EntryTag
+
+# Entradas por bloque al calcular similitudes (acota la memoria de cada producto)
+TOP_K_CHUNK = 256
+
+class TagCooccurrenceModel:
+    """
+    Matriz entradas × etiquetas de un usuario, con filas normalizadas por IDF.
+    
+    Es inmutable: `update` devuelve un modelo nuevo, así que puede compartirse
+    entre hilos sin bloqueos.
+    """
+    
+    def __init__(self, pairs):
+        """
+        Args:
+            pairs (numpy.ndarray): Pares (entry_id, tag_id), de forma (n, 2).
+        """
+        self.pairs = pairs
+        self.entry_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+        tag_ids, cols = np.unique(pairs[:, 1], return_inverse=True)
+        
+        matrix = sparse.csr_matrix(
+            (np.ones(len(pairs), dtype=np.float32), (rows.ravel(), cols.ravel())),
+            shape=(len(self.entry_ids), len(tag_ids))
+        )
+        # IDF suavizado: las etiquetas presentes en todas las entradas casi no cuentan
+        document_frequency = np.bincount(cols.ravel(), minlength=len(tag_ids))
+        idf = np.log1p(len(self.entry_ids) / np.maximum(document_frequency, 1)).astype(np.float32)
+        weighted = matrix.multiply(idf).tocsr()
+        norms = np.sqrt(weighted.multiply(weighted).sum(axis=1)).A1
+        norms[norms == 0] = 1
+        self.matrix = sparse.csr_matrix(sparse.diags(1 / norms).astype(np.float32) @ weighted)
+        # Traspuesta en CSR (etiquetas × entradas) para multiplicar bloques de filas por ella
+        self._transposed = self.matrix.transpose().tocsr()
+    
+    @classmethod
+    def from_pairs(cls, pairs):
+        """Crea el modelo a partir de una secuencia de pares (entry_id, tag_id)."""
+        return cls(np.asarray(pairs, dtype=np.int64).reshape(-1, 2))
+    
+    def update(self, entry_ids, pairs):
+        """
+        Sustituye las etiquetas de unas entradas.
+        
+        Args:
+            entry_ids (iterable): Entradas modificadas (incluidas las borradas o sin etiquetas).
+            pairs (iterable): Pares (entry_id, tag_id) actuales de esas entradas.
+        
+        Returns:
+            TagCooccurrenceModel: Modelo con las filas sustituidas.
+        """
+        changed = np.fromiter(entry_ids, dtype=np.int64)
+        kept = self.pairs[~np.isin(self.pairs[:, 0], changed)]
+        new = np.asarray(pairs, dtype=np.int64).reshape(-1, 2)
+        return TagCooccurrenceModel(np.concatenate([kept, new]))
+    
+    def top_k(self, entry_ids, k=5):
+        """
+        Entradas más parecidas a cada una de las indicadas.
+        
+        Args:
+            entry_ids (iterable): Entradas de las que se buscan relacionadas.
+            k (int): Máximo de relacionadas por entrada.
+        
+        Returns:
+            dict: Para cada entrada, lista de (entry_id, puntuación) de mayor a menor
+                similitud. Las entradas sin etiquetas no tienen relacionadas.
+        """
+        entry_ids = list(entry_ids)
+        results = {entry_id: [] for entry_id in entry_ids}
+        
+        positions = np.searchsorted(self.entry_ids, entry_ids)
+        known = [(entry_id, int(position)) for entry_id, position in zip(entry_ids, positions)
+                 if position < len(self.entry_ids) and self.entry_ids[position] == entry_id]
+        
+        for start in range(0, len(known), TOP_K_CHUNK):
+            chunk = known[start:start + TOP_K_CHUNK]
+            rows = [position for _, position in chunk]
+            # Similitud de cada entrada del bloque con todas: (bloque × entradas), dispersa
+            scores = (self.matrix[rows] @ self._transposed).tocsr()
+            for i, (entry_id, position) in enumerate(chunk):
+                begin, end = scores.indptr[i], scores.indptr[i + 1]
+                candidates, values = scores.indices[begin:end], scores.data[begin:end]
+                mask = candidates != position
+                candidates, values = candidates[mask], values[mask]
+                if len(values) > k:
+                    best = np.argpartition(-values, k)[:k]
+                    candidates, values = candidates[best], values[best]
+                order = np.lexsort((self.entry_ids[candidates], -values))
+                results[entry_id] = [(int(self.entry_ids[c]), float(v)) for c, v in
+                                     zip(candidates[order], values[order])]
+        return results
+
+class RelatedEntriesService:
+    """
+    Entradas relacionadas con caché por usuario y actualización incremental.
+    """
+    
+    def __init__(self, max_users=200, ttl=3600):
+        """
+        Args:
+            max_users (int): Modelos de usuario que se mantienen en memoria.
+            ttl (float): Segundos tras los que un modelo se reconstruye desde cero.
+        """
+        self.max_users = max_users
+        self.ttl = ttl
+        self._models = OrderedDict()
+        self._dirty = {}
+        # Se incrementa al descartar un modelo: una carga que empezó antes no se guarda
+        self._generation = 0
+        self._lock = threading.Lock()
+    
+    def related(self, user_id, entry_ids, k=5):
+        """
+        Entradas relacionadas con un lote de entradas de un usuario.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            entry_ids (iterable): Entradas de las que se buscan relacionadas.
+            k (int): Máximo de relacionadas por entrada.
+        
+        Returns:
+            dict: Para cada entrada, lista de diccionarios con `id`, `title` y
+                `score` (similitud entre 0 y 1), de mayor a menor similitud.
+        """
+        scores = self._model(user_id).top_k(entry_ids, k=k)
+        related_ids = {related_id for items in scores.values() for related_id, _ in items}
+        titles = dict(db.session.execute(
+            select(Entry.id, Entry.title).where(Entry.id.in_(related_ids), Entry.user_id == user_id)
+        ).all()) if related_ids else {}
+        
+        return {
+            entry_id: [{'id': related_id, 'title': titles[related_id], 'score': round(score, 4)}
+                       for related_id, score in items if related_id in titles]
+            for entry_id, items in scores.items()
+        }
+    
+    def on_changes(self, user_id, changes):
+        """Oyente de `app.utils.events`: marca las entradas cuyas filas hay que releer."""
+        if 'tags' not in changes and 'entries' not in changes:
+            return
+        with self._lock:
+            if 'tags' in changes or user_id not in self._models or not changes['entries']:
+                # Borrar una etiqueta elimina sus relaciones sin avisar de cada entrada; si no
+                # hay modelo, puede haber una carga en curso que no verá el cambio; y una lista
+                # vacía es un aviso sin detalle (carga de NOTIFY demasiado grande)
+                self._models.pop(user_id, None)
+                self._dirty.pop(user_id, None)
+                self._generation += 1
+            else:
+                self._dirty.setdefault(user_id, set()).update(changes['entries'])
+    
+    def _model(self, user_id):
+        """Modelo del usuario, desde la caché (aplicando los cambios pendientes) o la base de datos."""
+        now = time.monotonic()
+        with self._lock:
+            cached = self._models.get(user_id)
+            dirty = self._dirty.pop(user_id, set())
+            if cached is not None and now - cached[0] >= self.ttl:
+                cached = None
+            generation = self._generation
+        
+        if cached is None:
+            model = TagCooccurrenceModel.from_pairs(self._load_pairs(user_id))
+            loaded_at = now
+        elif dirty:
+            loaded_at, model = cached
+            model = model.update(dirty, self._load_pairs(user_id, dirty))
+        else:
+            with self._lock:
+                self._models.move_to_end(user_id)
+            return cached[1]
+        
+        with self._lock:
+            if cached is None and generation != self._generation:
+                return model
+            if cached is not None and self._models.get(user_id) is not cached:
+                # Otro hilo ha sustituido (o descartado) el modelo mientras se actualizaba;
+                # el suyo no incluye estos cambios, que quedan pendientes para el siguiente
+                if user_id in self._models:
+                    self._dirty.setdefault(user_id, set()).update(dirty)
+                return model
+            self._models[user_id] = (loaded_at, model)
+            self._models.move_to_end(user_id)
+            while len(self._models) > self.max_users:
+                evicted, _ = self._models.popitem(last=False)
+                self._dirty.pop(evicted, None)
+        return model
+    
+    def _load_pairs(self, user_id, entry_ids=None):
+        """Pares (entry_id, tag_id) de las entradas activas del usuario (o de algunas)."""
+        stmt = select(EntryTag.entry_id, EntryTag.tag_id) \
+            .join(Entry, Entry.id == EntryTag.entry_id) \
+            .where(Entry.user_id == user_id, Entry.is_deleted.is_(False))
+        if entry_ids is not None:
+            stmt = stmt.where(EntryTag.entry_id.in_(entry_ids))
+        return db.session.execute(stmt).all()
+
+def configure_related(app):
+    """
+    Configura las entradas relacionadas y su actualización con las notificaciones de cambios.
+    
+    Debe llamarse después de `configure_events`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('RELATED_CACHE_USERS', 200)
+    app.config.setdefault('RELATED_CACHE_TTL', 3600)
+    
+    service = RelatedEntriesService(
+        max_users=app.config['RELATED_CACHE_USERS'],
+        ttl=app.config['RELATED_CACHE_TTL']
+    )
+    app.extensions['events'].add_listener(service.on_changes)
+    app.extensions['related'] = service
+    return app
@@ -0,0 +1,416 @@
+"""
+Búsqueda semántica local sobre el contenido de las entradas.
+
+Cada entrada se representa con un vector TF-IDF de `DIM` dimensiones (ver
+`app.utils.text_vectors`) y los vectores de cada usuario se guardan en un fichero
+float32 mapeado en memoria (`np.memmap`) dentro de `SEMANTIC_INDEX_DIR`. Buscar es
+multiplicar esa matriz por el vector de la consulta y quedarse con las `k` mejores
+puntuaciones: la página la comparte el sistema operativo entre workers y no se
+lee entera en la memoria de cada proceso.
+
+El índice se pone al día antes de cada búsqueda con las entradas modificadas desde
+su marca de agua (updated_at, id), por el índice `idx_entry_user_updated`: solo se
+vectorizan las entradas nuevas, editadas o borradas. Como en la sincronización
+incremental, la marca no pasa de `SYNC_SAFETY_WINDOW` segundos atrás, para no
+saltarse transacciones que aún no han confirmado.
+
+Los IDF se calculan al construir el índice. Cuando el número de entradas cambia
+más de un `REBUILD_RATIO` desde entonces, el índice se reconstruye desde cero.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+import click
+import numpy as np
+from flask import current_app
+from sqlalchemy import or_, select
+
+from app import db
+from app.models import Entry, User
+from app.services.job_service import task
+from app.utils.text_vectors import DIM, TermHasher, document_frequencies, inverse_document_frequencies, \
+    vectorize
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows (solo desarrollo): basta el bloqueo entre hilos
+    fcntl = None
+
+# Versión del formato de los ficheros del índice
+INDEX_FORMAT = 1
+
+# Cambio relativo en el número de entradas a partir del cual se recalculan los IDF
+REBUILD_RATIO = 0.5
+
+# Entradas por debajo de las cuales el cambio relativo no fuerza la reconstrucción
+MIN_REBUILD_DOCUMENTS = 200
+
+# Bloqueos entre hilos, repartidos por ID de usuario
+LOCK_STRIPES = 64
+
+class SemanticIndex:
+    """
+    Índice de vectores de un usuario, guardado en un directorio.
+    
+    Ficheros: `vectors.f32` (matriz capacidad × `DIM`, mapeada en memoria),
+    `ids.npy` (ID de la entrada de cada fila; -1 si se borró), `idf.npy` y
+    `meta.json` (filas usadas, marca de agua y generación). Cada escritura
+    incrementa la generación, y así otros procesos saben que deben releerlo.
+    """
+    
+    def __init__(self, path):
+        """
+        Args:
+            path (str): Directorio del índice.
+        """
+        self.path = path
+        self.meta = None
+        self.ids = None
+        self.idf = None
+        self.vectors = None
+        self.positions = {}
+        self.hasher = TermHasher()
+    
+    def load(self):
+        """
+        Lee el índice del disco si ha cambiado desde la última lectura.
+        
+        Returns:
+            bool: True si hay un índice válido.
+        """
+        try:
+            with open(self._file('meta.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if meta.get('format') != INDEX_FORMAT or meta.get('dim') != DIM:
+            return False
+        if self.meta is not None and meta['generation'] == self.meta['generation']:
+            return True
+        
+        self.ids = np.load(self._file('ids.npy'))
+        self.idf = np.load(self._file('idf.npy'))
+        self._open_vectors(meta['capacity'])
+        self.positions = {int(entry_id): row for row, entry_id in enumerate(self.ids) if entry_id >= 0}
+        self.meta = meta
+        return True
+    
+    def build(self, rows, watermark):
+        """
+        Crea el índice desde cero.
+        
+        Args:
+            rows (list): Tuplas (entry_id, texto) de las entradas activas.
+            watermark (list): Marca de agua (updated_at ISO, id) hasta la que se ha leído.
+        """
+        os.makedirs(self.path, exist_ok=True)
+        documents = [self.hasher.counts(text) for _, text in rows]
+        idf = inverse_document_frequencies(document_frequencies(documents), len(documents))
+        ids = np.array([entry_id for entry_id, _ in rows], dtype=np.int64)
+        capacity = self._capacity(len(rows))
+        
+        self.vectors = None
+        with open(self._file('vectors.f32.tmp'), 'wb') as f:
+            vectorize(documents, idf).tofile(f)
+            f.truncate(capacity * DIM * 4)
+        os.replace(self._file('vectors.f32.tmp'), self._file('vectors.f32'))
+        self._save_array('ids.npy', ids)
+        self._save_array('idf.npy', idf)
+        
+        generation = self.meta['generation'] + 1 if self.meta else 1
+        self.ids, self.idf = ids, idf
+        self._open_vectors(capacity)
+        self.positions = {int(entry_id): row for row, entry_id in enumerate(ids)}
+        self._save(dict(format=INDEX_FORMAT, dim=DIM, generation=generation, count=len(ids),
+                        capacity=capacity, documents=len(ids), active=len(ids), watermark=watermark))
+    
+    def apply(self, rows, watermark):
+        """
+        Sustituye los vectores de las entradas modificadas.
+        
+        Args:
+            rows (list): Tuplas (entry_id, texto), con texto None si la entrada se ha borrado.
+            watermark (list): Nueva marca de agua.
+        """
+        live = [(entry_id, text) for entry_id, text in rows if text is not None]
+        vectors = vectorize([self.hasher.counts(text) for _, text in live], self.idf)
+        
+        ids = self.ids.copy()
+        active = self.meta['active']
+        for entry_id, text in rows:
+            if text is None and entry_id in self.positions:
+                row = self.positions.pop(entry_id)
+                ids[row] = -1
+                self.vectors[row] = 0
+                active -= 1
+        appended = list(dict.fromkeys(entry_id for entry_id, _ in live if entry_id not in self.positions))
+        if len(ids) + len(appended) > self.meta['capacity']:
+            self.vectors.flush()
+            self._grow(self._capacity(len(ids) + len(appended)))
+        for offset, entry_id in enumerate(appended):
+            self.positions[entry_id] = len(ids) + offset
+        ids = np.concatenate([ids, np.array(appended, dtype=np.int64)])
+        active += len(appended)
+        for (entry_id, _), vector in zip(live, vectors):
+            self.vectors[self.positions[entry_id]] = vector
+        
+        self.vectors.flush()
+        self.ids = ids
+        self._save_array('ids.npy', ids)
+        self._save(dict(self.meta, generation=self.meta['generation'] + 1, count=len(ids), active=active,
+                        watermark=watermark))
+    
+    def top_k(self, vector, k=10, exclude=None):
+        """
+        Entradas cuyo vector tiene mayor similitud de coseno con uno dado.
+        
+        Args:
+            vector (numpy.ndarray): Vector normalizado de la consulta.
+            k (int): Máximo de resultados.
+            exclude (int): ID de una entrada que no debe aparecer.
+        
+        Returns:
+            list: Tuplas (entry_id, puntuación) de mayor a menor similitud (solo positivas).
+        """
+        count = self.meta['count']
+        if not count or not vector.any():
+            return []
+        
+        scores = self.vectors[:count] @ vector
+        scores[self.ids < 0] = 0
+        if exclude in self.positions:
+            scores[self.positions[exclude]] = 0
+        if count > k:
+            best = np.argpartition(-scores, k)[:k]
+        else:
+            best = np.arange(count)
+        best = best[scores[best] > 0]
+        order = np.lexsort((self.ids[best], -scores[best]))
+        return [(int(self.ids[row]), float(scores[row])) for row in best[order]]
+    
+    def needs_rebuild(self):
+        """Indica si el número de entradas ha cambiado tanto que los IDF ya no sirven."""
+        built, active = self.meta['documents'], self.meta['active']
+        return abs(active - built) > REBUILD_RATIO * max(built, MIN_REBUILD_DOCUMENTS)
+    
+    def _file(self, name):
+        return os.path.join(self.path, name)
+    
+    def _capacity(self, count):
+        """Filas reservadas para `count` entradas (con margen para las nuevas)."""
+        return max(64, count + count // 4)
+    
+    def _open_vectors(self, capacity):
+        self.vectors = np.memmap(self._file('vectors.f32'), dtype=np.float32, mode='r+', shape=(capacity, DIM))
+    
+    def _grow(self, capacity):
+        """Amplía el fichero de vectores (con ceros) y lo vuelve a mapear."""
+        self.vectors = None
+        with open(self._file('vectors.f32'), 'r+b') as f:
+            f.truncate(capacity * DIM * 4)
+        self._open_vectors(capacity)
+        self.meta['capacity'] = capacity
+    
+    def _save_array(self, name, array):
+        with open(self._file(name + '.tmp'), 'wb') as f:
+            np.save(f, array)
+        os.replace(self._file(name + '.tmp'), self._file(name))
+    
+    def _save(self, meta):
+        """Escribe los metadatos (la última escritura: publica la nueva generación)."""
+        with open(self._file('meta.json.tmp'), 'w') as f:
+            json.dump(meta, f)
+        os.replace(self._file('meta.json.tmp'), self._file('meta.json'))
+        self.meta = meta
+
+class SemanticSearchService:
+    """
+    Búsqueda semántica con un índice de vectores por usuario.
+    """
+    
+    def __init__(self, directory, max_users=50, safety_window=5):
+        """
+        Args:
+            directory (str): Directorio donde se guardan los índices.
+            max_users (int): Índices que se mantienen abiertos en memoria.
+            safety_window (float): Segundos que la marca de agua se mantiene por detrás.
+        """
+        self.directory = directory
+        self.max_users = max_users
+        self.safety_window = safety_window
+        self._indexes = OrderedDict()
+        self._lock = threading.Lock()
+        self._user_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+    
+    def search(self, user_id, query, limit=10):
+        """
+        Entradas de un usuario cuyo contenido se parece más a un texto.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            query (str): Texto de la búsqueda.
+            limit (int): Máximo de resultados.
+        
+        Returns:
+            list: Diccionarios con `id`, `title` y `score` (similitud entre 0 y 1),
+                de mayor a menor similitud.
+        """
+        with self._locked(user_id):
+            index = self._refresh(user_id)
+            vector = vectorize([index.hasher.counts(query)], index.idf)[0]
+            results = index.top_k(vector, k=limit)
+        return self._with_titles(user_id, results)
+    
+    def similar(self, user_id, entry_id, limit=10):
+        """
+        Entradas de un usuario cuyo contenido se parece más al de una entrada.
+        
+        Returns:
+            list: Como `search`, o None si la entrada no existe (o está borrada).
+        """
+        with self._locked(user_id):
+            index = self._refresh(user_id)
+            row = index.positions.get(entry_id)
+            if row is None:
+                return None
+            results = index.top_k(np.array(index.vectors[row]), k=limit, exclude=entry_id)
+        return self._with_titles(user_id, results)
+    
+    def rebuild(self, user_id):
+        """Reconstruye desde cero el índice de un usuario (recalculando los IDF)."""
+        with self._locked(user_id):
+            self._build(self._index(user_id), user_id)
+    
+    def _refresh(self, user_id):
+        """Índice del usuario, al día con las entradas modificadas desde su marca de agua."""
+        index = self._index(user_id)
+        if not index.load():
+            self._build(index, user_id)
+            return index
+        
+        horizon = datetime.utcnow() - timedelta(seconds=self.safety_window)
+        limit = int(REBUILD_RATIO * max(index.meta['active'], MIN_REBUILD_DOCUMENTS))
+        rows = self._changed_rows(user_id, index.meta['watermark'], limit + 1)
+        if len(rows) > limit:
+            self._build(index, user_id)
+            return index
+        
+        if rows:
+            watermark = index.meta['watermark']
+            for row in rows:
+                if row.updated_at <= horizon:
+                    watermark = [row.updated_at.isoformat(), row.id]
+            index.apply([(row.id, None if row.is_deleted else self._text(row)) for row in rows], watermark)
+            if index.needs_rebuild():
+                self._build(index, user_id)
+        return index
+    
+    def _build(self, index, user_id):
+        """Construye el índice con todas las entradas activas del usuario."""
+        horizon = datetime.utcnow() - timedelta(seconds=self.safety_window)
+        watermark = db.session.execute(
+            select(Entry.updated_at, Entry.id)
+            .where(Entry.user_id == user_id, Entry.updated_at <= horizon)
+            .order_by(Entry.updated_at.desc(), Entry.id.desc())
+            .limit(1)
+        ).first()
+        rows = db.session.execute(
+            select(Entry.id, Entry.title, Entry.content)
+            .where(Entry.user_id == user_id, Entry.is_deleted.is_(False))
+            .order_by(Entry.id)
+        ).all()
+        index.build([(row.id, self._text(row)) for row in rows],
+                    [watermark.updated_at.isoformat(), watermark.id] if watermark else None)
+    
+    def _changed_rows(self, user_id, watermark, limit):
+        """Entradas modificadas (o borradas) después de la marca de agua, en orden (updated_at, id)."""
+        stmt = select(Entry.id, Entry.title, Entry.content, Entry.is_deleted, Entry.updated_at) \
+            .where(Entry.user_id == user_id)
+        if watermark:
+            updated_at, entry_id = datetime.fromisoformat(watermark[0]), watermark[1]
+            # La cota `>=` permite recorrer el índice por rango; el OR solo desempata por id
+            stmt = stmt.where(Entry.updated_at >= updated_at,
+                              or_(Entry.updated_at > updated_at, Entry.id > entry_id))
+        return db.session.execute(stmt.order_by(Entry.updated_at, Entry.id).limit(limit)).all()
+    
+    def _text(self, row):
+        return f'{row.title}\n{row.content}'
+    
+    def _with_titles(self, user_id, results):
+        """Añade los títulos actuales a los resultados (y descarta entradas ya borradas)."""
+        if not results:
+            return []
+        titles = dict(db.session.execute(
+            select(Entry.id, Entry.title).where(Entry.id.in_([entry_id for entry_id, _ in results]),
+                                                Entry.user_id == user_id, Entry.is_deleted.is_(False))
+        ).all())
+        return [{'id': entry_id, 'title': titles[entry_id], 'score': round(score, 4)}
+                for entry_id, score in results if entry_id in titles]
+    
+    def _index(self, user_id):
+        """Objeto del índice del usuario (LRU de índices abiertos)."""
+        with self._lock:
+            index = self._indexes.get(user_id)
+            if index is None:
+                index = self._indexes[user_id] = SemanticIndex(os.path.join(self.directory, str(user_id)))
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+            return index
+    
+    @contextmanager
+    def _locked(self, user_id):
+        """Bloquea el índice de un usuario frente a otros hilos y, si se puede, otros procesos."""
+        with self._user_locks[user_id % LOCK_STRIPES]:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f'{user_id}.lock'), 'a') as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+@task('search.rebuild')
+def _rebuild_index(user_id):
+    """Tarea de reconstrucción del índice semántico de un usuario."""
+    current_app.extensions['search'].rebuild(user_id)
+
+def configure_search(app):
+    """
+    Configura la búsqueda semántica y el comando `flask search rebuild`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('SEMANTIC_INDEX_DIR', None)
+    app.config.setdefault('SEMANTIC_CACHE_USERS', 50)
+    
+    app.extensions['search'] = SemanticSearchService(
+        app.config['SEMANTIC_INDEX_DIR'] or os.path.join(app.instance_path, 'semantic_index'),
+        max_users=app.config['SEMANTIC_CACHE_USERS'],
+        safety_window=app.config.get('SYNC_SAFETY_WINDOW', 5)
+    )
+    
+    @app.cli.group()
+    def search():
+        """Búsqueda semántica de entradas."""
+    
+    @search.command('rebuild')
+    @click.option('--user-id', type=int, default=None, help='Solo el índice de este usuario.')
+    def rebuild_command(user_id):
+        """Reconstruye los índices de búsqueda semántica."""
+        service = app.extensions['search']
+        user_ids = [user_id] if user_id else db.session.scalars(select(User.id).order_by(User.id)).all()
+        for current in user_ids:
+            service.rebuild(current)
+        click.echo(f'{len(user_ids)} índices reconstruidos')
+    
+    return app
@@ -0,0 +1,353 @@
+"""
+Estadísticas de actividad a partir de resúmenes diarios.
+
+Calcular las estadísticas (entradas por día, rachas, palabras por semana,
+etiquetas en tendencia) recorriendo las entradas de una cuenta cuesta más cuanto
+más escribe el usuario. En su lugar, cada transacción que crea, edita, publica o
+borra entradas suma su efecto a la fila `(user_id, día)` de `daily_activity` (y a
+`daily_tag_activity`), en la misma transacción. El efecto es la diferencia entre
+el estado actual de cada entrada y el ya contabilizado, guardado en
+`entry_activity`, así que el resultado es el mismo venga el cambio del ORM o de
+una sentencia masiva. Las estadísticas solo leen los resúmenes.
+
+Los días son días UTC. `flask stats backfill` reconstruye los resúmenes a partir
+de las entradas existentes.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import click
+from flask import current_app, has_app_context
+from sqlalchemy import delete, event, insert, or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import DailyActivity, DailyTagActivity, Entry, EntryActivity, EntryTag, Tag, User
+from app.models.entry import EntryStatus
+from app.services.job_service import task
+from app.utils.events import SESSION_KEY
+
+# Contadores de `daily_activity`
+ACTIVITY_COUNTERS = ('entries_created', 'entries_published', 'entries_deleted', 'words_written')
+
+# Etiquetas incluidas en las tendencias
+TOP_TAGS = 10
+
+# Entradas leídas por bloque al reconstruir los resúmenes
+BACKFILL_BATCH_SIZE = 2000
+
+def count_words(text):
+    """Número de palabras (separadas por espacios) de un texto."""
+    return len((text or '').split())
+
+def _upsert_increments(session, model, keys, counters, rows):
+    """
+    Suma contadores a filas existentes o las crea (INSERT ... ON CONFLICT DO UPDATE).
+    
+    Args:
+        session: Sesión en cuya transacción se escribe.
+        model: Modelo de la tabla de resúmenes.
+        keys (tuple): Columnas de la clave primaria.
+        counters (tuple): Columnas que se suman.
+        rows (list): Diccionarios con las claves y los incrementos.
+    """
+    if not rows:
+        return
+    dialect = postgresql if session.get_bind().dialect.name == 'postgresql' else sqlite
+    stmt = dialect.insert(model.__table__)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=list(keys),
+        set_={name: model.__table__.c[name] + stmt.excluded[name] for name in counters}
+    )
+    session.execute(stmt, rows)
+
+class ActivityRollup:
+    """
+    Incrementos de los resúmenes diarios acumulados antes de escribirlos.
+    """
+    
+    def __init__(self):
+        self.days = defaultdict(lambda: dict.fromkeys(ACTIVITY_COUNTERS, 0))
+        self.tags = defaultdict(int)
+    
+    def add_entry(self, row, state, today):
+        """
+        Acumula el efecto de una entrada respecto a su estado ya contabilizado.
+        
+        Args:
+            row: Fila con `user_id`, `content`, `status`, `is_deleted`, `created_at`,
+                `updated_at` y `deleted_at` de la entrada.
+            state (dict): Estado contabilizado (`words`, `published`, `deleted`), o None
+                si la entrada no se ha contabilizado nunca.
+            today (date): Día al que se atribuyen los cambios (None: reconstrucción,
+                se usan las fechas de la propia entrada).
+        
+        Returns:
+            dict: Nuevo estado contabilizado de la entrada.
+        """
+        words = count_words(row.content)
+        published = row.status == EntryStatus.PUBLICADO.value
+        deleted = bool(row.is_deleted)
+        
+        if state is None:
+            created_day = row.created_at.date()
+            self.days[(row.user_id, created_day)]['entries_created'] += 1
+            self.days[(row.user_id, created_day)]['words_written'] += words
+            state = {'words': words, 'published': False, 'deleted': False}
+        elif words > state['words']:
+            self.days[(row.user_id, today)]['words_written'] += words - state['words']
+        
+        if published and not state['published']:
+            self.days[(row.user_id, today or row.updated_at.date())]['entries_published'] += 1
+        if deleted and not state['deleted']:
+            self.days[(row.user_id, (row.deleted_at or row.updated_at).date())]['entries_deleted'] += 1
+        # La publicación y el borrado se cuentan una sola vez por entrada
+        return {'words': words, 'published': published or state['published'],
+                'deleted': deleted or state['deleted']}
+    
+    def add_tag_use(self, user_id, tag_id, created_at):
+        """Acumula la asignación de una etiqueta a una entrada."""
+        self.tags[(user_id, created_at.date(), tag_id)] += 1
+    
+    def write(self, session):
+        """Suma los incrementos acumulados a las tablas de resúmenes."""
+        _upsert_increments(session, DailyActivity, ('user_id', 'day'), ACTIVITY_COUNTERS, [
+            dict(counters, user_id=user_id, day=day) for (user_id, day), counters in self.days.items()
+            if any(counters.values())
+        ])
+        _upsert_increments(session, DailyTagActivity, ('user_id', 'day', 'tag_id'), ('uses',), [
+            {'user_id': user_id, 'day': day, 'tag_id': tag_id, 'uses': uses}
+            for (user_id, day, tag_id), uses in self.tags.items()
+        ])
+
+class StatsService:
+    """
+    Servicio de resúmenes diarios de actividad y estadísticas por usuario.
+    """
+    
+    def record_entries(self, session, entry_ids):
+        """
+        Suma a los resúmenes el efecto de unas entradas creadas o modificadas.
+        
+        Args:
+            session: Sesión en cuya transacción se escribe.
+            entry_ids (iterable): Entradas creadas, modificadas o borradas.
+        """
+        entry_ids = list(entry_ids)
+        if not entry_ids:
+            return
+        
+        rows = session.execute(
+            select(Entry.id, Entry.user_id, Entry.content, Entry.status, Entry.is_deleted, Entry.created_at,
+                   Entry.updated_at, Entry.deleted_at, EntryActivity.words, EntryActivity.published,
+                   EntryActivity.deleted, EntryActivity.tags_at)
+            .outerjoin(EntryActivity, EntryActivity.entry_id == Entry.id)
+            .where(Entry.id.in_(entry_ids))
+        ).all()
+        if not rows:
+            return
+        
+        rollup = ActivityRollup()
+        today = datetime.utcnow().date()
+        states = {}
+        for row in rows:
+            state = None if row.words is None else \
+                {'words': row.words, 'published': row.published, 'deleted': row.deleted}
+            states[row.id] = dict(rollup.add_entry(row, state, today), entry_id=row.id, user_id=row.user_id,
+                                  tags_at=row.tags_at)
+        
+        # Asignaciones de etiquetas posteriores a las ya contabilizadas de cada entrada
+        users = {row.id: row.user_id for row in rows if not row.is_deleted}
+        counted = {row.id: row.tags_at for row in rows}
+        if users:
+            links = session.execute(
+                select(EntryTag.entry_id, EntryTag.tag_id, EntryTag.created_at)
+                .where(EntryTag.entry_id.in_(users))
+            ).all()
+            for entry_id, tag_id, created_at in links:
+                if counted[entry_id] is None or created_at > counted[entry_id]:
+                    rollup.add_tag_use(users[entry_id], tag_id, created_at)
+                    states[entry_id]['tags_at'] = max(created_at, states[entry_id]['tags_at'] or created_at)
+        
+        rollup.write(session)
+        session.execute(delete(EntryActivity).where(EntryActivity.entry_id.in_(list(states))))
+        session.execute(insert(EntryActivity), list(states.values()))
+    
+    def rebuild(self, user_id, batch_size=BACKFILL_BATCH_SIZE):
+        """
+        Reconstruye los resúmenes de un usuario a partir de sus entradas.
+        
+        Como no se guarda el historial de cada entrada, las palabras se atribuyen al
+        día de creación, la publicación al de la última modificación y el borrado al
+        de `deleted_at`. Se hace en una transacción por usuario.
+        
+        Args:
+            user_id (int): ID del usuario.
+            batch_size (int): Entradas leídas por bloque (paginación por clave).
+        
+        Returns:
+            int: Entradas procesadas.
+        """
+        for model in (DailyActivity, DailyTagActivity, EntryActivity):
+            db.session.execute(delete(model).where(model.user_id == user_id))
+        
+        rollup = ActivityRollup()
+        processed, last_id = 0, 0
+        while True:
+            rows = db.session.execute(
+                select(Entry.id, Entry.user_id, Entry.content, Entry.status, Entry.is_deleted, Entry.created_at,
+                       Entry.updated_at, Entry.deleted_at)
+                .where(Entry.user_id == user_id, Entry.id > last_id)
+                .order_by(Entry.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                break
+            
+            states = {row.id: dict(rollup.add_entry(row, None, None), entry_id=row.id, user_id=user_id,
+                                   tags_at=None) for row in rows}
+            links = db.session.execute(
+                select(EntryTag.entry_id, EntryTag.tag_id, EntryTag.created_at)
+                .where(EntryTag.entry_id.in_([row.id for row in rows if not row.is_deleted]))
+            ).all()
+            for entry_id, tag_id, created_at in links:
+                rollup.add_tag_use(user_id, tag_id, created_at)
+                states[entry_id]['tags_at'] = max(created_at, states[entry_id]['tags_at'] or created_at)
+            db.session.execute(insert(EntryActivity), list(states.values()))
+            
+            processed += len(rows)
+            last_id = rows[-1].id
+        
+        rollup.write(db.session)
+        db.session.commit()
+        return processed
+    
+    def user_stats(self, user_id, days=90, today=None):
+        """
+        Estadísticas de actividad de un usuario, leídas solo de los resúmenes.
+        
+        Args:
+            user_id (int): ID del usuario.
+            days (int): Días (hasta hoy incluido) de la serie diaria y las tendencias.
+            today (date): Día de referencia (hoy en UTC por defecto).
+        
+        Returns:
+            dict: `days` (serie diaria de los días con actividad), `weeks` (palabras y
+                entradas por semana ISO), `streak` (racha actual y más larga de días
+                seguidos escribiendo) y `tags` (etiquetas más usadas en el periodo,
+                con sus usos por semana).
+        """
+        today = today or datetime.utcnow().date()
+        since = today - timedelta(days=days - 1)
+        
+        rows = db.session.execute(
+            select(DailyActivity.day, *[getattr(DailyActivity, name) for name in ACTIVITY_COUNTERS])
+            .where(DailyActivity.user_id == user_id, DailyActivity.day >= since, DailyActivity.day <= today)
+            .order_by(DailyActivity.day)
+        ).all()
+        series = [{'day': row.day.isoformat(), **{name: getattr(row, name) for name in ACTIVITY_COUNTERS}}
+                  for row in rows]
+        
+        weeks = defaultdict(lambda: {'entries_created': 0, 'words_written': 0})
+        for row in rows:
+            week = weeks[self._week(row.day)]
+            week['entries_created'] += row.entries_created
+            week['words_written'] += row.words_written
+        
+        return {
+            'days': series,
+            'weeks': [dict(counts, week=week) for week, counts in sorted(weeks.items())],
+            'streak': self._streaks(user_id, today),
+            'tags': self._tag_trends(user_id, since, today),
+        }
+    
+    def _streaks(self, user_id, today):
+        """Racha actual (hasta hoy o ayer) y más larga de días seguidos con entradas o palabras nuevas."""
+        active_days = db.session.scalars(
+            select(DailyActivity.day)
+            .where(DailyActivity.user_id == user_id, DailyActivity.day <= today,
+                   or_(DailyActivity.entries_created > 0, DailyActivity.words_written > 0))
+            .order_by(DailyActivity.day)
+        ).all()
+        
+        longest = run = 0
+        previous = None
+        for day in active_days:
+            run = run + 1 if previous is not None and day - previous == timedelta(days=1) else 1
+            longest = max(longest, run)
+            previous = day
+        current = run if previous is not None and today - previous <= timedelta(days=1) else 0
+        return {'current': current, 'longest': longest}
+    
+    def _tag_trends(self, user_id, since, today):
+        """Etiquetas más asignadas en el periodo, con sus usos por semana ISO."""
+        rows = db.session.execute(
+            select(DailyTagActivity.tag_id, DailyTagActivity.day, DailyTagActivity.uses)
+            .where(DailyTagActivity.user_id == user_id, DailyTagActivity.day >= since,
+                   DailyTagActivity.day <= today)
+        ).all()
+        
+        totals = defaultdict(int)
+        weekly = defaultdict(lambda: defaultdict(int))
+        for tag_id, day, uses in rows:
+            totals[tag_id] += uses
+            weekly[tag_id][self._week(day)] += uses
+        top = sorted(totals, key=lambda tag_id: (-totals[tag_id], tag_id))[:TOP_TAGS]
+        if not top:
+            return []
+        
+        names = dict(db.session.execute(select(Tag.id, Tag.name).where(Tag.id.in_(top))).all())
+        return [{'id': tag_id, 'name': names.get(tag_id), 'uses': totals[tag_id],
+                 'weeks': dict(sorted(weekly[tag_id].items()))} for tag_id in top]
+    
+    def _week(self, day):
+        """Semana ISO de un día ('2024-W07')."""
+        year, week, _ = day.isocalendar()
+        return f'{year}-W{week:02d}'
+
+@event.listens_for(Session, 'before_commit')
+def _roll_up_changed_entries(session):
+    """Suma a los resúmenes diarios el efecto de las entradas modificadas en la transacción."""
+    if not has_app_context() or not current_app.config.get('ACTIVITY_ROLLUPS_ENABLED', True):
+        return
+    
+    # Vuelca los cambios pendientes para que queden registrados (ver `app.utils.events`)
+    session.flush()
+    pending = session.info.get(SESSION_KEY)
+    if not pending:
+        return
+    
+    entry_ids = {entry_id for changes in pending.values() for entry_id in changes.get('entries', ())}
+    StatsService().record_entries(session, entry_ids)
+
+@task('stats.rebuild')
+def _rebuild_rollups(user_id):
+    """Tarea de reconstrucción de los resúmenes de actividad de un usuario."""
+    StatsService().rebuild(user_id)
+
+def configure_stats(app):
+    """
+    Configura los resúmenes de actividad y el comando `flask stats backfill`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('ACTIVITY_ROLLUPS_ENABLED', True)
+    
+    @app.cli.group()
+    def stats():
+        """Resúmenes diarios de actividad."""
+    
+    @stats.command('backfill')
+    @click.option('--user-id', type=int, default=None, help='Solo los resúmenes de este usuario.')
+    @click.option('--batch-size', default=BACKFILL_BATCH_SIZE, show_default=True, help='Entradas por bloque.')
+    def backfill_command(user_id, batch_size):
+        """Reconstruye los resúmenes a partir de las entradas existentes."""
+        service = StatsService()
+        user_ids = [user_id] if user_id else db.session.scalars(select(User.id).order_by(User.id)).all()
+        processed = sum(service.rebuild(current, batch_size=batch_size) for current in user_ids)
+        click.echo(f'{processed} entradas procesadas de {len(user_ids)} usuarios')
+    
+    return app
@@ -0,0 +1,159 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+from flask import current_app
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import and_, or_, select
+
+from app import db
+from app.models import Collection, Entry, Tag, EntryTag
+
+# Columnas que se envían de cada tipo de fila modificada
+SYNC_COLUMNS = {
+    'entries': (Entry, ('id', 'title', 'content', 'status', 'collection_id', 'created_at', 'updated_at',
+                        'version', 'is_deleted', 'deleted_at')),
+    'collections': (Collection, ('id', 'name', 'description', 'image_path', 'created_at', 'updated_at',
+                                 'is_deleted', 'deleted_at')),
+    'tags': (Tag, ('id', 'name', 'created_at', 'updated_at')),
+}
+
+# Campos que se envían de una fila con borrado lógico (el resto no le interesa al cliente)
+DELETED_FIELDS = ('id', 'updated_at', 'is_deleted', 'deleted_at')
+
+class SyncService:
+    """
+    Servicio de sincronización incremental basado en marcas de agua de `updated_at`.
+    
+    El token de sincronización guarda, para cada tipo de fila, la posición
+    (updated_at, id) de la última fila enviada. Cada llamada devuelve solo las filas
+    modificadas (o borradas lógicamente) después de esa posición, recorriendo el
+    índice (user_id, updated_at, id) de cada tabla.
+    """
+    
+    def changes_since(self, user_id, token=None, limit=500):
+        """
+        Obtiene los cambios de un usuario posteriores a un token de sincronización.
+        
+        Solo se devuelven filas cuyo `updated_at` es anterior al margen de seguridad
+        (`SYNC_SAFETY_WINDOW` segundos): una transacción que aún no ha confirmado puede
+        tener un `updated_at` anterior al de filas ya visibles, y el cursor no debe
+        adelantarla. Esas filas llegan en la siguiente sincronización.
+        
+        Args:
+            user_id (int): ID del usuario.
+            token (str): Token devuelto por la sincronización anterior; None para la inicial.
+            limit (int): Máximo de filas por tipo en esta página.
+        
+        Returns:
+            dict: Filas modificadas por tipo, `next_token` y `has_more` (hay más
+                cambios pendientes: conviene volver a llamar con `next_token`).
+        
+        Raises:
+            ValueError: Si el token no es válido o pertenece a otro usuario.
+        """
+        cursors = self._load_token(user_id, token)
+        statements = self._changed_rows_statements(user_id, cursors, limit)
+        rows = {kind: db.session.execute(stmt).all() for kind, stmt in statements.items()}
+        changes, has_more = self._collect_changes(rows, cursors, limit)
+        
+        entry_ids = self._live_entry_ids(changes)
+        links = db.session.execute(self._tag_links_statement(entry_ids)).all() if entry_ids else []
+        return self._finish_page(user_id, cursors, changes, links, has_more)
+    
+    async def changes_since_async(self, connection, user_id, token=None, limit=500):
+        """
+        Igual que `changes_since`, pero con una conexión asíncrona (`AsyncConnection`).
+        
+        Lo usa el modo ASGI (`app.utils.asgi`) para que la espera a la base de datos no
+        ocupe un hilo. Requiere un contexto de aplicación (configuración y clave secreta).
+        """
+        cursors = self._load_token(user_id, token)
+        statements = self._changed_rows_statements(user_id, cursors, limit)
+        rows = {kind: (await connection.execute(stmt)).all() for kind, stmt in statements.items()}
+        changes, has_more = self._collect_changes(rows, cursors, limit)
+        
+        entry_ids = self._live_entry_ids(changes)
+        links = (await connection.execute(self._tag_links_statement(entry_ids))).all() if entry_ids else []
+        return self._finish_page(user_id, cursors, changes, links, has_more)
+    
+    def has_changes(self, changes):
+        """Indica si una página de `changes_since` contiene alguna fila."""
+        return changes['has_more'] or any(changes[kind] for kind in SYNC_COLUMNS)
+    
+    def _changed_rows_statements(self, user_id, cursors, limit):
+        """Consulta de cada tipo de fila: las posteriores a su cursor, en orden (updated_at, id)."""
+        horizon = datetime.utcnow() - timedelta(seconds=current_app.config['SYNC_SAFETY_WINDOW'])
+        statements = {}
+        for kind, (model, columns) in SYNC_COLUMNS.items():
+            stmt = select(*[getattr(model, name) for name in columns]) \
+                .where(model.user_id == user_id, model.updated_at <= horizon)
+            cursor = cursors.get(kind)
+            if cursor:
+                updated_at, row_id = datetime.fromisoformat(cursor[0]), cursor[1]
+                stmt = stmt.where(or_(model.updated_at > updated_at,
+                                      and_(model.updated_at == updated_at, model.id > row_id)))
+            statements[kind] = stmt.order_by(model.updated_at, model.id).limit(limit + 1)
+        return statements
+    
+    def _collect_changes(self, rows, cursors, limit):
+        """Convierte las filas leídas en cambios y avanza los cursores."""
+        changes = {}
+        has_more = False
+        for kind, kind_rows in rows.items():
+            has_more = has_more or len(kind_rows) > limit
+            kind_rows = [dict(row._mapping) for row in kind_rows[:limit]]
+            if kind_rows:
+                cursors[kind] = (kind_rows[-1]['updated_at'].isoformat(), kind_rows[-1]['id'])
+            changes[kind] = [self._compact(row) for row in kind_rows]
+        return changes, has_more
+    
+    def _finish_page(self, user_id, cursors, changes, links, has_more):
+        """Añade las etiquetas de las entradas, el nuevo token y `has_more`."""
+        self._embed_tag_ids(changes['entries'], links)
+        changes['next_token'] = self._dump_token(user_id, cursors)
+        changes['has_more'] = has_more
+        return changes
+    
+    def _compact(self, row):
+        """Reduce una fila borrada a los campos que el cliente necesita para eliminarla."""
+        if row.get('is_deleted'):
+            return {name: row[name] for name in DELETED_FIELDS}
+        return row
+    
+    def _live_entry_ids(self, changes):
+        """IDs de las entradas no borradas de una página."""
+        return [entry['id'] for entry in changes['entries'] if not entry['is_deleted']]
+    
+    def _tag_links_statement(self, entry_ids):
+        """Etiquetas de unas entradas (una consulta para toda la página)."""
+        return select(EntryTag.entry_id, EntryTag.tag_id).where(EntryTag.entry_id.in_(entry_ids)) \
+            .order_by(EntryTag.tag_id)
+    
+    def _embed_tag_ids(self, entries, links):
+        """Añade a cada entrada no borrada el conjunto completo de sus etiquetas."""
+        tag_ids = defaultdict(list)
+        for entry_id, tag_id in links:
+            tag_ids[entry_id].append(tag_id)
+        for entry in entries:
+            if not entry['is_deleted']:
+                entry['tag_ids'] = tag_ids.get(entry['id'], [])
+    
+    def _serializer(self):
+        """Serializador firmado de los tokens de sincronización."""
+        return URLSafeSerializer(current_app.config['SECRET_KEY'], salt='sync-token')
+    
+    def _dump_token(self, user_id, cursors):
+        """Firma las posiciones alcanzadas junto con el ID del usuario."""
+        return self._serializer().dumps({'u': user_id, 'c': cursors})
+    
+    def _load_token(self, user_id, token):
+        """Verifica un token de sincronización y devuelve sus posiciones."""
+        if not token:
+            return {}
+        try:
+            data = self._serializer().loads(token)
+        except BadSignature:
+            raise ValueError('Token de sincronización no válido.')
+        if data.get('u') != user_id:
+            raise ValueError('Token de sincronización no válido.')
+        return {kind: tuple(cursor) for kind, cursor in data.get('c', {}).items() if kind in SYNC_COLUMNS}
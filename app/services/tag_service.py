@@ -0,0 +1,36 @@
+from sqlalchemy import select
+
+from app import db
+from app.models import Tag
+
+# Campos de una etiqueta que expone la API y la columna de la que se cargan
+TAG_COLUMNS = {
+    'id': Tag.id,
+    'name': Tag.name,
+    'created_at': Tag.created_at,
+    'updated_at': Tag.updated_at,
+}
+
+TAG_FIELDS = tuple(TAG_COLUMNS)
+
+class TagService:
+    """
+    Servicio para consultar las etiquetas de un usuario.
+    """
+    
+    def list_tags(self, user_id, fields=TAG_FIELDS):
+        """
+        Obtiene las etiquetas de un usuario ordenadas por nombre.
+        
+        Args:
+            user_id (int): ID del usuario propietario.
+            fields (tuple): Campos a devolver (ver `TAG_FIELDS`).
+            
+        Returns:
+            list: Etiquetas como diccionarios con los campos solicitados.
+        """
+        columns = [TAG_COLUMNS[name].label(name) for name in fields]
+        rows = db.session.execute(
+            select(*columns).where(Tag.user_id == user_id).order_by(Tag.name)
+        )
+        return [dict(row._mapping) for row in rows]
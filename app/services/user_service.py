@@ -1,9 +1,22 @@
-from datetime import datetime
 from itsdangerous import URLSafeTimedSerializer
 from flask import current_app
+from sqlalchemy import or_, select
+from sqlalchemy.exc import IntegrityError
 from app import db
 from app.models.user import User
 
+class UserExistsError(Exception):
+    """
+    El nombre de usuario o el correo ya los usa otra cuenta.
+    
+    Attributes:
+        fields (set): Campos ocupados ('username' y/o 'email').
+    """
+    
+    def __init__(self, fields):
+        super().__init__(f"Ya existe una cuenta con: {', '.join(sorted(fields))}")
+        self.fields = set(fields)
+
 class UserService:
     """
     Servicio para gestionar operaciones relacionadas con usuarios.
@@ -22,6 +35,11 @@ class UserService:
             
         Returns:
             User: Instancia del usuario creado.
+        
+        Raises:
+            UserExistsError: Si el nombre de usuario o el correo ya existen. Las
+                restricciones únicas de la tabla resuelven también los registros
+                simultáneos con los mismos datos.
         """
         user = User(
             username=username,
@@ -32,8 +50,17 @@ class UserService:
         user.password = password  # Se hashea mediante el setter del modelo
         
         db.session.add(user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            taken = self.get_taken_fields(username, email)
+            if not taken:
+                raise
+            current_app.extensions['availability'].add(username, email)
+            raise UserExistsError(taken)
         
+        current_app.extensions['availability'].add(user.username, user.email)
         return user
     
     def get_user_by_id(self, user_id):
@@ -72,6 +99,39 @@ class UserService:
         """
         return User.query.filter_by(username=username, is_deleted=False).first()
     
+    def get_taken_fields(self, username=None, email=None):
+        """
+        Comprueba con una única consulta si un nombre de usuario y un correo están ocupados.
+        
+        Incluye las cuentas borradas lógicamente: sus valores siguen ocupando las
+        restricciones únicas.
+        
+        Args:
+            username (str): Nombre de usuario.
+            email (str): Correo electrónico (no distingue mayúsculas).
+        
+        Returns:
+            set: Campos ocupados ('username' y/o 'email').
+        """
+        email = email.lower() if email else None
+        conditions = []
+        if username:
+            conditions.append(User.username == username)
+        if email:
+            conditions.append(User.email == email)
+        if not conditions:
+            return set()
+        
+        taken = set()
+        for found_username, found_email in db.session.execute(
+            select(User.username, User.email).where(or_(*conditions)).limit(2)
+        ):
+            if username and found_username == username:
+                taken.add('username')
+            if email and found_email == email:
+                taken.add('email')
+        return taken
+    
     def update_password(self, user, new_password):
         """
         Actualiza la contraseña de un usuario.
@@ -103,16 +163,19 @@ class UserService:
     
     def update_last_login(self, user):
         """
-        Actualiza la fecha del último inicio de sesión.
+        Registra un inicio de sesión (fecha del último y número de logins).
+        
+        La escritura se agrupa con la de otros logins en el registro del worker
+        (`app.extensions['login_tracker']`), así que puede llegar a la base de
+        datos unos segundos después.
         
         Args:
             user (User): Usuario que ha iniciado sesión.
             
         Returns:
-            User: Usuario actualizado.
+            User: El mismo usuario.
         """
-        user.last_login = datetime.utcnow()
-        db.session.commit()
+        current_app.extensions['login_tracker'].record(user.id)
         return user
     
     def generate_token(self, data, salt='default', expiration=86400):
@@ -0,0 +1,227 @@
+"""
+Modo de servicio ASGI (`asgi.py`).
+
+Con WSGI cada petición ocupa un hilo hasta que termina, aunque pase casi todo el
+tiempo esperando: un canal de eventos abierto durante horas o una sincronización
+con long polling bloquean un hilo del worker cada una. En modo ASGI:
+
+- Las rutas registradas con `AsgiApp.route` se atienden con corrutinas en el
+  bucle de eventos: mientras esperan no ocupan ningún hilo, y leen de la base de
+  datos con un driver asíncrono (asyncpg o aiosqlite).
+- El resto de la aplicación Flask se sirve sin cambios a través del adaptador
+  WSGI de a2wsgi, que ejecuta cada petición en un pool de `ASGI_WSGI_THREADS` hilos.
+
+La autenticación de las rutas asíncronas reutiliza la de Flask (sesión y
+Flask-Security) en un hilo: es una operación corta antes de la espera.
+"""
+
+import asyncio
+import io
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+from flask_security import current_user
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.utils.serialization import dumps
+
+# Driver asíncrono de cada base de datos
+ASYNC_DRIVERS = {'postgresql': 'postgresql+asyncpg', 'sqlite': 'sqlite+aiosqlite'}
+
+def async_database_url(url):
+    """
+    URL de la misma base de datos con un driver asíncrono.
+    
+    Args:
+        url (str): URL de SQLAlchemy (p. ej. `SQLALCHEMY_DATABASE_URI`).
+    
+    Returns:
+        URL: La misma URL con el driver de `ASYNC_DRIVERS`.
+    
+    Raises:
+        ValueError: Si no hay driver asíncrono para esa base de datos.
+    """
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No hay driver asíncrono para {backend}.')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+class AsyncRequest:
+    """
+    Petición HTTP atendida por una ruta asíncrona, con las utilidades para responderla.
+    """
+    
+    def __init__(self, server, scope, receive, send):
+        self.server = server
+        self.scope = scope
+        self.receive = receive
+        self.send = send
+        self.args = {name: values[-1] for name, values in
+                     parse_qs(scope.get('query_string', b'').decode('latin-1')).items()}
+    
+    @property
+    def app(self):
+        """Aplicación Flask."""
+        return self.server.app
+    
+    def int_arg(self, name):
+        """Lee un parámetro entero opcional (mismo mensaje de error que la API WSGI)."""
+        value = self.args.get(name)
+        if value is None or value == '':
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f'El parámetro {name} debe ser un número entero.')
+    
+    def environ(self):
+        """Entorno WSGI equivalente (sin cuerpo), para usar la sesión y la autenticación de Flask."""
+        scope = self.scope
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': scope['path'],
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': io.StringIO(),
+        }
+        for name, value in scope.get('headers', []):
+            key = name.decode('latin-1').upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = f'HTTP_{key}'
+            value = value.decode('latin-1')
+            environ[key] = f'{environ[key]},{value}' if key in environ else value
+        return environ
+    
+    async def user_id(self):
+        """ID del usuario con sesión iniciada, o None."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.server.current_user_id, self.environ())
+    
+    async def start(self, status, content_type, headers=None):
+        """Envía el código de estado y las cabeceras."""
+        raw_headers = [(b'content-type', content_type.encode('latin-1'))]
+        raw_headers += [(name.lower().encode('latin-1'), str(value).encode('latin-1'))
+                        for name, value in (headers or {}).items()]
+        await self.send({'type': 'http.response.start', 'status': status, 'headers': raw_headers})
+    
+    async def write(self, body, more_body=True):
+        """Envía un trozo del cuerpo."""
+        await self.send({'type': 'http.response.body', 'body': body, 'more_body': more_body})
+    
+    async def json(self, data, status=200, headers=None):
+        """Responde con un cuerpo JSON."""
+        body = dumps(data)
+        await self.start(status, 'application/json', dict(headers or {}, **{'Content-Length': len(body)}))
+        await self.write(body, more_body=False)
+    
+    async def error(self, message, status=400, headers=None):
+        """Respuesta de error con el formato común de la API."""
+        await self.json({'error': message}, status=status, headers=headers)
+    
+    async def disconnected(self):
+        """Termina cuando el cliente cierra la conexión."""
+        while True:
+            message = await self.receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+class AsgiApp:
+    """
+    Aplicación ASGI: rutas asíncronas propias y, para todo lo demás, la aplicación Flask.
+    """
+    
+    def __init__(self, app, database_url, pool_size=10, wsgi_threads=10):
+        """
+        Args:
+            app: Aplicación Flask.
+            database_url: URL de la base de datos con driver asíncrono.
+            pool_size (int): Conexiones asíncronas del pool.
+            wsgi_threads (int): Hilos que atienden las rutas de Flask.
+        """
+        self.app = app
+        self.wsgi = WSGIMiddleware(app, workers=wsgi_threads)
+        self.routes = {}
+        self.database_url = database_url
+        self.pool_size = pool_size
+        self._engine = None
+    
+    def route(self, path, methods=('GET',)):
+        """
+        Registra una corrutina que atiende una ruta; recibe un `AsyncRequest`.
+        
+        La ruta tiene prioridad sobre la vista Flask de la misma ruta, que sigue
+        atendiendo las peticiones cuando se sirve la aplicación con WSGI.
+        """
+        def decorator(handler):
+            for method in methods:
+                self.routes[(method, path)] = handler
+            return handler
+        return decorator
+    
+    @property
+    def engine(self):
+        """Engine asíncrono de la base de datos, creado al usarse por primera vez."""
+        if self._engine is None:
+            options = {'pool_size': self.pool_size} if self.database_url.get_backend_name() != 'sqlite' else {}
+            self._engine = create_async_engine(self.database_url, pool_pre_ping=True, **options)
+        return self._engine
+    
+    def current_user_id(self, environ):
+        """Autentica una petición con la sesión de Flask (en un hilo)."""
+        with self.app.request_context(environ):
+            return current_user.id if current_user.is_authenticated else None
+    
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+        if scope['type'] == 'http':
+            handler = self.routes.get((scope['method'], scope['path']))
+            if handler is not None:
+                return await handler(AsyncRequest(self, scope, receive, send))
+        return await self.wsgi(scope, receive, send)
+    
+    async def _lifespan(self, receive, send):
+        """Arranque y parada del servidor: al parar se cierran las conexiones asíncronas."""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                if self._engine is not None:
+                    await self._engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+def create_asgi_app(app):
+    """
+    Crea la aplicación ASGI con las rutas asíncronas de la API.
+    
+    Args:
+        app: Aplicación Flask.
+    
+    Returns:
+        AsgiApp: Aplicación para un servidor ASGI (p. ej. uvicorn).
+    """
+    from app.views.async_api import register_async_routes
+    
+    app.config.setdefault('ASYNC_DATABASE_URI', None)
+    app.config.setdefault('ASYNC_DATABASE_POOL_SIZE', 10)
+    app.config.setdefault('ASYNC_EVENTS_MAX_CONNECTIONS', 10000)
+    app.config.setdefault('ASGI_WSGI_THREADS', 10)
+    
+    database_url = make_url(app.config['ASYNC_DATABASE_URI']) if app.config['ASYNC_DATABASE_URI'] \
+        else async_database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    server = AsgiApp(app, database_url, pool_size=app.config['ASYNC_DATABASE_POOL_SIZE'],
+                     wsgi_threads=app.config['ASGI_WSGI_THREADS'])
+    register_async_routes(server)
+    return server
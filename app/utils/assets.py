@@ -0,0 +1,209 @@
+"""
+Canal de recursos estáticos con huella de contenido y variantes precomprimidas.
+
+`flask assets build` copia cada fichero de `app/static` a `app/static/dist` con un
+hash de su contenido en el nombre (`css/main.css` -> `css/main.3f2a9c1d7b4e.css`),
+genera variantes `.gz` y `.br` de los ficheros comprimibles y escribe un
+`manifest.json` con la correspondencia. Como el nombre cambia cada vez que cambia
+el contenido, esos ficheros pueden cachearse indefinidamente (`immutable`).
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import shutil
+
+import click
+from flask import abort, current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+MANIFEST_NAME = 'manifest.json'
+
+# Tipos de fichero que merece la pena comprimir (las imágenes ya vienen comprimidas)
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml', '.ico'}
+
+# Un año, el máximo recomendado; `immutable` evita además las revalidaciones al recargar
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+# Codificaciones precomprimidas por orden de preferencia y extensión de su variante
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+def _fingerprint(path):
+    """Calcula el hash del contenido de un fichero."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def _write_compressed_variants(path):
+    """
+    Escribe las variantes gzip y brotli de un fichero si reducen su tamaño.
+    
+    Args:
+        path (str): Ruta del fichero con huella.
+    
+    Returns:
+        list: Codificaciones generadas.
+    """
+    with open(path, 'rb') as handle:
+        data = handle.read()
+    
+    variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['br'] = brotli.compress(data, quality=11)
+    
+    written = []
+    for encoding, extension in ENCODINGS:
+        compressed = variants.get(encoding)
+        if compressed is not None and len(compressed) < len(data):
+            with open(path + extension, 'wb') as handle:
+                handle.write(compressed)
+            written.append(encoding)
+    return written
+
+def build_assets(source_folder, output_folder):
+    """
+    Genera los recursos con huella, sus variantes comprimidas y el manifiesto.
+    
+    Args:
+        source_folder (str): Carpeta de recursos estáticos originales.
+        output_folder (str): Carpeta de salida (se vacía antes de generar).
+    
+    Returns:
+        dict: Manifiesto con la ruta lógica de cada recurso, su ruta con huella
+            y las codificaciones precomprimidas disponibles.
+    """
+    source_folder = os.path.abspath(source_folder)
+    output_folder = os.path.abspath(output_folder)
+    if os.path.isdir(output_folder):
+        shutil.rmtree(output_folder)
+    os.makedirs(output_folder)
+    
+    manifest = {}
+    for root, dirs, files in os.walk(source_folder):
+        # No volver a procesar la salida si está dentro de la carpeta de origen
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != output_folder)
+        for name in sorted(files):
+            if name.startswith('.'):
+                continue
+            
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, source_folder).replace(os.sep, '/')
+            stem, extension = os.path.splitext(logical)
+            hashed = f'{stem}.{_fingerprint(source)}{extension}'
+            
+            target = os.path.join(output_folder, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            
+            encodings = []
+            if extension.lower() in COMPRESSIBLE_EXTENSIONS:
+                encodings = _write_compressed_variants(target)
+            manifest[logical] = {'path': hashed, 'encodings': encodings}
+    
+    with open(os.path.join(output_folder, MANIFEST_NAME), 'w', encoding='utf-8') as handle:
+        json.dump(manifest, handle, indent=2, sort_keys=True)
+    
+    return manifest
+
+def load_manifest(app):
+    """
+    Carga el manifiesto generado por `flask assets build`, si existe.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    
+    Returns:
+        dict: Manifiesto cargado (vacío si no se han generado los recursos).
+    """
+    path = os.path.join(app.config['ASSETS_OUTPUT_FOLDER'], MANIFEST_NAME)
+    manifest = {}
+    if os.path.isfile(path):
+        with open(path, encoding='utf-8') as handle:
+            manifest = json.load(handle)
+    app.extensions['assets_manifest'] = manifest
+    return manifest
+
+def asset_url(filename, **values):
+    """
+    Devuelve la URL de un recurso estático, con huella si se ha generado.
+    
+    Acepta los mismos argumentos que `url_for('static', filename=...)`, de modo que
+    puede sustituirlo directamente en las plantillas. Sin manifiesto (por ejemplo,
+    en desarrollo) devuelve la URL estática normal.
+    
+    Args:
+        filename (str): Ruta del recurso dentro de `app/static`.
+        **values: Argumentos adicionales para `url_for` (p. ej. `_external`).
+    
+    Returns:
+        str: URL del recurso.
+    """
+    entry = current_app.extensions.get('assets_manifest', {}).get(filename)
+    if entry is None:
+        return url_for('static', filename=filename, **values)
+    return url_for('assets', filename=entry['path'], **values)
+
+def serve_asset(filename):
+    """
+    Sirve un recurso con huella, eligiendo la variante precomprimida según Accept-Encoding.
+    
+    Args:
+        filename (str): Ruta del recurso con huella.
+    """
+    output_folder = current_app.config['ASSETS_OUTPUT_FOLDER']
+    if filename == MANIFEST_NAME or filename.endswith(('.gz', '.br')):
+        abort(404)
+    
+    served_name, encoding = filename, None
+    for candidate, extension in ENCODINGS:
+        if request.accept_encodings[candidate] and \
+                os.path.isfile(os.path.join(output_folder, filename + extension)):
+            served_name, encoding = filename + extension, candidate
+            break
+    
+    # El tipo MIME se deduce del nombre original, no del de la variante comprimida
+    mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    
+    response = send_from_directory(output_folder, served_name, mimetype=mimetype, max_age=31536000)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+    response.vary.add('Accept-Encoding')
+    return response
+
+def configure_assets(app):
+    """
+    Configura el canal de recursos estáticos con huella.
+    
+    Registra la ruta `/assets/<filename>`, la función `asset_url` en Jinja2 y el
+    comando `flask assets build`.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('ASSETS_OUTPUT_FOLDER', os.path.join(app.static_folder, 'dist'))
+    load_manifest(app)
+    
+    app.add_url_rule('/assets/<path:filename>', 'assets', serve_asset)
+    app.jinja_env.globals['asset_url'] = asset_url
+    
+    @app.cli.group()
+    def assets():
+        """Gestión de los recursos estáticos."""
+    
+    @assets.command('build')
+    def build_command():
+        """Genera los recursos con huella y sus variantes comprimidas."""
+        manifest = build_assets(app.static_folder, app.config['ASSETS_OUTPUT_FOLDER'])
+        load_manifest(app)
+        click.echo(f"{len(manifest)} recursos generados en {app.config['ASSETS_OUTPUT_FOLDER']}")
+    
+    return app
@@ -0,0 +1,68 @@
+"""
+Filtro de Bloom: pertenencia aproximada a un conjunto en poca memoria.
+
+Un elemento se marca poniendo a 1 `k` bits de un array de `m`, elegidos con
+doble hashing (`h1 + i·h2`) a partir de un único hash BLAKE2b de 128 bits. Si
+alguno de sus bits está a 0, el elemento seguro que no se añadió; si están todos
+a 1, probablemente sí (con la probabilidad de falso positivo elegida al crearlo,
+mientras no se superen los `capacity` elementos). No se pueden quitar elementos.
+
+Con un 1 % de falsos positivos ocupa ~1,2 bytes por elemento: un millón de
+nombres de usuario y correos caben en ~2,4 MB.
+"""
+
+import hashlib
+import math
+
+class BloomFilter:
+    """
+    Filtro de Bloom sobre cadenas de texto.
+    """
+    
+    def __init__(self, capacity, error_rate=0.01):
+        """
+        Args:
+            capacity (int): Elementos previstos; por encima, los falsos positivos aumentan.
+            error_rate (float): Probabilidad de falso positivo con `capacity` elementos.
+        """
+        if not 0 < error_rate < 1:
+            raise ValueError('La probabilidad de falso positivo debe estar entre 0 y 1.')
+        capacity = max(1, int(capacity))
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # m = -n·ln(p) / ln(2)^2 bits y k = (m / n)·ln(2) funciones hash
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+    
+    def _positions(self, item):
+        """Posiciones de los bits de un elemento."""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        # h2 impar: recorre posiciones distintas aunque `num_bits` sea par
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+    
+    def add(self, item):
+        """Añade un elemento."""
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+    
+    def update(self, items):
+        """Añade varios elementos."""
+        for item in items:
+            self.add(item)
+    
+    def __contains__(self, item):
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+    
+    def __len__(self):
+        """Elementos añadidos (contando repetidos)."""
+        return self.count
+    
+    @property
+    def size_bytes(self):
+        """Memoria que ocupa el array de bits."""
+        return len(self._bits)
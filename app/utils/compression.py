@@ -0,0 +1,181 @@
+"""
+Compresión de respuestas dinámicas (HTML, JSON, CSV...).
+
+Los recursos estáticos se sirven ya precomprimidos (ver `app.utils.assets`); este
+módulo comprime al vuelo lo que generan las vistas. Las respuestas en streaming
+se comprimen trozo a trozo, sin acumular el cuerpo completo en memoria.
+"""
+
+import zlib
+
+from flask import current_app, request
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli es opcional
+    brotli = None
+
+# Tipos de contenido que se comprimen por defecto
+DEFAULT_COMPRESS_MIMETYPES = (
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/csv',
+    'text/xml',
+    'application/json',
+    'application/javascript',
+    'application/xml',
+)
+
+# wbits=31 produce el formato gzip (cabecera y CRC) en lugar de zlib
+GZIP_WBITS = 16 + zlib.MAX_WBITS
+
+def _choose_encoding():
+    """
+    Elige la codificación según la cabecera Accept-Encoding de la petición.
+    
+    Returns:
+        str: 'br', 'gzip' o None si el cliente no acepta ninguna de las dos.
+    """
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        return 'br'
+    if accepted['gzip']:
+        return 'gzip'
+    return None
+
+def _compressor(encoding, config):
+    """
+    Crea un compresor incremental con la interfaz `compress(data)` / `flush()` / `finish()`.
+    
+    Args:
+        encoding (str): 'br' o 'gzip'.
+        config: Configuración de la aplicación.
+    """
+    if encoding == 'br':
+        return _BrotliCompressor(config['COMPRESS_BR_QUALITY'])
+    return _GzipCompressor(config['COMPRESS_LEVEL'])
+
+class _GzipCompressor:
+    """Compresor gzip incremental."""
+    
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, GZIP_WBITS)
+    
+    def compress(self, data):
+        return self._compressor.compress(data)
+    
+    def flush(self):
+        # Z_SYNC_FLUSH entrega al cliente lo comprimido hasta ahora sin cerrar el flujo
+        return self._compressor.flush(zlib.Z_SYNC_FLUSH)
+    
+    def finish(self):
+        return self._compressor.flush(zlib.Z_FINISH)
+
+class _BrotliCompressor:
+    """Compresor brotli incremental."""
+    
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+    
+    def compress(self, data):
+        return self._compressor.process(data)
+    
+    def flush(self):
+        return self._compressor.flush()
+    
+    def finish(self):
+        return self._compressor.finish()
+
+def compress_body(data, encoding, config):
+    """
+    Comprime un cuerpo completo.
+    
+    Args:
+        data (bytes): Cuerpo de la respuesta.
+        encoding (str): 'br' o 'gzip'.
+        config: Configuración de la aplicación.
+    
+    Returns:
+        bytes: Cuerpo comprimido.
+    """
+    compressor = _compressor(encoding, config)
+    return compressor.compress(data) + compressor.finish()
+
+def _compress_stream(chunks, compressor):
+    """Comprime un iterable de trozos, vaciando el compresor tras cada uno."""
+    try:
+        for chunk in chunks:
+            if isinstance(chunk, str):
+                chunk = chunk.encode('utf-8')
+            if chunk:
+                yield compressor.compress(chunk) + compressor.flush()
+        yield compressor.finish()
+    finally:
+        if hasattr(chunks, 'close'):
+            chunks.close()
+
+def _should_compress(response, config):
+    """Indica si la respuesta es candidata a comprimirse, sin mirar aún su tamaño."""
+    if response.status_code < 200 or response.status_code in (204, 206, 304):
+        return False
+    if request.method == 'HEAD' or response.direct_passthrough:
+        return False
+    if 'Content-Encoding' in response.headers:
+        return False
+    if response.cache_control.no_transform:
+        return False
+    return response.mimetype in config['COMPRESS_MIMETYPES']
+
+def configure_compression(app):
+    """
+    Configura la compresión de las respuestas dinámicas.
+    
+    Comprime con brotli o gzip según Accept-Encoding las respuestas cuyo tipo
+    está en `COMPRESS_MIMETYPES`. Se omiten las que ya tienen Content-Encoding,
+    las respuestas de ficheros (`send_file`), las de menos de `COMPRESS_MIN_SIZE`
+    bytes y aquellas en las que la compresión no reduce el tamaño. Las respuestas
+    en streaming se comprimen trozo a trozo.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('COMPRESS_ENABLED', True)
+    app.config.setdefault('COMPRESS_MIMETYPES', DEFAULT_COMPRESS_MIMETYPES)
+    app.config.setdefault('COMPRESS_MIN_SIZE', 500)
+    app.config.setdefault('COMPRESS_LEVEL', 6)
+    app.config.setdefault('COMPRESS_BR_QUALITY', 4)
+    
+    @app.after_request
+    def compress_response(response):
+        config = current_app.config
+        if not config['COMPRESS_ENABLED'] or not _should_compress(response, config):
+            return response
+        
+        # La representación depende de Accept-Encoding aunque esta vez no se comprima
+        response.vary.add('Accept-Encoding')
+        
+        encoding = _choose_encoding()
+        if encoding is None:
+            return response
+        
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, _compressor(encoding, config))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < config['COMPRESS_MIN_SIZE']:
+                return response
+            compressed = compress_body(data, encoding, config)
+            if len(compressed) >= len(data):
+                return response
+            response.set_data(compressed)
+        
+        response.headers['Content-Encoding'] = encoding
+        # Un ETag fuerte identifica bytes concretos; el cuerpo comprimido es otro
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+    
+    return app
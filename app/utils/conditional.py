@@ -0,0 +1,121 @@
+"""
+Respuestas condicionales (ETag / Last-Modified) basadas en `updated_at`.
+
+Una página que depende de las entradas, colecciones y etiquetas de un usuario no
+cambia mientras no cambie ninguna de esas filas. Con una consulta de agregados
+(máximo de `updated_at` y número de filas por tabla) se obtiene una versión del
+contenido y, si coincide con la que envía el navegador, se responde `304 Not
+Modified` sin ejecutar la vista ni renderizar la plantilla.
+"""
+
+import hashlib
+from functools import wraps
+
+from flask import current_app, request, session
+from flask_login import current_user
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Collection, Entry, Tag, EntryTag
+
+def user_content_version(user_id):
+    """
+    Calcula la versión del contenido de un usuario con una única consulta de agregados.
+    
+    El número de filas detecta los borrados físicos y las etiquetas quitadas de una
+    entrada, que no dejan un `updated_at` más reciente.
+    
+    Args:
+        user_id (int): ID del usuario.
+    
+    Returns:
+        tuple: (última modificación o None, clave de versión en texto)
+    """
+    aggregates = []
+    for model in (Entry, Collection, Tag):
+        aggregates.append(select(func.max(model.updated_at)).where(model.user_id == user_id).scalar_subquery())
+        aggregates.append(select(func.count()).select_from(model).where(model.user_id == user_id).scalar_subquery())
+    for column in (func.max(EntryTag.created_at), func.count()):
+        aggregates.append(select(column).select_from(EntryTag).join(Tag, Tag.id == EntryTag.tag_id)
+                          .where(Tag.user_id == user_id).scalar_subquery())
+    
+    row = db.session.execute(select(*aggregates)).one()
+    timestamps = [value for value in row[0::2] if value is not None]
+    last_modified = max(timestamps) if timestamps else None
+    return last_modified, ':'.join(str(value) for value in row)
+
+def current_user_validators():
+    """
+    Validadores de las páginas que dependen del contenido del usuario autenticado.
+    
+    Returns:
+        tuple: (última modificación, clave de versión) o None si no hay sesión iniciada.
+    """
+    if not current_user.is_authenticated:
+        return None
+    
+    last_modified, version = user_content_version(current_user.id)
+    # Datos del propio usuario que también se muestran en las páginas
+    key = f'{current_user.id}:{current_user.username}:{current_user.theme_preference}:{version}'
+    return last_modified, key
+
+def _make_etag(key):
+    """Genera el ETag a partir de la clave de versión, la vista con sus parámetros y la versión desplegada."""
+    # Las plantillas enlazan los recursos con huella: si cambian, la página también
+    assets = ','.join(sorted(entry['path'] for entry in current_app.extensions.get('assets_manifest', {}).values()))
+    raw = f"{current_app.config.get('ETAG_VERSION', '')}:{assets}:{request.endpoint}:{request.query_string.decode('latin-1')}:{key}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+def _not_modified(etag, last_modified):
+    """Indica si las cabeceras condicionales de la petición siguen siendo válidas."""
+    if request.if_none_match:
+        # Si hay If-None-Match se ignora If-Modified-Since (RFC 9110, 13.2.2)
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+    return False
+
+def _set_validators(response, etag, last_modified):
+    """Añade ETag débil, Last-Modified y la política de caché privada a la respuesta."""
+    response.set_etag(etag, weak=True)
+    if last_modified is not None:
+        response.last_modified = last_modified
+    # El navegador puede guardar la página, pero debe revalidarla en cada visita
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    response.vary.add('Cookie')
+    return response
+
+def conditional(validators=current_user_validators):
+    """
+    Decorador que responde `304 Not Modified` si el contenido de la vista no ha cambiado.
+    
+    Los validadores se calculan antes de ejecutar la vista. Solo se aplica a
+    peticiones GET y HEAD con respuesta 200, y nunca cuando hay mensajes flash
+    pendientes, porque la página que los muestra es distinta de la cacheada.
+    
+    Args:
+        validators (callable): Función sin argumentos que devuelve
+            (última modificación, clave de versión) o None para no aplicar caché.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if request.method not in ('GET', 'HEAD') or '_flashes' in session:
+                return view(*args, **kwargs)
+            
+            result = validators()
+            if result is None:
+                return view(*args, **kwargs)
+            
+            last_modified, key = result
+            etag = _make_etag(key)
+            if _not_modified(etag, last_modified):
+                return _set_validators(current_app.response_class(status=304), etag, last_modified)
+            
+            response = current_app.make_response(view(*args, **kwargs))
+            if response.status_code == 200:
+                _set_validators(response, etag, last_modified)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,292 @@
+"""
+Generador de datos sintéticos para pruebas de carga y dimensionamiento de Eureka.
+
+Genera usuarios con colecciones, entradas, etiquetas y relaciones entrada-etiqueta
+siguiendo distribuciones configurables. Los identificadores se asignan en Python
+para poder escribir cada tabla en bloque (COPY en PostgreSQL, inserciones
+múltiples en el resto de motores) sin consultar la base de datos por fila.
+"""
+
+import csv
+import io
+import math
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import func, select, text
+
+from app import bcrypt
+from app.models import User, Collection, Entry, Tag, EntryTag
+from app.models.entry import EntryStatus
+
+# Vocabulario base para construir textos con longitudes y palabras verosímiles
+VOCABULARY = (
+    'idea proyecto nota reflexión libro lectura cita pregunta respuesta hipótesis '
+    'experimento resultado plan objetivo tarea borrador capítulo personaje escena '
+    'diálogo investigación fuente referencia concepto modelo sistema proceso diseño '
+    'usuario producto mercado cliente estrategia equipo reunión resumen conclusión '
+    'mañana tarde semana mes año ciudad viaje música película artículo podcast '
+    'aprender enseñar escribir leer pensar construir probar medir mejorar revisar '
+    'simple complejo rápido lento nuevo antiguo claro oscuro importante pendiente '
+    'el la los las un una de del en con para por sobre entre sin desde hasta que y o'
+).split()
+
+# Tamaño del texto precalculado del que se extraen los contenidos
+CORPUS_WORDS = 200000
+
+class SeedProfile:
+    """
+    Distribuciones que determinan el volumen y la forma de los datos generados.
+    
+    Las entradas por usuario y la longitud de los contenidos siguen distribuciones
+    log-normales (pocos usuarios muy activos y muchas notas cortas), que es lo que
+    se observa habitualmente en aplicaciones de notas.
+    """
+    
+    def __init__(self, entries_median=200, entries_sigma=1.0, max_entries=20000,
+                 collections_mean=5, tags_mean=20, tags_per_entry_mean=1.5,
+                 content_words_median=120, content_words_sigma=1.0,
+                 published_ratio=0.3, deleted_ratio=0.02, days=730):
+        """
+        Args:
+            entries_median (int): Mediana de entradas por usuario.
+            entries_sigma (float): Dispersión log-normal de entradas por usuario.
+            max_entries (int): Tope de entradas por usuario.
+            collections_mean (float): Media de colecciones por usuario.
+            tags_mean (float): Media de etiquetas por usuario.
+            tags_per_entry_mean (float): Media de etiquetas por entrada.
+            content_words_median (int): Mediana de palabras por contenido.
+            content_words_sigma (float): Dispersión log-normal de la longitud del contenido.
+            published_ratio (float): Proporción de entradas publicadas.
+            deleted_ratio (float): Proporción de entradas con borrado lógico.
+            days (int): Antigüedad máxima de los datos generados, en días.
+        """
+        self.entries_median = entries_median
+        self.entries_sigma = entries_sigma
+        self.max_entries = max_entries
+        self.collections_mean = collections_mean
+        self.tags_mean = tags_mean
+        self.tags_per_entry_mean = tags_per_entry_mean
+        self.content_words_median = content_words_median
+        self.content_words_sigma = content_words_sigma
+        self.published_ratio = published_ratio
+        self.deleted_ratio = deleted_ratio
+        self.days = days
+
+class _BulkInsertWriter:
+    """Escribe filas mediante inserciones múltiples (executemany)."""
+    
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def write(self, table, columns, rows):
+        if rows:
+            self.connection.execute(table.insert(), [dict(zip(columns, row)) for row in rows])
+
+class _PostgresCopyWriter:
+    """Escribe filas con COPY ... FROM STDIN sobre la conexión DBAPI de PostgreSQL."""
+    
+    def __init__(self, connection):
+        self.connection = connection
+    
+    def write(self, table, columns, rows):
+        if not rows:
+            return
+        
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        buffer.seek(0)
+        
+        sql = f'COPY {table.name} ({", ".join(columns)}) FROM STDIN WITH (FORMAT csv)'
+        cursor = self.connection.connection.dbapi_connection.cursor()
+        try:
+            if hasattr(cursor, 'copy_expert'):
+                cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3 expone COPY mediante un gestor de contexto
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+        finally:
+            cursor.close()
+
+class SyntheticDataGenerator:
+    """
+    Genera y carga datos sintéticos de forma reproducible.
+    """
+    
+    USER_COLUMNS = ('id', 'username', 'email', '_password_hash', 'is_active', 'is_verified',
+                    'fs_uniquifier', 'created_at', 'theme_preference', 'is_deleted')
+    COLLECTION_COLUMNS = ('id', 'name', 'description', 'user_id', 'created_at', 'updated_at',
+                          'is_deleted')
+    TAG_COLUMNS = ('id', 'name', 'user_id', 'created_at', 'updated_at')
+    ENTRY_COLUMNS = ('id', 'title', 'content', 'status', 'user_id', 'collection_id',
+                     'created_at', 'updated_at', 'is_deleted', 'deleted_at')
+    ENTRY_TAG_COLUMNS = ('entry_id', 'tag_id', 'created_at')
+    
+    def __init__(self, engine, seed=0, profile=None, password='Eureka1234!', until=None):
+        """
+        Args:
+            engine: Engine de SQLAlchemy sobre el que se cargan los datos.
+            seed (int): Semilla para obtener siempre los mismos datos.
+            profile (SeedProfile): Distribuciones a utilizar.
+            password (str): Contraseña común de todos los usuarios generados.
+            until (datetime): Fecha más reciente de los datos; fijarla hace que dos
+                ejecuciones con la misma semilla generen exactamente las mismas fechas.
+        """
+        self.engine = engine
+        self.seed = seed
+        self.profile = profile or SeedProfile()
+        self.rng = random.Random(seed)
+        # Un único hash bcrypt para todos los usuarios: hashear por fila domina el tiempo de carga
+        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.now = until or datetime.utcnow().replace(microsecond=0)
+        self._corpus = ' '.join(self.rng.choices(VOCABULARY, k=CORPUS_WORDS))
+        self._counts = {'users': 0, 'collections': 0, 'tags': 0, 'entries': 0, 'entry_tags': 0}
+    
+    def generate(self, num_users, batch_size=500, progress=None):
+        """
+        Genera y carga `num_users` usuarios con todos sus datos asociados.
+        
+        Args:
+            num_users (int): Número de usuarios a generar.
+            batch_size (int): Usuarios por transacción.
+            progress (callable): Función opcional que recibe el recuento acumulado tras cada lote.
+        
+        Returns:
+            dict: Número de filas insertadas por tabla.
+        """
+        with self.engine.connect() as connection:
+            next_ids = self._next_ids(connection)
+            if connection.dialect.name == 'postgresql':
+                writer = _PostgresCopyWriter(connection)
+            else:
+                writer = _BulkInsertWriter(connection)
+            
+            for start in range(0, num_users, batch_size):
+                batch = self._generate_batch(min(batch_size, num_users - start), next_ids)
+                writer.write(User.__table__, self.USER_COLUMNS, batch['users'])
+                writer.write(Collection.__table__, self.COLLECTION_COLUMNS, batch['collections'])
+                writer.write(Tag.__table__, self.TAG_COLUMNS, batch['tags'])
+                writer.write(Entry.__table__, self.ENTRY_COLUMNS, batch['entries'])
+                writer.write(EntryTag.__table__, self.ENTRY_TAG_COLUMNS, batch['entry_tags'])
+                connection.commit()
+                
+                for key, rows in batch.items():
+                    self._counts[key] += len(rows)
+                if progress:
+                    progress(dict(self._counts))
+            
+            if connection.dialect.name == 'postgresql':
+                self._sync_sequences(connection)
+                connection.commit()
+        
+        return dict(self._counts)
+    
+    def _next_ids(self, connection):
+        """Obtiene el siguiente ID libre de cada tabla con clave autoincremental."""
+        return {
+            name: (connection.execute(select(func.max(model.id))).scalar() or 0) + 1
+            for name, model in (('users', User), ('collections', Collection),
+                                ('tags', Tag), ('entries', Entry))
+        }
+    
+    def _sync_sequences(self, connection):
+        """Avanza las secuencias de PostgreSQL tras insertar IDs explícitos."""
+        for table in ('users', 'collections', 'tags', 'entries'):
+            connection.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"COALESCE((SELECT MAX(id) FROM {table}), 1))"
+            ))
+    
+    def _lognormal_int(self, median, sigma, low, high):
+        """Entero log-normal con la mediana indicada, acotado a [low, high]."""
+        value = int(self.rng.lognormvariate(math.log(max(median, 1)), sigma))
+        return max(low, min(high, value))
+    
+    def _poisson(self, mean):
+        """Muestra de Poisson (algoritmo de Knuth, suficiente para medias pequeñas)."""
+        limit = math.exp(-mean)
+        k, p = 0, self.rng.random()
+        while p > limit:
+            k += 1
+            p *= self.rng.random()
+        return k
+    
+    def _text(self, words):
+        """Extrae un fragmento del corpus con aproximadamente `words` palabras."""
+        length = words * 7
+        start = self.rng.randrange(0, max(1, len(self._corpus) - length))
+        start = self._corpus.find(' ', start) + 1
+        fragment = self._corpus[start:start + length]
+        if ' ' in fragment:
+            fragment = fragment[:fragment.rfind(' ')]
+        return fragment.capitalize() + '.'
+    
+    def _timestamp(self):
+        """Fecha aleatoria dentro de la ventana configurada."""
+        return self.now - timedelta(seconds=self.rng.randrange(self.profile.days * 86400))
+    
+    def _generate_batch(self, num_users, next_ids):
+        """Genera las filas de un lote de usuarios, asignando IDs consecutivos."""
+        profile = self.profile
+        batch = {'users': [], 'collections': [], 'tags': [], 'entries': [], 'entry_tags': []}
+        
+        for _ in range(num_users):
+            user_id = next_ids['users']
+            next_ids['users'] += 1
+            user_created = self._timestamp()
+            username = f'seed{self.seed}_{user_id}'
+            batch['users'].append((
+                user_id, username, f'{username}@example.com', self.password_hash, True, True,
+                '%032x' % self.rng.getrandbits(128), user_created, 'claro', False
+            ))
+            
+            collection_ids = []
+            for i in range(self._poisson(profile.collections_mean)):
+                collection_ids.append(next_ids['collections'])
+                created = self._timestamp()
+                batch['collections'].append((
+                    next_ids['collections'], f'Colección {i + 1}', self._text(12), user_id,
+                    created, created, False
+                ))
+                next_ids['collections'] += 1
+            
+            tag_ids = []
+            for i in range(self._poisson(profile.tags_mean)):
+                tag_ids.append(next_ids['tags'])
+                created = self._timestamp()
+                batch['tags'].append((
+                    next_ids['tags'], f'{self.rng.choice(VOCABULARY)}_{i}', user_id, created, created
+                ))
+                next_ids['tags'] += 1
+            
+            num_entries = self._lognormal_int(profile.entries_median, profile.entries_sigma,
+                                              0, profile.max_entries)
+            for _ in range(num_entries):
+                entry_id = next_ids['entries']
+                next_ids['entries'] += 1
+                created = self._timestamp()
+                updated = created + timedelta(seconds=self.rng.randrange(86400))
+                is_deleted = self.rng.random() < profile.deleted_ratio
+                words = self._lognormal_int(profile.content_words_median,
+                                            profile.content_words_sigma, 3, 5000)
+                batch['entries'].append((
+                    entry_id,
+                    self._text(self.rng.randint(2, 8))[:200],
+                    self._text(words),
+                    EntryStatus.PUBLICADO.value if self.rng.random() < profile.published_ratio
+                    else EntryStatus.BORRADOR.value,
+                    user_id,
+                    self.rng.choice(collection_ids) if collection_ids and self.rng.random() < 0.7 else None,
+                    created,
+                    updated,
+                    is_deleted,
+                    updated if is_deleted else None,
+                ))
+                
+                if tag_ids:
+                    num_tags = min(len(tag_ids), self._poisson(profile.tags_per_entry_mean))
+                    for tag_id in self.rng.sample(tag_ids, num_tags):
+                        batch['entry_tags'].append((entry_id, tag_id, created))
+        
+        return batch
@@ -0,0 +1,373 @@
+"""
+Notificaciones de cambios en entradas, colecciones y etiquetas.
+
+Los cambios se recogen en la capa de modelos (eventos de sesión de SQLAlchemy) y se
+publican al confirmar la transacción, agrupados por usuario:
+`{"entries": [ids], "collections": [ids], "tags": [ids]}`. Los suscriptores son las
+conexiones SSE abiertas en el worker y los oyentes internos (p. ej. cachés que
+deben invalidarse).
+
+Con `LocalBroker` los cambios solo llegan a los suscriptores del propio proceso.
+`PostgresBroker` los reparte con LISTEN/NOTIFY, de modo que cualquier worker
+entrega los cambios confirmados en cualquier otro.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import select as select_module
+import threading
+import time
+from collections import defaultdict
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app.models import Collection, Entry, Tag
+
+logger = logging.getLogger(__name__)
+
+# Tipo de cambio de cada modelo observado
+TRACKED_MODELS = ((Entry, 'entries'), (Collection, 'collections'), (Tag, 'tags'))
+
+# Canal de PostgreSQL (NOTIFY admite cargas de hasta 8000 bytes)
+NOTIFY_CHANNEL = 'eureka_changes'
+NOTIFY_MAX_PAYLOAD = 7900
+
+# Cambios pendientes de publicar, guardados en `session.info`
+SESSION_KEY = 'change_events'
+
+class LocalBroker:
+    """
+    Reparte los cambios entre los suscriptores del proceso actual.
+    """
+    
+    # Si los cambios se publican dentro de la transacción que los confirma
+    transactional = False
+    
+    def __init__(self, queue_size=100):
+        """
+        Args:
+            queue_size (int): Eventos que puede acumular cada suscriptor antes de
+                empezar a descartarlos (el cliente debe resincronizar).
+        """
+        self.queue_size = queue_size
+        self._subscribers = defaultdict(set)
+        self._listeners = []
+        self._lock = threading.Lock()
+    
+    def subscribe(self, user_id, subscriber=None):
+        """
+        Registra un suscriptor para los cambios de un usuario.
+        
+        Args:
+            user_id (int): ID del usuario.
+            subscriber: Objeto con `put_nowait` que recibirá los cambios (p. ej. un
+                `AsyncSubscriber`); por defecto, una cola nueva.
+        
+        Returns:
+            queue.Queue: Cola (o suscriptor indicado) en la que se recibirán los cambios.
+        """
+        if subscriber is None:
+            subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(subscriber)
+        return subscriber
+    
+    def unsubscribe(self, user_id, subscriber):
+        """Elimina un suscriptor registrado con `subscribe`."""
+        with self._lock:
+            subscribers = self._subscribers.get(user_id)
+            if subscribers is not None:
+                subscribers.discard(subscriber)
+                if not subscribers:
+                    del self._subscribers[user_id]
+    
+    def add_listener(self, callback):
+        """
+        Registra una función que recibe todos los cambios entregados en este proceso.
+        
+        Args:
+            callback (callable): Función que recibe (user_id, cambios).
+        """
+        self._listeners.append(callback)
+    
+    def publish(self, user_id, changes):
+        """
+        Publica los cambios confirmados de un usuario.
+        
+        Args:
+            user_id (int): ID del usuario.
+            changes (dict): IDs modificados por tipo.
+        """
+        self.dispatch(user_id, changes)
+    
+    def dispatch(self, user_id, changes):
+        """Entrega unos cambios a los oyentes y suscriptores de este proceso."""
+        for callback in self._listeners:
+            try:
+                callback(user_id, changes)
+            except Exception:
+                logger.exception('Error en un oyente de cambios')
+        
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(changes)
+            except queue.Full:
+                # Cliente lento: pierde el evento y resincronizará con /sync
+                pass
+
+class PostgresBroker(LocalBroker):
+    """
+    Reparte los cambios entre workers mediante LISTEN/NOTIFY de PostgreSQL.
+    
+    Cada proceso mantiene una conexión dedicada a LISTEN en un hilo propio, que se
+    abre con la primera suscripción u oyente y se reconecta si se pierde.
+    
+    NOTIFY es transaccional: se publica en la conexión de la sesión antes de
+    confirmar y PostgreSQL solo lo entrega si la transacción se confirma.
+    """
+    
+    transactional = True
+    
+    def __init__(self, engine, queue_size=100, channel=NOTIFY_CHANNEL):
+        """
+        Args:
+            engine: Engine de SQLAlchemy de la base de datos PostgreSQL.
+            queue_size (int): Eventos que puede acumular cada suscriptor.
+            channel (str): Canal de NOTIFY.
+        """
+        super().__init__(queue_size)
+        self.engine = engine
+        self.channel = channel
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # Los hilos no sobreviven a un fork (p. ej. gunicorn con preload)
+        os.register_at_fork(after_in_child=self._after_fork)
+    
+    def subscribe(self, user_id, subscriber=None):
+        """Registra un suscriptor, arrancando antes el hilo de LISTEN si hace falta."""
+        self._ensure_listening()
+        return super().subscribe(user_id, subscriber)
+    
+    def add_listener(self, callback):
+        """Registra un oyente, arrancando el hilo de LISTEN si hace falta."""
+        super().add_listener(callback)
+        self._ensure_listening()
+    
+    def publish(self, user_id, changes, connection=None):
+        """
+        Envía los cambios por NOTIFY; los recibe (también) el hilo de este proceso.
+        
+        Args:
+            user_id (int): ID del usuario.
+            changes (dict): IDs modificados por tipo.
+            connection: Conexión de la transacción en curso; el aviso se entrega al
+                confirmarla. Sin ella se usa (y confirma) una conexión propia.
+        """
+        payload = json.dumps({'u': user_id, 'c': changes}, separators=(',', ':'))
+        if len(payload) > NOTIFY_MAX_PAYLOAD:
+            # Demasiados IDs: se avisa sin detalle y el cliente resincroniza
+            payload = json.dumps({'u': user_id, 'c': {kind: [] for kind in changes}})
+        statement = select(func.pg_notify(self.channel, payload))
+        if connection is not None:
+            connection.execute(statement)
+            return
+        with self.engine.connect() as connection:
+            connection.execute(statement)
+            connection.commit()
+    
+    def _after_fork(self):
+        """Rearranca el hilo de LISTEN en el proceso hijo si hay oyentes registrados."""
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        if self._listeners:
+            self._ensure_listening()
+    
+    def _ensure_listening(self):
+        """Arranca el hilo de LISTEN si aún no está en marcha (p. ej. tras un fork)."""
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._listen_forever, name='eureka-listen', daemon=True)
+                self._thread.start()
+    
+    def _listen_forever(self):
+        """Bucle del hilo de LISTEN, con reconexión ante errores."""
+        while True:
+            try:
+                self._listen()
+            except Exception:
+                logger.exception('Conexión LISTEN perdida; reintentando')
+                time.sleep(1)
+    
+    def _listen(self):
+        """Escucha el canal y entrega cada notificación a los suscriptores locales."""
+        connection = self.engine.raw_connection()
+        # La conexión queda escuchando: no debe volver al pool al cerrarla
+        connection.detach()
+        try:
+            dbapi_connection = connection.driver_connection
+            dbapi_connection.autocommit = True
+            cursor = dbapi_connection.cursor()
+            cursor.execute(f'LISTEN {self.channel}')
+            
+            while True:
+                for payload in self._wait_notifies(dbapi_connection):
+                    data = json.loads(payload)
+                    self.dispatch(data['u'], data['c'])
+        finally:
+            connection.close()
+    
+    def _wait_notifies(self, dbapi_connection, timeout=30):
+        """Espera notificaciones y devuelve sus cargas (psycopg2 o psycopg 3)."""
+        if hasattr(dbapi_connection, 'poll'):
+            # psycopg2
+            if select_module.select([dbapi_connection], [], [], timeout) != ([], [], []):
+                dbapi_connection.poll()
+                notifies = [notify.payload for notify in dbapi_connection.notifies]
+                del dbapi_connection.notifies[:]
+                return notifies
+            return []
+        # psycopg 3
+        return [notify.payload for notify in dbapi_connection.notifies(timeout=timeout)]
+
+class AsyncSubscriber:
+    """
+    Suscriptor para código asíncrono (modo ASGI, ver `app.utils.asgi`).
+    
+    El broker entrega los cambios desde cualquier hilo (p. ej. el de LISTEN); se
+    pasan al bucle de eventos en el que se creó el suscriptor, sin ocupar un hilo
+    por conexión mientras se espera.
+    """
+    
+    def __init__(self, queue_size=100):
+        """Debe crearse dentro del bucle de eventos que leerá los cambios."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=queue_size)
+    
+    def put_nowait(self, changes):
+        """Entrega unos cambios (desde cualquier hilo); lanza `queue.Full` si no caben."""
+        if self._queue.full():
+            raise queue.Full
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, changes)
+        except RuntimeError:
+            # El bucle ya se ha cerrado: la conexión terminó
+            pass
+    
+    def _deliver(self, changes):
+        try:
+            self._queue.put_nowait(changes)
+        except asyncio.QueueFull:
+            pass
+    
+    async def get(self, timeout=None):
+        """
+        Espera los siguientes cambios.
+        
+        Raises:
+            asyncio.TimeoutError: Si no llegan en `timeout` segundos.
+        """
+        return await asyncio.wait_for(self._queue.get(), timeout)
+
+def record_changes(session, user_id, kind, ids):
+    """
+    Registra cambios hechos sin objetos del ORM (sentencias masivas).
+    
+    Se publican al confirmar la sesión, junto con los detectados automáticamente.
+    
+    Args:
+        session: Sesión de SQLAlchemy en la que se hicieron los cambios.
+        user_id (int): ID del usuario propietario.
+        kind (str): 'entries', 'collections' o 'tags'.
+        ids (iterable): IDs modificados.
+    """
+    pending = session.info.setdefault(SESSION_KEY, {})
+    pending.setdefault(user_id, defaultdict(set))[kind].update(ids)
+
+@event.listens_for(Session, 'after_flush')
+def _collect_changes(session, flush_context):
+    """Recoge las entradas, colecciones y etiquetas creadas, modificadas o borradas."""
+    for instance in list(session.new) + list(session.dirty) + list(session.deleted):
+        for model, kind in TRACKED_MODELS:
+            if isinstance(instance, model):
+                if instance.user_id is not None and instance.id is not None and \
+                        (instance not in session.dirty or session.is_modified(instance)):
+                    record_changes(session, instance.user_id, kind, [instance.id])
+                break
+
+def _get_broker():
+    """Broker de la aplicación actual, o None si no hay contexto o no está configurado."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('events')
+
+@event.listens_for(Session, 'before_commit')
+def _notify_changes(session):
+    """Publica los cambios en la propia transacción si el broker es transaccional."""
+    broker = _get_broker()
+    if broker is None or not broker.transactional or session.in_nested_transaction():
+        return
+    
+    # El flush final de `commit` ocurre después de este evento: se adelanta para
+    # recoger también sus cambios
+    session.flush()
+    pending = session.info.pop(SESSION_KEY, None)
+    if not pending:
+        return
+    connection = session.connection()
+    for user_id, changes in pending.items():
+        broker.publish(user_id, {kind: sorted(ids) for kind, ids in changes.items()}, connection=connection)
+
+@event.listens_for(Session, 'after_commit')
+def _publish_changes(session):
+    """Publica los cambios al confirmar la transacción."""
+    pending = session.info.pop(SESSION_KEY, None)
+    if not pending:
+        return
+    
+    broker = _get_broker()
+    if broker is None:
+        return
+    for user_id, changes in pending.items():
+        try:
+            broker.publish(user_id, {kind: sorted(ids) for kind, ids in changes.items()})
+        except Exception:
+            logger.exception('No se pudieron publicar los cambios del usuario %s', user_id)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _discard_changes(session, previous_transaction):
+    """Descarta los cambios de una transacción revertida (salvo si es un SAVEPOINT interno)."""
+    if not previous_transaction.nested:
+        session.info.pop(SESSION_KEY, None)
+
+def configure_events(app):
+    """
+    Configura el reparto de notificaciones de cambios.
+    
+    `EVENTS_BROKER` puede ser 'local' (solo este proceso) o 'postgres' (LISTEN/NOTIFY);
+    `EVENTS_MAX_CONNECTIONS` limita las conexiones SSE abiertas en cada worker.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('EVENTS_BROKER', 'local')
+    app.config.setdefault('EVENTS_QUEUE_SIZE', 100)
+    app.config.setdefault('EVENTS_MAX_CONNECTIONS', 100)
+    
+    if app.config['EVENTS_BROKER'] == 'postgres':
+        from app import db
+        with app.app_context():
+            broker = PostgresBroker(db.engine, queue_size=app.config['EVENTS_QUEUE_SIZE'])
+    else:
+        broker = LocalBroker(queue_size=app.config['EVENTS_QUEUE_SIZE'])
+    
+    app.extensions['events'] = broker
+    # Conexiones SSE simultáneas por worker: cada una ocupa un hilo mientras está abierta
+    app.extensions['events_slots'] = threading.BoundedSemaphore(app.config['EVENTS_MAX_CONNECTIONS'])
+    return app
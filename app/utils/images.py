@@ -0,0 +1,87 @@
+"""
+Validación de imágenes y generación de miniaturas con Pillow.
+
+Las funciones son puras (solo leen y escriben ficheros), así que pueden
+ejecutarse en los procesos de un pool (ver `app.services.image_service`).
+"""
+
+import os
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+# Formatos admitidos y extensión con la que se guarda el original
+ALLOWED_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp', 'GIF': 'gif'}
+
+# Lado máximo (en píxeles) de cada tamaño de miniatura
+THUMBNAIL_SIZES = (160, 320, 640)
+
+# Formato de las miniaturas: WebP admite transparencia y pesa menos que JPEG
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_EXTENSION = 'webp'
+THUMBNAIL_QUALITY = 80
+
+# Píxeles máximos de una imagen subida (protege frente a «bombas» de descompresión)
+MAX_PIXELS = 40_000_000
+
+def identify(path):
+    """
+    Comprueba que un fichero es una imagen admitida.
+    
+    Solo lee la cabecera y verifica la estructura del fichero, sin decodificar los píxeles.
+    
+    Args:
+        path (str): Ruta del fichero.
+    
+    Returns:
+        str: Extensión con la que debe guardarse ('jpg', 'png', 'webp' o 'gif').
+    
+    Raises:
+        ValueError: Si no es una imagen, su formato no se admite o es demasiado grande.
+    """
+    try:
+        with Image.open(path) as image:
+            image_format, (width, height) = image.format, image.size
+            image.verify()
+    except (UnidentifiedImageError, OSError, SyntaxError, Image.DecompressionBombError):
+        raise ValueError('El fichero no es una imagen válida.')
+    
+    if image_format not in ALLOWED_FORMATS:
+        raise ValueError('Formato de imagen no admitido (usa JPEG, PNG, WebP o GIF).')
+    if width * height > MAX_PIXELS:
+        raise ValueError('La imagen tiene demasiados píxeles.')
+    return ALLOWED_FORMATS[image_format]
+
+def make_thumbnails(source, targets):
+    """
+    Genera las miniaturas de una imagen decodificándola una sola vez.
+    
+    Cada miniatura se escribe en un fichero temporal y se renombra al terminar, de
+    modo que otro proceso nunca ve una miniatura a medio escribir.
+    
+    Args:
+        source (str): Ruta de la imagen original.
+        targets (dict): Ruta de destino de cada tamaño (lado máximo en píxeles).
+    
+    Returns:
+        list: Rutas escritas.
+    """
+    largest = max(targets)
+    written = []
+    with Image.open(source) as image:
+        # JPEG puede decodificarse directamente a una escala reducida (mucho más rápido)
+        image.draft('RGB', (largest, largest))
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ('RGB', 'RGBA'):
+            has_alpha = image.mode in ('LA', 'PA') or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        
+        # De mayor a menor: cada tamaño se reduce a partir del anterior
+        for size in sorted(targets, reverse=True):
+            image.thumbnail((size, size), Image.Resampling.LANCZOS)
+            target = targets[size]
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temporary = f'{target}.{os.getpid()}.tmp'
+            image.save(temporary, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY)
+            os.replace(temporary, target)
+            written.append(target)
+    return written
@@ -0,0 +1,141 @@
+"""
+Operaciones de migración que no bloquean las tablas grandes.
+
+Un `CREATE INDEX` normal bloquea las escrituras en la tabla mientras se construye
+el índice, y rellenar una columna nueva con un único `UPDATE` bloquea todas las
+filas de la tabla hasta el commit y genera de golpe todo su WAL. En `entries` (y
+en las tablas que crecen con ella) eso deja la aplicación sin poder guardar
+mientras dura la migración. Este módulo ofrece alternativas para usar desde los
+scripts de `migrations/versions/`:
+
+- `create_index_concurrently` / `drop_index_concurrently`: `CREATE/DROP INDEX
+  CONCURRENTLY` en PostgreSQL, fuera de la transacción de la migración.
+- `backfill`: actualiza una tabla en lotes recorridos por clave (keyset), cada uno
+  en su propia transacción, con una pausa opcional entre lotes. Es reanudable: si
+  se interrumpe, al volver a ejecutarla continúa por las filas pendientes.
+
+Ambas confirman lo que la migración haya hecho antes de empezar, así que conviene
+que vayan en una migración propia (`env.py` usa una transacción por migración).
+
+El linter que avisa de las operaciones que no usan estas alternativas está en
+`migrations/lint.py` (ver `scripts/lint_migrations.py`).
+"""
+
+import logging
+import time
+
+import sqlalchemy as sa
+from alembic import op
+
+logger = logging.getLogger(__name__)
+
+def create_index_concurrently(index_name, table_name, columns, unique=False, **kw):
+    """
+    Crea un índice sin bloquear las escrituras en la tabla.
+    
+    En PostgreSQL usa `CREATE INDEX CONCURRENTLY`, que no puede ejecutarse dentro
+    de una transacción. Si una ejecución anterior se interrumpió y dejó el índice
+    a medias (inválido), lo borra y lo vuelve a crear; si ya existe y es válido, no
+    hace nada. En otras bases de datos crea el índice de la forma habitual.
+    
+    Args:
+        index_name (str): Nombre del índice.
+        table_name (str): Tabla.
+        columns (list): Columnas o expresiones, como en `op.create_index`.
+        unique (bool): Índice único.
+        **kw: Resto de argumentos de `op.create_index`.
+    """
+    context = op.get_context()
+    if context.dialect.name != 'postgresql':
+        op.create_index(index_name, table_name, columns, unique=unique, **kw)
+        return
+    
+    with context.autocommit_block():
+        if not context.as_sql:
+            valid = _index_is_valid(index_name)
+            if valid:
+                return
+            if valid is not None:
+                op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+        op.create_index(index_name, table_name, columns, unique=unique, postgresql_concurrently=True, **kw)
+
+def drop_index_concurrently(index_name, table_name):
+    """
+    Borra un índice sin bloquear la tabla (`DROP INDEX CONCURRENTLY` en PostgreSQL).
+    
+    Args:
+        index_name (str): Nombre del índice.
+        table_name (str): Tabla.
+    """
+    context = op.get_context()
+    if context.dialect.name != 'postgresql':
+        op.drop_index(index_name, table_name=table_name)
+        return
+    
+    with context.autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True)
+
+def _index_is_valid(index_name):
+    """True si el índice existe y es válido, False si quedó inválido y None si no existe."""
+    return op.get_bind().execute(
+        sa.text('SELECT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)'),
+        {'name': index_name}
+    ).scalar()
+
+def backfill(table_name, assignments, pending, batch_size=1000, pause=0.0, key='id'):
+    """
+    Actualiza las filas pendientes de una tabla en lotes, cada uno en su transacción.
+    
+    Los lotes se recorren en orden de `key` (una columna única e indexada, como la
+    clave primaria) y cada uno bloquea solo sus filas mientras se actualiza. La
+    condición `pending` debe dejar de cumplirse en las filas ya actualizadas: así
+    los lotes no repiten filas y, si la migración se interrumpe, al ejecutarla de
+    nuevo continúa donde lo dejó. En modo offline (`--sql`) se emite un único UPDATE.
+    
+    Ejemplo::
+        
+        backfill('entries', 'word_count = 0', 'word_count IS NULL', batch_size=5000, pause=0.1)
+    
+    Args:
+        table_name (str): Tabla.
+        assignments (str): Cláusula SET (SQL), p. ej. "summary = left(content, 200)".
+        pending (str): Condición (SQL) de las filas por actualizar, p. ej. "summary IS NULL".
+        batch_size (int): Filas por lote.
+        pause (float): Segundos de espera entre lotes, para no saturar la base de datos ni la réplica.
+        key (str): Columna por la que se recorren los lotes.
+    
+    Returns:
+        int: Filas actualizadas (None en modo offline).
+    """
+    context = op.get_context()
+    if context.as_sql:
+        op.execute(f'UPDATE {table_name} SET {assignments} WHERE {pending}')
+        return None
+    
+    total = 0
+    after = None
+    with context.autocommit_block():
+        connection = op.get_bind()
+        while True:
+            lower = f'{key} > :after AND ' if after is not None else ''
+            # Última clave del lote: las `batch_size` siguientes filas pendientes
+            upto = connection.execute(
+                sa.text(f'SELECT max({key}) FROM (SELECT {key} FROM {table_name} '
+                        f'WHERE {lower}({pending}) ORDER BY {key} LIMIT :limit) AS batch'),
+                {'after': after, 'limit': batch_size}
+            ).scalar()
+            if upto is None:
+                break
+            
+            updated = connection.execute(
+                sa.text(f'UPDATE {table_name} SET {assignments} '
+                        f'WHERE {lower}{key} <= :upto AND ({pending})'),
+                {'after': after, 'upto': upto}
+            ).rowcount
+            total += updated
+            after = upto
+            logger.info('%s: %d filas actualizadas (%s <= %s)', table_name, total, key, upto)
+            
+            if pause:
+                time.sleep(pause)
+    return total
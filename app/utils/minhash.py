@@ -0,0 +1,124 @@
+"""
+Firmas MinHash y cubetas LSH para detectar textos casi duplicados.
+
+El texto se normaliza (minúsculas y espacios colapsados) y se divide en shingles
+de 5 bytes consecutivos. La firma guarda, para cada una de `NUM_PERM` funciones
+hash, el valor mínimo sobre todos los shingles: la proporción de posiciones en las
+que coinciden dos firmas estima la similitud de Jaccard entre sus conjuntos de
+shingles. La firma se divide en `BANDS` bandas de `ROWS` valores; dos textos son
+candidatos a duplicado si coinciden en todos los valores de alguna banda, lo que
+ocurre con alta probabilidad a partir de una similitud de ~0,5.
+
+Todo se calcula con operaciones vectorizadas de NumPy y las funciones son puras
+(sin acceso a la base de datos), así que pueden ejecutarse en otros procesos.
+Las permutaciones usan una semilla fija: cambiarla invalida las firmas guardadas.
+"""
+
+import hashlib
+import re
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Funciones hash por firma, y bandas × filas en que se divide
+NUM_PERM = 128
+BANDS = 32
+ROWS = 4
+
+# Bytes por shingle (uno por cada posición del texto normalizado)
+SHINGLE_BYTES = 5
+
+# Shingles procesados a la vez (acota la memoria de la matriz shingles × permutaciones)
+SHINGLE_CHUNK = 2048
+
+_rng = np.random.default_rng(20261019)
+# Hash universal multiply-shift: ((a * x + b) mod 2^64) >> 32, con `a` impar
+_A = _rng.integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_B = _rng.integers(0, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_SHIFTS = np.arange(SHINGLE_BYTES, dtype=np.uint64) * np.uint64(8)
+
+def normalize(text):
+    """Pasa el texto a minúsculas y colapsa los espacios."""
+    return re.sub(r'\s+', ' ', (text or '').lower()).strip()
+
+def content_hash(normalized):
+    """Huella de 64 bits (con signo, para BIGINT) del texto normalizado."""
+    digest = hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little', signed=True)
+
+def shingle_hashes(normalized):
+    """Hashes únicos de los shingles de un texto normalizado."""
+    data = np.frombuffer(normalized.encode('utf-8'), dtype=np.uint8)
+    if len(data) < SHINGLE_BYTES:
+        data = np.concatenate([data, np.zeros(SHINGLE_BYTES - len(data), dtype=np.uint8)])
+    
+    windows = sliding_window_view(data, SHINGLE_BYTES).astype(np.uint64)
+    packed = np.bitwise_or.reduce(windows << _SHIFTS, axis=1)
+    
+    # Mezcla de splitmix64 para repartir los bits de los bytes de texto
+    packed ^= packed >> np.uint64(30)
+    packed *= np.uint64(0xBF58476D1CE4E5B9)
+    packed ^= packed >> np.uint64(27)
+    packed *= np.uint64(0x94D049BB133111EB)
+    packed ^= packed >> np.uint64(31)
+    return np.unique(packed)
+
+def minhash(hashes):
+    """
+    Firma MinHash de un conjunto de hashes de shingles.
+    
+    Returns:
+        numpy.ndarray: `NUM_PERM` valores uint32.
+    """
+    signature = np.full(NUM_PERM, np.iinfo(np.uint32).max, dtype=np.uint32)
+    for start in range(0, len(hashes), SHINGLE_CHUNK):
+        chunk = hashes[start:start + SHINGLE_CHUNK, None]
+        values = ((chunk * _A + _B) >> np.uint64(32)).astype(np.uint32)
+        np.minimum(signature, values.min(axis=0), out=signature)
+    return signature
+
+def band_buckets(signature):
+    """
+    Cubetas LSH de una firma, una por banda.
+    
+    Returns:
+        list: (banda, cubeta) con la cubeta como entero de 64 bits con signo.
+    """
+    buckets = []
+    for band, values in enumerate(signature.reshape(BANDS, ROWS)):
+        digest = hashlib.blake2b(values.astype('<u4').tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, 'little', signed=True)))
+    return buckets
+
+def similarity(signature_a, signature_b):
+    """Similitud de Jaccard estimada entre dos firmas."""
+    return float(np.mean(signature_a == signature_b))
+
+def signature_from_bytes(data):
+    """Firma guardada en la base de datos como array de uint32."""
+    return np.frombuffer(data, dtype='<u4')
+
+def compute_signature(content):
+    """
+    Firma y cubetas del contenido de una entrada.
+    
+    Returns:
+        tuple: (huella, firma en bytes, cubetas), o None si el contenido está vacío.
+    """
+    normalized = normalize(content)
+    if not normalized:
+        return None
+    signature = minhash(shingle_hashes(normalized))
+    return content_hash(normalized), signature.astype('<u4').tobytes(), band_buckets(signature)
+
+def compute_signatures(items):
+    """
+    Calcula las firmas de un bloque de entradas (pensada para un pool de procesos).
+    
+    Args:
+        items (list): Tuplas (entry_id, user_id, content).
+    
+    Returns:
+        list: Tuplas (entry_id, user_id, resultado de `compute_signature`).
+    """
+    return [(entry_id, user_id, compute_signature(content)) for entry_id, user_id, content in items]
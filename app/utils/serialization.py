@@ -0,0 +1,74 @@
+"""
+Serialización JSON rápida y selección de campos para la API.
+
+Se usa orjson si está instalado (serializa fechas de forma nativa y es varias
+veces más rápido que el módulo estándar); si no, se recurre a `json` con el
+mismo formato de salida.
+"""
+
+import json
+from datetime import date, datetime
+
+from flask import current_app
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson es opcional
+    orjson = None
+
+def _default(value):
+    """Convierte a JSON los tipos que el módulo estándar no admite."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f'Tipo no serializable: {type(value).__name__}')
+
+def dumps(data):
+    """
+    Serializa un objeto a JSON.
+    
+    Args:
+        data: Objeto a serializar (dict, list, tipos básicos y fechas).
+    
+    Returns:
+        bytes: JSON codificado en UTF-8.
+    """
+    if orjson is not None:
+        return orjson.dumps(data, default=_default)
+    return json.dumps(data, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def json_response(data, status=200):
+    """
+    Crea una respuesta JSON serializada con `dumps`.
+    
+    Args:
+        data: Objeto a serializar.
+        status (int): Código de estado HTTP.
+    
+    Returns:
+        Response: Respuesta con tipo `application/json`.
+    """
+    return current_app.response_class(dumps(data), status=status, mimetype='application/json')
+
+def parse_fields(raw, allowed, default):
+    """
+    Interpreta el parámetro `fields` de una petición (`?fields=id,title,updated_at`).
+    
+    Args:
+        raw (str): Valor del parámetro o None.
+        allowed (iterable): Campos válidos.
+        default (tuple): Campos a devolver si no se indica ninguno.
+    
+    Returns:
+        tuple: Campos solicitados, sin duplicados y en el orden indicado.
+    
+    Raises:
+        ValueError: Si se solicita algún campo desconocido.
+    """
+    if not raw:
+        return tuple(default)
+    
+    fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in fields if name not in allowed]
+    if unknown:
+        raise ValueError(f"Campos desconocidos: {', '.join(unknown)}")
+    return fields or tuple(default)
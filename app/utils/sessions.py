@@ -0,0 +1,339 @@
+"""
+Sesiones en el servidor con un identificador compacto en la cookie.
+
+Con la sesión por defecto de Flask todo su contenido (usuario, token CSRF,
+mensajes flash de Flask-Security...) viaja firmado en la cookie: cada petición
+envía esos bytes y el servidor verifica la firma y deserializa el JSON, la use o
+no. Con `SESSION_BACKEND` distinto de 'cookie', la cookie lleva solo un
+identificador aleatorio de 43 caracteres y el contenido se guarda en el servidor:
+
+- 'sqlite': una base de datos SQLite en modo WAL (`SESSION_STORE_PATH`, por
+  defecto `instance/sessions.sqlite3`), compartida por los workers de la máquina.
+- 'filesystem': un fichero por sesión en un directorio (`SESSION_STORE_PATH`,
+  por defecto `instance/sessions`), también compartido por los workers.
+
+El contenido se serializa con pickle (binario, sin pasar por JSON) y se lee de
+forma perezosa: una petición que no toca la sesión no la lee ni la deserializa, y
+solo se escribe si cambia. El identificador no se firma: son 256 bits aleatorios
+y nada del cliente llega a deserializarse. Al cambiar el usuario de la sesión
+(login o logout) se emite un identificador nuevo, para evitar la fijación de sesión.
+
+Las sesiones caducan a los `PERMANENT_SESSION_LIFETIME` segundos de su última
+escritura; `flask sessions purge` borra las caducadas (la tienda SQLite, además,
+las purga sola de vez en cuando).
+"""
+
+import os
+import pickle
+import random
+import re
+import secrets
+import sqlite3
+import struct
+import tempfile
+import threading
+import time
+
+import click
+from flask.sessions import SessionInterface, SessionMixin
+
+# Formato del identificador de sesión (token_urlsafe de 32 bytes)
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{43}$')
+
+# Clave con la que Flask-Login guarda el usuario de la sesión
+USER_ID_KEY = '_user_id'
+
+# Cabecera de los ficheros de sesión: timestamp de caducidad
+EXPIRES = struct.Struct('<d')
+
+# Probabilidad de purgar las sesiones caducadas en cada escritura (tienda SQLite)
+PURGE_PROBABILITY = 0.001
+
+class SQLiteSessionStore:
+    """
+    Sesiones en una base de datos SQLite en modo WAL.
+    
+    Cada hilo (y cada proceso, tras un fork) usa su propia conexión; WAL permite
+    leer mientras otro worker escribe.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                'CREATE TABLE IF NOT EXISTS sessions '
+                '(sid TEXT PRIMARY KEY, data BLOB NOT NULL, expires REAL NOT NULL) WITHOUT ROWID'
+            )
+            connection.execute('CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires)')
+    
+    def _connect(self):
+        """Conexión del hilo actual."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # En WAL, NORMAL no sincroniza en cada commit: se puede perder la última sesión escrita si cae la máquina
+            connection.execute('PRAGMA synchronous=NORMAL')
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+    
+    def get(self, sid):
+        """Contenido serializado y caducidad de una sesión vigente, o None."""
+        row = self._connect().execute(
+            'SELECT data, expires FROM sessions WHERE sid = ? AND expires > ?', (sid, time.time())
+        ).fetchone()
+        return tuple(row) if row else None
+    
+    def set(self, sid, data, expires):
+        """Guarda una sesión hasta `expires` (timestamp)."""
+        connection = self._connect()
+        connection.execute('INSERT OR REPLACE INTO sessions (sid, data, expires) VALUES (?, ?, ?)',
+                           (sid, data, expires))
+        if random.random() < PURGE_PROBABILITY:
+            self.purge()
+    
+    def delete(self, sid):
+        """Borra una sesión."""
+        self._connect().execute('DELETE FROM sessions WHERE sid = ?', (sid,))
+    
+    def purge(self):
+        """Borra las sesiones caducadas y devuelve cuántas."""
+        return self._connect().execute('DELETE FROM sessions WHERE expires <= ?', (time.time(),)).rowcount
+
+class FilesystemSessionStore:
+    """
+    Sesiones en ficheros: uno por sesión, repartidos en subdirectorios por los dos
+    primeros caracteres del identificador.
+    
+    Cada fichero empieza con la fecha de caducidad (8 bytes) y se escribe en un
+    temporal que se renombra, de modo que nunca se lee a medio escribir.
+    """
+    
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+    
+    def _path(self, sid):
+        return os.path.join(self.directory, sid[:2], sid)
+    
+    def get(self, sid):
+        """Contenido serializado y caducidad de una sesión vigente, o None."""
+        try:
+            with open(self._path(sid), 'rb') as handle:
+                content = handle.read()
+        except FileNotFoundError:
+            return None
+        if len(content) < EXPIRES.size:
+            return None
+        expires, = EXPIRES.unpack_from(content)
+        return (content[EXPIRES.size:], expires) if expires > time.time() else None
+    
+    def set(self, sid, data, expires):
+        """Guarda una sesión hasta `expires` (timestamp)."""
+        path = self._path(sid)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, temporary = tempfile.mkstemp(dir=os.path.dirname(path), prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as handle:
+                handle.write(EXPIRES.pack(expires) + data)
+            os.replace(temporary, path)
+        except BaseException:
+            if os.path.exists(temporary):
+                os.unlink(temporary)
+            raise
+    
+    def delete(self, sid):
+        """Borra una sesión."""
+        try:
+            os.unlink(self._path(sid))
+        except FileNotFoundError:
+            pass
+    
+    def purge(self):
+        """Borra las sesiones caducadas y devuelve cuántas."""
+        now = time.time()
+        removed = 0
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    if name.startswith('.tmp-'):
+                        # Temporal de una escritura en curso o de un proceso que murió a medias
+                        if os.path.getmtime(path) < now - 3600:
+                            os.unlink(path)
+                        continue
+                    with open(path, 'rb') as handle:
+                        header = handle.read(EXPIRES.size)
+                    if len(header) < EXPIRES.size or EXPIRES.unpack(header)[0] <= now:
+                        os.unlink(path)
+                        removed += 1
+                except FileNotFoundError:
+                    continue
+        return removed
+
+class ServerSideSession(SessionMixin):
+    """
+    Sesión guardada en el servidor que solo se lee al usarse por primera vez.
+    """
+    
+    def __init__(self, store, sid=None):
+        self.store = store
+        self.sid = sid
+        self.new = sid is None
+        self.modified = False
+        self.accessed = False
+        # El cliente envió un identificador que ya no existe: hay que borrar su cookie
+        self.stale = False
+        self.expires = None
+        self._data = None
+        self._user_id = None
+    
+    @property
+    def loaded(self):
+        """Indica si la petición ha usado la sesión."""
+        return self._data is not None
+    
+    def _load(self):
+        """Lee y deserializa la sesión la primera vez que se usa."""
+        self.accessed = True
+        if self._data is None:
+            stored = self.store.get(self.sid) if self.sid else None
+            if stored is None:
+                # Identificador desconocido o caducado: nunca se reutiliza el que envía el cliente
+                self.stale = self.sid is not None
+                self.sid = None
+                self.new = True
+                self._data = {}
+            else:
+                data, self.expires = stored
+                self._data = pickle.loads(data)
+            self._user_id = self._data.get(USER_ID_KEY)
+        return self._data
+    
+    def __getitem__(self, key):
+        return self._load()[key]
+    
+    def __setitem__(self, key, value):
+        self._load()[key] = value
+        self.modified = True
+    
+    def __delitem__(self, key):
+        del self._load()[key]
+        self.modified = True
+    
+    def __iter__(self):
+        return iter(self._load())
+    
+    def __len__(self):
+        return len(self._load())
+    
+    def __contains__(self, key):
+        return key in self._load()
+    
+    def get(self, key, default=None):
+        return self._load().get(key, default)
+    
+    def clear(self):
+        if self._load():
+            self._data.clear()
+            self.modified = True
+    
+    def user_changed(self):
+        """Indica si la petición ha cambiado el usuario de la sesión (login o logout)."""
+        return self.loaded and self._data.get(USER_ID_KEY) != self._user_id
+
+class ServerSideSessionInterface(SessionInterface):
+    """
+    Interfaz de sesión de Flask que guarda el contenido en una tienda del servidor.
+    """
+    
+    def __init__(self, store):
+        self.store = store
+    
+    def open_session(self, app, request):
+        sid = request.cookies.get(self.get_cookie_name(app))
+        if sid and not SESSION_ID_PATTERN.match(sid):
+            sid = None
+        return ServerSideSession(self.store, sid)
+    
+    def save_session(self, app, session, response):
+        if not session.loaded:
+            # La petición no ha usado la sesión: ni se lee ni se escribe
+            return
+        
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        response.vary.add('Cookie')
+        
+        if not session:
+            if session.sid:
+                self.store.delete(session.sid)
+            if session.sid or session.stale:
+                response.delete_cookie(name, domain=domain, path=path,
+                                       secure=self.get_cookie_secure(app),
+                                       samesite=self.get_cookie_samesite(app),
+                                       httponly=self.get_cookie_httponly(app))
+            return
+        
+        if session.sid is None or session.user_changed():
+            # Identificador nuevo al crear la sesión y al cambiar de usuario (fijación de sesión)
+            if session.sid:
+                self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.modified = True
+        
+        # Sin cambios, solo se reescribe para alargar la caducidad cuando ya ha pasado la mitad
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        if session.modified or session.expires is None or session.expires - now < lifetime / 2:
+            self.store.set(session.sid, pickle.dumps(session._data, protocol=pickle.HIGHEST_PROTOCOL),
+                           now + lifetime)
+        
+        if self.should_set_cookie(app, session):
+            response.set_cookie(
+                name, session.sid, expires=self.get_expiration_time(app, session),
+                httponly=self.get_cookie_httponly(app), domain=domain, path=path,
+                secure=self.get_cookie_secure(app), samesite=self.get_cookie_samesite(app)
+            )
+
+def configure_sessions(app):
+    """
+    Configura el almacenamiento de las sesiones y el comando `flask sessions purge`.
+    
+    `SESSION_BACKEND` puede ser 'cookie' (la sesión firmada de Flask), 'sqlite' o
+    'filesystem'.
+    
+    Args:
+        app: Instancia de la aplicación Flask.
+    """
+    app.config.setdefault('SESSION_BACKEND', 'cookie')
+    app.config.setdefault('SESSION_STORE_PATH', None)
+    
+    backend = app.config['SESSION_BACKEND']
+    path = app.config['SESSION_STORE_PATH']
+    if backend == 'sqlite':
+        store = SQLiteSessionStore(path or os.path.join(app.instance_path, 'sessions.sqlite3'))
+    elif backend == 'filesystem':
+        store = FilesystemSessionStore(path or os.path.join(app.instance_path, 'sessions'))
+    elif backend == 'cookie':
+        return app
+    else:
+        raise ValueError(f'SESSION_BACKEND desconocido: {backend}')
+    
+    app.session_interface = ServerSideSessionInterface(store)
+    app.extensions['session_store'] = store
+    
+    @app.cli.group()
+    def sessions():
+        """Gestión de las sesiones guardadas en el servidor."""
+    
+    @sessions.command('purge')
+    def purge_command():
+        """Borra las sesiones caducadas."""
+        click.echo(f'{store.purge()} sesiones caducadas borradas')
+    
+    return app
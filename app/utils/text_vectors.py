@@ -0,0 +1,128 @@
+"""
+Vectores TF-IDF con hashing para la búsqueda semántica local.
+
+El texto se pasa a minúsculas, se le quitan los acentos y se divide en palabras;
+cada palabra se recorta a sus `STEM_LENGTH` primeros caracteres (una reducción
+a la raíz muy simple pero suficiente para que «receta» y «recetas» coincidan).
+Cada término se convierte en un hash estable (CRC32) del que salen:
+
+- Su cubeta de frecuencia documental (`IDF_BUCKETS` cubetas), con la que se
+  calcula el IDF del término.
+- Su dimensión (`DIM`) y su signo en el vector denso que se guarda.
+
+El peso de cada término es (1 + log tf) · idf y cada vector se normaliza (L2), así
+que la similitud de coseno entre dos textos es el producto escalar de sus vectores.
+Proyectar los términos en pocas dimensiones con signo aleatorio conserva en
+promedio los productos escalares y deja vectores float32 de tamaño fijo, fáciles
+de guardar en un array mapeado en memoria.
+
+Cambiar las constantes o la forma de obtener los términos invalida los índices guardados.
+"""
+
+import re
+import unicodedata
+import zlib
+from collections import Counter
+
+import numpy as np
+
+# Dimensiones de los vectores guardados (potencia de 2)
+DIM = 256
+
+# Cubetas de hash en las que se cuentan las frecuencias documentales (potencia de 2)
+IDF_BUCKETS = 2 ** 18
+
+# Caracteres con los que se queda cada palabra
+STEM_LENGTH = 6
+
+_WORD = re.compile(r'[a-z0-9]{2,}')
+_IDF_MASK = IDF_BUCKETS - 1
+_DIM_SHIFT = IDF_BUCKETS.bit_length() - 1
+_SIGN_BIT = 31
+
+def terms(text):
+    """Términos (palabras sin acentos recortadas) de un texto, con repeticiones."""
+    folded = unicodedata.normalize('NFKD', (text or '').lower()).encode('ascii', 'ignore').decode('ascii')
+    return [word[:STEM_LENGTH] for word in _WORD.findall(folded)]
+
+class TermHasher:
+    """
+    Convierte textos en hashes de términos, recordando los hashes ya calculados.
+    
+    Un índice reutiliza el mismo objeto para todos sus textos: el vocabulario de
+    un usuario es pequeño comparado con el número de palabras que escribe.
+    """
+    
+    def __init__(self):
+        self._cache = {}
+    
+    def counts(self, text):
+        """
+        Hashes de los términos de un texto y sus frecuencias.
+        
+        Returns:
+            tuple: (hashes uint32 de cada término distinto, frecuencias float32).
+        """
+        cache = self._cache
+        counter = Counter(terms(text))
+        for term in counter:
+            if term not in cache:
+                cache[term] = zlib.crc32(term.encode('ascii'))
+        hashes = np.fromiter(map(cache.__getitem__, counter), dtype=np.uint32, count=len(counter))
+        # Dos términos con el mismo hash suman sus frecuencias al vectorizar
+        return hashes, np.fromiter(counter.values(), dtype=np.float32, count=len(counter))
+
+def document_frequencies(documents):
+    """
+    Frecuencia documental de cada cubeta de términos.
+    
+    Args:
+        documents (list): Resultados de `TermHasher.counts`.
+    
+    Returns:
+        numpy.ndarray: `IDF_BUCKETS` contadores.
+    """
+    if not documents:
+        return np.zeros(IDF_BUCKETS, dtype=np.int64)
+    buckets = np.concatenate([np.unique(hashes & _IDF_MASK) for hashes, _ in documents])
+    return np.bincount(buckets.astype(np.int64), minlength=IDF_BUCKETS)
+
+def inverse_document_frequencies(frequencies, total):
+    """
+    IDF suavizado de cada cubeta: log((1 + N) / (1 + df)) + 1.
+    
+    Los términos que no aparecían al calcularlo (df = 0) reciben el peso máximo.
+    """
+    return (np.log((1 + total) / (1 + frequencies)) + 1).astype(np.float32)
+
+def vectorize(documents, idf):
+    """
+    Vectores TF-IDF normalizados de unos textos.
+    
+    Args:
+        documents (list): Resultados de `TermHasher.counts`.
+        idf (numpy.ndarray): IDF de cada cubeta (`inverse_document_frequencies`).
+    
+    Returns:
+        numpy.ndarray: Matriz float32 (textos × `DIM`); los textos sin términos
+            tienen un vector de ceros.
+    """
+    vectors = np.zeros((len(documents), DIM), dtype=np.float32)
+    if not documents:
+        return vectors
+    
+    lengths = [len(hashes) for hashes, _ in documents]
+    hashes = np.concatenate([hashes for hashes, _ in documents])
+    frequencies = np.concatenate([counts for _, counts in documents])
+    rows = np.repeat(np.arange(len(documents)), lengths)
+    
+    weights = (1 + np.log(frequencies)) * idf[hashes & _IDF_MASK]
+    signs = np.where(hashes >> _SIGN_BIT, -1, 1).astype(np.float32)
+    columns = (hashes >> _DIM_SHIFT) & (DIM - 1)
+    vectors.ravel()[:] = np.bincount(rows * DIM + columns, weights=weights * signs,
+                                     minlength=len(documents) * DIM)
+    
+    norms = np.linalg.norm(vectors, axis=1)
+    norms[norms == 0] = 1
+    vectors /= norms[:, None]
+    return vectors
@@ -0,0 +1,487 @@
+import queue
+import time
+from functools import wraps
+
+from flask import Blueprint, current_app, request
+from flask_security import current_user
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.services.entry_service import EntryService, VersionConflictError, ENTRY_FIELDS, BATCH_MAX_OPERATIONS
+from app.services.collection_service import CollectionService, COLLECTION_FIELDS
+from app.services.tag_service import TagService, TAG_FIELDS
+from app.services.sync_service import SyncService
+from app.services.dedup_service import DedupService, DUPLICATE_THRESHOLD
+from app.services.image_service import ImageTooLargeError, image_urls
+from app.services.stats_service import StatsService
+from app.utils.conditional import conditional
+from app.utils.serialization import dumps, json_response, parse_fields
+from app import db
+
+api = Blueprint('api', __name__, url_prefix='/api/v1')
+entry_service = EntryService()
+collection_service = CollectionService()
+tag_service = TagService()
+sync_service = SyncService()
+dedup_service = DedupService()
+stats_service = StatsService()
+
+# Tamaño de página por defecto y máximo de los listados
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Sugerencias por defecto y máximas del autocompletado
+DEFAULT_AUTOCOMPLETE_SIZE = 10
+MAX_AUTOCOMPLETE_SIZE = 50
+
+# Entradas relacionadas por defecto y máximas
+DEFAULT_RELATED_SIZE = 5
+MAX_RELATED_SIZE = 20
+
+# Resultados por defecto y máximos de la búsqueda semántica
+DEFAULT_SEARCH_SIZE = 10
+MAX_SEARCH_SIZE = 50
+
+# Días por defecto y máximos de las estadísticas de actividad
+DEFAULT_STATS_DAYS = 90
+MAX_STATS_DAYS = 366
+
+# Segundos entre comentarios de keepalive en el canal de eventos
+EVENTS_HEARTBEAT = 15
+
+# Filas por tipo en cada página de sincronización
+DEFAULT_SYNC_PAGE_SIZE = 500
+MAX_SYNC_PAGE_SIZE = 1000
+
+# Segundos máximos de espera de una sincronización sin cambios (`wait`)
+MAX_SYNC_WAIT = 30
+
+def error_response(message, status=400):
+    """Respuesta de error con el formato común de la API."""
+    return json_response({'error': message}, status=status)
+
+def api_login_required(view):
+    """Exige sesión iniciada, respondiendo 401 en JSON en lugar de redirigir al login."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not current_user.is_authenticated:
+            return error_response('Autenticación requerida.', 401)
+        return view(*args, **kwargs)
+    return wrapper
+
+def _int_arg(name):
+    """Lee un parámetro entero opcional de la petición."""
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'El parámetro {name} debe ser un número entero.')
+
+@api.route('/entries', methods=['GET'])
+@api_login_required
+@conditional()
+def list_entries():
+    """
+    Lista las entradas del usuario.
+    
+    Parámetros: `fields`, `q`, `collection_id`, `tag_id`, `status`, `cursor` y `limit`.
+    """
+    try:
+        fields = parse_fields(request.args.get('fields'), ENTRY_FIELDS, ENTRY_FIELDS)
+        limit = _int_arg('limit') or DEFAULT_PAGE_SIZE
+        entries, next_cursor = entry_service.list_entries(
+            current_user.id,
+            fields=fields,
+            q=request.args.get('q'),
+            collection_id=_int_arg('collection_id'),
+            tag_id=_int_arg('tag_id'),
+            status=request.args.get('status'),
+            cursor=request.args.get('cursor'),
+            limit=max(1, min(limit, MAX_PAGE_SIZE))
+        )
+    except ValueError as e:
+        return error_response(str(e))
+    
+    return json_response({'data': entries, 'next_cursor': next_cursor})
+
+@api.route('/entries', methods=['POST'])
+@api_login_required
+def create_entry():
+    """Crea una entrada a partir de un cuerpo JSON."""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return error_response('El cuerpo de la petición debe ser un objeto JSON.')
+    
+    tags = data.get('tags') or []
+    if not isinstance(tags, list):
+        return error_response('Las etiquetas deben ser una lista de nombres.')
+    
+    try:
+        entry = entry_service.create_entry(
+            current_user.id,
+            title=data.get('title'),
+            content=data.get('content'),
+            status=data.get('status'),
+            collection_id=data.get('collection_id'),
+            tag_names=tags
+        )
+    except ValueError as e:
+        return error_response(str(e))
+    
+    return json_response({'data': entry_service.entry_to_dict(entry)}, status=201)
+
+@api.route('/entries/batch', methods=['POST'])
+@api_login_required
+def batch_entries():
+    """
+    Aplica un lote de operaciones sobre entradas en una única transacción.
+    
+    Cuerpo: `{"operations": [{"op": "update", "id": 1, "data": {...}}, ...]}`.
+    """
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return error_response('El cuerpo debe incluir una lista de operaciones.')
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return error_response(f'Un lote no puede tener más de {BATCH_MAX_OPERATIONS} operaciones.')
+    
+    try:
+        results = entry_service.apply_batch(current_user.id, operations)
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Error al aplicar un lote de entradas: {str(e)}")
+        return error_response('No se pudo aplicar el lote; no se ha guardado ningún cambio.', 409)
+    
+    return json_response({'results': results})
+
+@api.route('/entries/related', methods=['GET'])
+@api_login_required
+def related_entries():
+    """
+    Entradas relacionadas por etiquetas con un lote de entradas.
+    
+    Parámetros: `ids` (separados por comas) y `limit` (relacionadas por entrada).
+    """
+    try:
+        ids = [int(value) for value in request.args.get('ids', '').split(',') if value.strip()]
+        limit = _int_arg('limit') or DEFAULT_RELATED_SIZE
+    except ValueError:
+        return error_response('Los IDs y el límite deben ser números enteros.')
+    if not ids or len(ids) > MAX_PAGE_SIZE:
+        return error_response(f'Indica entre 1 y {MAX_PAGE_SIZE} IDs de entradas.')
+    
+    related = current_app.extensions['related'].related(
+        current_user.id, ids, k=max(1, min(limit, MAX_RELATED_SIZE))
+    )
+    return json_response({'data': {str(entry_id): items for entry_id, items in related.items()}})
+
+@api.route('/entries/<int:entry_id>/related', methods=['GET'])
+@api_login_required
+def entry_related(entry_id):
+    """Entradas que comparten más etiquetas (ponderadas por su rareza) con una entrada."""
+    try:
+        limit = _int_arg('limit') or DEFAULT_RELATED_SIZE
+    except ValueError as e:
+        return error_response(str(e))
+    
+    related = current_app.extensions['related'].related(
+        current_user.id, [entry_id], k=max(1, min(limit, MAX_RELATED_SIZE))
+    )
+    return json_response({'data': related[entry_id]})
+
+@api.route('/entries/<int:entry_id>/duplicates', methods=['GET'])
+@api_login_required
+def entry_duplicates(entry_id):
+    """
+    Posibles duplicados de una entrada (contenido casi igual).
+    
+    Parámetros: `threshold` (similitud mínima entre 0 y 1) y `limit`.
+    """
+    try:
+        threshold = float(request.args.get('threshold', DUPLICATE_THRESHOLD))
+        limit = _int_arg('limit') or DEFAULT_RELATED_SIZE
+    except ValueError:
+        return error_response('El umbral y el límite deben ser números.')
+    if not 0 < threshold <= 1:
+        return error_response('El umbral debe estar entre 0 y 1.')
+    
+    duplicates = dedup_service.possible_duplicates(
+        current_user.id, entry_id, threshold=threshold, limit=max(1, min(limit, MAX_RELATED_SIZE))
+    )
+    if duplicates is None:
+        return error_response('La entrada no existe o aún no se ha analizado.', 404)
+    return json_response({'data': duplicates})
+
+@api.route('/entries/search', methods=['GET'])
+@api_login_required
+def search_entries():
+    """
+    Búsqueda semántica: entradas cuyo contenido se parece más al texto `q`.
+    
+    Parámetros: `q` y `limit`.
+    """
+    query = request.args.get('q', '').strip()
+    try:
+        limit = _int_arg('limit') or DEFAULT_SEARCH_SIZE
+    except ValueError as e:
+        return error_response(str(e))
+    if not query:
+        return error_response('Indica el texto de la búsqueda.')
+    
+    results = current_app.extensions['search'].search(
+        current_user.id, query, limit=max(1, min(limit, MAX_SEARCH_SIZE))
+    )
+    return json_response({'data': results})
+
+@api.route('/entries/<int:entry_id>/similar', methods=['GET'])
+@api_login_required
+def entry_similar(entry_id):
+    """Entradas cuyo contenido se parece más al de una entrada (búsqueda semántica)."""
+    try:
+        limit = _int_arg('limit') or DEFAULT_SEARCH_SIZE
+    except ValueError as e:
+        return error_response(str(e))
+    
+    results = current_app.extensions['search'].similar(
+        current_user.id, entry_id, limit=max(1, min(limit, MAX_SEARCH_SIZE))
+    )
+    if results is None:
+        return error_response('Entrada no encontrada.', 404)
+    return json_response({'data': results})
+
+@api.route('/entries/<int:entry_id>', methods=['GET'])
+@api_login_required
+@conditional()
+def get_entry(entry_id):
+    """Obtiene una entrada del usuario."""
+    try:
+        fields = parse_fields(request.args.get('fields'), ENTRY_FIELDS, ENTRY_FIELDS)
+    except ValueError as e:
+        return error_response(str(e))
+    
+    entry = entry_service.get_entry(current_user.id, entry_id, fields=fields)
+    if entry is None:
+        return error_response('La entrada no existe.', 404)
+    return json_response({'data': entry})
+
+@api.route('/entries/<int:entry_id>', methods=['PATCH'])
+@api_login_required
+def update_entry(entry_id):
+    """
+    Actualiza solo los campos enviados si la entrada sigue en la versión indicada.
+    
+    Cuerpo: `{"version": 3, "content": "..."}`. Con `?autosave=1` y la cabecera
+    `X-Editor-Id` (identifica al dispositivo que edita) los cambios se agrupan con
+    los siguientes y se responde 202; si no, se escriben al momento.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return error_response('El cuerpo de la petición debe ser un objeto JSON.')
+    
+    data = dict(data)
+    version = data.pop('version', None)
+    try:
+        result = current_app.extensions['autosave'].save(
+            current_user.id,
+            entry_id,
+            version,
+            data,
+            editor=request.headers.get('X-Editor-Id'),
+            defer=request.args.get('autosave') in ('1', 'true')
+        )
+    except VersionConflictError as e:
+        return json_response({'error': str(e), 'current': e.current, 'unsaved': e.unsaved}, status=409)
+    except ValueError as e:
+        return error_response(str(e))
+    except SQLAlchemyError as e:
+        current_app.logger.error(f"Error al actualizar la entrada {entry_id}: {str(e)}")
+        return error_response('No se pudo guardar la entrada.', 500)
+    
+    if result is None:
+        return error_response('La entrada no existe.', 404)
+    return json_response({'data': result}, status=202 if result['pending'] else 200)
+
+@api.route('/collections', methods=['GET'])
+@api_login_required
+@conditional()
+def list_collections():
+    """Lista las colecciones del usuario."""
+    try:
+        fields = parse_fields(request.args.get('fields'), COLLECTION_FIELDS, COLLECTION_FIELDS)
+    except ValueError as e:
+        return error_response(str(e))
+    
+    return json_response({'data': collection_service.list_collections(current_user.id, fields=fields)})
+
+@api.route('/collections/<int:collection_id>/image', methods=['PUT'])
+@api_login_required
+def upload_collection_image(collection_id):
+    """
+    Sube la imagen de portada de una colección.
+    
+    El cuerpo de la petición es la imagen (JPEG, PNG, WebP o GIF), no un formulario:
+    se copia a disco por bloques sin cargarla entera en memoria.
+    """
+    if not collection_service.exists(current_user.id, collection_id):
+        return error_response('La colección no existe.', 404)
+    
+    try:
+        name = current_app.extensions['images'].save(request.stream, request.content_length)
+    except ImageTooLargeError as e:
+        return error_response(str(e), 413)
+    except ValueError as e:
+        return error_response(str(e))
+    
+    result = collection_service.set_image(current_user.id, collection_id, name)
+    if result is None:
+        return error_response('La colección no existe.', 404)
+    return json_response({'data': dict(result, images=image_urls(name))})
+
+@api.route('/collections/<int:collection_id>/image', methods=['DELETE'])
+@api_login_required
+def delete_collection_image(collection_id):
+    """Quita la imagen de portada de una colección (el fichero se borra con `flask images prune`)."""
+    result = collection_service.set_image(current_user.id, collection_id, None)
+    if result is None:
+        return error_response('La colección no existe.', 404)
+    return json_response({'data': result})
+
+@api.route('/collections/autocomplete', methods=['GET'])
+@api_login_required
+def autocomplete_collections():
+    """Colecciones cuyo nombre empieza por `q` (sin distinguir mayúsculas)."""
+    return _autocomplete('collections')
+
+@api.route('/tags', methods=['GET'])
+@api_login_required
+@conditional()
+def list_tags():
+    """Lista las etiquetas del usuario."""
+    try:
+        fields = parse_fields(request.args.get('fields'), TAG_FIELDS, TAG_FIELDS)
+    except ValueError as e:
+        return error_response(str(e))
+    
+    return json_response({'data': tag_service.list_tags(current_user.id, fields=fields)})
+
+@api.route('/tags/autocomplete', methods=['GET'])
+@api_login_required
+def autocomplete_tags():
+    """Etiquetas cuyo nombre empieza por `q` (sin distinguir mayúsculas)."""
+    return _autocomplete('tags')
+
+def _autocomplete(kind):
+    """Respuesta común de los endpoints de autocompletado."""
+    try:
+        limit = _int_arg('limit') or DEFAULT_AUTOCOMPLETE_SIZE
+    except ValueError as e:
+        return error_response(str(e))
+    
+    results = current_app.extensions['autocomplete'].complete(
+        current_user.id,
+        kind,
+        request.args.get('q', ''),
+        limit=max(1, min(limit, MAX_AUTOCOMPLETE_SIZE))
+    )
+    return json_response({'data': results})
+
+@api.route('/sync', methods=['GET'])
+@api_login_required
+def sync():
+    """
+    Devuelve los cambios posteriores al token `since` (todo si no se indica).
+    
+    Mientras `has_more` sea verdadero, el cliente debe volver a llamar con `next_token`.
+    Con `wait` (segundos, hasta `MAX_SYNC_WAIT`), si no hay cambios se espera a que
+    los haya antes de responder (long polling).
+    """
+    try:
+        limit = max(1, min(_int_arg('limit') or DEFAULT_SYNC_PAGE_SIZE, MAX_SYNC_PAGE_SIZE))
+        wait = max(0, min(_int_arg('wait') or 0, MAX_SYNC_WAIT))
+        token = request.args.get('since')
+        if not wait:
+            return json_response(sync_service.changes_since(current_user.id, token=token, limit=limit))
+        
+        # Suscribirse antes de consultar: un cambio confirmado entre medias no se pierde
+        broker = current_app.extensions['events']
+        user_id = current_user.id
+        subscriber = broker.subscribe(user_id)
+        try:
+            changes = sync_service.changes_since(user_id, token=token, limit=limit)
+            window = current_app.config['SYNC_SAFETY_WINDOW']
+            deadline = time.monotonic() + wait
+            while not sync_service.has_changes(changes) and time.monotonic() < deadline:
+                # La espera no debe retener una conexión de la base de datos
+                db.session.close()
+                step = max(0.0, min(max(window, 1.0), deadline - time.monotonic()))
+                try:
+                    subscriber.get(timeout=step)
+                    # Las filas recién confirmadas se envían cuando pasan el margen de seguridad
+                    time.sleep(max(0.0, min(window, deadline - time.monotonic())))
+                except queue.Empty:
+                    pass
+                changes = sync_service.changes_since(user_id, token=token, limit=limit)
+        finally:
+            broker.unsubscribe(user_id, subscriber)
+    except ValueError as e:
+        return error_response(str(e))
+    
+    return json_response(changes)
+
+@api.route('/stats', methods=['GET'])
+@api_login_required
+def stats():
+    """
+    Estadísticas de actividad de los últimos `days` días (leídas de los resúmenes diarios).
+    
+    Parámetros: `days`.
+    """
+    try:
+        days = _int_arg('days') or DEFAULT_STATS_DAYS
+    except ValueError as e:
+        return error_response(str(e))
+    
+    return json_response({'data': stats_service.user_stats(current_user.id, days=max(1, min(days, MAX_STATS_DAYS)))})
+
+@api.route('/events', methods=['GET'])
+@api_login_required
+def events():
+    """
+    Canal server-sent events con los cambios del usuario.
+    
+    Cada evento `change` lleva los IDs modificados por tipo; el cliente los obtiene
+    con `/sync`. Las conexiones por worker están limitadas (`EVENTS_MAX_CONNECTIONS`).
+    """
+    slots = current_app.extensions['events_slots']
+    if not slots.acquire(blocking=False):
+        response = error_response('Demasiadas conexiones abiertas; inténtalo más tarde.', 503)
+        response.headers['Retry-After'] = str(EVENTS_HEARTBEAT)
+        return response
+    
+    broker = current_app.extensions['events']
+    user_id = current_user.id
+    subscriber = broker.subscribe(user_id)
+    # La conexión puede durar horas: no debe retener una conexión de la base de datos
+    db.session.close()
+    
+    def stream():
+        yield f'retry: {EVENTS_HEARTBEAT * 1000}\n\n'
+        while True:
+            try:
+                changes = subscriber.get(timeout=EVENTS_HEARTBEAT)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            yield f"event: change\ndata: {dumps(changes).decode('utf-8')}\n\n"
+    
+    def release():
+        broker.unsubscribe(user_id, subscriber)
+        slots.release()
+    
+    response = current_app.response_class(stream(), mimetype='text/event-stream')
+    # Se libera al cerrar la respuesta, aunque el flujo no llegue a empezar
+    response.call_on_close(release)
+    response.headers['Cache-Control'] = 'no-cache'
+    # Evita que nginx acumule el flujo antes de enviarlo
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,113 @@
+"""
+Versiones asíncronas (modo ASGI) de las rutas de la API que pasan el tiempo esperando.
+
+Responden igual que sus equivalentes de `app.views.api`, que siguen atendiendo
+las peticiones cuando la aplicación se sirve con WSGI.
+"""
+
+import asyncio
+import time
+
+from app.utils.events import AsyncSubscriber
+from app.utils.serialization import dumps
+from app.views.api import (DEFAULT_SYNC_PAGE_SIZE, EVENTS_HEARTBEAT, MAX_SYNC_PAGE_SIZE, MAX_SYNC_WAIT,
+                           sync_service)
+
+def register_async_routes(server):
+    """
+    Registra las rutas asíncronas en la aplicación ASGI.
+    
+    Args:
+        server (AsgiApp): Aplicación ASGI (ver `app.utils.asgi`).
+    """
+    # Conexiones de eventos abiertas en este proceso
+    open_streams = [0]
+    
+    @server.route('/api/v1/sync')
+    async def sync(request):
+        """Sincronización incremental con long polling (`wait`) sin ocupar un hilo."""
+        user_id = await request.user_id()
+        if user_id is None:
+            return await request.error('Autenticación requerida.', 401)
+        
+        app = request.app
+        try:
+            limit = max(1, min(request.int_arg('limit') or DEFAULT_SYNC_PAGE_SIZE, MAX_SYNC_PAGE_SIZE))
+            wait = max(0, min(request.int_arg('wait') or 0, MAX_SYNC_WAIT))
+            token = request.args.get('since')
+            
+            with app.app_context():
+                subscriber = None
+                if wait:
+                    # Suscribirse antes de consultar: un cambio confirmado entre medias no se pierde
+                    subscriber = app.extensions['events'].subscribe(
+                        user_id, AsyncSubscriber(app.config['EVENTS_QUEUE_SIZE'])
+                    )
+                try:
+                    changes = await _changes(server, user_id, token, limit)
+                    window = app.config['SYNC_SAFETY_WINDOW']
+                    deadline = time.monotonic() + wait
+                    while not sync_service.has_changes(changes) and time.monotonic() < deadline:
+                        try:
+                            await subscriber.get(timeout=min(max(window, 1.0), deadline - time.monotonic()))
+                            # Las filas recién confirmadas se envían cuando pasan el margen de seguridad
+                            await asyncio.sleep(max(0.0, min(window, deadline - time.monotonic())))
+                        except asyncio.TimeoutError:
+                            pass
+                        changes = await _changes(server, user_id, token, limit)
+                finally:
+                    if subscriber is not None:
+                        app.extensions['events'].unsubscribe(user_id, subscriber)
+        except ValueError as e:
+            return await request.error(str(e))
+        
+        await request.json(changes)
+    
+    @server.route('/api/v1/events')
+    async def events(request):
+        """Canal server-sent events: cada conexión abierta es una corrutina en espera, no un hilo."""
+        user_id = await request.user_id()
+        if user_id is None:
+            return await request.error('Autenticación requerida.', 401)
+        
+        app = request.app
+        if open_streams[0] >= app.config['ASYNC_EVENTS_MAX_CONNECTIONS']:
+            return await request.error('Demasiadas conexiones abiertas; inténtalo más tarde.', 503,
+                                       headers={'Retry-After': EVENTS_HEARTBEAT})
+        
+        broker = app.extensions['events']
+        subscriber = broker.subscribe(user_id, AsyncSubscriber(app.config['EVENTS_QUEUE_SIZE']))
+        open_streams[0] += 1
+        disconnected = asyncio.ensure_future(request.disconnected())
+        try:
+            await request.start(200, 'text/event-stream', {
+                'Cache-Control': 'no-cache',
+                # Evita que nginx acumule el flujo antes de enviarlo
+                'X-Accel-Buffering': 'no',
+            })
+            await request.write(f'retry: {EVENTS_HEARTBEAT * 1000}\n\n'.encode('utf-8'))
+            while not disconnected.done():
+                received = asyncio.ensure_future(subscriber.get())
+                done, _ = await asyncio.wait({received, disconnected}, timeout=EVENTS_HEARTBEAT,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if received in done:
+                    changes = received.result()
+                    await request.write(f"event: change\ndata: {dumps(changes).decode('utf-8')}\n\n".encode('utf-8'))
+                else:
+                    received.cancel()
+                    if not disconnected.done():
+                        await request.write(b': keepalive\n\n')
+        except OSError:
+            # El cliente cerró la conexión mientras se escribía
+            pass
+        finally:
+            disconnected.cancel()
+            broker.unsubscribe(user_id, subscriber)
+            open_streams[0] -= 1
+    
+    return server
+
+async def _changes(server, user_id, token, limit):
+    """Una página de cambios leída con el engine asíncrono."""
+    async with server.engine.connect() as connection:
+        return await sync_service.changes_since_async(connection, user_id, token=token, limit=limit)
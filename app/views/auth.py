@@ -4,10 +4,12 @@ from flask_security.utils import login_user, logout_user, verify_password, hash_
 from flask_security.decorators import anonymous_user_required
 from datetime import datetime
 
+from app import db
 from app.forms.auth_forms import LoginForm, RegistrationForm, RequestResetPasswordForm, ResetPasswordForm
-from app.services.user_service import UserService
+from app.services.user_service import UserService, UserExistsError
 from app.services.email_service import send_password_reset_email, send_confirmation_email
 from app.utils.security import limiter
+from app.utils.serialization import json_response
 
 auth = Blueprint('auth', __name__, url_prefix='/auth')
 user_service = UserService()
@@ -58,31 +60,61 @@ def register():
     form = RegistrationForm()
     
     if form.validate_on_submit():
-        # Verificar si ya existe el correo o nombre de usuario
-        if user_service.get_user_by_email(form.email.data):
+        # Verificar si ya existe el correo o nombre de usuario (filtro de Bloom y, si hace falta, una consulta)
+        taken = current_app.extensions['availability'].taken(form.username.data, form.email.data)
+        
+        # Crear nuevo usuario; las restricciones únicas resuelven los registros simultáneos
+        if not taken:
+            try:
+                user = user_service.create_user(
+                    username=form.username.data,
+                    email=form.email.data,
+                    password=form.password.data,
+                    is_verified=False
+                )
+            except UserExistsError as e:
+                taken = e.fields
+        
+        if 'email' in taken:
             flash('Este correo electrónico ya está registrado.', 'error')
             return render_template('auth/register.html', form=form, now=datetime.now())
             
-        if user_service.get_user_by_username(form.username.data):
+        if 'username' in taken:
             flash('Este nombre de usuario ya está en uso.', 'error')
             return render_template('auth/register.html', form=form, now=datetime.now())
         
-        # Crear nuevo usuario
-        user = user_service.create_user(
-            username=form.username.data,
-            email=form.email.data,
-            password=form.password.data,
-            is_verified=False
-        )
-        
-        # Enviar correo de confirmación
+        # Enviar correo de confirmación (se encola al confirmar la sesión)
         send_confirmation_email(user)
+        db.session.commit()
         
         flash('Te has registrado correctamente. Por favor, revisa tu correo para verificar tu cuenta.', 'success')
         return redirect(url_for('auth.login'))
         
     return render_template('auth/register.html', form=form, now=datetime.now())
 
+@auth.route('/availability')
+@limiter.limit("60 per minute")
+def availability():
+    """
+    Indica si un nombre de usuario y/o un correo están libres (comprobación en vivo del registro).
+    
+    Los valores que el filtro de Bloom no conoce se responden sin consultar la base de datos.
+    """
+    username = (request.args.get('username') or '').strip()
+    email = (request.args.get('email') or '').strip()
+    if not username and not email:
+        return json_response({'error': 'Indica username o email.'}, status=400)
+    if len(username) > 64 or len(email) > 120:
+        return json_response({'error': 'El valor es demasiado largo.'}, status=400)
+    
+    taken = current_app.extensions['availability'].taken(username, email)
+    result = {}
+    if username:
+        result['username'] = 'username' not in taken
+    if email:
+        result['email'] = 'email' not in taken
+    return json_response(result)
+
 @auth.route('/confirm/<token>')
 def confirm_email(token):
     """Ruta para confirmar correo electrónico."""
@@ -117,6 +149,7 @@ def request_reset_password():
         
         if user:
             send_password_reset_email(user)
+            db.session.commit()
             
         # Siempre mostrar el mismo mensaje para evitar enumerar usuarios
         flash('Si tu correo está registrado, recibirás un enlace para restablecer tu contraseña.', 'info')
@@ -171,5 +204,6 @@ def resend_confirmation():
         return redirect(url_for('auth.login'))
         
     send_confirmation_email(user)
+    db.session.commit()
     flash('Se ha enviado un nuevo enlace de confirmación a tu correo electrónico.', 'success')
     return redirect(url_for('auth.login')) 
\ No newline at end of file
@@ -2,9 +2,12 @@ from flask import Blueprint, render_template, redirect, url_for
 from flask_login import current_user
 from datetime import datetime
 
+from app.utils.conditional import conditional
+
 main = Blueprint('main', __name__)
 
 @main.route('/')
+@conditional()
 def index():
     if not current_user.is_authenticated:
         return redirect(url_for('auth.login'))
@@ -0,0 +1,10 @@
+import os
+from dotenv import load_dotenv
+from app import create_app
+from app.utils.asgi import create_asgi_app
+
+load_dotenv()
+flask_app = create_app(os.getenv('FLASK_ENV') or 'default')
+
+# Servidor ASGI, p. ej.: uvicorn asgi:app --workers 4
+app = create_asgi_app(flask_app)
@@ -1,9 +1,15 @@
 import os
 from urllib.parse import quote_plus
+from sqlalchemy.engine import make_url
 from dotenv import load_dotenv
 
 load_dotenv()
 
+def _worker_database_uri(uri, worker):
+    """Añade el sufijo del worker de pytest-xdist al nombre de la base de datos."""
+    url = make_url(uri)
+    return url.set(database=f"{url.database}_{worker}").render_as_string(hide_password=False)
+
 class Config:
     # Configuración general
     SECRET_KEY = os.environ.get('SECRET_KEY')
@@ -12,6 +18,83 @@ class Config:
     
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Limitación de tasa (Flask-Limiter); solo debe desactivarse en entornos de pruebas de carga
+    RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', 'true').lower() in ['true', 'on', '1']
+    
+    # Compresión de respuestas dinámicas (ver app/utils/compression.py)
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    COMPRESS_LEVEL = int(os.environ.get('COMPRESS_LEVEL', '6'))
+    COMPRESS_BR_QUALITY = int(os.environ.get('COMPRESS_BR_QUALITY', '4'))
+    COMPRESS_MIN_SIZE = int(os.environ.get('COMPRESS_MIN_SIZE', '500'))
+    
+    # Versión desplegada; forma parte de los ETag para invalidarlos al cambiar las plantillas
+    ETAG_VERSION = os.environ.get('APP_VERSION', '')
+    
+    # Margen (segundos) que la sincronización deja a las transacciones en curso
+    SYNC_SAFETY_WINDOW = int(os.environ.get('SYNC_SAFETY_WINDOW', '5'))
+    
+    # Notificaciones de cambios: 'local' (un solo proceso) o 'postgres' (LISTEN/NOTIFY entre workers)
+    EVENTS_BROKER = os.environ.get('EVENTS_BROKER', 'local')
+    EVENTS_MAX_CONNECTIONS = int(os.environ.get('EVENTS_MAX_CONNECTIONS', '100'))
+    
+    # Sesiones: 'cookie' (firmada, por defecto), 'sqlite' o 'filesystem' (en el servidor, con
+    # solo el identificador en la cookie) y ruta de la tienda (por defecto, en instance/)
+    SESSION_BACKEND = os.environ.get('SESSION_BACKEND', 'cookie')
+    SESSION_STORE_PATH = os.environ.get('SESSION_STORE_PATH')
+    
+    # Roles y permisos: usuarios cuyos roles se cachean por worker y segundos antes de releerlos
+    PERMISSIONS_CACHE_USERS = int(os.environ.get('PERMISSIONS_CACHE_USERS', '10000'))
+    PERMISSIONS_CACHE_TTL = int(os.environ.get('PERMISSIONS_CACHE_TTL', '300'))
+    
+    # Disponibilidad de nombres de usuario y correos: falsos positivos del filtro de Bloom y
+    # segundos tras los que se reconstruye (para ver los usuarios creados en otros workers)
+    AVAILABILITY_ERROR_RATE = float(os.environ.get('AVAILABILITY_ERROR_RATE', '0.01'))
+    AVAILABILITY_REFRESH = int(os.environ.get('AVAILABILITY_REFRESH', '3600'))
+    
+    # Inicios de sesión: segundos entre escrituras agrupadas de last_login y login_count (0: al momento)
+    LOGIN_TRACKING_INTERVAL = float(os.environ.get('LOGIN_TRACKING_INTERVAL', '5'))
+    
+    # Autoguardado: segundos sin cambios antes de escribir y espera máxima con cambios continuos
+    AUTOSAVE_DEBOUNCE = float(os.environ.get('AUTOSAVE_DEBOUNCE', '2'))
+    AUTOSAVE_MAX_DELAY = float(os.environ.get('AUTOSAVE_MAX_DELAY', '10'))
+    
+    # Autocompletado: listas de nombres en memoria por worker y segundos antes de recargarlas
+    AUTOCOMPLETE_CACHE_USERS = int(os.environ.get('AUTOCOMPLETE_CACHE_USERS', '1000'))
+    AUTOCOMPLETE_CACHE_TTL = int(os.environ.get('AUTOCOMPLETE_CACHE_TTL', '300'))
+    
+    # Entradas relacionadas: matrices de etiquetas en memoria por worker y segundos antes de reconstruirlas
+    RELATED_CACHE_USERS = int(os.environ.get('RELATED_CACHE_USERS', '200'))
+    RELATED_CACHE_TTL = int(os.environ.get('RELATED_CACHE_TTL', '3600'))
+    
+    # Firmas MinHash de las entradas al guardarlas (detección de casi duplicados)
+    DEDUP_ENABLED = os.environ.get('DEDUP_ENABLED', 'true').lower() in ['true', 'on', '1']
+    
+    # Índices de la búsqueda semántica (por defecto, en el directorio instance/ de la aplicación)
+    SEMANTIC_INDEX_DIR = os.environ.get('SEMANTIC_INDEX_DIR')
+    SEMANTIC_CACHE_USERS = int(os.environ.get('SEMANTIC_CACHE_USERS', '50'))
+    
+    # Imágenes de portada subidas (por defecto, en el directorio instance/ de la aplicación)
+    IMAGE_STORAGE_DIR = os.environ.get('IMAGE_STORAGE_DIR')
+    IMAGE_MAX_BYTES = int(os.environ.get('IMAGE_MAX_BYTES', str(10 * 1024 * 1024)))
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', '2'))
+    
+    # Cola de tareas: espera antes del primer reintento, espera máxima y segundos tras
+    # los que una tarea en curso se da por abandonada (worker caído)
+    JOB_RETRY_DELAY = int(os.environ.get('JOB_RETRY_DELAY', '10'))
+    JOB_MAX_RETRY_DELAY = int(os.environ.get('JOB_MAX_RETRY_DELAY', '3600'))
+    JOB_LOCK_TIMEOUT = int(os.environ.get('JOB_LOCK_TIMEOUT', '600'))
+    
+    # Modo ASGI (asgi.py): URL de la base de datos con driver asíncrono (por defecto, la de
+    # SQLALCHEMY_DATABASE_URI con asyncpg o aiosqlite), su pool, conexiones de eventos por
+    # proceso e hilos que atienden las rutas de Flask
+    ASYNC_DATABASE_URI = os.environ.get('ASYNC_DATABASE_URI')
+    ASYNC_DATABASE_POOL_SIZE = int(os.environ.get('ASYNC_DATABASE_POOL_SIZE', '10'))
+    ASYNC_EVENTS_MAX_CONNECTIONS = int(os.environ.get('ASYNC_EVENTS_MAX_CONNECTIONS', '10000'))
+    ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', '10'))
+    
+    # Resúmenes diarios de actividad al guardar entradas (estadísticas)
+    ACTIVITY_ROLLUPS_ENABLED = os.environ.get('ACTIVITY_ROLLUPS_ENABLED', 'true').lower() in ['true', 'on', '1']
+    
     SECURITY_PASSWORD_SALT = os.environ.get('SECURITY_PASSWORD_SALT')
     if not SECURITY_PASSWORD_SALT:
         raise ValueError("No SECURITY_PASSWORD_SALT configurada. Esta variable es obligatoria.")
@@ -42,7 +125,21 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     TESTING = True
     DB_NAME = os.environ.get('TEST_DB_NAME', 'eureka_test')
-    SQLALCHEMY_DATABASE_URI = f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD_ENCODED}@{Config.DB_HOST}:{Config.DB_PORT}/{DB_NAME}"
+    # TEST_DATABASE_URL permite apuntar a una base desechable (p. ej. sqlite:// para benchmarks locales)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL') or \
+        f"postgresql://{Config.DB_USER}:{Config.DB_PASSWORD_ENCODED}@{Config.DB_HOST}:{Config.DB_PORT}/{DB_NAME}"
+    
+    # Con pytest-xdist cada worker (gw0, gw1, ...) usa su propia base de datos PostgreSQL;
+    # SQLite en memoria ya es independiente en cada proceso
+    XDIST_WORKER = os.environ.get('PYTEST_XDIST_WORKER')
+    if XDIST_WORKER and SQLALCHEMY_DATABASE_URI.startswith('postgresql'):
+        SQLALCHEMY_DATABASE_URI = _worker_database_uri(SQLALCHEMY_DATABASE_URI, XDIST_WORKER)
+    
+    # Hash bcrypt con el coste mínimo: las pruebas no necesitan resistir fuerza bruta
+    BCRYPT_LOG_ROUNDS = 4
+    
+    # Inicios de sesión escritos al momento, sin hilo de fondo
+    LOGIN_TRACKING_INTERVAL = 0
     
     # Configuraciones para construcción de URLs en tests
     SERVER_NAME = 'localhost:5000'
@@ -4,6 +4,7 @@ from logging.config import fileConfig
 from flask import current_app
 
 from alembic import context
+from sqlalchemy import create_engine, pool
 
 # Importar los modelos explícitamente
 from app.models import User, Collection, Entry, Tag, EntryTag
@@ -27,7 +28,14 @@ def get_engine():
         return current_app.extensions['migrate'].db.engine
 
 
+def get_x_database_url():
+    # permite migrar otra base de datos con `-x dburl=...` (p. ej. la plantilla de los tests)
+    return context.get_x_argument(as_dictionary=True).get('dburl')
+
+
 def get_engine_url():
+    if get_x_database_url():
+        return get_x_database_url().replace('%', '%%')
     try:
         return get_engine().url.render_as_string(hide_password=False).replace(
             '%', '%%')
@@ -97,7 +105,14 @@ def run_migrations_online():
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
 
-    connectable = get_engine()
+    # una transacción por migración: los índices concurrentes y los backfills por
+    # lotes (app/utils/migrations.py) solo confirman su propia migración
+    conf_args.setdefault("transaction_per_migration", True)
+
+    if get_x_database_url():
+        connectable = create_engine(get_x_database_url(), poolclass=pool.NullPool)
+    else:
+        connectable = get_engine()
 
     with connectable.connect() as connection:
         context.configure(
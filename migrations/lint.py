@@ -0,0 +1,202 @@
+"""
+Linter de migraciones: operaciones que bloquean las tablas grandes.
+
+Analiza el código de las migraciones sin ejecutarlo ni importar la aplicación
+(solo la biblioteca estándar), de modo que `scripts/lint_migrations.py` puede
+ejecutarse sin configuración (`SECRET_KEY`, base de datos...). Las alternativas
+que recomiendan los avisos están en `app.utils.migrations`.
+"""
+
+import ast
+import re
+from collections import namedtuple
+
+# Tablas que crecen con el número de entradas o de usuarios
+LARGE_TABLES = frozenset({
+    'users', 'entries', 'entry_tags', 'entry_signatures', 'entry_lsh_buckets',
+    'entry_activity', 'daily_activity', 'daily_tag_activity', 'jobs',
+})
+
+# Comentario que acepta un aviso del linter en su línea
+LINT_IGNORE = 'lint-migrations: ignore'
+
+# Aviso del linter: línea de la migración y descripción
+LintIssue = namedtuple('LintIssue', ['line', 'message'])
+
+# Argumentos de cada operación de Alembic (`op.*`) que indican las tablas afectadas.
+# Dentro de `batch_alter_table` la tabla es la del bloque y estos argumentos no existen.
+_TABLE_ARGUMENTS = {
+    'create_index': ((1, 'table_name'),),
+    'add_column': ((0, 'table_name'),),
+    'alter_column': ((0, 'table_name'),),
+    'create_primary_key': ((1, 'table_name'),),
+    'create_unique_constraint': ((1, 'table_name'),),
+    'create_check_constraint': ((1, 'table_name'),),
+    'create_foreign_key': ((1, 'source_table'), (2, 'referent_table')),
+}
+
+_CONSTRAINTS = {
+    'create_primary_key': 'clave primaria',
+    'create_unique_constraint': 'restricción única',
+    'create_check_constraint': 'restricción CHECK',
+    'create_foreign_key': 'clave foránea',
+}
+
+_SQL_CREATE_INDEX = re.compile(r'\bCREATE\s+(?:UNIQUE\s+)?INDEX\s+(?!CONCURRENTLY)(?:IF\s+NOT\s+EXISTS\s+)?\w+\s+ON\s+(?:ONLY\s+)?"?(\w+)', re.I)
+_SQL_UPDATE = re.compile(r'\b(UPDATE|DELETE\s+FROM)\s+"?(\w+)', re.I)
+_SQL_ALTER = re.compile(r'\bALTER\s+TABLE\s+(?:IF\s+EXISTS\s+)?(?:ONLY\s+)?"?(\w+)"?\s+([^;]*)', re.I)
+
+def lint_migration(source, large_tables=LARGE_TABLES):
+    """
+    Busca en el `upgrade()` de una migración operaciones que bloquean tablas grandes.
+    
+    Detecta índices creados sin CONCURRENTLY, columnas NOT NULL sin valor por
+    defecto, cambios de tipo o de nulabilidad, restricciones que se validan
+    recorriendo la tabla y UPDATE/DELETE de toda una tabla. Los avisos de una línea
+    con el comentario `# lint-migrations: ignore` se omiten.
+    
+    Args:
+        source (str): Código de la migración.
+        large_tables (set): Tablas que se consideran grandes.
+    
+    Returns:
+        list: Avisos (`LintIssue`) en orden de línea.
+    """
+    tree = ast.parse(source)
+    upgrade = next((node for node in tree.body if isinstance(node, ast.FunctionDef) and node.name == 'upgrade'), None)
+    if upgrade is None:
+        return []
+    
+    linter = _MigrationLinter(large_tables)
+    linter.visit(upgrade)
+    
+    ignored = {number for number, line in enumerate(source.splitlines(), 1) if LINT_IGNORE in line}
+    return sorted((issue for issue in linter.issues if issue.line not in ignored), key=lambda issue: issue.line)
+
+class _MigrationLinter(ast.NodeVisitor):
+    """Recorre el cuerpo de `upgrade()` anotando las operaciones que bloquean tablas grandes."""
+    
+    def __init__(self, large_tables):
+        self.large_tables = large_tables
+        self.issues = []
+        # Variable de cada bloque `with op.batch_alter_table(...) as batch_op` -> tabla
+        self.batch_tables = {}
+        # Tablas creadas en la propia migración: están vacías y no hay nada que bloquear
+        self.created_tables = set()
+    
+    def visit_With(self, node):
+        for item in node.items:
+            call = item.context_expr
+            if (isinstance(call, ast.Call) and _operation(call) == ('op', 'batch_alter_table')
+                    and isinstance(item.optional_vars, ast.Name)):
+                self.batch_tables[item.optional_vars.id] = _literal(_argument(call, 0, 'table_name'))
+        self.generic_visit(node)
+    
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        operation = _operation(node)
+        if operation is None:
+            return
+        owner, name = operation
+        
+        if owner == 'op' and name == 'execute':
+            self._lint_sql(node)
+            return
+        if owner == 'op' and name == 'create_table':
+            self.created_tables.add(_literal(_argument(node, 0, 'table_name')))
+            return
+        if owner in self.batch_tables:
+            # Dentro de un bloque batch la tabla es la del bloque y no se pasa como argumento
+            tables = [self.batch_tables[owner]]
+            column_position = 0
+        elif owner == 'op' and name in _TABLE_ARGUMENTS:
+            tables = [_literal(_argument(node, position, keyword)) for position, keyword in _TABLE_ARGUMENTS[name]]
+            column_position = 1
+        else:
+            return
+        table = next((table for table in tables
+                      if table in self.large_tables and table not in self.created_tables), None)
+        if table is not None:
+            self._lint_operation(node, name, table, column_position)
+    
+    def _warn(self, node, message):
+        self.issues.append(LintIssue(node.lineno, message))
+    
+    def _lint_operation(self, call, name, table, column_position):
+        """Revisa una operación de Alembic sobre una tabla grande."""
+        if name == 'create_index':
+            if not _is_true(_keyword(call, 'postgresql_concurrently')):
+                self._warn(call, f"create_index en '{table}' bloquea las escrituras mientras se construye: "
+                                 f"usa create_index_concurrently")
+        elif name == 'add_column':
+            column = _argument(call, column_position, 'column')
+            if (isinstance(column, ast.Call) and _is_false(_keyword(column, 'nullable'))
+                    and _keyword(column, 'server_default') is None):
+                self._warn(call, f"add_column NOT NULL sin server_default en '{table}': falla si hay filas; "
+                                 f"añádela nullable, rellénala con backfill y después hazla NOT NULL")
+        elif name == 'alter_column':
+            if _keyword(call, 'type_') is not None:
+                self._warn(call, f"alter_column con type_ en '{table}' puede reescribir la tabla con un "
+                                 f"bloqueo exclusivo")
+            if _is_false(_keyword(call, 'nullable')):
+                self._warn(call, f"alter_column nullable=False en '{table}' recorre la tabla con un bloqueo "
+                                 f"exclusivo: valida antes un CHECK (... IS NOT NULL) NOT VALID")
+        elif name in _CONSTRAINTS and not _is_true(_keyword(call, 'postgresql_not_valid')):
+            self._warn(call, f"{name} en '{table}' valida la {_CONSTRAINTS[name]} recorriendo la tabla con un "
+                             f"bloqueo: créala NOT VALID y valídala aparte, o sobre un índice creado con "
+                             f"create_index_concurrently")
+    
+    def _lint_sql(self, call):
+        """Revisa el SQL literal de `op.execute`."""
+        sql = _literal(_argument(call, 0, 'sqltext'))
+        if not isinstance(sql, str):
+            return
+        
+        for match in _SQL_CREATE_INDEX.finditer(sql):
+            if match.group(1) in self.large_tables - self.created_tables:
+                self._warn(call, f"CREATE INDEX en '{match.group(1)}' sin CONCURRENTLY: usa "
+                                 f"create_index_concurrently")
+        for match in _SQL_UPDATE.finditer(sql):
+            if match.group(2) in self.large_tables:
+                self._warn(call, f"{match.group(1).split()[0].upper()} de '{match.group(2)}' en una sola "
+                                 f"transacción: usa backfill")
+        for match in _SQL_ALTER.finditer(sql):
+            table, clause = match.group(1), match.group(2).upper()
+            if table not in self.large_tables:
+                continue
+            if (re.search(r'\bADD\s+(CONSTRAINT|PRIMARY|UNIQUE|FOREIGN|CHECK)\b', clause)
+                    and 'NOT VALID' not in clause and 'USING INDEX' not in clause):
+                self._warn(call, f"ALTER TABLE '{table}' añade una restricción validándola con un bloqueo: "
+                                 f"usa NOT VALID y VALIDATE CONSTRAINT")
+            if re.search(r'\bTYPE\b|\bSET\s+NOT\s+NULL\b', clause):
+                self._warn(call, f"ALTER TABLE '{table}' recorre o reescribe la tabla con un bloqueo exclusivo")
+
+def _operation(call):
+    """('op' o la variable del bloque batch, nombre de la operación) de una llamada, o None."""
+    function = call.func
+    if isinstance(function, ast.Attribute) and isinstance(function.value, ast.Name):
+        return function.value.id, function.attr
+    return None
+
+def _argument(call, position, keyword):
+    """Argumento de una llamada por posición o por nombre."""
+    if 0 <= position < len(call.args):
+        return call.args[position]
+    return _keyword(call, keyword)
+
+def _keyword(call, name):
+    return next((keyword.value for keyword in call.keywords if keyword.arg == name), None)
+
+def _literal(node):
+    """Valor de un literal (o de `sa.text('...')`), o None."""
+    if isinstance(node, ast.Call) and node.args and _operation(node) in (('sa', 'text'), ('sqlalchemy', 'text')):
+        node = node.args[0]
+    if isinstance(node, ast.Constant):
+        return node.value
+    return None
+
+def _is_true(node):
+    return isinstance(node, ast.Constant) and node.value is True
+
+def _is_false(node):
+    return isinstance(node, ast.Constant) and node.value is False
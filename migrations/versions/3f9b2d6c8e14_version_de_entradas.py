@@ -0,0 +1,26 @@
+"""Columna version en entries para el control de concurrencia optimista
+
+Revision ID: 3f9b2d6c8e14
+Revises: 8c3e5a1f2d47
+Create Date: 2026-10-19 13:05:47.902316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9b2d6c8e14'
+down_revision = '8c3e5a1f2d47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,31 @@
+"""Índices (user_id, updated_at, id) para la sincronización incremental
+
+Revision ID: 8c3e5a1f2d47
+Revises: 15b4936e92b8
+Create Date: 2026-10-19 10:12:31.418205
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3e5a1f2d47'
+down_revision = '15b4936e92b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY: no bloquea las escrituras mientras se construyen
+    create_index_concurrently('idx_entry_user_updated', 'entries', ['user_id', 'updated_at', 'id'])
+    create_index_concurrently('idx_collection_user_updated', 'collections', ['user_id', 'updated_at', 'id'])
+    create_index_concurrently('idx_tag_user_updated', 'tags', ['user_id', 'updated_at', 'id'])
+
+
+def downgrade():
+    drop_index_concurrently('idx_tag_user_updated', 'tags')
+    drop_index_concurrently('idx_collection_user_updated', 'collections')
+    drop_index_concurrently('idx_entry_user_updated', 'entries')
@@ -0,0 +1,26 @@
+"""Columna login_count en users para el registro agrupado de inicios de sesión
+
+Revision ID: a1d6f4c9e827
+Revises: f3b9d1e6a274
+Create Date: 2026-10-19 19:02:14.518203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a1d6f4c9e827'
+down_revision = 'f3b9d1e6a274'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('login_count', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('login_count')
@@ -0,0 +1,47 @@
+"""Clave primaria e índice en roles_users y permisos de los roles
+
+Revision ID: b5e3c8a1f694
+Revises: a1d6f4c9e827
+Create Date: 2026-10-19 19:41:08.236517
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b5e3c8a1f694'
+down_revision = 'a1d6f4c9e827'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # La tabla no tenía clave: se quitan las filas incompletas y las repetidas antes de crearla
+    op.execute('DELETE FROM roles_users WHERE user_id IS NULL OR role_id IS NULL')
+    if op.get_bind().dialect.name == 'postgresql':
+        op.execute('DELETE FROM roles_users a USING roles_users b '
+                   'WHERE a.ctid < b.ctid AND a.user_id = b.user_id AND a.role_id = b.role_id')
+    else:
+        op.execute('DELETE FROM roles_users WHERE rowid NOT IN '
+                   '(SELECT min(rowid) FROM roles_users GROUP BY user_id, role_id)')
+    
+    with op.batch_alter_table('roles_users', schema=None) as batch_op:
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('role_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key('roles_users_pkey', ['user_id', 'role_id'])
+        batch_op.create_index('idx_roles_users_role', ['role_id'], unique=False)
+    
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('permissions', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('roles', schema=None) as batch_op:
+        batch_op.drop_column('permissions')
+    
+    with op.batch_alter_table('roles_users', schema=None) as batch_op:
+        batch_op.drop_index('idx_roles_users_role')
+        batch_op.drop_constraint('roles_users_pkey', type_='primary')
+        batch_op.alter_column('role_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column('user_id', existing_type=sa.Integer(), nullable=True)
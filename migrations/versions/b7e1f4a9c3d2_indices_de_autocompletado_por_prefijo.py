@@ -0,0 +1,38 @@
+"""Índices (user_id, lower(name) text_pattern_ops) para el autocompletado
+
+Revision ID: b7e1f4a9c3d2
+Revises: 3f9b2d6c8e14
+Create Date: 2026-10-19 13:48:12.550173
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from app.utils.migrations import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7e1f4a9c3d2'
+down_revision = '3f9b2d6c8e14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # text_pattern_ops solo existe en PostgreSQL; en otras bases se usa la búsqueda sin índice
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    # CREATE INDEX CONCURRENTLY: no bloquea las escrituras mientras se construyen
+    create_index_concurrently('idx_tag_user_name_prefix', 'tags',
+                              ['user_id', sa.text('lower(name) text_pattern_ops')])
+    create_index_concurrently('idx_collection_user_name_prefix', 'collections',
+                              ['user_id', sa.text('lower(name) text_pattern_ops')])
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    drop_index_concurrently('idx_collection_user_name_prefix', 'collections')
+    drop_index_concurrently('idx_tag_user_name_prefix', 'tags')
@@ -0,0 +1,48 @@
+"""Tablas entry_signatures y entry_lsh_buckets para detectar casi duplicados
+
+Revision ID: d52a8e6f1b90
+Revises: b7e1f4a9c3d2
+Create Date: 2026-10-19 15:21:36.118402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd52a8e6f1b90'
+down_revision = 'b7e1f4a9c3d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('entry_signatures',
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('content_hash', sa.BigInteger(), nullable=False),
+    sa.Column('signature', sa.LargeBinary(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['entries.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('entry_id')
+    )
+    op.create_table('entry_lsh_buckets',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('band', sa.SmallInteger(), nullable=False),
+    sa.Column('bucket', sa.BigInteger(), nullable=False),
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['entry_id'], ['entries.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'band', 'bucket', 'entry_id')
+    )
+    with op.batch_alter_table('entry_lsh_buckets', schema=None) as batch_op:
+        batch_op.create_index('idx_lsh_bucket_entry', ['entry_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('entry_lsh_buckets', schema=None) as batch_op:
+        batch_op.drop_index('idx_lsh_bucket_entry')
+
+    op.drop_table('entry_lsh_buckets')
+    op.drop_table('entry_signatures')
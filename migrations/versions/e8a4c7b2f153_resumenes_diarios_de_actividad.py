@@ -0,0 +1,60 @@
+"""Tablas daily_activity, daily_tag_activity y entry_activity para las estadísticas
+
+Revision ID: e8a4c7b2f153
+Revises: d52a8e6f1b90
+Create Date: 2026-10-19 17:02:11.530284
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8a4c7b2f153'
+down_revision = 'd52a8e6f1b90'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('daily_activity',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('entries_created', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('entries_published', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('entries_deleted', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('words_written', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day')
+    )
+    op.create_table('daily_tag_activity',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.Column('uses', sa.Integer(), server_default='0', nullable=False),
+    sa.ForeignKeyConstraint(['tag_id'], ['tags.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('user_id', 'day', 'tag_id')
+    )
+    op.create_table('entry_activity',
+    sa.Column('entry_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('words', sa.Integer(), nullable=False),
+    sa.Column('published', sa.Boolean(), nullable=False),
+    sa.Column('deleted', sa.Boolean(), nullable=False),
+    sa.Column('tags_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['entry_id'], ['entries.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('entry_id')
+    )
+    with op.batch_alter_table('entry_activity', schema=None) as batch_op:
+        batch_op.create_index('idx_entry_activity_user', ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('entry_activity', schema=None) as batch_op:
+        batch_op.drop_index('idx_entry_activity_user')
+
+    op.drop_table('entry_activity')
+    op.drop_table('daily_tag_activity')
+    op.drop_table('daily_activity')
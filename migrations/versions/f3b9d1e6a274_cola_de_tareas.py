@@ -0,0 +1,49 @@
+"""Tabla jobs para la cola de tareas en segundo plano
+
+Revision ID: f3b9d1e6a274
+Revises: e8a4c7b2f153
+Create Date: 2026-10-19 18:10:42.907315
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3b9d1e6a274'
+down_revision = 'e8a4c7b2f153'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('queue', sa.String(length=50), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('payload', sa.JSON(), nullable=False),
+    sa.Column('priority', sa.SmallInteger(), server_default='0', nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('run_at', sa.DateTime(), nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), server_default='5', nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('locked_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.create_index('idx_job_pending', ['queue', sa.text('priority DESC'), 'run_at', 'id'], unique=False,
+                              postgresql_where=sa.text("status = 'pendiente'"),
+                              sqlite_where=sa.text("status = 'pendiente'"))
+        batch_op.create_index('idx_job_status', ['status', 'locked_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('jobs', schema=None) as batch_op:
+        batch_op.drop_index('idx_job_status')
+        batch_op.drop_index('idx_job_pending')
+
+    op.drop_table('jobs')
@@ -0,0 +1,214 @@
+#!/usr/bin/env python
+"""
+Prueba de conexiones inactivas simultáneas para comparar los modos WSGI y ASGI.
+
+Abre muchas conexiones que pasan casi todo el tiempo esperando (el canal de
+eventos `/api/v1/events` o una sincronización con long polling) y las mantiene
+abiertas. Mientras tanto mide la latencia de una petición normal (`--probe-path`)
+para ver si el servidor sigue atendiendo al resto de usuarios.
+
+Con WSGI cada conexión inactiva ocupa un hilo: a partir de los hilos disponibles
+(y de `EVENTS_MAX_CONNECTIONS`) las conexiones se rechazan o las peticiones
+normales esperan. Con ASGI (`asgi.py`) cada conexión es una corrutina en espera.
+    
+    gunicorn -w 2 --threads 50 -b :8000 wsgi:app
+    uvicorn asgi:app --workers 2 --port 8001
+    
+    python scripts/idle_connections.py --url http://localhost:8000 --account seed42_1@example.com:Eureka1234! -n 1000
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from argparse import Namespace
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# Añadir el directorio de scripts al path para reutilizar el login de load_test.py
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from load_test import VirtualUser, load_accounts, percentile
+
+def parse_args():
+    """Parsea los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Conexiones inactivas simultáneas contra un servidor de Eureka')
+    parser.add_argument('--url', required=True, help='URL base del servidor (p. ej. http://localhost:8000)')
+    parser.add_argument('--account', action='append', default=[], metavar='EMAIL:CONTRASEÑA',
+                        help='Cuenta con la que iniciar sesión (repetible; las conexiones se reparten)')
+    parser.add_argument('--accounts-file', help='Fichero con una cuenta EMAIL:CONTRASEÑA por línea')
+    parser.add_argument('-n', '--connections', type=int, default=500, help='Conexiones inactivas a abrir')
+    parser.add_argument('--path', default='/api/v1/events',
+                        help='Ruta que mantiene la conexión abierta (p. ej. "/api/v1/sync?wait=30")')
+    parser.add_argument('--rate', type=float, default=200, help='Conexiones nuevas por segundo')
+    parser.add_argument('--hold', type=float, default=30, help='Segundos que se mantienen abiertas')
+    parser.add_argument('--probe-path', default='/api/v1/stats', help='Petición normal cuya latencia se mide')
+    parser.add_argument('--probe-interval', type=float, default=0.2, help='Segundos entre peticiones de sondeo')
+    parser.add_argument('--timeout', type=float, default=10, help='Segundos máximos de espera de cada respuesta')
+    parser.add_argument('-o', '--output', help='Fichero donde guardar el informe JSON')
+    return parser.parse_args()
+
+def session_cookies(base_url, accounts, timeout):
+    """Inicia sesión con cada cuenta y devuelve sus cabeceras `Cookie`."""
+    cookies = []
+    for account in accounts:
+        user = VirtualUser(base_url, account, Namespace(timeout=timeout), rng=None)
+        if not user.login():
+            raise RuntimeError(f'No se pudo iniciar sesión con {account[0]}')
+        cookies.append('; '.join(f'{cookie.name}={cookie.value}' for cookie in user.cookies))
+    return cookies
+
+async def _request(host, port, path, cookie, timeout):
+    """Abre una conexión, envía un GET y devuelve (código de estado, reader, writer)."""
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    writer.write((f'GET {path} HTTP/1.1\r\nHost: {host}:{port}\r\nCookie: {cookie}\r\n'
+                  f'Accept: */*\r\n\r\n').encode('latin-1'))
+    await writer.drain()
+    status_line = await asyncio.wait_for(reader.readline(), timeout)
+    return int(status_line.split()[1]), reader, writer
+
+class IdleConnectionTest:
+    """
+    Abre las conexiones inactivas, las mantiene y sondea la latencia del servidor.
+    """
+    
+    def __init__(self, base_url, cookies, args):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.cookies = cookies
+        self.args = args
+        self.statuses = {}
+        self.errors = 0
+        self.open = 0
+        self.max_open = 0
+        self.probes = []
+        self.probe_errors = 0
+    
+    async def _idle(self, number, stop):
+        """Una conexión inactiva: se abre y se lee (descartando) hasta el final de la prueba."""
+        try:
+            status, reader, writer = await _request(self.host, self.port, self.args.path,
+                                                    self.cookies[number % len(self.cookies)], self.args.timeout)
+        except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+            self.errors += 1
+            return
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        if status != 200:
+            writer.close()
+            return
+        
+        self.open += 1
+        self.max_open = max(self.max_open, self.open)
+        try:
+            while not stop.is_set():
+                reading = asyncio.ensure_future(reader.read(65536))
+                stopping = asyncio.ensure_future(stop.wait())
+                done, _ = await asyncio.wait({reading, stopping}, return_when=asyncio.FIRST_COMPLETED)
+                stopping.cancel()
+                if reading not in done:
+                    reading.cancel()
+                elif not reading.result():
+                    # El servidor cerró la conexión (p. ej. fin de un long polling)
+                    break
+        except OSError:
+            pass
+        finally:
+            self.open -= 1
+            writer.close()
+    
+    async def _probe(self, stop):
+        """Peticiones normales periódicas, cada una en una conexión nueva."""
+        while not stop.is_set():
+            start = time.perf_counter()
+            try:
+                status, _, writer = await _request(self.host, self.port, self.args.probe_path, self.cookies[0],
+                                                   self.args.timeout)
+                writer.close()
+                if status == 200:
+                    self.probes.append((time.perf_counter() - start) * 1000)
+                else:
+                    self.probe_errors += 1
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                self.probe_errors += 1
+            await asyncio.sleep(self.args.probe_interval)
+    
+    async def run(self):
+        """Ejecuta la prueba y devuelve el informe."""
+        stop = asyncio.Event()
+        probe = asyncio.ensure_future(self._probe(stop))
+        start = time.perf_counter()
+        idle = []
+        for number in range(self.args.connections):
+            idle.append(asyncio.ensure_future(self._idle(number, stop)))
+            await asyncio.sleep(1 / self.args.rate)
+        ramp_seconds = time.perf_counter() - start
+        
+        await asyncio.sleep(self.args.hold)
+        held = self.open
+        stop.set()
+        await asyncio.gather(probe, *idle)
+        return self.report(ramp_seconds, held)
+    
+    def report(self, ramp_seconds, held):
+        """Construye el informe de la prueba."""
+        latencies = sorted(self.probes)
+        return {
+            'config': {
+                'url': f'http://{self.host}:{self.port}',
+                'path': self.args.path,
+                'connections': self.args.connections,
+                'rate': self.args.rate,
+                'hold_seconds': self.args.hold,
+                'probe_path': self.args.probe_path,
+            },
+            'idle': {
+                'statuses': {str(status): count for status, count in sorted(self.statuses.items())},
+                'errors': self.errors,
+                'max_open': self.max_open,
+                'open_at_end': held,
+                'ramp_seconds': round(ramp_seconds, 2),
+            },
+            'probe': {
+                'ok': len(latencies),
+                'errors': self.probe_errors,
+                'mean_ms': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                'p50_ms': percentile(latencies, 0.50),
+                'p95_ms': percentile(latencies, 0.95),
+                'p99_ms': percentile(latencies, 0.99),
+                'max_ms': latencies[-1] if latencies else None,
+            },
+        }
+
+def main():
+    """Función principal del script."""
+    args = parse_args()
+    
+    try:
+        accounts = load_accounts(args)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    if not accounts:
+        print("Indica al menos una cuenta con --account o --accounts-file.", file=sys.stderr)
+        sys.exit(1)
+    
+    base_url = args.url.rstrip('/')
+    try:
+        cookies = session_cookies(base_url, accounts, args.timeout)
+    except RuntimeError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    
+    report = asyncio.run(IdleConnectionTest(base_url, cookies, args).run())
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+"""
+Linter de migraciones: avisa de las operaciones que bloquean tablas grandes.
+
+Revisa el `upgrade()` de las migraciones de `migrations/versions/` con
+`migrations/lint.py` (índices sin CONCURRENTLY, columnas NOT NULL
+sin valor por defecto, cambios de tipo, restricciones validadas con la tabla
+bloqueada, UPDATE/DELETE de toda una tabla...). Por defecto revisa las
+migraciones posteriores a `BASELINE`, la última de las migraciones iniciales
+(creadas cuando las tablas aún estaban vacías). Sale con código 1 si hay avisos.
+
+Un aviso aceptado a propósito se silencia con el comentario
+`# lint-migrations: ignore` en su línea.
+
+No importa la aplicación, así que no necesita configuración ni base de datos.
+"""
+
+import os
+import sys
+import ast
+import argparse
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from migrations.lint import LARGE_TABLES, lint_migration
+
+VERSIONS_DIR = ROOT_DIR / 'migrations' / 'versions'
+
+# Última de las migraciones iniciales, anteriores a los datos de producción
+BASELINE = '15b4936e92b8'
+
+def parse_args():
+    """Parsea los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Avisa de las operaciones de las migraciones que bloquean tablas grandes')
+    parser.add_argument('paths', nargs='*', help='Migraciones a revisar (por defecto, las posteriores a --since)')
+    parser.add_argument('--since', default=BASELINE,
+                        help=f'Revisar solo las migraciones posteriores a esta revisión (por defecto: {BASELINE})')
+    parser.add_argument('--all', action='store_true', help='Revisar todas las migraciones')
+    parser.add_argument('--large-table', action='append', default=[], metavar='TABLA',
+                        help='Tabla adicional a considerar grande (repetible)')
+    return parser.parse_args()
+
+def read_revisions(directory):
+    """Devuelve {revisión: (down_revision, ruta)} de las migraciones de un directorio."""
+    revisions = {}
+    for path in sorted(directory.glob('*.py')):
+        values = {}
+        for node in ast.parse(path.read_text(encoding='utf-8')).body:
+            if isinstance(node, ast.Assign) and len(node.targets) == 1 and isinstance(node.targets[0], ast.Name):
+                if node.targets[0].id in ('revision', 'down_revision'):
+                    values[node.targets[0].id] = ast.literal_eval(node.value)
+        if 'revision' in values:
+            revisions[values['revision']] = (values.get('down_revision'), path)
+    return revisions
+
+def revisions_after(revisions, since):
+    """Rutas de las migraciones que descienden de `since` (todas si es None)."""
+    selected = []
+    for revision, (_, path) in revisions.items():
+        ancestors = set()
+        pending = [revision]
+        while pending:
+            current = revisions.get(pending.pop())
+            if current is None:
+                continue
+            parents = current[0] if isinstance(current[0], (tuple, list)) else [current[0]]
+            for parent in parents:
+                if parent and parent not in ancestors:
+                    ancestors.add(parent)
+                    pending.append(parent)
+        if since is None or since in ancestors:
+            selected.append(path)
+    return sorted(selected)
+
+def main():
+    """Función principal del script."""
+    args = parse_args()
+    
+    if args.paths:
+        paths = [Path(path) for path in args.paths]
+    else:
+        revisions = read_revisions(VERSIONS_DIR)
+        if not args.all and args.since not in revisions:
+            print(f'Revisión desconocida: {args.since}', file=sys.stderr)
+            sys.exit(2)
+        paths = revisions_after(revisions, None if args.all else args.since)
+    
+    large_tables = LARGE_TABLES | set(args.large_table)
+    found = 0
+    for path in paths:
+        for issue in lint_migration(path.read_text(encoding='utf-8'), large_tables):
+            print(f'{os.path.relpath(path)}:{issue.line}: {issue.message}')
+            found += 1
+    
+    if found:
+        print(f'{found} avisos en {len(paths)} migraciones', file=sys.stderr)
+        sys.exit(1)
+    print(f'{len(paths)} migraciones revisadas sin avisos')
+
+if __name__ == '__main__':
+    main()
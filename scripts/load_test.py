@@ -0,0 +1,339 @@
+#!/usr/bin/env python
+"""
+Script de pruebas de carga en lazo cerrado para Eureka.
+
+Cada usuario virtual es un hilo con su propia sesión (cookies y token CSRF) que
+ejecuta escenarios de forma continua: en cuanto recibe una respuesta elige el
+siguiente escenario según los pesos configurados. Al terminar se emite un
+informe JSON con el rendimiento (peticiones por segundo) y las latencias
+p50/p95/p99 de cada escenario.
+
+El objetivo puede ser un servidor ya arrancado (--url, p. ej. gunicorn wsgi:app)
+o la propia aplicación de `wsgi.py` servida en este proceso (--serve).
+"""
+
+import os
+import re
+import sys
+import json
+import math
+import time
+import random
+import logging
+import argparse
+import threading
+from pathlib import Path
+from http.cookiejar import CookieJar, DefaultCookiePolicy
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+# Añadir el directorio raíz del proyecto al path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+# Mismo patrón que usan las pruebas para extraer el token de los formularios de auth_forms.py
+CSRF_PATTERN = re.compile(rb'name="csrf_token" type="hidden" value="(.+?)"')
+
+SCENARIOS = ('login', 'index', 'create_entry', 'search')
+
+SEARCH_TERMS = ('idea', 'proyecto', 'nota', 'libro', 'plan', 'reunión', 'diseño', 'viaje')
+
+def parse_args():
+    """Parsea los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Pruebas de carga HTTP en lazo cerrado para Eureka')
+    
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument('--url', help='URL base de un servidor ya arrancado (p. ej. http://localhost:8000)')
+    target.add_argument('--serve', action='store_true', help='Sirve la aplicación de wsgi.py en este proceso')
+    parser.add_argument('--port', type=int, default=5050, help='Puerto para --serve (por defecto: 5050)')
+    
+    parser.add_argument('-c', '--concurrency', type=int, default=10, help='Usuarios virtuales concurrentes')
+    parser.add_argument('-d', '--duration', type=float, default=30, help='Duración de la medición en segundos')
+    parser.add_argument('--warmup', type=float, default=5, help='Segundos iniciales que no se contabilizan')
+    parser.add_argument('--think-time', type=float, default=0, help='Pausa entre escenarios de un usuario virtual')
+    parser.add_argument('--mix', default='login=1,index=6,create_entry=2,search=3',
+                        help='Pesos de los escenarios (por defecto: login=1,index=6,create_entry=2,search=3)')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla para la elección de escenarios')
+    
+    parser.add_argument('--account', action='append', default=[], metavar='EMAIL:CONTRASEÑA',
+                        help='Cuenta con la que iniciar sesión (repetible)')
+    parser.add_argument('--accounts-file', help='Fichero con una cuenta EMAIL:CONTRASEÑA por línea')
+    
+    parser.add_argument('--create-entry-path', default='/api/v1/entries',
+                        help='Ruta que recibe un POST JSON para crear entradas')
+    parser.add_argument('--search-path', default='/api/v1/entries',
+                        help='Ruta que recibe la búsqueda mediante el parámetro q')
+    parser.add_argument('--timeout', type=float, default=30, help='Tiempo máximo por petición en segundos')
+    parser.add_argument('-o', '--output', help='Fichero donde escribir el informe JSON (por defecto: salida estándar)')
+    
+    return parser.parse_args()
+
+def parse_mix(mix):
+    """Convierte 'login=1,index=6' en una lista de escenarios y otra de pesos."""
+    names, weights = [], []
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Escenario desconocido: {name}. Disponibles: {', '.join(SCENARIOS)}")
+        if float(weight or 1) > 0:
+            names.append(name)
+            weights.append(float(weight or 1))
+    return names, weights
+
+def load_accounts(args):
+    """Reúne las cuentas indicadas por línea de comandos y por fichero."""
+    lines = list(args.account)
+    if args.accounts_file:
+        with open(args.accounts_file, encoding='utf-8') as handle:
+            lines.extend(line.strip() for line in handle if line.strip() and not line.startswith('#'))
+    
+    accounts = []
+    for line in lines:
+        email, _, password = line.partition(':')
+        if not email or not password:
+            raise ValueError(f"Cuenta inválida (se esperaba EMAIL:CONTRASEÑA): {line}")
+        accounts.append((email, password))
+    return accounts
+
+def percentile(sorted_values, fraction):
+    """Percentil por el método del rango más cercano sobre una lista ordenada."""
+    if not sorted_values:
+        return None
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+class _InsecureCookiePolicy(DefaultCookiePolicy):
+    """
+    Reenvía también las cookies `Secure` por HTTP plano.
+    
+    La configuración marca la cookie de sesión como segura; en un entorno de
+    pruebas sin TLS el cliente la descartaría y ninguna sesión sobreviviría.
+    """
+    
+    def return_ok_secure(self, cookie, request):
+        return True
+
+class _NoRedirectHandler(HTTPRedirectHandler):
+    """No sigue redirecciones: cada petición medida es exactamente una petición."""
+    
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        return None
+
+class VirtualUser:
+    """
+    Usuario virtual con sesión propia que ejecuta escenarios contra el servidor.
+    """
+    
+    def __init__(self, base_url, account, args, rng):
+        self.base_url = base_url
+        self.email, self.password = account
+        self.args = args
+        self.rng = rng
+        self.csrf_token = None
+        self._new_session()
+    
+    def _new_session(self):
+        self.cookies = CookieJar(policy=_InsecureCookiePolicy())
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirectHandler())
+    
+    def _request(self, method, path, data=None, json_body=None, headers=None):
+        """Realiza una petición y devuelve (código de estado, cuerpo)."""
+        headers = dict(headers or {})
+        body = None
+        if json_body is not None:
+            body = json.dumps(json_body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        elif data is not None:
+            body = urlencode(data).encode('utf-8')
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+        if self.csrf_token and method != 'GET':
+            headers['X-CSRFToken'] = self.csrf_token
+        
+        request = Request(urljoin(self.base_url, path), data=body, headers=headers, method=method)
+        try:
+            with self.opener.open(request, timeout=self.args.timeout) as response:
+                return response.status, response.read()
+        except HTTPError as error:
+            return error.code, error.read()
+    
+    def login(self):
+        """Escenario de login completo: sesión nueva, formulario y envío con su token CSRF."""
+        self._new_session()
+        status, body = self._request('GET', '/auth/login')
+        match = CSRF_PATTERN.search(body)
+        if status != 200 or not match:
+            return False
+        self.csrf_token = match.group(1).decode('utf-8')
+        
+        status, _ = self._request('POST', '/auth/login', data={
+            'email': self.email,
+            'password': self.password,
+            'csrf_token': self.csrf_token,
+        })
+        # Un login correcto redirige; uno fallido vuelve a renderizar el formulario con 200
+        return status == 302
+    
+    def index(self):
+        """Escenario de página principal con sesión iniciada."""
+        status, _ = self._request('GET', '/')
+        return status == 200
+    
+    def create_entry(self):
+        """Escenario de creación de una entrada."""
+        status, _ = self._request('POST', self.args.create_entry_path, json_body={
+            'title': f'Entrada de carga {self.rng.randrange(10 ** 9)}',
+            'content': ' '.join(self.rng.choices(SEARCH_TERMS, k=self.rng.randint(20, 200))),
+        })
+        return status in (200, 201)
+    
+    def search(self):
+        """Escenario de búsqueda de entradas."""
+        query = urlencode({'q': self.rng.choice(SEARCH_TERMS)})
+        status, _ = self._request('GET', f'{self.args.search_path}?{query}')
+        return status == 200
+
+class LoadTest:
+    """
+    Coordina los usuarios virtuales y agrega sus mediciones.
+    """
+    
+    def __init__(self, base_url, accounts, args):
+        self.base_url = base_url
+        self.accounts = accounts
+        self.args = args
+        self.names, self.weights = parse_mix(args.mix)
+        self.samples = {name: [] for name in SCENARIOS}
+        self.errors = {name: 0 for name in SCENARIOS}
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        self.measure_from = None
+    
+    def _worker(self, number):
+        rng = random.Random(self.args.seed * 1000003 + number)
+        user = VirtualUser(self.base_url, self.accounts[number % len(self.accounts)], self.args, rng)
+        # Cada usuario virtual inicia sesión antes de empezar (dentro del calentamiento)
+        user.login()
+        
+        while not self.stop.is_set():
+            scenario = rng.choices(self.names, weights=self.weights)[0]
+            started = time.perf_counter()
+            try:
+                ok = getattr(user, scenario)()
+            except (URLError, OSError):
+                ok = False
+            finished = time.perf_counter()
+            
+            if started >= self.measure_from:
+                with self.lock:
+                    if ok:
+                        self.samples[scenario].append(finished - started)
+                    else:
+                        self.errors[scenario] += 1
+            
+            if self.args.think_time:
+                time.sleep(self.args.think_time)
+    
+    def run(self):
+        """Ejecuta la prueba y devuelve el informe."""
+        self.measure_from = time.perf_counter() + self.args.warmup
+        threads = [
+            threading.Thread(target=self._worker, args=(number,), daemon=True)
+            for number in range(self.args.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        
+        time.sleep(self.args.warmup + self.args.duration)
+        self.stop.set()
+        measured = time.perf_counter() - self.measure_from
+        for thread in threads:
+            thread.join(timeout=self.args.timeout)
+        
+        return self.report(measured)
+    
+    def report(self, measured):
+        """Construye el informe legible por máquina con rendimiento y percentiles."""
+        scenarios = {}
+        total_ok = total_errors = 0
+        for name in self.names:
+            latencies = sorted(self.samples[name])
+            total_ok += len(latencies)
+            total_errors += self.errors[name]
+            scenarios[name] = {
+                'requests': len(latencies),
+                'errors': self.errors[name],
+                'throughput_rps': round(len(latencies) / measured, 2),
+                'latency_ms': {
+                    'mean': round(1000 * sum(latencies) / len(latencies), 2) if latencies else None,
+                    'p50': round(1000 * percentile(latencies, 0.50), 2) if latencies else None,
+                    'p95': round(1000 * percentile(latencies, 0.95), 2) if latencies else None,
+                    'p99': round(1000 * percentile(latencies, 0.99), 2) if latencies else None,
+                    'max': round(1000 * latencies[-1], 2) if latencies else None,
+                },
+            }
+        
+        return {
+            'target': self.base_url,
+            'concurrency': self.args.concurrency,
+            'duration_s': round(measured, 2),
+            'mix': dict(zip(self.names, self.weights)),
+            'total': {
+                'requests': total_ok,
+                'errors': total_errors,
+                'throughput_rps': round(total_ok / measured, 2),
+            },
+            'scenarios': scenarios,
+        }
+
+def serve_wsgi_app(port):
+    """Sirve la aplicación de wsgi.py en un hilo y devuelve su URL base."""
+    from werkzeug.serving import make_server
+    from wsgi import app
+    from app.utils.security import limiter
+    
+    # Con el límite de 5 logins cada 5 minutos solo se mediría el limitador
+    limiter.enabled = False
+    # TestingConfig fija SERVER_NAME a localhost:5000 y rechazaría cualquier otro host
+    app.config['SERVER_NAME'] = None
+    # El registro de cada petición en stderr distorsionaría la medición
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+    server = make_server('127.0.0.1', port, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{port}'
+
+def main():
+    """Función principal del script."""
+    args = parse_args()
+    
+    try:
+        accounts = load_accounts(args)
+        parse_mix(args.mix)
+    except ValueError as error:
+        print(error, file=sys.stderr)
+        sys.exit(1)
+    
+    if not accounts:
+        print("Indica al menos una cuenta con --account o --accounts-file.", file=sys.stderr)
+        sys.exit(1)
+    
+    if args.serve:
+        if os.getenv('FLASK_ENV') == 'production':
+            print("--serve no debe usarse con la configuración de producción.", file=sys.stderr)
+            sys.exit(1)
+        base_url = serve_wsgi_app(args.port)
+    else:
+        base_url = args.url.rstrip('/')
+    
+    report = LoadTest(base_url, accounts, args).run()
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+
+if __name__ == '__main__':
+    main()
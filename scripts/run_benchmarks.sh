@@ -0,0 +1,60 @@
+#!/bin/bash
+# Script para ejecutar los benchmarks de la aplicación Eureka
+#
+# Uso:
+#   ./scripts/run_benchmarks.sh            Ejecuta los benchmarks y muestra los tiempos
+#   ./scripts/run_benchmarks.sh baseline   Ejecuta y guarda los resultados como nueva línea base
+#   ./scripts/run_benchmarks.sh compare    Ejecuta y compara con la última línea base guardada
+#
+# Variables de entorno:
+#   TEST_DATABASE_URL       Base de datos desechable (por defecto la de TestingConfig). Ej.: sqlite://
+#   BENCHMARK_SIZES         Entradas por usuario a evaluar (por defecto 1000,10000,100000)
+#   BENCHMARK_MAX_REGRESSION  Regresión máxima tolerada sobre la mediana (por defecto 20%)
+
+# Colores para mensajes
+GREEN='\033[0;32m'
+YELLOW='\033[1;33m'
+RED='\033[0;31m'
+NC='\033[0m' # No Color
+
+# Directorio del proyecto
+PROJECT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")/.." && pwd)"
+cd "$PROJECT_DIR"
+
+# Configurar entorno de pruebas
+export FLASK_ENV=testing
+export PYTHONPATH=$PROJECT_DIR
+
+STORAGE="file://tests/benchmarks/baselines"
+MAX_REGRESSION="${BENCHMARK_MAX_REGRESSION:-20%}"
+MODE="${1:-run}"
+
+BENCH_ARGS="tests/benchmarks -c tests/pytest.ini --run-benchmarks --no-cov --benchmark-storage=$STORAGE"
+BENCH_ARGS="$BENCH_ARGS --benchmark-columns=min,mean,median,stddev,rounds --benchmark-sort=fullname"
+
+case "$MODE" in
+    run)
+        echo -e "${YELLOW}Ejecutando benchmarks...${NC}"
+        python -m pytest $BENCH_ARGS
+        ;;
+    baseline)
+        echo -e "${YELLOW}Ejecutando benchmarks y guardando línea base...${NC}"
+        python -m pytest $BENCH_ARGS --benchmark-save=baseline
+        ;;
+    compare)
+        echo -e "${YELLOW}Comparando con la última línea base (regresión máxima: ${MAX_REGRESSION})...${NC}"
+        python -m pytest $BENCH_ARGS --benchmark-compare --benchmark-compare-fail="median:${MAX_REGRESSION}"
+        ;;
+    *)
+        echo -e "${RED}Modo no reconocido: ${MODE}. Usa run, baseline o compare.${NC}"
+        exit 1
+        ;;
+esac
+
+# Verificar resultado
+if [ $? -eq 0 ]; then
+    echo -e "${GREEN}Benchmarks completados sin regresiones.${NC}"
+else
+    echo -e "${RED}Los benchmarks fallaron o detectaron regresiones.${NC}"
+    exit 1
+fi
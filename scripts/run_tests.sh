@@ -22,10 +22,16 @@ else
     TEST_PATTERN="$1"
 fi
 
+# Ejecución en paralelo con pytest-xdist (p. ej. PYTEST_WORKERS=auto o PYTEST_WORKERS=4)
+XDIST_ARGS=""
+if [ -n "$PYTEST_WORKERS" ]; then
+    XDIST_ARGS="-n $PYTEST_WORKERS"
+fi
+
 echo -e "${YELLOW}Ejecutando pruebas: ${TEST_PATTERN}${NC}"
 
 # Ejecutar pruebas con pytest
-python -m pytest $TEST_PATTERN -v
+python -m pytest $TEST_PATTERN -v $XDIST_ARGS
 
 # Verificar resultado
 if [ $? -eq 0 ]; then
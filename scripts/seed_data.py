@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+"""
+Script para generar datos sintéticos de carga en la base de datos de Eureka.
+
+Genera usuarios con colecciones, entradas, etiquetas y relaciones entre entradas
+y etiquetas mediante cargas masivas (COPY en PostgreSQL), de forma reproducible
+a partir de una semilla. Pensado para pruebas de carga y para dimensionar la
+base de datos y sus índices; nunca debe ejecutarse contra producción.
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import datetime
+from pathlib import Path
+
+# Añadir el directorio raíz del proyecto al path
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT_DIR))
+
+from app import create_app, db
+from app.utils.data_generator import SeedProfile, SyntheticDataGenerator
+
+def parse_args():
+    """Parsea los argumentos de línea de comandos."""
+    parser = argparse.ArgumentParser(description='Generar datos sintéticos para pruebas de carga en Eureka')
+    
+    parser.add_argument('-n', '--users', type=int, required=True, help='Número de usuarios a generar')
+    parser.add_argument('--seed', type=int, default=0, help='Semilla para obtener datos reproducibles (por defecto: 0)')
+    parser.add_argument('--batch-size', type=int, default=500, help='Usuarios por transacción (por defecto: 500)')
+    parser.add_argument('--password', default='Eureka1234!', help='Contraseña común de los usuarios generados')
+    parser.add_argument('--until', type=datetime.fromisoformat, default=None,
+                        help='Fecha más reciente de los datos (ISO 8601); fíjala para obtener fechas reproducibles')
+    
+    # Distribuciones
+    parser.add_argument('--entries-median', type=int, default=200, help='Mediana de entradas por usuario')
+    parser.add_argument('--entries-sigma', type=float, default=1.0, help='Dispersión log-normal de entradas por usuario')
+    parser.add_argument('--max-entries', type=int, default=20000, help='Tope de entradas por usuario')
+    parser.add_argument('--collections-mean', type=float, default=5, help='Media de colecciones por usuario')
+    parser.add_argument('--tags-mean', type=float, default=20, help='Media de etiquetas por usuario')
+    parser.add_argument('--tags-per-entry', type=float, default=1.5, help='Media de etiquetas por entrada')
+    parser.add_argument('--content-words', type=int, default=120, help='Mediana de palabras por contenido')
+    parser.add_argument('--content-sigma', type=float, default=1.0, help='Dispersión log-normal de la longitud del contenido')
+    parser.add_argument('--published-ratio', type=float, default=0.3, help='Proporción de entradas publicadas')
+    parser.add_argument('--deleted-ratio', type=float, default=0.02, help='Proporción de entradas borradas')
+    parser.add_argument('--days', type=int, default=730, help='Antigüedad máxima de los datos en días')
+    
+    return parser.parse_args()
+
+def main():
+    """Función principal del script."""
+    args = parse_args()
+    
+    config_name = os.getenv('FLASK_ENV') or 'default'
+    if config_name == 'production':
+        print("Este script no debe ejecutarse con la configuración de producción.")
+        sys.exit(1)
+    
+    app = create_app(config_name)
+    
+    profile = SeedProfile(
+        entries_median=args.entries_median,
+        entries_sigma=args.entries_sigma,
+        max_entries=args.max_entries,
+        collections_mean=args.collections_mean,
+        tags_mean=args.tags_mean,
+        tags_per_entry_mean=args.tags_per_entry,
+        content_words_median=args.content_words,
+        content_words_sigma=args.content_sigma,
+        published_ratio=args.published_ratio,
+        deleted_ratio=args.deleted_ratio,
+        days=args.days
+    )
+    
+    with app.app_context():
+        generator = SyntheticDataGenerator(db.engine, seed=args.seed, profile=profile,
+                                           password=args.password, until=args.until)
+        started = time.perf_counter()
+        
+        def report(counts):
+            elapsed = time.perf_counter() - started
+            rows = sum(counts.values())
+            print(f"{counts['users']}/{args.users} usuarios, {rows} filas, "
+                  f"{rows / elapsed:,.0f} filas/s", flush=True)
+        
+        counts = generator.generate(args.users, batch_size=args.batch_size, progress=report)
+    
+    elapsed = time.perf_counter() - started
+    print(f"Datos generados en {elapsed:.1f} s:")
+    for table, count in counts.items():
+        print(f"  {table}: {count}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,26 @@
+"""
+Fixtures comunes de las pruebas de la API.
+"""
+
+import pytest
+
+@pytest.fixture
+def api_client(app, db_session, test_user):
+    """
+    Cliente de pruebas con la sesión de `test_user` iniciada y sin CSRF.
+    
+    Usa un contexto de aplicación propio: el de la fixture `app` dura toda la sesión
+    y Flask-Login cachea en `g` el usuario de la primera petición.
+    """
+    secure, csrf_enabled = app.config['SESSION_COOKIE_SECURE'], app.config.get('WTF_CSRF_ENABLED', True)
+    app.config['SESSION_COOKIE_SECURE'] = False
+    app.config['WTF_CSRF_ENABLED'] = False
+    
+    with app.app_context(), app.test_client() as client:
+        with client.session_transaction() as session:
+            session['_user_id'] = test_user.get_id()
+            session['_fresh'] = True
+        yield client
+    
+    app.config['SESSION_COOKIE_SECURE'] = secure
+    app.config['WTF_CSRF_ENABLED'] = csrf_enabled
@@ -0,0 +1,434 @@
+"""
+Pruebas para la API JSON de entradas, colecciones y etiquetas.
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.models import Entry, Tag
+from app.services.autosave_service import AutosaveCoalescer
+
+@pytest.fixture
+def many_entries(db_session, test_user, test_tag):
+    """Crea varias entradas con fechas distintas, la mitad etiquetadas."""
+    now = datetime.utcnow()
+    entries = []
+    for i in range(5):
+        entry = Entry(
+            title=f'Entrada {i}',
+            content=f'Contenido número {i}',
+            user_id=test_user.id,
+            created_at=now - timedelta(minutes=i),
+            updated_at=now - timedelta(minutes=i)
+        )
+        if i % 2 == 0:
+            entry.tags.append(test_tag)
+        entries.append(entry)
+    db_session.add_all(entries)
+    db_session.commit()
+    return entries
+
+@pytest.mark.views
+class TestEntriesApi:
+    """Pruebas para los endpoints de entradas."""
+    
+    def test_requires_authentication(self, client):
+        """Prueba que sin sesión se responde 401 en JSON."""
+        response = client.get('/api/v1/entries')
+        
+        assert response.status_code == 401
+        assert response.json['error']
+    
+    def test_list_entries_with_tags(self, api_client, many_entries, test_tag):
+        """Prueba el listado con las etiquetas embebidas."""
+        response = api_client.get('/api/v1/entries')
+        
+        assert response.status_code == 200
+        data = response.json['data']
+        assert [item['title'] for item in data] == [f'Entrada {i}' for i in range(5)]
+        assert data[0]['tags'] == [{'id': test_tag.id, 'name': test_tag.name}]
+        assert data[1]['tags'] == []
+    
+    def test_sparse_fieldsets(self, api_client, many_entries):
+        """Prueba que solo se devuelven los campos solicitados."""
+        response = api_client.get('/api/v1/entries?fields=id,title')
+        
+        assert response.status_code == 200
+        assert set(response.json['data'][0]) == {'id', 'title'}
+    
+    def test_unknown_field(self, api_client):
+        """Prueba que un campo desconocido devuelve 400."""
+        response = api_client.get('/api/v1/entries?fields=id,password')
+        
+        assert response.status_code == 400
+    
+    def test_keyset_pagination(self, api_client, many_entries):
+        """Prueba que el cursor recorre todas las entradas sin repetirlas."""
+        seen = []
+        cursor = ''
+        while True:
+            response = api_client.get(f'/api/v1/entries?fields=id&limit=2&cursor={cursor}')
+            body = response.json
+            seen.extend(item['id'] for item in body['data'])
+            if not body['next_cursor']:
+                break
+            cursor = body['next_cursor']
+        
+        assert seen == [entry.id for entry in many_entries]
+    
+    def test_search_and_tag_filter(self, api_client, many_entries, test_tag):
+        """Prueba la búsqueda por texto y el filtro por etiqueta."""
+        response = api_client.get('/api/v1/entries?fields=title&q=número 3')
+        assert [item['title'] for item in response.json['data']] == ['Entrada 3']
+        
+        response = api_client.get(f'/api/v1/entries?fields=title&tag_id={test_tag.id}')
+        assert [item['title'] for item in response.json['data']] == ['Entrada 0', 'Entrada 2', 'Entrada 4']
+    
+    def test_create_entry(self, api_client, test_user, test_tag, test_collection):
+        """Prueba la creación de una entrada con etiquetas nuevas y existentes."""
+        response = api_client.post('/api/v1/entries', json={
+            'title': 'Nueva idea',
+            'content': 'Contenido',
+            'collection_id': test_collection.id,
+            'tags': [test_tag.name, 'otra'],
+        })
+        
+        assert response.status_code == 201
+        data = response.json['data']
+        assert data['title'] == 'Nueva idea'
+        assert sorted(tag['name'] for tag in data['tags']) == sorted([test_tag.name, 'otra'])
+        assert Tag.query.filter_by(user_id=test_user.id).count() == 2
+    
+    def test_create_entry_validation(self, api_client):
+        """Prueba que los datos no válidos devuelven 400."""
+        assert api_client.post('/api/v1/entries', json={'content': 'Sin título'}).status_code == 400
+        assert api_client.post('/api/v1/entries', json={'title': 'x', 'content': 'y',
+                                                         'collection_id': 999999}).status_code == 400
+    
+    def test_get_entry_not_modified(self, api_client, test_entry):
+        """Prueba que una entrada sin cambios devuelve 304 con su ETag."""
+        response = api_client.get(f'/api/v1/entries/{test_entry.id}')
+        assert response.status_code == 200
+        
+        response = api_client.get(f'/api/v1/entries/{test_entry.id}',
+                                  headers={'If-None-Match': response.headers['ETag']})
+        assert response.status_code == 304
+    
+    def test_list_collections_and_tags(self, api_client, test_collection, test_tag):
+        """Prueba los listados de colecciones y etiquetas."""
+        collections = api_client.get('/api/v1/collections?fields=id,name').json['data']
+        tags = api_client.get('/api/v1/tags').json['data']
+        
+        assert collections == [{'id': test_collection.id, 'name': test_collection.name}]
+        assert tags[0]['name'] == test_tag.name
+
+@pytest.mark.views
+class TestBatchApi:
+    """Pruebas para el endpoint de lotes de entradas."""
+    
+    def test_mixed_batch(self, api_client, db_session, test_user, test_entry, test_tag, many_entries):
+        """Prueba un lote con altas, modificaciones, etiquetas y borrados."""
+        to_delete = many_entries[1]
+        response = api_client.post('/api/v1/entries/batch', json={'operations': [
+            {'op': 'create', 'data': {'title': 'Offline', 'content': 'Escrita sin conexión'}, 'tags': ['viaje']},
+            {'op': 'update', 'id': test_entry.id, 'data': {'title': 'Editada', 'status': 'publicado'}},
+            {'op': 'add_tags', 'id': test_entry.id, 'tags': [test_tag.name, 'nueva']},
+            {'op': 'remove_tags', 'id': many_entries[0].id, 'tags': [test_tag.name]},
+            {'op': 'delete', 'id': to_delete.id},
+        ]})
+        
+        assert response.status_code == 200
+        results = response.json['results']
+        assert [result['status'] for result in results] == ['ok'] * 5
+        
+        db_session.expire_all()
+        created = db_session.get(Entry, results[0]['id'])
+        assert created.user_id == test_user.id
+        assert [tag.name for tag in created.tags] == ['viaje']
+        assert test_entry.title == 'Editada'
+        assert test_entry.status == 'publicado'
+        assert sorted(tag.name for tag in test_entry.tags) == sorted([test_tag.name, 'nueva'])
+        assert many_entries[0].tags == []
+        assert to_delete.is_deleted
+    
+    def test_per_item_errors(self, api_client, db_session, test_entry):
+        """Prueba que las operaciones no válidas devuelven error sin impedir el resto."""
+        other = Entry(title='Ajena', content='x', user_id=test_entry.user_id + 1000)
+        db_session.add(other)
+        db_session.commit()
+        
+        response = api_client.post('/api/v1/entries/batch', json={'operations': [
+            {'op': 'update', 'id': other.id, 'data': {'title': 'Robada'}},
+            {'op': 'update', 'id': test_entry.id, 'data': {'status': 'inventado'}},
+            {'op': 'create', 'data': {'title': 'x', 'content': 'y', 'collection_id': 999999}},
+            {'op': 'rename', 'id': test_entry.id},
+            {'op': 'update', 'id': test_entry.id, 'data': {'content': 'Nuevo contenido'}},
+        ]})
+        
+        results = response.json['results']
+        assert [result['status'] for result in results] == ['error'] * 4 + ['ok']
+        db_session.expire_all()
+        assert other.title == 'Ajena'
+        assert test_entry.content == 'Nuevo contenido'
+    
+    def test_versioned_updates(self, api_client, db_session, test_entry, many_entries):
+        """Prueba que una modificación con versión antigua es un conflicto y no pisa los cambios."""
+        stale, fresh = test_entry, many_entries[0]
+        stale_version, fresh_version = stale.version, fresh.version
+        api_client.patch(f'/api/v1/entries/{stale.id}', json={'version': stale_version, 'title': 'Desde el móvil'})
+        
+        response = api_client.post('/api/v1/entries/batch', json={'operations': [
+            {'op': 'update', 'id': stale.id, 'version': stale_version, 'data': {'title': 'Desde el portátil'}},
+            {'op': 'update', 'id': fresh.id, 'version': fresh_version, 'data': {'title': 'Al día'}},
+            {'op': 'update', 'id': fresh.id, 'version': fresh_version + 1, 'data': {'content': 'Segunda'}},
+        ]})
+        
+        results = response.json['results']
+        assert [result['status'] for result in results] == ['conflict', 'ok', 'ok']
+        assert results[0]['version'] == stale_version + 1
+        db_session.expire_all()
+        assert stale.title == 'Desde el móvil'
+        assert (fresh.title, fresh.content, fresh.version) == ('Al día', 'Segunda', fresh_version + 2)
+    
+    def test_repeated_versioned_updates(self, api_client, db_session, test_entry):
+        """Prueba que varias modificaciones de una misma entrada se aplican en el orden del lote."""
+        version = test_entry.version
+        
+        response = api_client.post('/api/v1/entries/batch', json={'operations': [
+            {'op': 'update', 'id': test_entry.id, 'version': version, 'data': {'title': 'Primera'}},
+            {'op': 'update', 'id': test_entry.id, 'version': version + 1, 'data': {'content': 'Segunda'}},
+            {'op': 'update', 'id': test_entry.id, 'version': version + 2, 'data': {'title': 'Tercera'}},
+            {'op': 'update', 'id': test_entry.id, 'data': {'content': 'Sin versión'}},
+            {'op': 'update', 'id': test_entry.id, 'version': version + 4, 'data': {'title': 'Quinta'}},
+        ]})
+        
+        assert [result['status'] for result in response.json['results']] == ['ok'] * 5
+        db_session.expire_all()
+        assert (test_entry.title, test_entry.content, test_entry.version) == ('Quinta', 'Sin versión', version + 5)
+    
+    def test_rejects_empty_batch(self, api_client):
+        """Prueba que un lote vacío devuelve 400."""
+        assert api_client.post('/api/v1/entries/batch', json={'operations': []}).status_code == 400
+
+@pytest.fixture
+def no_sync_window(app):
+    """Desactiva el margen de seguridad para ver los cambios recién confirmados."""
+    window = app.config['SYNC_SAFETY_WINDOW']
+    app.config['SYNC_SAFETY_WINDOW'] = 0
+    yield
+    app.config['SYNC_SAFETY_WINDOW'] = window
+
+@pytest.mark.views
+@pytest.mark.usefixtures('no_sync_window')
+class TestSyncApi:
+    """Pruebas para la sincronización incremental."""
+    
+    def test_initial_and_incremental_sync(self, api_client, db_session, test_entry, test_tag, test_collection):
+        """Prueba que tras la sincronización inicial solo se reciben los cambios nuevos."""
+        initial = api_client.get('/api/v1/sync').json
+        assert [entry['id'] for entry in initial['entries']] == [test_entry.id]
+        assert [tag['id'] for tag in initial['tags']] == [test_tag.id]
+        assert [collection['id'] for collection in initial['collections']] == [test_collection.id]
+        assert initial['has_more'] is False
+        
+        empty = api_client.get(f"/api/v1/sync?since={initial['next_token']}").json
+        assert empty['entries'] == [] and empty['tags'] == [] and empty['collections'] == []
+        
+        test_entry.add_tag(test_tag)
+        db_session.commit()
+        
+        changed = api_client.get(f"/api/v1/sync?since={empty['next_token']}").json
+        assert [entry['id'] for entry in changed['entries']] == [test_entry.id]
+        assert changed['entries'][0]['tag_ids'] == [test_tag.id]
+        assert changed['tags'] == []
+    
+    def test_long_polling(self, api_client, test_entry):
+        """Prueba que `wait` responde al momento si hay cambios y espera si no los hay."""
+        start = time.monotonic()
+        initial = api_client.get('/api/v1/sync?wait=5').json
+        assert [entry['id'] for entry in initial['entries']] == [test_entry.id]
+        assert time.monotonic() - start < 1
+        
+        start = time.monotonic()
+        empty = api_client.get(f"/api/v1/sync?wait=1&since={initial['next_token']}").json
+        assert empty['entries'] == [] and empty['has_more'] is False
+        assert time.monotonic() - start >= 1
+    
+    def test_soft_deleted_rows(self, api_client, db_session, test_entry):
+        """Prueba que las entradas borradas se envían reducidas a su ID y marca de borrado."""
+        token = api_client.get('/api/v1/sync').json['next_token']
+        test_entry.soft_delete()
+        db_session.commit()
+        
+        entries = api_client.get(f'/api/v1/sync?since={token}').json['entries']
+        
+        assert entries == [{
+            'id': test_entry.id,
+            'is_deleted': True,
+            'deleted_at': entries[0]['deleted_at'],
+            'updated_at': entries[0]['updated_at'],
+        }]
+    
+    def test_paginates_changes(self, api_client, many_entries):
+        """Prueba que las páginas acotadas recorren todos los cambios."""
+        seen, token = [], ''
+        while True:
+            body = api_client.get(f'/api/v1/sync?limit=2&since={token}').json
+            seen.extend(entry['id'] for entry in body['entries'])
+            token = body['next_token']
+            if not body['has_more']:
+                break
+        
+        assert sorted(seen) == sorted(entry.id for entry in many_entries)
+    
+    def test_invalid_token(self, api_client):
+        """Prueba que un token manipulado devuelve 400."""
+        assert api_client.get('/api/v1/sync?since=manipulado').status_code == 400
+
+@pytest.mark.views
+class TestEventsApi:
+    """Pruebas para el canal de notificaciones."""
+    
+    def test_stream_and_connection_limit(self, app, api_client, test_user):
+        """Prueba que se envían los cambios y que se limita el número de conexiones."""
+        slots = app.extensions['events_slots']
+        response = api_client.get('/api/v1/events', buffered=False)
+        stream = response.response
+        
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+        assert next(stream).startswith(b'retry:')
+        
+        app.extensions['events'].publish(test_user.id, {'entries': [7]})
+        assert next(stream) == b'event: change\ndata: {"entries":[7]}\n\n'
+        
+        # Con todas las plazas ocupadas se responde 503
+        taken = 0
+        while slots.acquire(blocking=False):
+            taken += 1
+        try:
+            busy = api_client.get('/api/v1/events')
+            assert busy.status_code == 503
+            assert 'Retry-After' in busy.headers
+        finally:
+            for _ in range(taken):
+                slots.release()
+            response.close()
+
+@pytest.fixture
+def autosave(app):
+    """
+    Agrupador de autoguardados con una espera larga y sin estado de otras pruebas.
+    
+    Los IDs de las entradas se repiten entre pruebas (cada una se revierte), así que
+    las versiones recordadas de una prueba no deben llegar a la siguiente.
+    """
+    coalescer = app.extensions['autosave']
+    debounce, max_delay = coalescer.debounce, coalescer.max_delay
+    coalescer.debounce, coalescer.max_delay = 60, 120
+    for state in (coalescer._pending, coalescer._written, coalescer._conflicts):
+        state.clear()
+    yield coalescer
+    coalescer.debounce, coalescer.max_delay = debounce, max_delay
+    for state in (coalescer._pending, coalescer._written, coalescer._conflicts):
+        state.clear()
+
+@pytest.mark.views
+@pytest.mark.usefixtures('autosave')
+class TestAutosaveApi:
+    """Pruebas para las actualizaciones parciales con control de versión."""
+    
+    def test_patch_updates_only_sent_fields(self, api_client, db_session, test_entry):
+        """Prueba que PATCH escribe los campos enviados e incrementa la versión."""
+        version = test_entry.version
+        
+        response = api_client.patch(f'/api/v1/entries/{test_entry.id}', json={'version': version, 'title': 'Nuevo'})
+        
+        assert response.status_code == 200
+        assert response.json['data']['version'] == version + 1
+        db_session.refresh(test_entry)
+        assert test_entry.title == 'Nuevo'
+        assert test_entry.content == 'This is a test entry content'
+    
+    def test_stale_version_conflicts(self, api_client, db_session, test_entry):
+        """Prueba que escribir desde una versión antigua devuelve 409 con el estado actual."""
+        url = f'/api/v1/entries/{test_entry.id}'
+        version = test_entry.version
+        api_client.patch(url, json={'version': version, 'content': 'Desde el portátil'})
+        
+        response = api_client.patch(url, json={'version': version, 'content': 'Desde el móvil'})
+        
+        assert response.status_code == 409
+        assert response.json['current']['content'] == 'Desde el portátil'
+        assert response.json['unsaved'] == {'content': 'Desde el móvil'}
+    
+    def test_autosave_coalesces_writes(self, app, api_client, db_session, test_entry):
+        """Prueba que los autoguardados seguidos se escriben una sola vez."""
+        url = f'/api/v1/entries/{test_entry.id}?autosave=1'
+        headers = {'X-Editor-Id': 'portatil'}
+        version = test_entry.version
+        
+        for text in ('H', 'Ho', 'Hola'):
+            response = api_client.patch(url, json={'version': version, 'content': text}, headers=headers)
+            assert response.status_code == 202
+            assert response.json['data'] == {'id': test_entry.id, 'version': version, 'pending': True}
+        api_client.patch(url, json={'version': version, 'title': 'Saludo'}, headers=headers)
+        
+        assert app.extensions['autosave'].flush(force=True) == 1
+        db_session.refresh(test_entry)
+        assert (test_entry.title, test_entry.content) == ('Saludo', 'Hola')
+        assert test_entry.version == version + 1
+        
+        # El editor sigue enviando la versión que conocía y continúa sin conflicto
+        response = api_client.patch(url, json={'version': version, 'content': 'Hola!'}, headers=headers)
+        assert response.json['data']['version'] == version + 1
+    
+    def test_autosave_conflict_with_other_editor(self, api_client, db_session, test_entry):
+        """Prueba que los cambios de otro dispositivo no se pisan con el autoguardado."""
+        url = f'/api/v1/entries/{test_entry.id}'
+        version = test_entry.version
+        api_client.patch(f'{url}?autosave=1', json={'version': version, 'content': 'Portátil'},
+                         headers={'X-Editor-Id': 'portatil'})
+        
+        # El móvil escribe al momento: los cambios pendientes del portátil se escriben antes
+        response = api_client.patch(url, json={'version': version, 'content': 'Móvil'},
+                                    headers={'X-Editor-Id': 'movil'})
+        
+        assert response.status_code == 409
+        assert response.json['current']['content'] == 'Portátil'
+    
+    def test_concurrent_autosaves_are_merged(self, app):
+        """Prueba que dos autoguardados simultáneos del mismo editor no se pisan."""
+        checking, release = threading.Event(), threading.Event()
+        
+        class SlowEntryService:
+            def _clean_values(self, data, partial=False):
+                return dict(data)
+            
+            def current_version(self, user_id, entry_id):
+                checking.set()
+                release.wait(5)
+                return 1
+        
+        coalescer = AutosaveCoalescer(app, debounce=60, max_delay=120, entry_service=SlowEntryService())
+        coalescer._ensure_flushing = lambda: None
+        first = threading.Thread(target=coalescer.save, args=(1, 7, 1, {'title': 'Hola'}, 'portatil'))
+        first.start()
+        checking.wait(5)
+        # El segundo guardado llega mientras el primero comprueba la versión
+        second = threading.Thread(target=coalescer.save, args=(1, 7, 1, {'content': 'Mundo'}, 'portatil'))
+        second.start()
+        release.set()
+        first.join(5)
+        second.join(5)
+        
+        assert coalescer._pending[7].values == {'title': 'Hola', 'content': 'Mundo'}
+    
+    def test_patch_requires_version(self, api_client, test_entry):
+        """Prueba que sin versión no se actualiza la entrada."""
+        response = api_client.patch(f'/api/v1/entries/{test_entry.id}', json={'title': 'Nuevo'})
+        
+        assert response.status_code == 400
@@ -0,0 +1,146 @@
+"""
+Pruebas para el modo de servicio ASGI.
+"""
+
+import asyncio
+import json
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip('a2wsgi')
+pytest.importorskip('aiosqlite')
+pytest.importorskip('greenlet')
+
+from app.utils.asgi import async_database_url, create_asgi_app
+
+class _SessionConnection:
+    """
+    Conexión asíncrona que ejecuta las consultas en la sesión de la prueba.
+    
+    La base de datos de las pruebas vive en una transacción que se revierte al
+    terminar, así que el engine asíncrono no vería sus filas.
+    """
+    
+    def __init__(self, session):
+        self.session = session
+    
+    @asynccontextmanager
+    async def connect(self):
+        yield self
+    
+    async def execute(self, stmt):
+        return self.session.execute(stmt)
+
+def _call(server, path, cookie=None, query=b''):
+    """Hace una petición GET a la aplicación ASGI y devuelve (estado, cabeceras, cuerpo)."""
+    headers = [(b'host', b'localhost:5000')]
+    if cookie:
+        headers.append((b'cookie', cookie.encode('latin-1')))
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'root_path': '', 'query_string': query,
+        'headers': headers, 'server': ('localhost', 5000), 'client': ('127.0.0.1', 40000),
+    }
+    messages = []
+    
+    async def receive():
+        if not messages:
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.sleep(3600)
+    
+    async def send(message):
+        messages.append(message)
+    
+    asyncio.run(server(scope, receive, send))
+    start = messages[0]
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], dict(start['headers']), body
+
+@pytest.fixture
+def asgi_server(app, db_session):
+    """Aplicación ASGI cuyas consultas asíncronas usan la sesión de la prueba."""
+    server = create_asgi_app(app)
+    server._engine = _SessionConnection(db_session)
+    return server
+
+@pytest.fixture
+def session_cookie(api_client):
+    """Cookie de sesión de `test_user`."""
+    cookie = api_client.get_cookie('session', domain='localhost')
+    return f'session={cookie.value}'
+
+def test_async_database_url():
+    """Prueba la elección del driver asíncrono."""
+    assert async_database_url('postgresql://u:p@db/eureka').drivername == 'postgresql+asyncpg'
+    assert async_database_url('sqlite://').drivername == 'sqlite+aiosqlite'
+    with pytest.raises(ValueError):
+        async_database_url('mysql://u:p@db/eureka')
+
+@pytest.mark.views
+class TestAsgiApp:
+    """Pruebas para las rutas asíncronas y el paso a Flask del resto."""
+    
+    def test_requires_login(self, asgi_server):
+        """Prueba que las rutas asíncronas exigen sesión."""
+        status, _, body = _call(asgi_server, '/api/v1/sync')
+        
+        assert status == 401
+        assert json.loads(body) == {'error': 'Autenticación requerida.'}
+    
+    def test_async_sync(self, app, asgi_server, session_cookie, test_entry):
+        """Prueba que la sincronización asíncrona devuelve lo mismo que la de Flask."""
+        entry_id = test_entry.id
+        window = app.config['SYNC_SAFETY_WINDOW']
+        app.config['SYNC_SAFETY_WINDOW'] = 0
+        try:
+            status, headers, body = _call(asgi_server, '/api/v1/sync', session_cookie)
+            changes = json.loads(body)
+            assert status == 200 and headers[b'content-type'] == b'application/json'
+            assert [entry['id'] for entry in changes['entries']] == [entry_id]
+            
+            query = f"since={changes['next_token']}&wait=1".encode()
+            status, _, body = _call(asgi_server, '/api/v1/sync', session_cookie, query)
+            assert status == 200 and json.loads(body)['entries'] == []
+            
+            status, _, _ = _call(asgi_server, '/api/v1/sync', session_cookie, b'limit=muchas')
+            assert status == 400
+        finally:
+            app.config['SYNC_SAFETY_WINDOW'] = window
+    
+    def test_async_events(self, app, asgi_server, session_cookie, test_user):
+        """Prueba que el canal de eventos asíncrono entrega los cambios y se cierra con el cliente."""
+        user_id = test_user.id
+        scope = {
+            'type': 'http', 'http_version': '1.1', 'method': 'GET', 'scheme': 'http', 'path': '/api/v1/events',
+            'root_path': '', 'query_string': b'', 'server': ('localhost', 5000), 'client': ('127.0.0.1', 40000),
+            'headers': [(b'host', b'localhost:5000'), (b'cookie', session_cookie.encode('latin-1'))],
+        }
+        messages = []
+        
+        async def wait_for(count):
+            while len(messages) < count:
+                await asyncio.sleep(0.01)
+        
+        async def receive():
+            # Abierto el canal, se publica un cambio y, al recibirlo, el cliente se desconecta
+            await wait_for(2)
+            app.extensions['events'].publish(user_id, {'entries': [7]})
+            await wait_for(3)
+            return {'type': 'http.disconnect'}
+        
+        async def send(message):
+            messages.append(message)
+        
+        asyncio.run(asyncio.wait_for(asgi_server(scope, receive, send), 5))
+        
+        assert messages[0]['status'] == 200
+        assert messages[1]['body'].startswith(b'retry: ')
+        assert messages[2]['body'] == b'event: change\ndata: {"entries":[7]}\n\n'
+    
+    def test_other_routes_served_by_flask(self, asgi_server):
+        """Prueba que las rutas sin versión asíncrona las atiende la aplicación Flask."""
+        status, _, body = _call(asgi_server, '/api/v1/entries')
+        
+        assert status == 401
+        assert json.loads(body) == {'error': 'Autenticación requerida.'}
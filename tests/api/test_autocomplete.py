@@ -0,0 +1,115 @@
+"""
+Pruebas para el autocompletado de etiquetas y colecciones.
+"""
+
+import pytest
+from sqlalchemy import event
+
+from app import db
+from app.models import Collection, Tag
+from app.services.autocomplete_service import AutocompleteService
+
+@pytest.fixture
+def tag_names(db_session, test_user):
+    """Crea etiquetas con mayúsculas y prefijos compartidos."""
+    tags = [Tag(name=name, user_id=test_user.id) for name in ('Python', 'pytest', 'Viaje', 'py_lib', 'Música')]
+    db_session.add_all(tags)
+    db_session.commit()
+    return tags
+
+@pytest.fixture
+def autocomplete(app):
+    """Servicio de autocompletado de la aplicación, vacío al empezar y al terminar."""
+    service = app.extensions['autocomplete']
+    service._cache.clear()
+    yield service
+    service._cache.clear()
+
+@pytest.mark.utils
+class TestAutocompleteService:
+    """Pruebas para la búsqueda por prefijo."""
+    
+    def test_prefix_is_case_insensitive(self, db_session, test_user, tag_names, autocomplete):
+        """Prueba que el prefijo no distingue mayúsculas y que se ordena alfabéticamente."""
+        results = autocomplete.complete(test_user.id, 'tags', 'PY')
+        
+        assert [tag['name'] for tag in results] == ['py_lib', 'pytest', 'Python']
+        assert autocomplete.complete(test_user.id, 'tags', 'py', limit=1) == [results[0]]
+        assert autocomplete.complete(test_user.id, 'tags', 'zz') == []
+    
+    def test_matches_database_search(self, db_session, test_user, tag_names, autocomplete):
+        """Prueba que la caché y la consulta a la base de datos dan el mismo resultado."""
+        for prefix in ('p', 'py_', 'mú', 'v', '%'):
+            assert autocomplete.complete(test_user.id, 'tags', prefix) == \
+                autocomplete.search_database(test_user.id, 'tags', prefix)
+    
+    def test_writes_invalidate_cache(self, db_session, test_user, tag_names, autocomplete):
+        """Prueba que crear una etiqueta o borrar una colección invalida la caché."""
+        collection = Collection(name='Proyectos', user_id=test_user.id)
+        db_session.add(collection)
+        db_session.commit()
+        assert autocomplete.complete(test_user.id, 'tags', 'pyth') == [{'id': tag_names[0].id, 'name': 'Python'}]
+        assert autocomplete.complete(test_user.id, 'collections', 'pro') == [{'id': collection.id, 'name': 'Proyectos'}]
+        
+        db_session.add(Tag(name='Pythonic', user_id=test_user.id))
+        collection.soft_delete()
+        db_session.commit()
+        
+        assert [tag['name'] for tag in autocomplete.complete(test_user.id, 'tags', 'pyth')] == ['Python', 'Pythonic']
+        assert autocomplete.complete(test_user.id, 'collections', 'pro') == []
+    
+    def test_large_lists_use_database(self, db_session, test_user, tag_names):
+        """Prueba que las listas demasiado grandes no se cachean, pero se recuerda que lo son."""
+        service = AutocompleteService(max_names=2)
+        
+        assert [tag['name'] for tag in service.complete(test_user.id, 'tags', 'py')] == ['py_lib', 'pytest', 'Python']
+        assert service._cache[(test_user.id, 'tags')][1:] == (None, None)
+        
+        # Las siguientes pulsaciones van directamente a la base de datos, sin volver a cargar la lista
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            assert [tag['name'] for tag in service.complete(test_user.id, 'tags', 'pyt')] == ['pytest', 'Python']
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        assert len(statements) == 1 and 'LIKE' in statements[0].upper()
+    
+    def test_invalidation_during_load(self, db_session, test_user, tag_names):
+        """Prueba que solo una invalidación de la misma lista descarta la carga en curso."""
+        service = AutocompleteService()
+        
+        def load_while_invalidating(user_id, kind):
+            listener = lambda *args: service.invalidate(user_id, kind)
+            event.listen(db.engine, 'before_cursor_execute', listener)
+            try:
+                service.complete(test_user.id, 'tags', 'py')
+            finally:
+                event.remove(db.engine, 'before_cursor_execute', listener)
+        
+        for user_id, kind in ((test_user.id + 1, 'tags'), (test_user.id, 'collections')):
+            service._cache.clear()
+            load_while_invalidating(user_id, kind)
+            assert (test_user.id, 'tags') in service._cache
+        
+        service.invalidate(test_user.id, 'tags')
+        load_while_invalidating(test_user.id, 'tags')
+        assert (test_user.id, 'tags') not in service._cache
+
+@pytest.mark.views
+class TestAutocompleteApi:
+    """Pruebas para los endpoints de autocompletado."""
+    
+    def test_autocomplete_tags(self, api_client, tag_names, autocomplete):
+        """Prueba el endpoint de etiquetas."""
+        response = api_client.get('/api/v1/tags/autocomplete?q=py&limit=2')
+        
+        assert response.status_code == 200
+        assert [tag['name'] for tag in response.json['data']] == ['py_lib', 'pytest']
+    
+    def test_autocomplete_collections(self, api_client, test_collection, autocomplete):
+        """Prueba el endpoint de colecciones."""
+        response = api_client.get(f'/api/v1/collections/autocomplete?q={test_collection.name[:3].upper()}')
+        
+        assert response.status_code == 200
+        assert response.json['data'] == [{'id': test_collection.id, 'name': test_collection.name}]
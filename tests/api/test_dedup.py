@@ -0,0 +1,112 @@
+"""
+Pruebas para la detección de entradas casi duplicadas.
+"""
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models import Entry, EntryLshBucket, EntrySignature
+from app.services.dedup_service import DedupService
+from app.utils.minhash import compute_signatures
+
+NOTE = 'Receta de lentejas: sofreír cebolla y zanahoria, añadir las lentejas y cocer cuarenta minutos.'
+
+@pytest.fixture
+def imported_notes(db_session, test_user):
+    """Una nota, una copia retocada y una nota distinta."""
+    entries = [
+        Entry(title='Lentejas', content=NOTE, user_id=test_user.id),
+        Entry(title='Lentejas (importada)', content=NOTE.replace('cuarenta', '40') + '\n', user_id=test_user.id),
+        Entry(title='Otra', content='Ideas para el viaje de verano a la montaña.', user_id=test_user.id),
+    ]
+    db_session.add_all(entries)
+    db_session.commit()
+    return entries
+
+@pytest.mark.utils
+class TestDedupService:
+    """Pruebas para las firmas guardadas y la búsqueda de duplicados."""
+    
+    def test_signatures_written_on_commit(self, db_session, imported_notes):
+        """Prueba que al guardar entradas se guardan sus firmas y cubetas."""
+        ids = [entry.id for entry in imported_notes]
+        
+        assert db_session.scalar(select(func.count()).where(EntrySignature.entry_id.in_(ids))) == 3
+        assert db_session.scalar(select(func.count()).where(EntryLshBucket.entry_id.in_(ids))) > 0
+    
+    def test_possible_duplicates(self, db_session, test_user, imported_notes):
+        """Prueba que se encuentra la copia retocada y no la nota distinta."""
+        original, copy, other = imported_notes
+        
+        duplicates = DedupService().possible_duplicates(test_user.id, original.id)
+        
+        assert [item['id'] for item in duplicates] == [copy.id]
+        assert duplicates[0]['similarity'] >= 0.7
+        assert DedupService().possible_duplicates(test_user.id, other.id) == []
+    
+    def test_edits_and_deletes_update_signatures(self, db_session, test_user, imported_notes):
+        """Prueba que editar el contenido o borrar la entrada actualiza su firma."""
+        original, copy, _ = imported_notes
+        service = DedupService()
+        
+        copy.content = 'Contenido totalmente nuevo sin relación con la receta original.'
+        db_session.commit()
+        assert service.possible_duplicates(test_user.id, original.id) == []
+        
+        copy.content = NOTE
+        db_session.commit()
+        assert [item['id'] for item in service.possible_duplicates(test_user.id, original.id)] == [copy.id]
+        
+        copy.soft_delete()
+        db_session.commit()
+        assert db_session.get(EntrySignature, copy.id) is None
+        assert service.possible_duplicates(test_user.id, original.id) == []
+    
+    def test_store_precomputed_signatures(self, app, db_session, test_user):
+        """Prueba el guardado de firmas calculadas fuera de la transacción (relleno)."""
+        app.config['DEDUP_ENABLED'] = False
+        try:
+            entries = [Entry(title=f'Copia {i}', content=NOTE, user_id=test_user.id) for i in range(2)]
+            db_session.add_all(entries)
+            db_session.commit()
+        finally:
+            app.config['DEDUP_ENABLED'] = True
+        service = DedupService()
+        assert service.possible_duplicates(test_user.id, entries[0].id) is None
+        
+        service.store_signatures(db_session, compute_signatures(
+            [(entry.id, test_user.id, entry.content) for entry in entries]
+        ))
+        
+        assert [item['id'] for item in service.possible_duplicates(test_user.id, entries[0].id)] == [entries[1].id]
+    
+    def test_backfill(self, app, db_session, test_user):
+        """Prueba el relleno de firmas de entradas guardadas sin ellas."""
+        app.config['DEDUP_ENABLED'] = False
+        try:
+            entries = [Entry(title=f'Copia {i}', content=NOTE, user_id=test_user.id) for i in range(3)]
+            db_session.add_all(entries)
+            db_session.commit()
+        finally:
+            app.config['DEDUP_ENABLED'] = True
+        
+        assert DedupService().backfill(batch_size=2, workers=1) == 3
+        
+        duplicates = DedupService().possible_duplicates(test_user.id, entries[0].id)
+        assert [item['id'] for item in duplicates] == [entries[1].id, entries[2].id]
+        assert DedupService().backfill(batch_size=2, workers=1) == 0
+
+@pytest.mark.views
+class TestDuplicatesApi:
+    """Pruebas para el endpoint de posibles duplicados."""
+    
+    def test_duplicates_endpoint(self, api_client, imported_notes):
+        """Prueba el endpoint y la validación del umbral."""
+        original, copy, _ = imported_notes
+        
+        response = api_client.get(f'/api/v1/entries/{original.id}/duplicates')
+        assert response.status_code == 200
+        assert [item['title'] for item in response.json['data']] == [copy.title]
+        
+        assert api_client.get(f'/api/v1/entries/{original.id}/duplicates?threshold=2').status_code == 400
+        assert api_client.get('/api/v1/entries/999999/duplicates').status_code == 404
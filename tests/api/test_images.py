@@ -0,0 +1,165 @@
+"""
+Pruebas para las imágenes de portada de las colecciones.
+"""
+
+import hashlib
+import io
+import os
+
+import pytest
+from PIL import Image
+
+from app.models import Collection, User
+from app.services.image_service import PRIVATE_IMMUTABLE_CACHE_CONTROL, FutureTimeoutError, ImageStore
+from app.utils.images import THUMBNAIL_SIZES, identify, make_thumbnails
+
+def _png(width=800, height=400, color=(200, 80, 40, 255)):
+    """Imagen PNG con transparencia, en bytes."""
+    buffer = io.BytesIO()
+    Image.new('RGBA', (width, height), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+@pytest.fixture(scope='module')
+def images(app, tmp_path_factory):
+    """
+    Almacén de imágenes en un directorio temporal, con un límite de tamaño bajo.
+    
+    Se comparte en el módulo para arrancar una sola vez el pool de miniaturas.
+    """
+    original = app.extensions['images']
+    store = ImageStore(str(tmp_path_factory.mktemp('images')), max_bytes=64 * 1024, workers=1)
+    app.extensions['images'] = store
+    yield store
+    store.shutdown()
+    app.extensions['images'] = original
+
+@pytest.mark.utils
+class TestImageUtils:
+    """Pruebas para la validación y las miniaturas."""
+    
+    def test_identify(self, tmp_path):
+        """Prueba que se reconocen las imágenes admitidas y se rechaza lo demás."""
+        (tmp_path / 'a.png').write_bytes(_png())
+        (tmp_path / 'b.txt').write_bytes(b'no soy una imagen')
+        
+        assert identify(str(tmp_path / 'a.png')) == 'png'
+        with pytest.raises(ValueError):
+            identify(str(tmp_path / 'b.txt'))
+    
+    def test_make_thumbnails(self, tmp_path):
+        """Prueba que cada miniatura respeta su tamaño, la proporción y la transparencia."""
+        (tmp_path / 'a.png').write_bytes(_png(color=(200, 80, 40, 128)))
+        targets = {size: str(tmp_path / f'{size}.webp') for size in THUMBNAIL_SIZES}
+        
+        make_thumbnails(str(tmp_path / 'a.png'), targets)
+        
+        for size, path in targets.items():
+            with Image.open(path) as thumbnail:
+                assert thumbnail.format == 'WEBP'
+                assert thumbnail.size == (size, size // 2)
+                assert thumbnail.mode == 'RGBA'
+    
+    def test_prune_keeps_used_images(self, images):
+        """Prueba que solo se borran las imágenes sin usar."""
+        used = images.save(io.BytesIO(_png(color=(1, 2, 3, 255))))
+        unused = images.save(io.BytesIO(_png(color=(0, 0, 0, 255))))
+        images.thumbnail(unused, THUMBNAIL_SIZES[0])
+        keep = {name for _, _, files in os.walk(os.path.join(images.root, 'originals')) for name in files}
+        
+        assert images.prune(keep - {unused}, min_age=0) == 1
+        assert os.path.exists(images.original_path(used))
+        assert not os.path.exists(images.original_path(unused))
+        assert not os.path.exists(images.thumbnail_path(unused, THUMBNAIL_SIZES[0]))
+
+@pytest.mark.views
+class TestCollectionImageApi:
+    """Pruebas para la subida y el servicio de imágenes."""
+    
+    def test_upload_deduplicates_by_content(self, api_client, db_session, images, test_user, test_collection):
+        """Prueba que la imagen se guarda con su hash y que el mismo contenido no se duplica."""
+        data = _png()
+        other = Collection(name='Otra', user_id=test_user.id)
+        db_session.add(other)
+        db_session.commit()
+        
+        responses = [api_client.put(f'/api/v1/collections/{collection_id}/image', data=data,
+                                    content_type='image/png')
+                     for collection_id in (test_collection.id, other.id)]
+        
+        name = f'{hashlib.sha256(data).hexdigest()}.png'
+        assert [response.status_code for response in responses] == [200, 200]
+        assert responses[0].json['data']['image_path'] == name
+        assert responses[0].json['data']['images']['320'] == f'/images/320/{name}'
+        assert db_session.get(Collection, other.id).image_path == name
+        assert os.listdir(os.path.dirname(images.original_path(name))) == [name]
+    
+    def test_serves_thumbnails_with_immutable_cache(self, api_client, images, test_collection):
+        """Prueba que las miniaturas se sirven (generándose si faltan) con caché de un año."""
+        name = api_client.put(f'/api/v1/collections/{test_collection.id}/image', data=_png(),
+                              content_type='image/png').json['data']['image_path']
+        
+        response = api_client.get(f'/images/320/{name}')
+        
+        assert response.status_code == 200
+        assert response.headers['Cache-Control'] == PRIVATE_IMMUTABLE_CACHE_CONTROL
+        with Image.open(io.BytesIO(response.data)) as thumbnail:
+            assert thumbnail.size == (320, 160)
+        assert api_client.get(f'/images/{name}').status_code == 200
+        assert api_client.get(f'/images/321/{name}').status_code == 404
+        assert api_client.get(f"/images/{'0' * 64}.png").status_code == 404
+    
+    def test_images_of_other_users_are_not_served(self, api_client, db_session, images):
+        """Prueba que conocer el hash de la imagen de otro usuario no permite descargarla."""
+        other = User(username='otro', email='otro@example.com', is_active=True)
+        other.password = 'otra_clave'
+        db_session.add(other)
+        db_session.flush()
+        name = images.save(io.BytesIO(_png(color=(9, 9, 9, 255))))
+        db_session.add(Collection(name='Ajena', user_id=other.id, image_path=name))
+        db_session.commit()
+        
+        assert api_client.get(f'/images/{name}').status_code == 404
+        assert api_client.get(f'/images/160/{name}').status_code == 404
+    
+    def test_thumbnail_failures(self, api_client, images, test_collection, monkeypatch):
+        """Prueba que un original que no se decodifica da 404 y una miniatura lenta, 503."""
+        name = api_client.put(f'/api/v1/collections/{test_collection.id}/image', data=_png(color=(5, 5, 5, 255)),
+                              content_type='image/png').json['data']['image_path']
+        # Espera a las miniaturas encargadas al subir y las borra para forzar su generación
+        images.shutdown()
+        for size in THUMBNAIL_SIZES:
+            if os.path.exists(images.thumbnail_path(name, size)):
+                os.remove(images.thumbnail_path(name, size))
+        with open(images.original_path(name), 'r+b') as f:
+            f.truncate(64)
+        
+        assert api_client.get(f'/images/160/{name}').status_code == 404
+        
+        def slow_thumbnail(name, size):
+            raise FutureTimeoutError()
+        
+        monkeypatch.setattr(images, 'thumbnail', slow_thumbnail)
+        response = api_client.get(f'/images/160/{name}')
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+    
+    def test_rejects_invalid_uploads(self, api_client, images, test_collection):
+        """Prueba el rechazo de ficheros que no son imágenes, demasiado grandes o de otra colección."""
+        url = f'/api/v1/collections/{test_collection.id}/image'
+        
+        assert api_client.put(url, data=b'texto', content_type='image/png').status_code == 400
+        assert api_client.put(url, data=b'', content_type='image/png').status_code == 400
+        assert api_client.put(url, data=os.urandom(100 * 1024), content_type='image/png').status_code == 413
+        assert api_client.put('/api/v1/collections/999999/image', data=_png(),
+                              content_type='image/png').status_code == 404
+        assert os.listdir(os.path.join(images.root, 'tmp')) == []
+    
+    def test_delete_image(self, api_client, images, test_collection):
+        """Prueba que se puede quitar la imagen de portada."""
+        url = f'/api/v1/collections/{test_collection.id}/image'
+        api_client.put(url, data=_png(), content_type='image/png')
+        
+        response = api_client.delete(url)
+        
+        assert response.status_code == 200
+        assert response.json['data']['image_path'] is None
@@ -0,0 +1,82 @@
+"""
+Pruebas para la resolución cacheada de roles y permisos.
+"""
+
+import flask
+import pytest
+from flask_principal import RoleNeed
+from flask_security.utils import FsPermNeed
+
+from app.models import User
+from app.models.user import Role
+
+@pytest.fixture
+def resolver(app, db_session):
+    """Resolución de roles sin usuarios cacheados de otras pruebas."""
+    resolver = app.extensions['permissions']
+    resolver.invalidate()
+    yield resolver
+    resolver.invalidate()
+
+@pytest.fixture
+def editor_role(db_session):
+    """Rol con dos permisos."""
+    role = Role(name='editor', permissions='entries-write, stats-read')
+    db_session.add(role)
+    db_session.commit()
+    return role
+
+def _count_loads(resolver, monkeypatch):
+    """Cuenta las lecturas de roles de la base de datos."""
+    loads = []
+    original = resolver.load
+    monkeypatch.setattr(resolver, 'load', lambda user_id: loads.append(user_id) or original(user_id))
+    return loads
+
+@pytest.mark.utils
+class TestPermissionResolver:
+    """Pruebas para la caché de roles y permisos y su invalidación."""
+    
+    def test_resolve_cached(self, resolver, db_session, test_user, editor_role, monkeypatch):
+        """Prueba que los roles y permisos se leen una vez y después se sirven de memoria."""
+        test_user.roles.append(editor_role)
+        db_session.commit()
+        loads = _count_loads(resolver, monkeypatch)
+        
+        grants = resolver.resolve(test_user.id)
+        
+        assert grants.roles == {'editor'}
+        assert grants.permissions == {'entries-write', 'stats-read'}
+        assert test_user.has_role('editor') and test_user.has_role(editor_role)
+        assert test_user.has_permission('stats-read') and not test_user.has_permission('admin')
+        assert len(loads) == 1
+    
+    def test_invalidated_on_role_changes(self, resolver, db_session, test_user, editor_role):
+        """Prueba que al confirmar cambios en los roles se descarta la caché."""
+        user_id = test_user.id
+        assert resolver.resolve(user_id).roles == frozenset()
+        
+        test_user.roles.append(editor_role)
+        db_session.commit()
+        assert resolver.resolve(user_id).roles == {'editor'}
+        
+        editor_role.permissions = 'entries-write'
+        db_session.commit()
+        assert resolver.resolve(user_id).permissions == {'entries-write'}
+        
+        db_session.get(User, user_id).roles.remove(editor_role)
+        db_session.commit()
+        assert resolver.resolve(user_id).roles == frozenset()
+    
+    def test_identity_from_cache(self, resolver, api_client, db_session, test_user, editor_role, monkeypatch):
+        """Prueba que la identidad de cada petición toma los roles de la caché."""
+        test_user.roles.append(editor_role)
+        db_session.commit()
+        loads = _count_loads(resolver, monkeypatch)
+        
+        for _ in range(3):
+            assert api_client.get('/api/v1/tags').status_code == 200
+        
+        provides = flask.g.identity.provides
+        assert RoleNeed('editor') in provides and FsPermNeed('stats-read') in provides
+        assert len(loads) == 1
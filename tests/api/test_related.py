@@ -0,0 +1,116 @@
+"""
+Pruebas para las entradas relacionadas por etiquetas.
+"""
+
+import pytest
+
+from app.models import Entry, Tag
+from app.services.related_service import TagCooccurrenceModel
+
+@pytest.fixture
+def related(app):
+    """Servicio de entradas relacionadas de la aplicación, vacío al empezar y al terminar."""
+    service = app.extensions['related']
+    service._models.clear()
+    service._dirty.clear()
+    yield service
+    service._models.clear()
+    service._dirty.clear()
+
+@pytest.fixture
+def tagged_entries(db_session, test_user):
+    """Entradas con etiquetas solapadas: 'comun' está en todas, 'rara' solo en dos."""
+    tags = {name: Tag(name=name, user_id=test_user.id) for name in ('comun', 'rara', 'viaje')}
+    layout = {'A': ('comun', 'rara'), 'B': ('comun', 'rara'), 'C': ('comun', 'viaje'), 'D': ('comun',), 'E': ()}
+    entries = {}
+    for title, names in layout.items():
+        entries[title] = Entry(title=title, content='Contenido', user_id=test_user.id,
+                               tags=[tags[name] for name in names])
+    db_session.add_all(list(tags.values()) + list(entries.values()))
+    db_session.commit()
+    return entries
+
+@pytest.mark.utils
+class TestTagCooccurrenceModel:
+    """Pruebas para la matriz de etiquetas."""
+    
+    def test_rare_tags_weigh_more(self):
+        """Prueba que puntúa más compartir etiquetas raras y tener menos etiquetas no compartidas."""
+        model = TagCooccurrenceModel.from_pairs([(1, 10), (1, 11), (2, 10), (2, 11), (3, 10), (3, 12), (4, 10)])
+        
+        results = model.top_k([1, 4, 99], k=2)
+        
+        assert [entry_id for entry_id, _ in results[1]] == [2, 4]
+        assert results[1][0][1] == pytest.approx(1.0)
+        assert results[1][1][1] > dict(model.top_k([1], k=3)[1])[3]
+        assert results[99] == []
+    
+    def test_update_replaces_rows(self):
+        """Prueba que actualizar una entrada sustituye sus etiquetas y admite entradas nuevas."""
+        model = TagCooccurrenceModel.from_pairs([(1, 10), (2, 11)])
+        
+        updated = model.update([2, 3], [(2, 10), (3, 10)])
+        
+        assert [entry_id for entry_id, _ in updated.top_k([1])[1]] == [2, 3]
+        assert model.top_k([1])[1] == []
+
+@pytest.mark.views
+class TestRelatedApi:
+    """Pruebas para los endpoints de entradas relacionadas."""
+    
+    def test_entry_related(self, api_client, tagged_entries, related):
+        """Prueba que las entradas se ordenan por similitud y se excluye la propia."""
+        response = api_client.get(f"/api/v1/entries/{tagged_entries['A'].id}/related")
+        
+        assert response.status_code == 200
+        assert [item['title'] for item in response.json['data']] == ['B', 'D', 'C']
+    
+    def test_batch_related(self, api_client, tagged_entries, related):
+        """Prueba el cálculo en lote para varias entradas."""
+        ids = [tagged_entries[title].id for title in ('C', 'E')]
+        
+        response = api_client.get(f"/api/v1/entries/related?ids={ids[0]},{ids[1]}&limit=1")
+        
+        assert response.status_code == 200
+        assert response.json['data'][str(ids[1])] == []
+        assert len(response.json['data'][str(ids[0])]) == 1
+    
+    def test_tag_changes_update_model(self, db_session, test_user, tagged_entries, related):
+        """Prueba que los cambios de etiquetas de una entrada actualizan su fila en caché."""
+        entry_a, entry_e = tagged_entries['A'], tagged_entries['E']
+        assert related.related(test_user.id, [entry_e.id])[entry_e.id] == []
+        
+        entry_e.add_tag(next(tag for tag in entry_a.tags if tag.name == 'rara'))
+        db_session.commit()
+        
+        assert entry_e.id in related._dirty[test_user.id]
+        titles = [item['title'] for item in related.related(test_user.id, [entry_e.id])[entry_e.id]]
+        assert titles[:2] == ['A', 'B']
+    
+    def test_notice_without_ids_invalidates_user(self, test_user, tagged_entries, related):
+        """Prueba que un aviso sin IDs (NOTIFY demasiado grande) descarta el modelo del usuario."""
+        related.related(test_user.id, [tagged_entries['A'].id])
+        assert test_user.id in related._models
+        
+        related.on_changes(test_user.id, {'entries': []})
+        
+        assert test_user.id not in related._models
+    
+    def test_concurrent_updates_keep_pending_changes(self, test_user, tagged_entries, related, monkeypatch):
+        """Prueba que una actualización que pierde la carrera vuelve a dejar pendientes sus cambios."""
+        entry_d, entry_e = tagged_entries['D'], tagged_entries['E']
+        related.related(test_user.id, [entry_d.id])
+        related.on_changes(test_user.id, {'entries': [entry_e.id]})
+        load_pairs = related._load_pairs
+        
+        def load_pairs_with_race(user_id, entry_ids=None):
+            if entry_ids == {entry_e.id}:
+                # Otra petición aplica sus cambios mientras esta lee los suyos
+                related.on_changes(user_id, {'entries': [entry_d.id]})
+                related._model(user_id)
+            return load_pairs(user_id, entry_ids)
+        
+        monkeypatch.setattr(related, '_load_pairs', load_pairs_with_race)
+        related._model(test_user.id)
+        
+        assert related._dirty[test_user.id] == {entry_e.id}
@@ -0,0 +1,123 @@
+"""
+Pruebas para la búsqueda semántica local.
+"""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from app.models import Entry
+from app.services.search_service import SemanticSearchService
+from app.utils.text_vectors import TermHasher, document_frequencies, inverse_document_frequencies, terms, \
+    vectorize
+
+@pytest.fixture
+def search(app, tmp_path):
+    """Servicio de búsqueda con los índices en un directorio temporal y sin margen de seguridad."""
+    original = app.extensions['search']
+    service = app.extensions['search'] = SemanticSearchService(str(tmp_path), safety_window=0)
+    yield service
+    app.extensions['search'] = original
+
+@pytest.fixture
+def notes(db_session, test_user):
+    """Notas de cocina, de viajes y de trabajo."""
+    entries = {
+        'lentejas': Entry(title='Lentejas', content='Receta de lentejas con verduras: cocer la cebolla y la zanahoria.',
+                          user_id=test_user.id),
+        'cocido': Entry(title='Cocido', content='Recetas de invierno: el cocido necesita garbanzos y verduras.',
+                        user_id=test_user.id),
+        'viaje': Entry(title='Viaje', content='Billetes de tren y hotel para el viaje a la montaña.',
+                       user_id=test_user.id),
+        'reunion': Entry(title='Reunión', content='Preparar la reunión del equipo y el informe trimestral.',
+                         user_id=test_user.id),
+    }
+    db_session.add_all(entries.values())
+    db_session.commit()
+    return entries
+
+def _meta(service, user_id):
+    with open(os.path.join(service.directory, str(user_id), 'meta.json')) as f:
+        return json.load(f)
+
+@pytest.mark.utils
+class TestTextVectors:
+    """Pruebas para los vectores TF-IDF con hashing."""
+    
+    def test_terms_fold_accents_and_suffixes(self):
+        """Prueba que los términos no distinguen mayúsculas, acentos ni terminaciones."""
+        assert terms('Canción CANCIONES') == ['cancio', 'cancio']
+        assert terms('a 1 de') == ['de']
+    
+    def test_vectors_are_normalized_and_weighted(self):
+        """Prueba que los vectores tienen norma 1 y que los términos raros pesan más."""
+        hasher = TermHasher()
+        documents = [hasher.counts(text) for text in ('nota comun uno', 'nota comun dos', 'nota rara')]
+        idf = inverse_document_frequencies(document_frequencies(documents), len(documents))
+        vectors = vectorize(documents + [hasher.counts('')], idf)
+        
+        assert np.allclose(np.linalg.norm(vectors[:3], axis=1), 1)
+        assert not vectors[3].any()
+        query = vectorize([hasher.counts('nota rara')], idf)[0]
+        assert vectors[2] @ query > vectors[0] @ query
+
+@pytest.mark.utils
+class TestSemanticSearchService:
+    """Pruebas para el índice por usuario y su actualización incremental."""
+    
+    def test_search_ranks_related_content(self, search, test_user, notes):
+        """Prueba que se encuentran las notas con términos parecidos y no las demás."""
+        results = search.search(test_user.id, 'receta con verdura')
+        
+        assert [item['title'] for item in results] == ['Lentejas', 'Cocido']
+        assert 0 < results[1]['score'] < results[0]['score'] <= 1
+        assert search.search(test_user.id, 'palabras inexistentes') == []
+    
+    def test_incremental_updates(self, search, db_session, test_user, notes):
+        """Prueba que las entradas nuevas, editadas y borradas se aplican sin reconstruir el índice."""
+        search.search(test_user.id, 'receta')
+        built = _meta(search, test_user.id)
+        
+        new = Entry(title='Gazpacho', content='Receta de gazpacho con verduras del huerto.', user_id=test_user.id)
+        db_session.add(new)
+        notes['viaje'].content = 'Receta de paella con verduras para el viaje.'
+        notes['cocido'].soft_delete()
+        db_session.commit()
+        
+        titles = [item['title'] for item in search.search(test_user.id, 'receta verduras', limit=10)]
+        meta = _meta(search, test_user.id)
+        
+        assert set(titles) == {'Lentejas', 'Gazpacho', 'Viaje'}
+        assert meta['documents'] == built['documents']
+        assert meta['generation'] > built['generation']
+        assert meta['active'] == 4
+    
+    def test_index_is_shared_between_instances(self, search, test_user, notes):
+        """Prueba que otro proceso (otra instancia del servicio) reutiliza el índice guardado."""
+        search.search(test_user.id, 'receta')
+        other = SemanticSearchService(search.directory, safety_window=0)
+        
+        assert [item['title'] for item in other.search(test_user.id, 'hotel')] == ['Viaje']
+        assert _meta(other, test_user.id)['generation'] == _meta(search, test_user.id)['generation']
+
+@pytest.mark.views
+class TestSearchApi:
+    """Pruebas para los endpoints de búsqueda semántica."""
+    
+    def test_search_endpoint(self, api_client, search, notes):
+        """Prueba la búsqueda por texto y su validación."""
+        response = api_client.get('/api/v1/entries/search?q=informe del equipo')
+        
+        assert response.status_code == 200
+        assert [item['title'] for item in response.json['data']] == ['Reunión']
+        assert api_client.get('/api/v1/entries/search?q=').status_code == 400
+    
+    def test_similar_endpoint(self, api_client, search, notes):
+        """Prueba las entradas parecidas a una entrada."""
+        response = api_client.get(f"/api/v1/entries/{notes['lentejas'].id}/similar")
+        
+        assert response.status_code == 200
+        assert [item['title'] for item in response.json['data']][0] == 'Cocido'
+        assert api_client.get('/api/v1/entries/999999/similar').status_code == 404
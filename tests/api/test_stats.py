@@ -0,0 +1,133 @@
+"""
+Pruebas para los resúmenes diarios de actividad y las estadísticas.
+"""
+
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models import DailyActivity, DailyTagActivity, Entry
+from app.services.entry_service import EntryService
+from app.services.stats_service import StatsService
+
+def _today(db_session, user_id):
+    """Resumen de hoy (UTC) de un usuario."""
+    return db_session.get(DailyActivity, (user_id, datetime.utcnow().date()))
+
+def _rollups(db_session, user_id):
+    """Contenido de las tablas de resúmenes de un usuario."""
+    days = db_session.execute(
+        select(DailyActivity.day, DailyActivity.entries_created, DailyActivity.entries_published,
+               DailyActivity.entries_deleted, DailyActivity.words_written)
+        .where(DailyActivity.user_id == user_id).order_by(DailyActivity.day)
+    ).all()
+    tags = db_session.execute(
+        select(DailyTagActivity.day, DailyTagActivity.tag_id, DailyTagActivity.uses)
+        .where(DailyTagActivity.user_id == user_id).order_by(DailyTagActivity.day, DailyTagActivity.tag_id)
+    ).all()
+    return days, tags
+
+@pytest.mark.utils
+class TestActivityRollups:
+    """Pruebas para la actualización incremental de los resúmenes."""
+    
+    def test_create_publish_edit_delete(self, db_session, test_user):
+        """Prueba que cada cambio suma solo su efecto al resumen del día."""
+        entry = Entry(title='Diario', content='uno dos tres', user_id=test_user.id)
+        db_session.add(entry)
+        db_session.commit()
+        
+        today = _today(db_session, test_user.id)
+        assert (today.entries_created, today.words_written, today.entries_published) == (1, 3, 0)
+        
+        entry.publish()
+        entry.content = 'uno dos tres cuatro cinco'
+        db_session.commit()
+        db_session.refresh(today)
+        assert (today.entries_created, today.words_written, today.entries_published) == (1, 5, 1)
+        
+        # Acortar el texto o volver a publicar no resta ni suma
+        entry.draft()
+        entry.content = 'uno'
+        db_session.commit()
+        entry.publish()
+        db_session.commit()
+        entry.soft_delete()
+        db_session.commit()
+        db_session.refresh(today)
+        assert (today.words_written, today.entries_published, today.entries_deleted) == (5, 1, 1)
+    
+    def test_batch_operations(self, db_session, test_user, test_entry, test_tag):
+        """Prueba que las escrituras masivas también se contabilizan."""
+        db_session.refresh(_today(db_session, test_user.id))
+        before = _today(db_session, test_user.id).entries_created
+        
+        EntryService().apply_batch(test_user.id, [
+            {'op': 'create', 'data': {'title': 'Offline', 'content': 'Escrita sin conexión'}, 'tags': ['viaje']},
+            {'op': 'update', 'id': test_entry.id, 'data': {'status': 'publicado'}},
+            {'op': 'add_tags', 'id': test_entry.id, 'tags': [test_tag.name]},
+        ])
+        
+        today = _today(db_session, test_user.id)
+        db_session.refresh(today)
+        assert today.entries_created == before + 1
+        assert today.entries_published == 1
+        uses = db_session.scalars(
+            select(DailyTagActivity.uses).where(DailyTagActivity.user_id == test_user.id)
+        ).all()
+        assert sum(uses) >= 2
+    
+    def test_rebuild_matches_incremental(self, db_session, test_user, test_tag):
+        """Prueba que la reconstrucción da los mismos resúmenes para entradas de un solo día."""
+        entries = [Entry(title=f'Nota {i}', content='palabra ' * i, user_id=test_user.id) for i in range(1, 4)]
+        entries[0].add_tag(test_tag)
+        db_session.add_all(entries)
+        db_session.commit()
+        entries[1].publish()
+        entries[2].soft_delete()
+        db_session.commit()
+        incremental = _rollups(db_session, test_user.id)
+        
+        assert StatsService().rebuild(test_user.id, batch_size=2) == 3
+        
+        assert _rollups(db_session, test_user.id) == incremental
+        # Las entradas ya contabilizadas no se vuelven a sumar
+        entries[0].title = 'Solo cambia el título'
+        db_session.commit()
+        assert _rollups(db_session, test_user.id) == incremental
+    
+    def test_user_stats(self, db_session, test_user, test_tag):
+        """Prueba la serie diaria, las semanas, las rachas y las etiquetas."""
+        today = date(2024, 3, 14)
+        days = [today - timedelta(days=n) for n in (0, 1, 5, 6, 7)]
+        db_session.add_all([
+            DailyActivity(user_id=test_user.id, day=day, entries_created=1, words_written=10) for day in days
+        ])
+        db_session.add(DailyTagActivity(user_id=test_user.id, day=today, tag_id=test_tag.id, uses=2))
+        db_session.commit()
+        
+        stats = StatsService().user_stats(test_user.id, days=7, today=today)
+        
+        assert [item['day'] for item in stats['days']] == ['2024-03-08', '2024-03-09', '2024-03-13', '2024-03-14']
+        assert stats['weeks'] == [
+            {'week': '2024-W10', 'entries_created': 2, 'words_written': 20},
+            {'week': '2024-W11', 'entries_created': 2, 'words_written': 20},
+        ]
+        assert stats['streak'] == {'current': 2, 'longest': 3}
+        assert stats['tags'] == [{'id': test_tag.id, 'name': test_tag.name, 'uses': 2, 'weeks': {'2024-W11': 2}}]
+        
+        assert StatsService().user_stats(test_user.id, today=today + timedelta(days=2))['streak']['current'] == 0
+
+@pytest.mark.views
+class TestStatsApi:
+    """Pruebas para el endpoint de estadísticas."""
+    
+    def test_stats_endpoint(self, api_client, test_entry):
+        """Prueba el endpoint y la validación de `days`."""
+        response = api_client.get('/api/v1/stats?days=30')
+        assert response.status_code == 200
+        assert response.json['data']['days'][-1]['entries_created'] >= 1
+        assert response.json['data']['streak']['current'] >= 1
+        
+        assert api_client.get('/api/v1/stats?days=muchos').status_code == 400
@@ -83,6 +83,11 @@ def test_login_success(client):
     )
     assert response.status_code == 200
     assert b'Has iniciado sesi' in response.data  # 'Has iniciado sesión correctamente' en UTF-8
+    
+    # Con LOGIN_TRACKING_INTERVAL = 0 el login se registra al momento
+    user = User.query.filter_by(email='test@example.com').first()
+    assert user.login_count == 1
+    assert user.last_login is not None
 
 def test_login_wrong_password(client):
     """Prueba un inicio de sesión con contraseña incorrecta."""
@@ -182,6 +187,40 @@ def test_register_existing_username(client):
     assert response.status_code == 200
     assert b'Este nombre de usuario ya est' in response.data  # 'Este nombre de usuario ya está en uso' en UTF-8
 
+def test_register_race_with_unique_constraint(app, client, monkeypatch):
+    """Prueba que un registro simultáneo con el mismo correo lo resuelve la restricción única."""
+    # El filtro no conoce el correo: como si otro worker acabara de registrarlo
+    monkeypatch.setattr(app.extensions['availability'], 'taken', lambda *args: set())
+    response = client.get(url_for('auth.register'))
+    csrf_token = get_csrf_token(response)
+    
+    response = client.post(
+        url_for('auth.register'),
+        data={
+            'username': 'raceuser',
+            'email': 'test@example.com',
+            'password': 'RaceUser1234!',
+            'password_confirm': 'RaceUser1234!',
+            'csrf_token': csrf_token
+        },
+        follow_redirects=True
+    )
+    assert response.status_code == 200
+    assert b'Este correo electr' in response.data
+    assert User.query.filter_by(username='raceuser').first() is None
+
+def test_availability(client):
+    """Prueba la comprobación de disponibilidad de nombre de usuario y correo."""
+    response = client.get(url_for('auth.availability', username='testuser', email='libre@example.com'))
+    assert response.status_code == 200
+    assert response.get_json() == {'username': False, 'email': True}
+    
+    response = client.get(url_for('auth.availability', email='TEST@example.com'))
+    assert response.get_json() == {'email': False}
+    
+    response = client.get(url_for('auth.availability'))
+    assert response.status_code == 400
+
 def test_logout(client):
     """Prueba el cierre de sesión."""
     # Primero obtener el token CSRF
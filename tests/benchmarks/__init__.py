@@ -0,0 +1,3 @@
+"""
+Pruebas de rendimiento (benchmarks) para la aplicación Eureka.
+"""
@@ -0,0 +1,202 @@
+"""
+Fixtures para los benchmarks de la aplicación Eureka.
+
+Los benchmarks se ejecutan contra la base de datos indicada en TEST_DATABASE_URL
+(PostgreSQL desechable o sqlite://) y generan volúmenes realistas por usuario
+mediante inserciones masivas, sin pasar por el hasheo de contraseñas por fila.
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert, select
+
+from app import create_app, db, bcrypt
+from app.models import User, Collection, Entry, Tag, EntryTag
+from app.models.entry import EntryStatus
+from app.utils.security import limiter
+
+# Tamaños (entradas por usuario) a evaluar; configurable para ejecuciones rápidas
+BENCHMARK_SIZES = [
+    int(size) for size in os.environ.get('BENCHMARK_SIZES', '1000,10000,100000').split(',') if size
+]
+
+# Usuarios de relleno para que las búsquedas por índice no operen sobre tablas vacías
+FILLER_USERS = int(os.environ.get('BENCHMARK_FILLER_USERS', '1000'))
+
+BENCHMARK_PASSWORD = 'Bench1234!'
+TAGS_PER_USER = 50
+INSERT_CHUNK = 5000
+
+def _insert_in_chunks(model, rows):
+    """Inserta filas en bloques para no construir sentencias gigantes."""
+    for start in range(0, len(rows), INSERT_CHUNK):
+        db.session.execute(insert(model), rows[start:start + INSERT_CHUNK])
+
+def _build_dataset(size, password_hash, rng):
+    """
+    Genera un usuario con `size` entradas, sus colecciones, etiquetas y relaciones.
+    
+    Args:
+        size (int): Número de entradas del usuario.
+        password_hash (str): Hash bcrypt compartido por todos los usuarios generados.
+        rng (random.Random): Generador pseudoaleatorio con semilla fija.
+    
+    Returns:
+        dict: Identificadores útiles para los benchmarks.
+    """
+    now = datetime.utcnow()
+    username = f'bench_{size}'
+    db.session.execute(insert(User), [{
+        'username': username,
+        'email': f'{username}@example.com',
+        '_password_hash': password_hash,
+        'is_active': True,
+        'is_verified': True,
+        'fs_uniquifier': f'bench-{size}',
+        'created_at': now,
+        'theme_preference': 'claro',
+        'is_deleted': False,
+    }])
+    user_id = db.session.execute(select(User.id).filter_by(username=username)).scalar_one()
+    
+    num_collections = max(1, size // 100)
+    _insert_in_chunks(Collection, [{
+        'name': f'Colección {i}',
+        'description': 'Colección generada para benchmarks',
+        'user_id': user_id,
+        'created_at': now,
+        'updated_at': now,
+        'is_deleted': False,
+    } for i in range(num_collections)])
+    collection_ids = db.session.execute(
+        select(Collection.id).filter_by(user_id=user_id).order_by(Collection.id)
+    ).scalars().all()
+    
+    _insert_in_chunks(Tag, [{
+        'name': f'etiqueta_{i}',
+        'user_id': user_id,
+        'created_at': now,
+        'updated_at': now,
+    } for i in range(TAGS_PER_USER)])
+    tag_ids = db.session.execute(
+        select(Tag.id).filter_by(user_id=user_id).order_by(Tag.id)
+    ).scalars().all()
+    
+    # La primera colección concentra el 10% de las entradas para medir borrados grandes
+    big_collection_share = size // 10
+    entry_rows = []
+    for i in range(size):
+        created = now - timedelta(minutes=size - i)
+        if i < big_collection_share or len(collection_ids) == 1:
+            collection_id = collection_ids[0]
+        else:
+            collection_id = collection_ids[1 + i % (len(collection_ids) - 1)]
+        entry_rows.append({
+            'title': f'Entrada {i}',
+            'content': 'Lorem ipsum dolor sit amet. ' * rng.randint(5, 60),
+            'status': EntryStatus.PUBLICADO.value if i % 3 == 0 else EntryStatus.BORRADOR.value,
+            'user_id': user_id,
+            'collection_id': collection_id,
+            'created_at': created,
+            'updated_at': created,
+            'is_deleted': False,
+        })
+    _insert_in_chunks(Entry, entry_rows)
+    entry_ids = db.session.execute(
+        select(Entry.id).filter_by(user_id=user_id).order_by(Entry.id)
+    ).scalars().all()
+    
+    _insert_in_chunks(EntryTag, [
+        {'entry_id': entry_id, 'tag_id': tag_id, 'created_at': now}
+        for entry_id in entry_ids
+        for tag_id in rng.sample(tag_ids, rng.randint(0, 3))
+    ])
+    db.session.commit()
+    
+    return {
+        'size': size,
+        'user_id': user_id,
+        'email': f'{username}@example.com',
+        'username': username,
+        'password': BENCHMARK_PASSWORD,
+        'big_collection_id': collection_ids[0],
+        'entry_ids': entry_ids,
+        'tag_ids': tag_ids,
+    }
+
+@pytest.fixture(scope='session')
+def bench_app():
+    """Aplicación de pruebas con las tablas creadas y la limitación de tasa desactivada."""
+    os.environ['FLASK_ENV'] = 'testing'
+    app = create_app('testing')
+    # El login está limitado a 5 intentos cada 5 minutos; aquí mediríamos el limitador
+    limiter.enabled = False
+    # El cliente de pruebas habla HTTP plano y no reenviaría la cookie de sesión segura
+    app.config['SESSION_COOKIE_SECURE'] = False
+    # El registro envía el correo de confirmación (suprimido en modo testing)
+    app.config['MAIL_DEFAULT_SENDER'] = app.config['MAIL_DEFAULT_SENDER'] or 'benchmarks@example.com'
+    
+    with app.app_context():
+        db.create_all()
+        password_hash = bcrypt.generate_password_hash(BENCHMARK_PASSWORD).decode('utf-8')
+        now = datetime.utcnow()
+        _insert_in_chunks(User, [{
+            'username': f'filler_{i}',
+            'email': f'filler_{i}@example.com',
+            '_password_hash': password_hash,
+            'is_active': True,
+            'is_verified': True,
+            'fs_uniquifier': f'filler-{i}',
+            'created_at': now,
+            'theme_preference': 'claro',
+            'is_deleted': False,
+        } for i in range(FILLER_USERS)])
+        db.session.commit()
+        app.config['BENCHMARK_PASSWORD_HASH'] = password_hash
+    
+    yield app
+    
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+@pytest.fixture(scope='session')
+def datasets(bench_app):
+    """Caché de conjuntos de datos por tamaño, generados bajo demanda."""
+    cache = {}
+    
+    def get(size):
+        if size not in cache:
+            rng = random.Random(size)
+            with bench_app.app_context():
+                cache[size] = _build_dataset(size, bench_app.config['BENCHMARK_PASSWORD_HASH'], rng)
+        return cache[size]
+    
+    return get
+
+@pytest.fixture(params=BENCHMARK_SIZES, ids=lambda size: f'{size}_entries')
+def dataset(request, datasets):
+    """Conjunto de datos para el tamaño parametrizado."""
+    return datasets(request.param)
+
+@pytest.fixture
+def bench_context(bench_app):
+    """
+    Contexto de aplicación para los benchmarks que consultan modelos directamente.
+    
+    Las vistas no lo usan: con un contexto compartido, `g` (y con él el token CSRF
+    cacheado por Flask-WTF) sobreviviría entre peticiones de clientes distintos.
+    """
+    with bench_app.app_context():
+        yield
+        # Descartar cualquier cambio pendiente del benchmark
+        db.session.rollback()
+
+@pytest.fixture
+def bench_client(bench_app):
+    """Cliente de pruebas para los benchmarks de vistas."""
+    with bench_app.test_client() as client:
+        yield client
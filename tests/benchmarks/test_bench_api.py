@@ -0,0 +1,62 @@
+"""
+Benchmarks de la serialización de entradas de la API frente a la conversión ingenua del ORM.
+"""
+
+import json
+
+import pytest
+
+from app import db
+from app.models import Entry
+from app.services.entry_service import EntryService
+from app.utils.serialization import dumps
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures('bench_context')]
+
+# Tamaño de página medido (el máximo que admite la API)
+PAGE_SIZE = 200
+
+def _reset_session():
+    """Vacía el mapa de identidad para que cada ronda cargue las entradas desde cero."""
+    db.session.rollback()
+    db.session.expunge_all()
+
+class TestEntrySerializationBenchmarks:
+    """Benchmarks de una página del listado de entradas con sus etiquetas."""
+    
+    def test_naive_orm_to_dict(self, benchmark, dataset):
+        """Mide la carga de entidades completas, una consulta de etiquetas por entrada y json estándar."""
+        def serialize():
+            entries = Entry.query.filter_by(user_id=dataset['user_id'], is_deleted=False) \
+                .order_by(Entry.created_at.desc(), Entry.id.desc()) \
+                .limit(PAGE_SIZE) \
+                .all()
+            data = [{
+                'id': entry.id,
+                'title': entry.title,
+                'content': entry.content,
+                'status': entry.status,
+                'collection_id': entry.collection_id,
+                'created_at': entry.created_at.isoformat(),
+                'updated_at': entry.updated_at.isoformat(),
+                'tags': [{'id': tag.id, 'name': tag.name} for tag in entry.tags],
+            } for entry in entries]
+            return json.dumps({'data': data}).encode('utf-8')
+        
+        body = benchmark.pedantic(serialize, setup=_reset_session, rounds=20)
+        assert body
+    
+    @pytest.mark.parametrize('fields', [
+        ('id', 'title', 'content', 'status', 'collection_id', 'created_at', 'updated_at', 'tags'),
+        ('id', 'title', 'updated_at'),
+    ], ids=['all_fields', 'sparse_fields'])
+    def test_api_serialization(self, benchmark, dataset, fields):
+        """Mide el listado de la API: columnas solicitadas, etiquetas en una consulta y orjson."""
+        service = EntryService()
+        
+        def serialize():
+            entries, next_cursor = service.list_entries(dataset['user_id'], fields=fields, limit=PAGE_SIZE)
+            return dumps({'data': entries, 'next_cursor': next_cursor})
+        
+        body = benchmark.pedantic(serialize, setup=_reset_session, rounds=20)
+        assert body
@@ -0,0 +1,30 @@
+"""
+Benchmarks del autocompletado de etiquetas: caché en memoria frente a consulta por prefijo.
+"""
+
+import pytest
+
+from app.services.autocomplete_service import AutocompleteService
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures('bench_context')]
+
+# Prefijo de una pulsación intermedia (coincide con varias etiquetas generadas)
+PREFIX = 'etiqueta_1'
+
+class TestAutocompleteBenchmarks:
+    """Benchmarks de una petición de autocompletado."""
+    
+    def test_database_prefix_search(self, benchmark, dataset):
+        """Mide la consulta `lower(name) LIKE 'prefijo%'` en cada pulsación."""
+        service = AutocompleteService()
+        
+        results = benchmark(service.search_database, dataset['user_id'], 'tags', PREFIX)
+        assert results
+    
+    def test_cached_prefix_search(self, benchmark, dataset):
+        """Mide la búsqueda binaria sobre la lista en memoria (tras la primera carga)."""
+        service = AutocompleteService()
+        service.complete(dataset['user_id'], 'tags', PREFIX)
+        
+        results = benchmark(service.complete, dataset['user_id'], 'tags', PREFIX)
+        assert results == service.search_database(dataset['user_id'], 'tags', PREFIX)
@@ -0,0 +1,63 @@
+"""
+Benchmarks del coste de CPU de la compresión de respuestas frente a los bytes ahorrados.
+
+Cada combinación de codificación y nivel guarda en `extra_info` el tamaño original,
+el comprimido y la proporción ahorrada, de modo que el informe de pytest-benchmark
+(`--benchmark-json`) permite elegir `COMPRESS_LEVEL` y `COMPRESS_BR_QUALITY`.
+"""
+
+import json
+
+import pytest
+
+from app.models import Entry
+from app.utils.compression import brotli, compress_body
+
+pytestmark = pytest.mark.benchmark
+
+# Niveles a comparar: rápido, por defecto y máximo de cada codificación
+LEVELS = [('gzip', 1), ('gzip', 6), ('gzip', 9), ('br', 1), ('br', 4), ('br', 11)]
+
+# Entradas incluidas en la carga JSON (una página grande de un listado o exportación)
+JSON_ENTRIES = 500
+
+# Tamaño del conjunto de datos del que se toman esas entradas
+JSON_DATASET_SIZE = 1000
+
+@pytest.fixture(scope='module')
+def payloads(bench_app, datasets):
+    """Cuerpos representativos: HTML renderizado y un listado JSON de entradas."""
+    dataset = datasets(JSON_DATASET_SIZE)
+    with bench_app.test_client() as client:
+        html = client.get('/auth/register', headers={'Accept-Encoding': 'identity'}).data
+    
+    with bench_app.app_context():
+        entries = Entry.query.filter_by(user_id=dataset['user_id']).limit(JSON_ENTRIES).all()
+        body = json.dumps([{
+            'id': entry.id,
+            'title': entry.title,
+            'content': entry.content,
+            'status': entry.status,
+            'collection_id': entry.collection_id,
+            'created_at': entry.created_at.isoformat(),
+            'updated_at': entry.updated_at.isoformat(),
+        } for entry in entries]).encode('utf-8')
+    
+    return {'html': html, 'json': body}
+
+@pytest.mark.parametrize('payload_name', ['html', 'json'])
+@pytest.mark.parametrize('encoding,level', LEVELS, ids=[f'{e}-{l}' for e, l in LEVELS])
+def test_compression_level(benchmark, payloads, payload_name, encoding, level):
+    """Mide la compresión de un cuerpo con cada codificación y nivel."""
+    if encoding == 'br' and brotli is None:
+        pytest.skip('brotli no está instalado')
+    
+    data = payloads[payload_name]
+    config = {'COMPRESS_LEVEL': level, 'COMPRESS_BR_QUALITY': level}
+    
+    compressed = benchmark(compress_body, data, encoding, config)
+    
+    benchmark.extra_info['original_bytes'] = len(data)
+    benchmark.extra_info['compressed_bytes'] = len(compressed)
+    benchmark.extra_info['saved_ratio'] = round(1 - len(compressed) / len(data), 4)
+    assert len(compressed) < len(data)
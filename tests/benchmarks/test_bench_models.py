@@ -0,0 +1,84 @@
+"""
+Benchmarks para las operaciones sobre entradas, etiquetas y colecciones.
+"""
+
+import pytest
+
+from app import db
+from app.models import Collection, Entry, Tag
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures('bench_context')]
+
+PAGE_SIZE = 50
+
+def _reset_session():
+    """Descarta los cambios de la ronda anterior antes de medir la siguiente."""
+    db.session.rollback()
+    db.session.expunge_all()
+
+class TestEntryListingBenchmarks:
+    """Benchmarks del listado de entradas de un usuario."""
+    
+    def test_list_recent_entries(self, benchmark, dataset):
+        """Mide la primera página de entradas ordenadas por fecha de creación."""
+        def list_entries():
+            return Entry.query.filter_by(user_id=dataset['user_id'], is_deleted=False) \
+                .order_by(Entry.created_at.desc()) \
+                .limit(PAGE_SIZE) \
+                .all()
+        
+        entries = benchmark(list_entries)
+        assert len(entries) == min(PAGE_SIZE, dataset['size'])
+    
+    def test_list_entries_by_tag(self, benchmark, dataset):
+        """Mide el listado de entradas filtrado por etiqueta."""
+        tag_id = dataset['tag_ids'][0]
+        
+        def list_entries():
+            return Entry.query.join(Entry.tags) \
+                .filter(Tag.id == tag_id, Entry.is_deleted.is_(False)) \
+                .order_by(Entry.created_at.desc()) \
+                .limit(PAGE_SIZE) \
+                .all()
+        
+        benchmark(list_entries)
+    
+    def test_count_entries(self, benchmark, dataset):
+        """Mide el recuento de entradas activas del usuario."""
+        count = benchmark(
+            lambda: Entry.query.filter_by(user_id=dataset['user_id'], is_deleted=False).count()
+        )
+        assert count == dataset['size']
+
+class TestTaggingBenchmarks:
+    """Benchmarks del etiquetado de entradas."""
+    
+    def test_add_tag(self, benchmark, dataset):
+        """Mide añadir una etiqueta a una entrada y sincronizar con la base de datos."""
+        entry_id = dataset['entry_ids'][-1]
+        tag_id = dataset['tag_ids'][-1]
+        
+        def setup():
+            _reset_session()
+            return (db.session.get(Entry, entry_id), db.session.get(Tag, tag_id)), {}
+        
+        def add_tag(entry, tag):
+            entry.add_tag(tag)
+            db.session.flush()
+        
+        benchmark.pedantic(add_tag, setup=setup, rounds=20)
+
+class TestCollectionBenchmarks:
+    """Benchmarks del borrado de colecciones."""
+    
+    def test_soft_delete_collection(self, benchmark, dataset):
+        """Mide el borrado lógico de la colección más grande (10% de las entradas)."""
+        def setup():
+            _reset_session()
+            return (db.session.get(Collection, dataset['big_collection_id']),), {}
+        
+        def soft_delete(collection):
+            collection.soft_delete()
+            db.session.flush()
+        
+        benchmark.pedantic(soft_delete, setup=setup, rounds=3)
@@ -0,0 +1,71 @@
+"""
+Benchmarks de las entradas relacionadas: joins SQL por entrada frente a la matriz dispersa.
+"""
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import aliased
+
+import pytest
+
+from app import db
+from app.models import Entry, EntryTag
+from app.services.related_service import RelatedEntriesService, TagCooccurrenceModel
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures('bench_context')]
+
+# Entradas de las que se piden relacionadas en cada ronda (una página del listado)
+BATCH_SIZE = 50
+TOP_K = 5
+
+def _sql_related(user_id, entry_id):
+    """Relacionadas por número de etiquetas compartidas con un self-join de entry_tags."""
+    source, other = aliased(EntryTag), aliased(EntryTag)
+    return db.session.execute(
+        select(other.entry_id, func.count().label('shared'))
+        .join(source, source.tag_id == other.tag_id)
+        .join(Entry, Entry.id == other.entry_id)
+        .where(source.entry_id == entry_id, other.entry_id != entry_id,
+               Entry.user_id == user_id, Entry.is_deleted.is_(False))
+        .group_by(other.entry_id)
+        .order_by(func.count().desc(), other.entry_id)
+        .limit(TOP_K)
+    ).all()
+
+class TestRelatedEntriesBenchmarks:
+    """Benchmarks de las relacionadas de una página de entradas."""
+    
+    def test_sql_join_per_entry(self, benchmark, dataset):
+        """Mide una consulta con self-join de etiquetas por entrada de la página."""
+        entry_ids = dataset['entry_ids'][:BATCH_SIZE]
+        
+        results = benchmark.pedantic(
+            lambda: [_sql_related(dataset['user_id'], entry_id) for entry_id in entry_ids], rounds=5
+        )
+        assert len(results) == len(entry_ids)
+    
+    def test_sparse_matrix_batch(self, benchmark, dataset):
+        """Mide el cálculo en lote sobre la matriz ya cacheada."""
+        service = RelatedEntriesService()
+        entry_ids = dataset['entry_ids'][:BATCH_SIZE]
+        service.related(dataset['user_id'], entry_ids, k=TOP_K)
+        
+        results = benchmark(service.related, dataset['user_id'], entry_ids, TOP_K)
+        assert len(results) == len(entry_ids)
+    
+    def test_build_model(self, benchmark, dataset):
+        """Mide la carga de todas las etiquetas del usuario y la construcción de la matriz."""
+        service = RelatedEntriesService()
+        
+        model = benchmark.pedantic(
+            lambda: TagCooccurrenceModel.from_pairs(service._load_pairs(dataset['user_id'])), rounds=5
+        )
+        assert len(model.entry_ids)
+    
+    def test_incremental_update(self, benchmark, dataset):
+        """Mide la actualización tras cambiar las etiquetas de una entrada (sus filas y la matriz)."""
+        service = RelatedEntriesService()
+        model = TagCooccurrenceModel.from_pairs(service._load_pairs(dataset['user_id']))
+        changed = dataset['entry_ids'][:1]
+        
+        updated = benchmark(lambda: model.update(changed, service._load_pairs(dataset['user_id'], changed)))
+        assert len(updated.pairs) == len(model.pairs)
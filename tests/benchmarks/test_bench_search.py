@@ -0,0 +1,57 @@
+"""
+Benchmarks de la búsqueda semántica: LIKE sobre el contenido frente al índice de vectores.
+"""
+
+from sqlalchemy import select
+
+import pytest
+
+from app import db
+from app.models import Entry
+from app.services.search_service import SemanticSearchService
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures('bench_context')]
+
+QUERY = 'dolor sit amet'
+TOP_K = 10
+
+@pytest.fixture
+def search(tmp_path):
+    """Servicio de búsqueda con los índices en un directorio temporal."""
+    return SemanticSearchService(str(tmp_path))
+
+class TestSemanticSearchBenchmarks:
+    """Benchmarks de una búsqueda y del mantenimiento del índice."""
+    
+    def test_sql_like(self, benchmark, dataset):
+        """Mide la búsqueda por palabra clave con LIKE de una palabra ausente (recorre todo el contenido)."""
+        results = benchmark.pedantic(lambda: db.session.execute(
+            select(Entry.id, Entry.title)
+            .where(Entry.user_id == dataset['user_id'], Entry.is_deleted.is_(False),
+                   Entry.content.ilike('%lentejas%'))
+            .order_by(Entry.id.desc())
+            .limit(TOP_K)
+        ).all(), rounds=5)
+        assert results == []
+    
+    def test_semantic_search(self, benchmark, dataset, search):
+        """Mide una búsqueda con el índice ya construido (puesta al día, producto y top-k)."""
+        search.search(dataset['user_id'], QUERY)
+        
+        results = benchmark(search.search, dataset['user_id'], QUERY, TOP_K)
+        assert len(results) == TOP_K
+    
+    def test_build_index(self, benchmark, dataset, search):
+        """Mide la construcción del índice desde cero (lectura, vectorización y escritura)."""
+        benchmark.pedantic(search.rebuild, args=(dataset['user_id'],), rounds=1)
+        assert search._index(dataset['user_id']).meta['count'] == dataset['size']
+    
+    def test_incremental_update(self, benchmark, dataset, search):
+        """Mide la sustitución del vector de una entrada editada."""
+        search.search(dataset['user_id'], QUERY)
+        index = search._index(dataset['user_id'])
+        entry_id = dataset['entry_ids'][0]
+        
+        benchmark(index.apply, [(entry_id, 'Entrada editada\nNuevo contenido de la entrada.')],
+                  index.meta['watermark'])
+        assert index.positions[entry_id] == 0
@@ -0,0 +1,29 @@
+"""
+Benchmarks para las búsquedas de UserService.
+"""
+
+import pytest
+
+from app.services.user_service import UserService
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.usefixtures('bench_context')]
+
+user_service = UserService()
+
+class TestUserServiceBenchmarks:
+    """Benchmarks de las consultas de usuario más frecuentes."""
+    
+    def test_get_user_by_email(self, benchmark, dataset):
+        """Mide la búsqueda de usuario por correo (login, confirmación, reset)."""
+        user = benchmark(user_service.get_user_by_email, dataset['email'])
+        assert user.id == dataset['user_id']
+    
+    def test_get_user_by_username(self, benchmark, dataset):
+        """Mide la búsqueda de usuario por nombre (registro)."""
+        user = benchmark(user_service.get_user_by_username, dataset['username'])
+        assert user.id == dataset['user_id']
+    
+    def test_get_user_by_id(self, benchmark, dataset):
+        """Mide la búsqueda de usuario por ID."""
+        user = benchmark(user_service.get_user_by_id, dataset['user_id'])
+        assert user.username == dataset['username']
@@ -0,0 +1,83 @@
+"""
+Benchmarks de las vistas de autenticación y de la página principal mediante el cliente de pruebas.
+"""
+
+import re
+import itertools
+
+import pytest
+
+pytestmark = pytest.mark.benchmark
+
+def get_csrf_token(response):
+    """Extrae el token CSRF de la respuesta HTML."""
+    csrf_token = re.search(b'name="csrf_token" type="hidden" value="(.+?)"', response.data)
+    if csrf_token:
+        return csrf_token.group(1).decode('utf-8')
+    return None
+
+class TestAuthViewBenchmarks:
+    """Benchmarks de las vistas de login y registro."""
+    
+    def test_login_page(self, benchmark, bench_client):
+        """Mide el renderizado del formulario de login."""
+        response = benchmark(bench_client.get, '/auth/login')
+        assert response.status_code == 200
+    
+    def test_login_submit(self, benchmark, bench_client, dataset):
+        """Mide el envío del formulario de login (incluye la verificación bcrypt)."""
+        def setup():
+            bench_client.get('/auth/logout')
+            csrf_token = get_csrf_token(bench_client.get('/auth/login'))
+            return (), {'data': {
+                'email': dataset['email'],
+                'password': dataset['password'],
+                'csrf_token': csrf_token,
+            }}
+        
+        def login(data):
+            return bench_client.post('/auth/login', data=data)
+        
+        response = benchmark.pedantic(login, setup=setup, rounds=10)
+        assert response.status_code == 302
+    
+    def test_register_page(self, benchmark, bench_client):
+        """Mide el renderizado del formulario de registro."""
+        response = benchmark(bench_client.get, '/auth/register')
+        assert response.status_code == 200
+    
+    def test_register_submit(self, benchmark, bench_client, dataset):
+        """Mide el registro de un usuario nuevo (consultas de unicidad, hash y correo)."""
+        counter = itertools.count()
+        
+        def setup():
+            csrf_token = get_csrf_token(bench_client.get('/auth/register'))
+            n = next(counter)
+            return (), {'data': {
+                'username': f'nuevo_{dataset["size"]}_{n}',
+                'email': f'nuevo_{dataset["size"]}_{n}@example.com',
+                'password': dataset['password'],
+                'password_confirm': dataset['password'],
+                'csrf_token': csrf_token,
+            }}
+        
+        def register(data):
+            return bench_client.post('/auth/register', data=data)
+        
+        response = benchmark.pedantic(register, setup=setup, rounds=10)
+        assert response.status_code == 302
+
+class TestMainViewBenchmarks:
+    """Benchmarks de la página principal con sesión iniciada."""
+    
+    def test_index(self, benchmark, bench_client, dataset):
+        """Mide la carga de la página principal de un usuario autenticado."""
+        csrf_token = get_csrf_token(bench_client.get('/auth/login'))
+        bench_client.post('/auth/login', data={
+            'email': dataset['email'],
+            'password': dataset['password'],
+            'csrf_token': csrf_token,
+        })
+        
+        response = benchmark(bench_client.get, '/')
+        assert response.status_code == 200
@@ -5,11 +5,110 @@ Configuración y fixtures para las pruebas de la aplicación Eureka.
 import os
 import pytest
 from datetime import datetime
+from pathlib import Path
+
+from alembic.script import ScriptDirectory
+from flask_migrate import upgrade
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 from app import create_app, db
 from app.models import User, Collection, Entry, Tag, EntryTag
 from app.models.entry import EntryStatus
 
+MIGRATIONS_DIR = str(Path(__file__).resolve().parent.parent / 'migrations')
+
+# Clave arbitraria del advisory lock que serializa la creación de la plantilla
+TEMPLATE_LOCK_KEY = 72736
+
+def pytest_addoption(parser):
+    """Registra opciones de línea de comandos propias de la suite."""
+    parser.addoption(
+        '--run-benchmarks',
+        action='store_true',
+        default=False,
+        help='Ejecuta también las pruebas de rendimiento (tests/benchmarks).'
+    )
+
+def pytest_collection_modifyitems(config, items):
+    """Omite los benchmarks salvo que se soliciten explícitamente."""
+    if config.getoption('--run-benchmarks'):
+        return
+    
+    skip_benchmark = pytest.mark.skip(reason='Usa --run-benchmarks para ejecutar los benchmarks.')
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip_benchmark)
+
+def _uses_worker_database(app):
+    """Indica si la base de datos del worker debe clonarse desde la plantilla migrada."""
+    return bool(app.config.get('XDIST_WORKER')) and db.engine.dialect.name == 'postgresql'
+
+def _clone_worker_database(app):
+    """
+    Crea la base de datos del worker de pytest-xdist a partir de una plantilla migrada.
+    
+    La plantilla se migra una sola vez (y de nuevo solo si cambia la revisión head);
+    clonarla con CREATE DATABASE ... TEMPLATE es mucho más rápido que crear las
+    tablas en cada worker. Un advisory lock serializa a los workers que arrancan a la vez.
+    """
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    worker_db = url.database
+    template_db = worker_db[:-len(app.config['XDIST_WORKER']) - 1] + '_template'
+    head = ScriptDirectory.from_config(
+        app.extensions['migrate'].migrate.get_config(MIGRATIONS_DIR)
+    ).get_current_head()
+    
+    admin = create_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    try:
+        with admin.connect() as connection:
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': TEMPLATE_LOCK_KEY})
+            try:
+                current = connection.execute(text(
+                    "SELECT shobj_description(oid, 'pg_database') FROM pg_database WHERE datname = :name"
+                ), {'name': template_db}).first()
+                
+                if current is None or current[0] != head:
+                    connection.execute(text(f'DROP DATABASE IF EXISTS "{template_db}"'))
+                    connection.execute(text(f'CREATE DATABASE "{template_db}"'))
+                    template_url = url.set(database=template_db).render_as_string(hide_password=False)
+                    upgrade(directory=MIGRATIONS_DIR, x_arg=[f'dburl={template_url}'])
+                    connection.execute(text(f"COMMENT ON DATABASE \"{template_db}\" IS '{head}'"))
+                
+                connection.execute(text(f'DROP DATABASE IF EXISTS "{worker_db}"'))
+                connection.execute(text(f'CREATE DATABASE "{worker_db}" TEMPLATE "{template_db}"'))
+            finally:
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': TEMPLATE_LOCK_KEY})
+    finally:
+        admin.dispose()
+
+def _drop_worker_database(app):
+    """Elimina la base de datos del worker al terminar la sesión de pruebas."""
+    url = make_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    db.engine.dispose()
+    admin = create_engine(url.set(database='postgres'), isolation_level='AUTOCOMMIT')
+    try:
+        with admin.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{url.database}"'))
+    finally:
+        admin.dispose()
+
+def _enable_sqlite_savepoints(engine):
+    """
+    Hace que pysqlite respete BEGIN/SAVEPOINT para poder revertir cada prueba.
+    
+    Por defecto el driver gestiona las transacciones por su cuenta e impide anidar
+    SAVEPOINTs dentro de una transacción externa.
+    """
+    @event.listens_for(engine, 'connect')
+    def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+    
+    @event.listens_for(engine, 'begin')
+    def _emit_begin(connection):
+        connection.exec_driver_sql('BEGIN')
+
 @pytest.fixture(scope='session')
 def app():
     """Crea una instancia de la aplicación para las pruebas."""
@@ -19,14 +118,24 @@ def app():
     
     # Establecer el contexto de la aplicación
     with app.app_context():
-        # Crear todas las tablas en la base de datos de prueba
-        db.create_all()
+        if db.engine.dialect.name == 'sqlite':
+            _enable_sqlite_savepoints(db.engine)
+        
+        if _uses_worker_database(app):
+            # Base de datos propia del worker, clonada de la plantilla migrada
+            _clone_worker_database(app)
+        else:
+            # Crear todas las tablas en la base de datos de prueba
+            db.create_all()
         
         yield app
         
         # Limpiar después de las pruebas
         db.session.remove()
-        db.drop_all()
+        if _uses_worker_database(app):
+            _drop_worker_database(app)
+        else:
+            db.drop_all()
 
 @pytest.fixture(scope='function')
 def client(app):
@@ -36,25 +145,33 @@ def client(app):
 
 @pytest.fixture(scope='function')
 def db_session(app):
-    """Proporciona una sesión de base de datos para las pruebas."""
+    """
+    Proporciona una sesión de base de datos que se revierte al terminar cada prueba.
+    
+    La sesión se enlaza a una transacción externa y cada commit de la prueba solo
+    libera un SAVEPOINT, de modo que nada persiste entre pruebas y no hace falta
+    recrear las tablas.
+    """
     # Iniciar una transacción
     connection = db.engine.connect()
     transaction = connection.begin()
     
-    # Crear una sesión usando la conexión
-    session = db.create_scoped_session(
-        options=dict(bind=connection, binds={})
-    )
+    # Crear una sesión usando la conexión; los commits operan sobre SAVEPOINTs.
+    # Se usa la sesión de SQLAlchemy directamente porque la de Flask-SQLAlchemy
+    # resuelve siempre el engine y abriría otra conexión fuera de la transacción.
+    session = scoped_session(sessionmaker(bind=connection, join_transaction_mode='create_savepoint'))
     
     # Reemplazar la sesión global con nuestra sesión de prueba
+    original_session = db.session
     db.session = session
     
     yield session
     
     # Rollback de la transacción y limpieza
+    session.remove()
+    db.session = original_session
     transaction.rollback()
     connection.close()
-    session.remove()
 
 @pytest.fixture
 def test_user(db_session):
@@ -0,0 +1,3 @@
+"""
+Paquete de pruebas para las utilidades de la aplicación Eureka.
+"""
\ No newline at end of file
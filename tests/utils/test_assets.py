@@ -0,0 +1,75 @@
+"""
+Pruebas para el canal de recursos estáticos con huella.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from app import create_app
+from app.utils.assets import build_assets, load_manifest, asset_url, IMMUTABLE_CACHE_CONTROL
+
+@pytest.fixture
+def assets_app(tmp_path):
+    """Aplicación con los recursos generados en una carpeta temporal."""
+    app = create_app('testing')
+    app.config['ASSETS_OUTPUT_FOLDER'] = str(tmp_path / 'dist')
+    build_assets(app.static_folder, app.config['ASSETS_OUTPUT_FOLDER'])
+    load_manifest(app)
+    return app
+
+@pytest.mark.utils
+class TestAssets:
+    """Pruebas para la generación y el servicio de recursos estáticos."""
+    
+    def test_build_writes_fingerprinted_files(self, assets_app, tmp_path):
+        """Prueba que se generan el manifiesto, los ficheros con huella y sus variantes."""
+        manifest = json.loads((tmp_path / 'dist' / 'manifest.json').read_text())
+        entry = manifest['css/main.css']
+        
+        assert entry['path'].startswith('css/main.')
+        assert entry['path'].endswith('.css')
+        assert 'gzip' in entry['encodings']
+        
+        original = (tmp_path / 'dist' / entry['path']).read_bytes()
+        compressed = (tmp_path / 'dist' / (entry['path'] + '.gz')).read_bytes()
+        assert gzip.decompress(compressed) == original
+    
+    def test_asset_url_uses_manifest(self, assets_app):
+        """Prueba que asset_url devuelve la ruta con huella o la estática si no existe."""
+        with assets_app.test_request_context():
+            path = assets_app.extensions['assets_manifest']['css/main.css']['path']
+            assert asset_url('css/main.css') == f'/assets/{path}'
+            assert asset_url('css/desconocido.css') == '/static/css/desconocido.css'
+    
+    def test_serves_precompressed_variant(self, assets_app):
+        """Prueba que se sirve la variante gzip con caché inmutable."""
+        path = assets_app.extensions['assets_manifest']['css/main.css']['path']
+        client = assets_app.test_client()
+        
+        response = client.get(f'/assets/{path}', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.status_code == 200
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert response.headers['Cache-Control'] == IMMUTABLE_CACHE_CONTROL
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert response.mimetype == 'text/css'
+        assert b'--color-accent' in gzip.decompress(response.data)
+    
+    def test_serves_identity_without_accept_encoding(self, assets_app):
+        """Prueba que sin Accept-Encoding se sirve el fichero sin comprimir."""
+        path = assets_app.extensions['assets_manifest']['css/main.css']['path']
+        client = assets_app.test_client()
+        
+        response = client.get(f'/assets/{path}', headers={'Accept-Encoding': 'identity'})
+        
+        assert response.status_code == 200
+        assert 'Content-Encoding' not in response.headers
+        assert b'--color-accent' in response.data
+    
+    def test_manifest_is_not_served(self, assets_app):
+        """Prueba que el manifiesto y las variantes no se sirven directamente."""
+        client = assets_app.test_client()
+        
+        assert client.get('/assets/manifest.json').status_code == 404
@@ -0,0 +1,73 @@
+"""
+Pruebas para el filtro de Bloom y la comprobación de disponibilidad.
+"""
+
+import pytest
+
+from app.models import User
+from app.utils.bloom import BloomFilter
+
+@pytest.mark.utils
+class TestBloomFilter:
+    """Pruebas para el filtro de Bloom."""
+    
+    def test_no_false_negatives_and_error_rate(self):
+        """Prueba que todo lo añadido está y que los falsos positivos rondan la tasa pedida."""
+        bloom = BloomFilter(10000, error_rate=0.01)
+        added = [f'username:usuario{i}' for i in range(10000)]
+        bloom.update(added)
+        
+        assert all(item in bloom for item in added)
+        false_positives = sum(f'username:otro{i}' in bloom for i in range(10000))
+        assert false_positives < 200
+        assert len(bloom) == 10000
+        assert bloom.size_bytes < 10000 * 1.3
+    
+    def test_invalid_error_rate(self):
+        """Prueba que la probabilidad de falso positivo debe estar entre 0 y 1."""
+        with pytest.raises(ValueError):
+            BloomFilter(100, error_rate=1)
+
+@pytest.fixture
+def availability(app, db_session):
+    """Comprobación de disponibilidad con un filtro construido para la prueba."""
+    service = app.extensions['availability']
+    service.invalidate()
+    yield service
+    service.invalidate()
+
+@pytest.mark.utils
+class TestAvailabilityService:
+    """Pruebas para la comprobación de nombres de usuario y correos."""
+    
+    def test_taken(self, availability, test_user):
+        """Prueba los campos ocupados, sin distinguir mayúsculas en el correo."""
+        assert availability.taken('test_user', 'TEST@example.com') == {'username', 'email'}
+        assert availability.taken('test_user', 'libre@example.com') == {'username'}
+        assert availability.taken(email='test@example.com') == {'email'}
+        assert availability.taken('libre', 'libre@example.com') == set()
+    
+    def test_negatives_skip_database(self, availability, test_user, monkeypatch):
+        """Prueba que lo que el filtro no conoce se responde sin consultar y lo positivo se confirma."""
+        availability.taken('calentar')
+        queries = []
+        original = availability.user_service.get_taken_fields
+        monkeypatch.setattr(availability.user_service, 'get_taken_fields',
+                            lambda *args: queries.append(args) or original(*args))
+        
+        assert availability.taken('nadie', 'nadie@example.com') == set()
+        assert queries == []
+        assert availability.taken('test_user', 'nadie@example.com') == {'username'}
+        assert len(queries) == 1
+    
+    def test_add_new_user(self, availability, db_session):
+        """Prueba que los usuarios creados después de construir el filtro se incorporan con `add`."""
+        availability.taken('calentar')
+        user = User(username='recien', email='recien@example.com', is_verified=True)
+        user.password = 'Recien1234!'
+        db_session.add(user)
+        db_session.commit()
+        
+        assert availability.taken('recien') == set()
+        availability.add('recien', 'recien@example.com')
+        assert availability.taken('recien', 'Recien@example.com') == {'username', 'email'}
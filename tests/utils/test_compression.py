@@ -0,0 +1,98 @@
+"""
+Pruebas para la compresión de respuestas dinámicas.
+"""
+
+import gzip
+
+import pytest
+from flask import Response, jsonify, send_file
+from io import BytesIO
+
+from app import create_app
+
+BODY = 'Eureka ' * 200
+
+@pytest.fixture
+def compression_app():
+    """Aplicación con rutas de prueba para cada tipo de respuesta."""
+    app = create_app('testing')
+    
+    @app.route('/_test/html')
+    def html():
+        return BODY
+    
+    @app.route('/_test/tiny')
+    def tiny():
+        return 'ok'
+    
+    @app.route('/_test/json')
+    def json_body():
+        return jsonify(items=[BODY] * 5)
+    
+    @app.route('/_test/stream')
+    def stream():
+        return Response((f'{i}:{BODY}\n' for i in range(5)), mimetype='text/plain')
+    
+    @app.route('/_test/file')
+    def file():
+        return send_file(BytesIO(BODY.encode()), mimetype='text/plain')
+    
+    @app.route('/_test/encoded')
+    def encoded():
+        return Response(gzip.compress(BODY.encode()), headers={'Content-Encoding': 'gzip'})
+    
+    return app
+
+@pytest.mark.utils
+class TestCompression:
+    """Pruebas para el middleware de compresión."""
+    
+    def test_compresses_html(self, compression_app):
+        """Prueba que el HTML se comprime con gzip si el cliente lo acepta."""
+        response = compression_app.test_client().get('/_test/html', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Accept-Encoding' in response.headers['Vary']
+        assert int(response.headers['Content-Length']) == len(response.data)
+        assert gzip.decompress(response.data).decode() == BODY
+    
+    def test_prefers_brotli(self, compression_app):
+        """Prueba que se prefiere brotli cuando está disponible y el cliente lo acepta."""
+        brotli = pytest.importorskip('brotli')
+        response = compression_app.test_client().get('/_test/json', headers={'Accept-Encoding': 'gzip, br'})
+        
+        assert response.headers['Content-Encoding'] == 'br'
+        assert BODY.encode() in brotli.decompress(response.data)
+    
+    def test_without_accept_encoding(self, compression_app):
+        """Prueba que no se comprime si el cliente no lo acepta."""
+        response = compression_app.test_client().get('/_test/html', headers={'Accept-Encoding': 'identity'})
+        
+        assert 'Content-Encoding' not in response.headers
+        assert response.data.decode() == BODY
+    
+    def test_skips_tiny_bodies(self, compression_app):
+        """Prueba que los cuerpos por debajo del tamaño mínimo no se comprimen."""
+        response = compression_app.test_client().get('/_test/tiny', headers={'Accept-Encoding': 'gzip'})
+        
+        assert 'Content-Encoding' not in response.headers
+        assert response.data == b'ok'
+    
+    def test_compresses_streamed_responses(self, compression_app):
+        """Prueba que las respuestas en streaming se comprimen sin Content-Length."""
+        response = compression_app.test_client().get('/_test/stream', headers={'Accept-Encoding': 'gzip'})
+        
+        assert response.headers['Content-Encoding'] == 'gzip'
+        assert 'Content-Length' not in response.headers
+        lines = gzip.decompress(response.data).decode().splitlines()
+        assert [line.split(':')[0] for line in lines] == ['0', '1', '2', '3', '4']
+    
+    def test_skips_files_and_encoded_responses(self, compression_app):
+        """Prueba que no se recomprimen ficheros ni respuestas ya codificadas."""
+        client = compression_app.test_client()
+        
+        file_response = client.get('/_test/file', headers={'Accept-Encoding': 'gzip'})
+        assert 'Content-Encoding' not in file_response.headers
+        
+        encoded_response = client.get('/_test/encoded', headers={'Accept-Encoding': 'gzip'})
+        assert gzip.decompress(encoded_response.data).decode() == BODY
@@ -0,0 +1,106 @@
+"""
+Pruebas para las respuestas condicionales basadas en updated_at.
+"""
+
+from datetime import datetime
+
+import pytest
+
+from app import create_app
+from app.models import Tag
+from app.utils.conditional import conditional, user_content_version
+
+@pytest.fixture
+def conditional_app():
+    """Aplicación con una ruta condicional cuya versión se controla desde la prueba."""
+    app = create_app('testing')
+    app.config['SESSION_COOKIE_SECURE'] = False
+    state = {'key': 'v1', 'renders': 0}
+    
+    @app.route('/_test/page')
+    @conditional(lambda: (datetime(2025, 1, 1, 12, 0, 0), state['key']))
+    def page():
+        state['renders'] += 1
+        return 'contenido'
+    
+    app.config['TEST_STATE'] = state
+    return app
+
+@pytest.mark.utils
+class TestConditionalResponses:
+    """Pruebas para el decorador conditional."""
+    
+    def test_sets_validators(self, conditional_app):
+        """Prueba que la respuesta incluye ETag débil, Last-Modified y caché privada."""
+        response = conditional_app.test_client().get('/_test/page')
+        
+        assert response.status_code == 200
+        etag, weak = response.get_etag()
+        assert etag and weak
+        assert response.headers['Last-Modified'] == 'Wed, 01 Jan 2025 12:00:00 GMT'
+        assert response.cache_control.private
+        assert response.cache_control.no_cache
+    
+    def test_not_modified_skips_view(self, conditional_app):
+        """Prueba que con el mismo ETag se responde 304 sin ejecutar la vista."""
+        client = conditional_app.test_client()
+        state = conditional_app.config['TEST_STATE']
+        etag = client.get('/_test/page').headers['ETag']
+        
+        response = client.get('/_test/page', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 304
+        assert response.data == b''
+        assert state['renders'] == 1
+    
+    def test_changed_version_renders(self, conditional_app):
+        """Prueba que si cambia la versión se vuelve a renderizar la página."""
+        client = conditional_app.test_client()
+        state = conditional_app.config['TEST_STATE']
+        etag = client.get('/_test/page').headers['ETag']
+        state['key'] = 'v2'
+        
+        response = client.get('/_test/page', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+    
+    def test_if_modified_since(self, conditional_app):
+        """Prueba la validación por fecha cuando no se envía If-None-Match."""
+        client = conditional_app.test_client()
+        
+        response = client.get('/_test/page', headers={'If-Modified-Since': 'Wed, 01 Jan 2025 12:00:00 GMT'})
+        assert response.status_code == 304
+        
+        response = client.get('/_test/page', headers={'If-Modified-Since': 'Wed, 01 Jan 2025 11:59:59 GMT'})
+        assert response.status_code == 200
+    
+    def test_pending_flashes_bypass_cache(self, conditional_app):
+        """Prueba que con mensajes flash pendientes se renderiza siempre la página."""
+        client = conditional_app.test_client()
+        etag = client.get('/_test/page').headers['ETag']
+        with client.session_transaction() as session:
+            session['_flashes'] = [('info', 'Mensaje')]
+        
+        response = client.get('/_test/page', headers={'If-None-Match': etag})
+        
+        assert response.status_code == 200
+    
+    def test_user_content_version_changes(self, db_session, test_user, test_entry):
+        """Prueba que la versión del contenido cambia al etiquetar y editar entradas."""
+        initial = user_content_version(test_user.id)
+        
+        tag = Tag(name='nueva', user_id=test_user.id)
+        db_session.add(tag)
+        db_session.commit()
+        with_tag = user_content_version(test_user.id)
+        assert with_tag != initial
+        
+        test_entry.tags.append(tag)
+        db_session.commit()
+        tagged = user_content_version(test_user.id)
+        assert tagged[1] != with_tag[1]
+        
+        test_entry.tags.remove(tag)
+        db_session.commit()
+        assert user_content_version(test_user.id)[1] != tagged[1]
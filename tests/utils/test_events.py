@@ -0,0 +1,84 @@
+"""
+Pruebas para las notificaciones de cambios.
+"""
+
+import queue
+
+import pytest
+
+from app.models import Entry, Tag
+from app.services.entry_service import EntryService
+from app.utils.events import LocalBroker
+
+@pytest.fixture
+def subscriber(app, test_user):
+    """Suscripción a los cambios de `test_user` en el broker de la aplicación."""
+    broker = app.extensions['events']
+    subscriber = broker.subscribe(test_user.id)
+    yield subscriber
+    broker.unsubscribe(test_user.id, subscriber)
+
+@pytest.mark.utils
+class TestChangeEvents:
+    """Pruebas para la publicación de cambios desde la capa de modelos."""
+    
+    def test_commit_publishes_changes(self, db_session, test_user, subscriber):
+        """Prueba que al confirmar se publican los IDs creados por tipo."""
+        tag = Tag(name='publicada', user_id=test_user.id)
+        entry = Entry(title='Nueva', content='Texto', user_id=test_user.id)
+        db_session.add_all([tag, entry])
+        db_session.commit()
+        
+        changes = subscriber.get_nowait()
+        assert changes == {'tags': [tag.id], 'entries': [entry.id]}
+    
+    def test_rollback_discards_changes(self, db_session, test_user, subscriber):
+        """Prueba que los cambios revertidos no se publican."""
+        db_session.add(Tag(name='revertida', user_id=test_user.id))
+        db_session.flush()
+        db_session.rollback()
+        
+        with pytest.raises(queue.Empty):
+            subscriber.get_nowait()
+    
+    def test_batch_publishes_bulk_changes(self, db_session, test_user, test_entry, subscriber):
+        """Prueba que los cambios hechos con sentencias masivas también se publican."""
+        subscriber.queue.clear()
+        
+        EntryService().apply_batch(test_user.id, [
+            {'op': 'update', 'id': test_entry.id, 'data': {'title': 'Editada'}},
+        ])
+        
+        assert subscriber.get_nowait() == {'entries': [test_entry.id]}
+    
+    def test_slow_subscriber_drops_events(self):
+        """Prueba que un suscriptor con la cola llena pierde eventos sin bloquear."""
+        broker = LocalBroker(queue_size=1)
+        subscriber = broker.subscribe(1)
+        received = []
+        broker.add_listener(lambda user_id, changes: received.append(user_id))
+        
+        broker.publish(1, {'entries': [1]})
+        broker.publish(1, {'entries': [2]})
+        broker.publish(2, {'entries': [3]})
+        
+        assert subscriber.get_nowait() == {'entries': [1]}
+        assert subscriber.empty()
+        assert received == [1, 1, 2]
+    
+    def test_transactional_broker_publishes_before_commit(self, app, db_session, test_user, monkeypatch):
+        """Prueba que un broker transaccional publica en la conexión de la sesión, antes de confirmar."""
+        published = []
+        
+        class TransactionalBroker(LocalBroker):
+            transactional = True
+            
+            def publish(self, user_id, changes, connection=None):
+                published.append((user_id, changes, connection is not None and connection.in_transaction()))
+        
+        monkeypatch.setitem(app.extensions, 'events', TransactionalBroker())
+        entry = Entry(title='Sin flush', content='Texto', user_id=test_user.id)
+        db_session.add(entry)
+        db_session.commit()
+        
+        assert published == [(test_user.id, {'entries': [entry.id]}, True)]
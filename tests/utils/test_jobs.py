@@ -0,0 +1,187 @@
+"""
+Pruebas para la cola de tareas en segundo plano.
+"""
+
+import time
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.models import Job, Tag
+from app.models.job import JobStatus
+from app.services.job_service import TASKS, Worker, task
+
+@task('tests.record')
+def _record(value, fail=False):
+    """Tarea de prueba que, si se pide, falla."""
+    if fail:
+        raise RuntimeError('fallo de prueba')
+
+@task('tests.sleep')
+def _sleep(seconds):
+    """Tarea de prueba que tarda en terminar."""
+    time.sleep(seconds)
+
+@task('tests.create_tag')
+def _create_tag(user_id, name, fail=False):
+    """Tarea de prueba que escribe en la base de datos."""
+    from app import db
+    db.session.add(Tag(name=name, user_id=user_id))
+    db.session.flush()
+    if fail:
+        raise RuntimeError('fallo después de escribir')
+
+@pytest.fixture
+def queue(app, db_session):
+    """Cola de tareas de la aplicación."""
+    return app.extensions['jobs']
+
+def _enqueue(queue, db_session, *jobs):
+    """Encola varias tareas y confirma."""
+    created = [queue.enqueue(name, payload, **options) for name, payload, options in jobs]
+    db_session.commit()
+    return created
+
+@pytest.mark.utils
+class TestJobQueue:
+    """Pruebas para las operaciones de la cola."""
+    
+    def test_dequeue_by_priority_and_schedule(self, queue, db_session):
+        """Prueba el orden por prioridad, las tareas programadas y que no se toman dos veces."""
+        low, high, later, other = _enqueue(
+            queue, db_session,
+            ('tests.record', {'value': 'baja'}, {}),
+            ('tests.record', {'value': 'alta'}, {'priority': 5}),
+            ('tests.record', {'value': 'luego'}, {'delay': 3600}),
+            ('tests.record', {'value': 'otra'}, {'queue': 'email'}),
+        )
+        
+        jobs = queue.dequeue('w1', queues=['default'], limit=5)
+        
+        assert [job.id for job in jobs] == [high.id, low.id]
+        assert all(job.attempts == 1 for job in jobs)
+        assert queue.dequeue('w2', queues=['default']) == []
+        assert [job.id for job in queue.dequeue('w2')] == [other.id]
+        db_session.refresh(later)
+        assert later.status == JobStatus.PENDIENTE.value
+    
+    def test_unknown_task(self, queue):
+        """Prueba que no se pueden encolar tareas sin registrar."""
+        with pytest.raises(ValueError):
+            queue.enqueue('tests.missing')
+    
+    def test_retries_with_backoff(self, queue, db_session):
+        """Prueba que una tarea que falla se reprograma hasta agotar sus intentos."""
+        job, = _enqueue(queue, db_session, ('tests.record', {'value': 1, 'fail': True}, {'max_attempts': 2}))
+        
+        claimed, = queue.dequeue('w1')
+        queue.fail(claimed, 'w1', 'RuntimeError: fallo')
+        db_session.refresh(job)
+        assert job.status == JobStatus.PENDIENTE.value
+        assert job.run_at > datetime.utcnow() + timedelta(seconds=queue.retry_delay * 0.7)
+        assert job.last_error == 'RuntimeError: fallo'
+        
+        job.run_at = datetime.utcnow()
+        db_session.commit()
+        claimed, = queue.dequeue('w1')
+        queue.fail(claimed, 'w1', 'RuntimeError: fallo')
+        db_session.refresh(job)
+        assert (job.status, job.attempts) == (JobStatus.FALLIDA.value, 2)
+        
+        assert queue.retry_failed() == 1
+        db_session.refresh(job)
+        assert (job.status, job.attempts) == (JobStatus.PENDIENTE.value, 0)
+    
+    def test_recover_stale_and_release(self, queue, db_session):
+        """Prueba que vuelven a la cola las tareas de un worker caído y las no ejecutadas."""
+        stale, released = _enqueue(
+            queue, db_session,
+            ('tests.record', {'value': 1}, {}),
+            ('tests.record', {'value': 2}, {}),
+        )
+        queue.dequeue('w1')
+        stale.locked_at = datetime.utcnow() - timedelta(seconds=queue.lock_timeout + 1)
+        db_session.commit()
+        
+        assert queue.recover_stale() == 1
+        queue.release([released.id], 'w1')
+        
+        db_session.refresh(stale)
+        db_session.refresh(released)
+        assert stale.status == released.status == JobStatus.PENDIENTE.value
+        assert (stale.attempts, released.attempts) == (1, 0)
+    
+    def test_heartbeat_keeps_job_in_progress(self, queue, db_session):
+        """Prueba que una tarea cuyo worker renueva el bloqueo no se recupera como abandonada."""
+        job, = _enqueue(queue, db_session, ('tests.record', {'value': 1}, {}))
+        queue.dequeue('w1')
+        job.locked_at = datetime.utcnow() - timedelta(seconds=queue.lock_timeout + 1)
+        db_session.commit()
+        
+        assert queue.heartbeat(job.id, 'w1')
+        assert not queue.heartbeat(job.id, 'w2')
+        assert queue.recover_stale() == 0
+        db_session.refresh(job)
+        assert (job.status, job.locked_by) == (JobStatus.EN_CURSO.value, 'w1')
+    
+    def test_purge(self, queue, db_session):
+        """Prueba que se borran solo las tareas terminadas hace tiempo."""
+        old, recent, pending = _enqueue(
+            queue, db_session,
+            ('tests.record', {'value': 1}, {}),
+            ('tests.record', {'value': 2}, {}),
+            ('tests.record', {'value': 3}, {}),
+        )
+        for job, days in ((old, 10), (recent, 1)):
+            job.status = JobStatus.COMPLETADA.value
+            job.finished_at = datetime.utcnow() - timedelta(days=days)
+        db_session.commit()
+        ids = [old.id, recent.id, pending.id]
+        
+        assert queue.purge(older_than=7) == 1
+        assert db_session.scalars(select(Job.id).where(Job.id.in_(ids)).order_by(Job.id)).all() == ids[1:]
+        assert queue.counts()['default'] == {'completada': 1, 'pendiente': 1}
+
+@pytest.mark.utils
+class TestWorker:
+    """Pruebas para la ejecución de tareas."""
+    
+    def test_burst_runs_and_completes(self, app, queue, db_session, test_user):
+        """Prueba que el worker ejecuta las tareas y confirma sus escrituras con ellas."""
+        ok, failing = _enqueue(
+            queue, db_session,
+            ('tests.create_tag', {'user_id': test_user.id, 'name': 'desde-worker'}, {}),
+            ('tests.create_tag', {'user_id': test_user.id, 'name': 'revertida', 'fail': True}, {'max_attempts': 1}),
+        )
+        
+        ok_id, failing_id, user_id = ok.id, failing.id, test_user.id
+        
+        assert Worker(app, batch_size=1, worker_id='w1').run(burst=True) == 2
+        
+        # El contexto de aplicación del worker cierra la sesión al terminar
+        ok, failing = db_session.get(Job, ok_id), db_session.get(Job, failing_id)
+        assert ok.status == JobStatus.COMPLETADA.value
+        assert failing.status == JobStatus.FALLIDA.value
+        assert 'fallo después de escribir' in failing.last_error
+        names = {tag.name for tag in db_session.query(Tag).filter_by(user_id=user_id)}
+        assert 'desde-worker' in names and 'revertida' not in names
+    
+    def test_heartbeat_while_running(self, app, queue, db_session, monkeypatch):
+        """Prueba que el worker renueva el bloqueo mientras la tarea se ejecuta, y deja de hacerlo al terminar."""
+        job, = _enqueue(queue, db_session, ('tests.sleep', {'seconds': 0.2}, {}))
+        job_id = job.id
+        beats = []
+        monkeypatch.setattr(queue, 'heartbeat', lambda job_id, worker_id: beats.append((job_id, worker_id)))
+        
+        assert Worker(app, worker_id='w1', heartbeat_interval=0.05).run(burst=True) == 1
+        
+        count = len(beats)
+        assert count >= 2 and set(beats) == {(job_id, 'w1')}
+        time.sleep(0.1)
+        assert len(beats) == count
+        assert db_session.get(Job, job_id).status == JobStatus.COMPLETADA.value
+    
+    def test_registered_tasks(self):
+        """Prueba que el correo y el mantenimiento tienen tareas registradas."""
+        assert {'email.send', 'jobs.purge', 'images.prune', 'search.rebuild', 'stats.rebuild'} <= set(TASKS)
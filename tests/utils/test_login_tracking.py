@@ -0,0 +1,67 @@
+"""
+Pruebas para el registro agrupado de inicios de sesión.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.exc import OperationalError
+
+from app import db
+from app.models import User
+
+@pytest.fixture
+def tracker(app, db_session, monkeypatch):
+    """Registro de inicios de sesión que acumula sin hilo de fondo."""
+    tracker = app.extensions['login_tracker']
+    monkeypatch.setattr(tracker, 'interval', 60)
+    monkeypatch.setattr(tracker, '_ensure_flushing', lambda: None)
+    tracker._pending.clear()
+    yield tracker
+    tracker._pending.clear()
+
+@pytest.mark.utils
+class TestLoginTracker:
+    """Pruebas para la acumulación y la escritura por lotes."""
+    
+    def test_record_buffers_until_flush(self, tracker, db_session, test_user):
+        """Prueba que los logins se acumulan y se escriben juntos en un solo UPDATE."""
+        user_id = test_user.id
+        first = datetime(2026, 1, 1, 9, 0)
+        for minutes in (0, 30, 10):
+            tracker.record(user_id, at=first + timedelta(minutes=minutes))
+        
+        assert tracker.pending(user_id) == (first + timedelta(minutes=30), 3)
+        db_session.refresh(test_user)
+        assert (test_user.last_login, test_user.login_count) == (None, 0)
+        
+        assert tracker.flush() == 1
+        assert tracker.pending(user_id) is None
+        user = db_session.get(User, user_id)
+        db_session.refresh(user)
+        assert (user.last_login, user.login_count) == (first + timedelta(minutes=30), 3)
+        
+        tracker.record(user_id)
+        assert tracker.flush() == 1
+        db_session.refresh(user)
+        assert user.login_count == 4
+        assert tracker.flush() == 0
+    
+    def test_failed_flush_keeps_logins(self, tracker, db_session, test_user, monkeypatch):
+        """Prueba que si la escritura falla los logins vuelven al búfer."""
+        user_id = test_user.id
+        at = datetime(2026, 1, 1, 9, 0)
+        tracker.record(user_id, at=at)
+        
+        def fail(*args, **kwargs):
+            raise OperationalError('UPDATE users', {}, Exception('sin conexión'))
+        
+        with monkeypatch.context() as patch:
+            patch.setattr(db.session, 'execute', fail)
+            with pytest.raises(OperationalError):
+                tracker.flush()
+        
+        tracker.record(user_id, at=at - timedelta(hours=1))
+        assert tracker.pending(user_id) == (at, 2)
+        assert tracker.flush() == 1
+        assert db_session.get(User, user_id).login_count == 2
@@ -0,0 +1,120 @@
+"""
+Pruebas para las operaciones de migración sin bloqueos y el linter de migraciones.
+"""
+
+import io
+from pathlib import Path
+
+import pytest
+import sqlalchemy as sa
+from alembic.operations import Operations
+from alembic.runtime.migration import MigrationContext
+
+from app.utils.migrations import backfill, create_index_concurrently
+from migrations.lint import lint_migration
+
+@pytest.fixture
+def engine(tmp_path):
+    """Base de datos SQLite con una tabla `items` de 25 filas sin rellenar."""
+    engine = sa.create_engine(f"sqlite:///{tmp_path / 'migrations.sqlite3'}")
+    with engine.begin() as connection:
+        connection.execute(sa.text('CREATE TABLE items (id INTEGER PRIMARY KEY, total INTEGER)'))
+        connection.execute(sa.text('INSERT INTO items (id) VALUES (:id)'), [{'id': i} for i in range(1, 26)])
+    yield engine
+    engine.dispose()
+
+def _run(connection, operation, **opts):
+    """Ejecuta una operación como dentro de una migración."""
+    context = MigrationContext.configure(connection, opts=opts)
+    with Operations.context(context), context.begin_transaction():
+        return operation()
+
+@pytest.mark.utils
+class TestMigrationOperations:
+    """Pruebas para `backfill` y `create_index_concurrently`."""
+    
+    def test_backfill_in_batches(self, engine):
+        """Prueba que el backfill actualiza en lotes y solo las filas pendientes."""
+        updates = []
+        sa.event.listen(engine, 'before_cursor_execute',
+                        lambda conn, cursor, statement, *args: updates.append(statement)
+                        if statement.startswith('UPDATE') else None)
+        with engine.connect() as connection:
+            # Filas de una ejecución anterior interrumpida: no se repiten
+            connection.execute(sa.text('UPDATE items SET total = -1 WHERE id <= 5'))
+            connection.commit()
+            updates.clear()
+            
+            updated = _run(connection, lambda: backfill('items', 'total = id * 2', 'total IS NULL', batch_size=8))
+            rows = dict(connection.execute(sa.text('SELECT id, total FROM items')).all())
+        
+        assert updated == 20
+        assert len(updates) == 3
+        assert rows[1] == -1 and rows[6] == 12 and rows[25] == 50
+    
+    def test_create_index_falls_back_outside_postgresql(self, engine):
+        """Prueba que fuera de PostgreSQL el índice se crea de la forma habitual."""
+        with engine.connect() as connection:
+            _run(connection, lambda: create_index_concurrently('idx_items_total', 'items', ['total']))
+        assert 'idx_items_total' in {index['name'] for index in sa.inspect(engine).get_indexes('items')}
+    
+    def test_offline_sql(self):
+        """Prueba el SQL que se genera con `--sql` en PostgreSQL."""
+        buffer = io.StringIO()
+        context = MigrationContext.configure(dialect_name='postgresql',
+                                             opts={'as_sql': True, 'output_buffer': buffer})
+        with Operations.context(context), context.begin_transaction():
+            create_index_concurrently('idx_entries_title', 'entries', ['title'])
+            backfill('entries', 'version = 1', 'version IS NULL')
+        sql = buffer.getvalue()
+        
+        assert 'COMMIT' in sql and 'CREATE INDEX CONCURRENTLY idx_entries_title ON entries (title)' in sql
+        assert 'UPDATE entries SET version = 1 WHERE version IS NULL' in sql
+
+@pytest.mark.utils
+class TestMigrationLinter:
+    """Pruebas para `lint_migration`."""
+    
+    def test_flags_locking_operations(self):
+        """Prueba que se avisa de las operaciones que bloquean tablas grandes."""
+        source = '''
+def upgrade():
+    op.create_index('idx_entry_title', 'entries', ['title'])
+    with op.batch_alter_table('entries', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('summary', sa.Text(), nullable=False))
+        batch_op.alter_column('title', type_=sa.Text())
+    op.create_foreign_key('fk_tag', 'tags', 'users', ['user_id'], ['id'])
+    op.execute('UPDATE entries SET version = 1')
+    op.execute('CREATE INDEX idx_users_name ON users (username)')
+'''
+        lines = [issue.line for issue in lint_migration(source)]
+        assert lines == [3, 5, 6, 7, 8, 9]
+    
+    def test_accepts_safe_operations(self):
+        """Prueba que no se avisa de las operaciones seguras, de tablas nuevas o pequeñas ni de las ignoradas."""
+        source = '''
+def upgrade():
+    create_index_concurrently('idx_entry_title', 'entries', ['title'])
+    op.create_index('idx_entry_title2', 'entries', ['title'], postgresql_concurrently=True)
+    op.add_column('entries', sa.Column('summary', sa.Text(), nullable=True))
+    op.add_column('users', sa.Column('logins', sa.Integer(), server_default='0', nullable=False))
+    op.create_table('notes', sa.Column('id', sa.Integer()))
+    op.create_index('idx_notes', 'notes', ['id'])
+    op.create_index('idx_roles_name', 'roles', ['name'])
+    op.execute('ALTER TABLE entries ADD CONSTRAINT ck CHECK (version > 0) NOT VALID')
+    op.execute('UPDATE entries SET version = 1')  # lint-migrations: ignore
+
+def downgrade():
+    op.create_index('idx_entry_title', 'entries', ['title'])
+'''
+        assert lint_migration(source) == []
+    
+    def test_repository_migrations(self):
+        """Prueba que las migraciones posteriores a las iniciales no bloquean tablas grandes."""
+        versions = Path(__file__).resolve().parents[2] / 'migrations' / 'versions'
+        initial = ('144b5427e749', '15b4936e92b8')
+        paths = [path for path in versions.glob('*.py') if not path.name.startswith(initial)]
+        
+        assert paths
+        for path in paths:
+            assert lint_migration(path.read_text(encoding='utf-8')) == [], path.name
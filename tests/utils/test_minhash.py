@@ -0,0 +1,32 @@
+"""
+Pruebas para las firmas MinHash.
+"""
+
+import pytest
+
+from app.utils.minhash import NUM_PERM, band_buckets, compute_signature, minhash, normalize, \
+    shingle_hashes, signature_from_bytes, similarity
+
+NOTE = 'Hoy he ido al mercado a comprar fruta y verdura para toda la semana. Después he cocinado.'
+
+@pytest.mark.utils
+class TestMinhash:
+    """Pruebas para el cálculo de firmas y cubetas."""
+    
+    def test_near_duplicates_are_similar(self):
+        """Prueba que un texto con pequeños cambios se parece mucho más que uno distinto."""
+        original = minhash(shingle_hashes(normalize(NOTE)))
+        edited = minhash(shingle_hashes(normalize(NOTE.replace('fruta', 'frutas') + '  ')))
+        other = minhash(shingle_hashes(normalize('Lista de libros pendientes de leer este verano')))
+        
+        assert similarity(original, edited) > 0.7
+        assert similarity(original, other) < 0.2
+        assert set(band_buckets(original)) & set(band_buckets(edited))
+    
+    def test_signature_is_stable(self):
+        """Prueba que la firma no depende de mayúsculas, espacios ni del proceso."""
+        hash_value, signature, buckets = compute_signature(NOTE)
+        
+        assert compute_signature(NOTE.upper().replace(' ', '   ')) == (hash_value, signature, buckets)
+        assert len(signature_from_bytes(signature)) == NUM_PERM
+        assert compute_signature('   ') is None
@@ -0,0 +1,117 @@
+"""
+Pruebas para las sesiones guardadas en el servidor.
+"""
+
+import pickle
+import time
+
+import pytest
+from flask import session
+
+from app.utils.sessions import (SESSION_ID_PATTERN, FilesystemSessionStore, SQLiteSessionStore,
+                                ServerSideSessionInterface)
+
+@pytest.fixture(params=['sqlite', 'filesystem'])
+def store(request, tmp_path):
+    """Tienda de sesiones de cada tipo en un directorio temporal."""
+    if request.param == 'sqlite':
+        return SQLiteSessionStore(str(tmp_path / 'sessions.sqlite3'))
+    return FilesystemSessionStore(str(tmp_path / 'sessions'))
+
+@pytest.fixture
+def server_sessions(app, store, monkeypatch):
+    """La aplicación guarda las sesiones en `store` durante la prueba."""
+    monkeypatch.setattr(app, 'session_interface', ServerSideSessionInterface(store))
+    monkeypatch.setitem(app.config, 'SESSION_COOKIE_SECURE', False)
+    return store
+
+def _sid(client):
+    cookie = client.get_cookie('session', domain='localhost')
+    return cookie.value if cookie else None
+
+@pytest.mark.utils
+class TestSessionStores:
+    """Pruebas para las tiendas SQLite y de ficheros."""
+    
+    def test_roundtrip_and_expiry(self, store):
+        """Prueba que una sesión se guarda, caduca y se purga."""
+        now = time.time()
+        store.set('a' * 43, b'datos', now + 60)
+        store.set('b' * 43, b'viejos', now - 1)
+        
+        assert store.get('a' * 43) == (b'datos', now + 60)
+        assert store.get('b' * 43) is None
+        assert store.get('c' * 43) is None
+        assert store.purge() == 1
+        
+        store.delete('a' * 43)
+        assert store.get('a' * 43) is None
+
+@pytest.mark.utils
+class TestServerSideSessions:
+    """Pruebas para la interfaz de sesión de Flask."""
+    
+    def test_compact_cookie_and_login(self, app, server_sessions, db_session, test_user):
+        """Prueba que la cookie solo lleva el identificador y que autentica las peticiones."""
+        # Contexto propio: Flask-Login cachea en `g` el usuario (ver `api_client`)
+        with app.app_context(), app.test_client() as client:
+            with client.session_transaction() as sess:
+                sess['_user_id'] = test_user.get_id()
+                sess['_fresh'] = True
+            sid = _sid(client)
+            
+            assert SESSION_ID_PATTERN.match(sid)
+            data, _ = server_sessions.get(sid)
+            assert pickle.loads(data)['_user_id'] == test_user.get_id()
+            assert client.get('/api/v1/tags').status_code == 200
+    
+    def test_new_id_when_user_changes(self, app, server_sessions):
+        """Prueba que al iniciar o cerrar sesión se emite otro identificador y se borra el anterior."""
+        with app.test_client() as client:
+            with client.session_transaction() as sess:
+                sess['csrf_token'] = 'x'
+            anonymous = _sid(client)
+            with client.session_transaction() as sess:
+                sess['_user_id'] = 'uniquifier'
+            logged_in = _sid(client)
+            with client.session_transaction() as sess:
+                sess['csrf_token'] = 'y'
+            
+            assert logged_in != anonymous and _sid(client) == logged_in
+            assert server_sessions.get(anonymous) is None
+            
+            with client.session_transaction() as sess:
+                sess.clear()
+            assert _sid(client) is None
+            assert server_sessions.get(logged_in) is None
+    
+    def test_unknown_id_not_reused(self, app, server_sessions):
+        """Prueba que un identificador que no existe en la tienda no se adopta."""
+        planted = 'p' * 43
+        with app.test_client() as client:
+            client.set_cookie('session', planted, domain='localhost')
+            with client.session_transaction() as sess:
+                sess['csrf_token'] = 'x'
+            
+            assert _sid(client) != planted
+            assert server_sessions.get(planted) is None
+    
+    def test_lazy_loading(self, app, server_sessions, monkeypatch):
+        """Prueba que una petición que no usa la sesión no la lee ni la escribe."""
+        sid = 's' * 43
+        server_sessions.set(sid, pickle.dumps({'csrf_token': 'x'}), time.time() + 600)
+        reads = []
+        original = server_sessions.get
+        monkeypatch.setattr(server_sessions, 'get', lambda key: reads.append(key) or original(key))
+        interface = app.session_interface
+        
+        with app.test_request_context(headers={'Cookie': f'session={sid}'}) as context:
+            untouched = interface.open_session(app, context.request)
+            response = app.response_class()
+            interface.save_session(app, untouched, response)
+            assert reads == [] and 'Set-Cookie' not in response.headers
+        
+        with app.test_request_context(headers={'Cookie': f'session={sid}'}) as context:
+            used = interface.open_session(app, context.request)
+            assert used['csrf_token'] == 'x'
+            assert reads == [sid]